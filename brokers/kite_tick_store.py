@@ -0,0 +1,280 @@
+"""
+Kite Tick Store
+Preallocated per-token record store for Zerodha WebSocket ticks
+"""
+
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional, Any
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Kite full-mode ticks carry 5 levels of depth on each side
+DEPTH_LEVELS = 5
+
+
+class KiteTickStore:
+    """
+    Columnar store for Kite ticks keyed by instrument token.
+
+    Each token owns a fixed slot in a set of preallocated NumPy arrays, so the
+    ticker thread only does in-place writes (no per-tick dicts, no ISO
+    formatting). Timestamps are monotonic nanoseconds and the TTL check on read
+    is a single vectorized comparison. Snapshots are returned in the same
+    schema the TrueData path writes to ``live_market_data``.
+    """
+
+    def __init__(self, capacity: int = 1024, ttl_seconds: float = 5.0):
+        self._lock = threading.Lock()
+        self._ttl_ns = int(ttl_seconds * 1e9)
+        self._token_to_slot: Dict[int, int] = {}
+        self._symbol_to_slot: Dict[str, int] = {}
+        self._slot_symbols: List[Optional[str]] = []
+        self._slot_tokens: List[int] = []
+        self._depth_listeners: List[Callable] = []
+
+        # Wall-clock anchor so monotonic stamps can be rendered as ISO on read
+        self._wall_anchor = time.time()
+        self._mono_anchor_ns = time.monotonic_ns()
+
+        self._capacity = 0
+        self._allocate(max(1, capacity))
+
+    def _allocate(self, capacity: int):
+        """Allocate (or grow) the column arrays to ``capacity`` slots"""
+        def grow(old, shape, dtype):
+            new = np.zeros(shape, dtype=dtype)
+            if old is not None:
+                new[:old.shape[0]] = old
+            return new
+
+        get = lambda name: getattr(self, name, None)
+        self._ltp = grow(get('_ltp'), capacity, np.float64)
+        self._open = grow(get('_open'), capacity, np.float64)
+        self._high = grow(get('_high'), capacity, np.float64)
+        self._low = grow(get('_low'), capacity, np.float64)
+        self._prev_close = grow(get('_prev_close'), capacity, np.float64)
+        self._change = grow(get('_change'), capacity, np.float64)
+        self._volume = grow(get('_volume'), capacity, np.int64)
+        self._oi = grow(get('_oi'), capacity, np.int64)
+        self._ts_ns = grow(get('_ts_ns'), capacity, np.int64)
+
+        # Depth: [slot, level] for price / quantity / orders on each side
+        depth_shape = (capacity, DEPTH_LEVELS)
+        self._bid_px = grow(get('_bid_px'), depth_shape, np.float64)
+        self._bid_qty = grow(get('_bid_qty'), depth_shape, np.int64)
+        self._bid_orders = grow(get('_bid_orders'), depth_shape, np.int32)
+        self._ask_px = grow(get('_ask_px'), depth_shape, np.float64)
+        self._ask_qty = grow(get('_ask_qty'), depth_shape, np.int64)
+        self._ask_orders = grow(get('_ask_orders'), depth_shape, np.int32)
+        self._has_depth = grow(get('_has_depth'), capacity, np.bool_)
+
+        self._capacity = capacity
+
+    def _slot_for(self, token: int, symbol: str) -> int:
+        """Return the slot for a token, registering it on first sight"""
+        slot = self._token_to_slot.get(token)
+        if slot is not None:
+            if self._slot_symbols[slot] != symbol:
+                self._symbol_to_slot.pop(self._slot_symbols[slot], None)
+                self._slot_symbols[slot] = symbol
+                self._symbol_to_slot[symbol] = slot
+            return slot
+
+        slot = len(self._slot_tokens)
+        if slot >= self._capacity:
+            self._allocate(self._capacity * 2)
+            logger.debug(f"📊 KiteTickStore grown to {self._capacity} slots")
+        self._token_to_slot[token] = slot
+        self._slot_tokens.append(token)
+        self._slot_symbols.append(symbol)
+        self._symbol_to_slot[symbol] = slot
+        return slot
+
+    def write_ticks(self, ticks: Iterable[Dict], token_to_symbol: Dict[int, str]) -> int:
+        """
+        Write a batch of raw Kite ticks in place.
+
+        Returns the number of ticks stored.
+        """
+        now_ns = time.monotonic_ns()
+        stored = 0
+        with self._lock:
+            for tick in ticks:
+                token = tick.get('instrument_token')
+                if not token:
+                    continue
+                slot = self._slot_for(token, token_to_symbol.get(token) or f"TOKEN_{token}")
+
+                self._ltp[slot] = tick.get('last_price') or 0.0
+                self._volume[slot] = tick.get('volume_traded', tick.get('volume')) or 0
+                self._change[slot] = tick.get('change') or 0.0
+                self._oi[slot] = tick.get('oi') or 0
+
+                ohlc = tick.get('ohlc')
+                if ohlc:
+                    self._open[slot] = ohlc.get('open') or 0.0
+                    self._high[slot] = ohlc.get('high') or 0.0
+                    self._low[slot] = ohlc.get('low') or 0.0
+                    # In Kite ticks ohlc.close is the PREVIOUS day's close
+                    self._prev_close[slot] = ohlc.get('close') or 0.0
+
+                depth = tick.get('depth')
+                if depth:
+                    self._write_side(depth.get('buy'), self._bid_px[slot], self._bid_qty[slot], self._bid_orders[slot])
+                    self._write_side(depth.get('sell'), self._ask_px[slot], self._ask_qty[slot], self._ask_orders[slot])
+                    self._has_depth[slot] = True
+                else:
+                    # No depth in this tick: drop the previous levels so readers never see a stale book
+                    self._has_depth[slot] = False
+
+                self._ts_ns[slot] = now_ns
+                stored += 1
+
+                if depth and self._depth_listeners:
+                    self._notify_depth(slot, now_ns)
+        return stored
+
+    def add_depth_listener(self, listener: Callable):
+        """
+        Register a callback invoked for every depth tick with
+        ``(symbol, ts_ns, ltp, volume, bid_px, bid_qty, ask_px, ask_qty)``.
+        Depth rows are passed as views into the store - listeners must not keep them.
+        """
+        if listener not in self._depth_listeners:
+            self._depth_listeners.append(listener)
+
+    def _notify_depth(self, slot: int, ts_ns: int):
+        symbol = self._slot_symbols[slot]
+        for listener in self._depth_listeners:
+            try:
+                listener(symbol, ts_ns, float(self._ltp[slot]), int(self._volume[slot]),
+                         self._bid_px[slot], self._bid_qty[slot], self._ask_px[slot], self._ask_qty[slot])
+            except Exception as e:
+                logger.debug(f"Depth listener error for {symbol}: {e}")
+
+    @staticmethod
+    def _write_side(levels: Optional[List[Dict]], px, qty, orders):
+        """Copy up to DEPTH_LEVELS depth entries into fixed-size rows"""
+        n = 0
+        if levels:
+            for level in levels[:DEPTH_LEVELS]:
+                px[n] = level.get('price') or 0.0
+                qty[n] = level.get('quantity') or 0
+                orders[n] = level.get('orders') or 0
+                n += 1
+        if n < DEPTH_LEVELS:
+            px[n:] = 0.0
+            qty[n:] = 0
+            orders[n:] = 0
+
+    def fresh_slots(self, max_age_seconds: Optional[float] = None) -> np.ndarray:
+        """Vectorized TTL check: indices of slots updated within the TTL"""
+        ttl_ns = self._ttl_ns if max_age_seconds is None else int(max_age_seconds * 1e9)
+        n = len(self._slot_tokens)
+        if n == 0:
+            return np.empty(0, dtype=np.int64)
+        ts = self._ts_ns[:n]
+        mask = (ts > 0) & ((time.monotonic_ns() - ts) <= ttl_ns)
+        return np.flatnonzero(mask)
+
+    def _record(self, slot: int, symbol: str) -> Dict[str, Any]:
+        """Materialize one slot as a TrueData-schema market data dict"""
+        ltp = float(self._ltp[slot])
+        prev_close = float(self._prev_close[slot])
+        change = float(self._change[slot])
+        change_percent = (change / prev_close * 100) if prev_close > 0 else 0
+        high = float(self._high[slot])
+        low = float(self._low[slot])
+        open_price = float(self._open[slot])
+        volume = int(self._volume[slot])
+        oi = int(self._oi[slot])
+        has_depth = bool(self._has_depth[slot])
+        ohlc_available = high > 0 and low > 0 and open_price > 0 and high != low
+        wall = self._wall_anchor + (int(self._ts_ns[slot]) - self._mono_anchor_ns) / 1e9
+
+        return {
+            'symbol': symbol,
+            'ltp': ltp,
+            'close': prev_close,
+            'previous_close': prev_close,
+            'high': high,
+            'low': low,
+            'open': open_price,
+            'volume': volume,
+            'change': change,
+            'changeper': change_percent,
+            'change_percent': change_percent,
+            'bid': float(self._bid_px[slot, 0]) if has_depth else 0,
+            'ask': float(self._ask_px[slot, 0]) if has_depth else 0,
+            'oi': oi,
+            'depth': self._depth_dict(slot) if has_depth else {},
+            'timestamp': datetime.fromtimestamp(wall).isoformat(),
+            'source': 'zerodha_websocket',
+            'instrument_token': self._slot_tokens[slot],
+            'ohlc_available': ohlc_available,
+            'data_quality': {
+                'has_ohlc': ohlc_available,
+                'has_volume': volume > 0,
+                'has_change_percent': change_percent != 0,
+                'has_previous_close': prev_close > 0 and prev_close != ltp,
+                'calculated_change_percent': True,
+                'has_oi': oi > 0
+            }
+        }
+
+    def _depth_dict(self, slot: int) -> Dict[str, List[Dict]]:
+        """Rebuild the Kite depth structure for consumers that expect it"""
+        return {
+            'buy': [
+                {'price': float(p), 'quantity': int(q), 'orders': int(o)}
+                for p, q, o in zip(self._bid_px[slot], self._bid_qty[slot], self._bid_orders[slot])
+            ],
+            'sell': [
+                {'price': float(p), 'quantity': int(q), 'orders': int(o)}
+                for p, q, o in zip(self._ask_px[slot], self._ask_qty[slot], self._ask_orders[slot])
+            ]
+        }
+
+    def snapshot(self, symbols: Optional[List[str]] = None,
+                 max_age_seconds: Optional[float] = None) -> Dict[str, Dict[str, Any]]:
+        """Return fresh ticks keyed by symbol, optionally filtered"""
+        wanted = set(symbols) if symbols else None
+        result = {}
+        with self._lock:
+            for slot in self.fresh_slots(max_age_seconds):
+                symbol = self._slot_symbols[slot]
+                if wanted is not None and symbol not in wanted:
+                    continue
+                result[symbol] = self._record(int(slot), symbol)
+        return result
+
+    def get_depth_arrays(self, symbol: str) -> Optional[Dict[str, np.ndarray]]:
+        """Return copies of the fixed-size depth rows for a symbol"""
+        with self._lock:
+            slot = self._symbol_to_slot.get(symbol)
+            if slot is None or not self._has_depth[slot]:
+                return None
+            return {
+                'bid_px': self._bid_px[slot].copy(),
+                'bid_qty': self._bid_qty[slot].copy(),
+                'ask_px': self._ask_px[slot].copy(),
+                'ask_qty': self._ask_qty[slot].copy(),
+            }
+
+    def clear(self):
+        """Drop all records (slots are kept allocated)"""
+        with self._lock:
+            self._token_to_slot.clear()
+            self._symbol_to_slot.clear()
+            self._slot_tokens.clear()
+            self._slot_symbols.clear()
+            self._ts_ns[:] = 0
+            self._has_depth[:] = False
+
+    def __len__(self) -> int:
+        return len(self._slot_tokens)
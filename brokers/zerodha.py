@@ -23,6 +23,28 @@ except ImportError:
     KiteConnect = None
     KiteTicker = None
 
+from .kite_tick_store import KiteTickStore
+
+# Hot-path Prometheus metrics; optional so the broker still loads standalone
+try:
+    from src.utils.hot_metrics import broker_call_seconds, order_path_seconds, timed_async
+except ImportError:
+    broker_call_seconds = order_path_seconds = None
+
+    def timed_async(*_args, **_kwargs):
+        return lambda func: func
+
+# Kite per-API-key rate ceilings are enforced centrally; optional like the metrics above
+try:
+    from src.core.order_dispatch_scheduler import (
+        DispatchPriority, OrderDispatchTimeout, api_kind, modification_priority, order_dispatcher, order_priority
+    )
+except ImportError:
+    order_dispatcher = None
+
+    class OrderDispatchTimeout(Exception):
+        """Never raised without the dispatch scheduler"""
+
 logger = logging.getLogger(__name__)
 
 class ConnectionState(Enum):
@@ -47,10 +69,10 @@ class ZerodhaIntegration:
         self.max_retries = 3
         self.retry_delay = 2
         
-        # Rate limiting (ONLY add what's needed for order_semaphore error)
-        self.order_semaphore = asyncio.Semaphore(1)
+        # Rate limiting: calls are paced per API key by the order dispatch scheduler
+        self.dispatcher = order_dispatcher
         self.last_order_time = 0
-        self.order_rate_limit = 1.0  # Used in place_order method
+        self.order_rate_limit = 1.0  # Fallback spacing when the scheduler is unavailable
         
         # 🚨 CRITICAL: Lock for KiteConnect initialization to prevent race conditions
         self._kite_init_lock = threading.Lock()
@@ -69,6 +91,20 @@ class ZerodhaIntegration:
             'nse_instruments': 3600   # 1 hour
         }
         
+        # WebSocket ticks live in a preallocated columnar store, not _unified_cache
+        self._tick_store = KiteTickStore(ttl_seconds=5)
+        try:
+            # Feed full-mode depth straight into the microstructure engine
+            from src.core.market_depth_engine import market_depth_engine
+            self._tick_store.add_depth_listener(market_depth_engine.on_depth)
+        except ImportError:
+            logger.debug("Market depth engine not available - depth analytics disabled")
+        try:
+            from src.core.tick_journal import tick_journal
+            self._tick_journal = tick_journal
+        except ImportError:
+            self._tick_journal = None
+        
         # Rate limit tracking
         self._last_rate_limit_log = 0
         
@@ -240,6 +276,7 @@ class ZerodhaIntegration:
         """🚨 DEFENSIVE: Reset all caches to prevent corruption"""
         try:
             self._unified_cache.clear()
+            self._tick_store.clear()
             # Reset separate instrument caches
             self._instruments_cache = {}
             self._nfo_instruments = None
@@ -489,6 +526,7 @@ class ZerodhaIntegration:
             logger.error(f"Traceback: {traceback.format_exc()}")
             return False
 
+    @timed_async(order_path_seconds, 'broker', outcome=lambda order_id: 'ok' if order_id else 'rejected')
     async def place_order(self, order_params: Dict) -> Optional[str]:
         """Place order with built-in rate limiting, cooldown, and retry logic"""
         
@@ -607,44 +645,47 @@ class ZerodhaIntegration:
                 logger.warning(f"   Remaining: {remaining:.0f}s/{self._cooldown_seconds}s ({remaining/60:.1f} min)")
                 return None
         
-        async with self.order_semaphore:
-            # Rate limiting
-            current_time = time.time()
-            if current_time - self.last_order_time < self.order_rate_limit:
-                wait_time = self.order_rate_limit - (current_time - self.last_order_time)
-                logger.info(f"⏱️ Rate limiting: waiting {wait_time:.2f}s")
-                await asyncio.sleep(wait_time)
-            
-            # Retry logic
-            for attempt in range(self.max_retries):
-                try:
-                    result = await self._place_order_impl(order_params)
-                    if result:
-                        self.last_order_time = time.time()
-                        
-                        # 🔧 FIX: Invalidate positions cache IMMEDIATELY after order
-                        # This ensures duplicate checks see the new position
-                        if 'positions' in self._unified_cache:
-                            del self._unified_cache['positions']
-                            logger.info(f"🔄 CACHE INVALIDATED: Positions cache cleared after {symbol} {action}")
-                        
-                        # 🔥 Set cooldown after successful ENTRY order only
-                        # EXIT orders don't trigger cooldown (we need to be able to exit)
-                        if not is_exit_order:
-                            self._symbol_cooldown[symbol] = now
-                            self._symbol_last_action[symbol] = action
-                            logger.info(f"🧊 COOLDOWN SET: {symbol} {action} - {self._cooldown_seconds/60:.0f} min cooldown started")
-                        else:
-                            logger.info(f"✅ EXIT ORDER COMPLETED: {symbol} {action} x{quantity} - No cooldown for exits")
-                        
-                        return result
-                except Exception as e:
-                    logger.error(f"❌ Order attempt {attempt + 1} failed: {e}")
-                    if attempt < self.max_retries - 1:
-                        await asyncio.sleep(self.retry_delay)
-            
-            logger.error("❌ Order failed after all retries")
-            return None
+        # Rate limiting (the dispatch scheduler paces the API call itself, exits first)
+        current_time = time.time()
+        if self.dispatcher is None and current_time - self.last_order_time < self.order_rate_limit:
+            wait_time = self.order_rate_limit - (current_time - self.last_order_time)
+            logger.info(f"⏱️ Rate limiting: waiting {wait_time:.2f}s")
+            await asyncio.sleep(wait_time)
+        
+        # Retry logic
+        for attempt in range(self.max_retries):
+            try:
+                result = await self._place_order_impl(order_params)
+                if result:
+                    self.last_order_time = time.time()
+                    
+                    # 🔧 FIX: Invalidate positions cache IMMEDIATELY after order
+                    # This ensures duplicate checks see the new position
+                    if 'positions' in self._unified_cache:
+                        del self._unified_cache['positions']
+                        logger.info(f"🔄 CACHE INVALIDATED: Positions cache cleared after {symbol} {action}")
+                    
+                    # 🔥 Set cooldown after successful ENTRY order only
+                    # EXIT orders don't trigger cooldown (we need to be able to exit)
+                    if not is_exit_order:
+                        self._symbol_cooldown[symbol] = now
+                        self._symbol_last_action[symbol] = action
+                        logger.info(f"🧊 COOLDOWN SET: {symbol} {action} - {self._cooldown_seconds/60:.0f} min cooldown started")
+                    else:
+                        logger.info(f"✅ EXIT ORDER COMPLETED: {symbol} {action} x{quantity} - No cooldown for exits")
+                    
+                    return result
+            except OrderDispatchTimeout as e:
+                # The entry missed its dispatch deadline - retrying would only queue it again
+                logger.warning(f"⏰ ENTRY DROPPED: {symbol} {action} x{quantity} - {e}")
+                return None
+            except Exception as e:
+                logger.error(f"❌ Order attempt {attempt + 1} failed: {e}")
+                if attempt < self.max_retries - 1:
+                    await asyncio.sleep(self.retry_delay)
+        
+        logger.error("❌ Order failed after all retries")
+        return None
 
     async def _place_order_impl(self, order_params: Dict) -> Optional[str]:
         """Place order implementation with retries and proper error handling"""
@@ -776,6 +817,7 @@ class ZerodhaIntegration:
                 # Place the REAL order
                 order_response = await self._async_api_call(
                     self.kite.place_order,
+                    dispatch_priority=order_priority(order_params) if self.dispatcher else None,
                     **zerodha_params
                 )
                 
@@ -798,6 +840,9 @@ class ZerodhaIntegration:
                     logger.error(f"❌ Zerodha order failed: No response")
                     return None
                     
+            except OrderDispatchTimeout:
+                # Final for this order; place_order must not retry it
+                raise
             except Exception as e:
                 error_msg = str(e)
                 logger.error(f"❌ Error placing REAL order: {error_msg}")
@@ -816,6 +861,13 @@ class ZerodhaIntegration:
             if isinstance(cached, (int, float)) and cached > 0:
                 return float(cached)
 
+            # Option contracts: today's contract specs, no instrument scan
+            from src.core.contract_specs import contract_specs
+            tick = contract_specs.get_tick_size_for_symbol(tradingsymbol)
+            if tick:
+                self._tick_size_cache[cache_key] = float(tick)
+                return float(tick)
+
             # Prefer already-cached instruments to avoid extra API calls
             instruments = None
             if exchange == "NSE" and isinstance(self._nse_instruments, list) and self._nse_instruments:
@@ -898,10 +950,26 @@ class ZerodhaIntegration:
             except Exception:
                 return price
 
-    async def _async_api_call(self, func, *args, **kwargs):
-        """Execute synchronous API call in thread pool"""
+    async def _async_api_call(self, func, *args, dispatch_priority: Optional[int] = None, **kwargs):
+        """Execute synchronous API call in thread pool
+
+        The call first waits for capacity in its Kite rate-limit lane (per API key);
+        ``dispatch_priority`` orders it against other queued calls.
+        """
+        if self.dispatcher is not None:
+            await self.dispatcher.acquire(self.api_key or self.user_id or 'default',
+                                          api_kind(getattr(func, '__name__', '')), dispatch_priority)
         loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(None, lambda: func(*args, **kwargs))
+        started = time.perf_counter()
+        outcome = 'error'
+        try:
+            result = await loop.run_in_executor(None, lambda: func(*args, **kwargs))
+            outcome = 'ok'
+            return result
+        finally:
+            if broker_call_seconds is not None:
+                broker_call_seconds.labels(getattr(func, '__name__', 'call'), outcome).observe(
+                    time.perf_counter() - started)
 
     def _get_transaction_type(self, order_params: Dict) -> str:
         """Extract transaction type from order parameters"""
@@ -1078,51 +1146,11 @@ class ZerodhaIntegration:
             
             logger.debug(f"📊 Received {len(ticks)} ticks from WebSocket")
             
-            # Process each tick and store in Redis
-            for tick in ticks:
-                try:
-                    instrument_token = tick.get('instrument_token')
-                    if not instrument_token:
-                        continue
-                    
-                    # Map token to symbol (need to maintain reverse mapping)
-                    symbol = self._token_to_symbol.get(instrument_token, f"TOKEN_{instrument_token}")
-                    
-                    # Transform to standard format matching quote API
-                    # 🔍 CRITICAL: In Zerodha ticks, ohlc.close is PREVIOUS DAY's close, NOT today's close!
-                    ohlc_data = tick.get('ohlc', {})
-                    prev_close = ohlc_data.get('close', 0)
-                    
-                    tick_data = {
-                        'symbol': symbol,
-                        'ltp': tick.get('last_price', 0),
-                        'open': ohlc_data.get('open', 0),
-                        'high': ohlc_data.get('high', 0),
-                        'low': ohlc_data.get('low', 0),
-                        'previous_close': prev_close,  # 🎯 THIS IS PREVIOUS DAY's CLOSE (FIXED: 2025-11-14)
-                        'volume': tick.get('volume', 0),
-                        'change': tick.get('change', 0),
-                        'change_percent': (tick.get('change', 0) / prev_close * 100) if prev_close > 0 else 0,
-                        'bid': tick.get('depth', {}).get('buy', [{}])[0].get('price', 0) if tick.get('depth', {}).get('buy') else 0,
-                        'ask': tick.get('depth', {}).get('sell', [{}])[0].get('price', 0) if tick.get('depth', {}).get('sell') else 0,
-                        'depth': tick.get('depth', {}),
-                        'timestamp': datetime.now().isoformat(),
-                        'source': 'zerodha_websocket',
-                        'instrument_token': instrument_token
-                    }
-                    
-                    # Store in cache with symbol key
-                    cache_key = f'websocket_tick:{symbol}'
-                    self._unified_cache[cache_key] = {
-                        'data': tick_data,
-                        'timestamp': time.time(),
-                        'ttl': 5  # 5 second TTL for ticks
-                    }
-                    
-                except Exception as tick_error:
-                    logger.debug(f"Error processing tick for {instrument_token}: {tick_error}")
-                    continue
-                    
+            # Write ticks in place into the per-token store (same schema as TrueData on read)
+            self._tick_store.write_ticks(ticks, self._token_to_symbol)
+            if self._tick_journal is not None:
+                self._tick_journal.record_kite_ticks(ticks, self._token_to_symbol)
+
         except Exception as e:
             logger.error(f"❌ Error in _on_ticks: {e}")
 
@@ -1259,33 +1287,11 @@ class ZerodhaIntegration:
     
     def get_websocket_ticks(self, symbols: List[str] = None) -> Dict[str, Any]:
         """
-        Get latest WebSocket tick data from cache
-        Returns dict matching quote API format
+        Get latest WebSocket tick data from the tick store
+        Returns dict in TrueData format (superset of quote API fields)
         """
         try:
-            result = {}
-            
-            # Get all cached ticks
-            current_time = time.time()
-            for cache_key, cache_value in list(self._unified_cache.items()):
-                if not cache_key.startswith('websocket_tick:'):
-                    continue
-                
-                # Check if cache is still valid
-                if current_time - cache_value['timestamp'] > cache_value['ttl']:
-                    continue
-                
-                tick_data = cache_value['data']
-                symbol = tick_data.get('symbol')
-                
-                # Filter by symbols if provided
-                if symbols and symbol not in symbols:
-                    continue
-                
-                result[symbol] = tick_data
-            
-            return result
-            
+            return self._tick_store.snapshot(symbols)
         except Exception as e:
             logger.error(f"❌ Error getting WebSocket ticks: {e}")
             return {}
@@ -1382,7 +1388,9 @@ class ZerodhaIntegration:
             try:
                 if not self.kite or not self.access_token:
                     return False
-                result = await self._async_api_call(self.kite.cancel_order, 'regular', order_id)
+                result = await self._async_api_call(
+                    self.kite.cancel_order, 'regular', order_id,
+                    dispatch_priority=DispatchPriority.MODIFY if self.dispatcher else None)
                 return bool(result)
             except Exception as e:
                 logger.error(f"❌ Cancel order attempt {attempt + 1} failed: {e}")
@@ -1397,7 +1405,10 @@ class ZerodhaIntegration:
                 if not self.kite or not self.access_token:
                     return {}
                 # Implement modify order logic
-                result = await self._async_api_call(self.kite.modify_order, 'regular', order_id, **order_params)
+                result = await self._async_api_call(
+                    self.kite.modify_order, 'regular', order_id,
+                    dispatch_priority=modification_priority(order_params) if self.dispatcher else None,
+                    **order_params)
                 return result or {}
             except Exception as e:
                 logger.error(f"❌ Modify order attempt {attempt + 1} failed: {e}")
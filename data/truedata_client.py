@@ -40,6 +40,27 @@ logger = logging.getLogger(__name__)
 # Global data storage
 live_market_data: Dict[str, Dict] = {}
 
+# Append-only tick journal (session replay); optional so the client still loads standalone
+try:
+    from src.core.tick_journal import tick_journal
+except ImportError:
+    tick_journal = None
+
+# Streaming per-symbol data quality scores, fed from the tick workers
+try:
+    from monitoring.data_quality_monitor import data_quality_monitor
+except ImportError:
+    data_quality_monitor = None
+
+# Hot-path Prometheus metrics (thread-local accumulation, safe per tick)
+try:
+    from src.utils.hot_metrics import (TICKS_BY_CLASS, TICK_LATENCY_BY_CLASS,
+                                       dropped_ticks_total, hot_metrics, symbol_class)
+    _DROPPED_QUEUE_FULL = dropped_ticks_total.labels('queue_full')
+    _DROPPED_RATE_LIMIT = dropped_ticks_total.labels('rate_limit')
+except ImportError:
+    hot_metrics = None
+
 # Add connection status tracking
 truedata_connection_status = {
     'connected': False,
@@ -233,6 +254,9 @@ class TrueDataClient:
         self._tick_queue: "queue.Queue" = queue.Queue(
             maxsize=int(os.getenv('TRUEDATA_TICK_QUEUE_SIZE', '20000'))
         )
+        if hot_metrics is not None:
+            hot_metrics.gauge('trading_system_tick_queue_depth',
+                              'TrueData ticks waiting for a worker', self._tick_queue.qsize)
         self._tick_worker_stop = threading.Event()
         self._tick_worker_threads: List[threading.Thread] = []
         self._tick_workers_started = False
@@ -256,7 +280,14 @@ class TrueDataClient:
                 try:
                     processor = self._tick_processor
                     if processor is not None:
-                        processor(tick)
+                        if hot_metrics is None:
+                            processor(tick)
+                        else:
+                            started = time.perf_counter()
+                            processor(tick)
+                            cls = symbol_class(getattr(tick, 'symbol', ''))
+                            TICK_LATENCY_BY_CLASS[cls].observe(time.perf_counter() - started)
+                            TICKS_BY_CLASS[cls].inc()
                 except Exception as e:
                     # Never let worker errors kill the thread
                     logger.error(f"❌ TrueData tick worker error: {e}")
@@ -1301,6 +1332,13 @@ class TrueDataClient:
                 # Store in local cache (existing behavior)
                 live_market_data[symbol] = market_data
 
+                # Append to the on-disk tick journal for session replay
+                if tick_journal is not None:
+                    tick_journal.record(symbol, market_data, source='truedata')
+
+                if data_quality_monitor is not None:
+                    data_quality_monitor.record_tick(symbol, ltp, volume)
+
                 # CRITICAL: Store in Redis for cross-process access
                 # 🚨 2025-12-31 FIX: AUTO-EXPIRING DATA for clean stale data handling
                 # When WebSocket disconnects, data auto-expires in 60 seconds
@@ -1392,11 +1430,15 @@ class TrueDataClient:
             callback_execution_count['count'] += 1
             if callback_execution_count['count'] > MAX_CALLBACKS_PER_SECOND:
                 logger.error(f"❌ CALLBACK RATE LIMIT EXCEEDED: {callback_execution_count['count']}/sec - Dropping tick")
+                if hot_metrics is not None:
+                    _DROPPED_RATE_LIMIT.inc()
                 return  # Drop this tick to prevent system overload
             try:
                 self._tick_queue.put_nowait(tick_data)
             except queue.Full:
                 # Drop tick if we're saturated; better than blocking websocket thread.
+                if hot_metrics is not None:
+                    _DROPPED_QUEUE_FULL.inc()
                 return
             except Exception:
                 # Never let callback throw.
@@ -0,0 +1,248 @@
+-- Migration: Add pre-aggregated P&L rollup tables
+-- Version: 018
+-- Date: 2026-10-18
+-- Description: Per user/day, user/symbol/day and user/strategy/day P&L rollups for the
+--              user analytics endpoints. Rows are maintained by a trigger on trades, so every
+--              writer (trade engine, performance tracker, Zerodha sync) keeps them current.
+--              Only the (user, day, symbol, strategy) keys touched by a write are recomputed,
+--              which keeps report latency flat as trade history grows.
+
+BEGIN;
+
+-- Supports the per-key recompute below
+CREATE INDEX IF NOT EXISTS idx_trades_user_created ON trades(user_id, created_at);
+
+CREATE TABLE IF NOT EXISTS user_pnl_daily (
+    user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    trade_date DATE NOT NULL,
+    trade_count INTEGER NOT NULL DEFAULT 0,
+    winning_trades INTEGER NOT NULL DEFAULT 0,
+    losing_trades INTEGER NOT NULL DEFAULT 0,
+    pnl_count INTEGER NOT NULL DEFAULT 0,
+    total_pnl DECIMAL(15,2) NOT NULL DEFAULT 0,
+    gross_profit DECIMAL(15,2) NOT NULL DEFAULT 0,
+    gross_loss DECIMAL(15,2) NOT NULL DEFAULT 0,
+    max_win DECIMAL(12,2) NOT NULL DEFAULT 0,
+    max_loss DECIMAL(12,2) NOT NULL DEFAULT 0,
+    pnl_sq_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+    loss_sq_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+    notional DECIMAL(18,2) NOT NULL DEFAULT 0,
+    notional_count INTEGER NOT NULL DEFAULT 0,
+    first_trade_at TIMESTAMP WITH TIME ZONE,
+    last_trade_at TIMESTAMP WITH TIME ZONE,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    PRIMARY KEY (user_id, trade_date)
+);
+
+CREATE TABLE IF NOT EXISTS user_symbol_pnl_daily (
+    user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    trade_date DATE NOT NULL,
+    symbol VARCHAR(20) NOT NULL,
+    trade_count INTEGER NOT NULL DEFAULT 0,
+    winning_trades INTEGER NOT NULL DEFAULT 0,
+    losing_trades INTEGER NOT NULL DEFAULT 0,
+    total_pnl DECIMAL(15,2) NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    PRIMARY KEY (user_id, trade_date, symbol)
+);
+
+-- strategy is '' for trades without a strategy (primary key columns cannot be NULL)
+CREATE TABLE IF NOT EXISTS user_strategy_pnl_daily (
+    user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    trade_date DATE NOT NULL,
+    strategy VARCHAR(50) NOT NULL,
+    trade_count INTEGER NOT NULL DEFAULT 0,
+    winning_trades INTEGER NOT NULL DEFAULT 0,
+    losing_trades INTEGER NOT NULL DEFAULT 0,
+    total_pnl DECIMAL(15,2) NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    PRIMARY KEY (user_id, trade_date, strategy)
+);
+
+-- Recompute the rollup rows for one (user, day, symbol, strategy) key from trades.
+-- Concurrent trades for the same user and day serialize on a transaction-scoped advisory
+-- lock, and rows are upserted, so the refresh can never fail the trade write that fired it.
+CREATE OR REPLACE FUNCTION refresh_trade_pnl_rollups(
+    p_user_id INTEGER, p_day DATE, p_symbol VARCHAR, p_strategy VARCHAR
+) RETURNS VOID AS $$
+DECLARE
+    day_start TIMESTAMP WITH TIME ZONE := p_day::timestamp AT TIME ZONE 'UTC';
+    day_end TIMESTAMP WITH TIME ZONE := (p_day + 1)::timestamp AT TIME ZONE 'UTC';
+BEGIN
+    IF p_user_id IS NULL OR p_day IS NULL THEN
+        RETURN;
+    END IF;
+
+    -- One lock per (user, day) covers the symbol and strategy rows of that day too
+    PERFORM pg_advisory_xact_lock(p_user_id, p_day - DATE '2000-01-01');
+
+    INSERT INTO user_pnl_daily (
+        user_id, trade_date, trade_count, winning_trades, losing_trades, pnl_count,
+        total_pnl, gross_profit, gross_loss, max_win, max_loss, pnl_sq_sum, loss_sq_sum,
+        notional, notional_count, first_trade_at, last_trade_at, updated_at
+    )
+    SELECT p_user_id, p_day,
+           COUNT(*),
+           COUNT(*) FILTER (WHERE pnl > 0),
+           COUNT(*) FILTER (WHERE pnl < 0),
+           COUNT(pnl),
+           COALESCE(SUM(pnl), 0),
+           COALESCE(SUM(pnl) FILTER (WHERE pnl > 0), 0),
+           COALESCE(SUM(pnl) FILTER (WHERE pnl < 0), 0),
+           COALESCE(MAX(pnl) FILTER (WHERE pnl > 0), 0),
+           COALESCE(MIN(pnl) FILTER (WHERE pnl < 0), 0),
+           COALESCE(SUM((pnl * pnl)::double precision), 0),
+           COALESCE(SUM((pnl * pnl)::double precision) FILTER (WHERE pnl < 0), 0),
+           COALESCE(SUM(quantity * price) FILTER (WHERE quantity > 0 AND price > 0), 0),
+           COUNT(*) FILTER (WHERE quantity > 0 AND price > 0),
+           MIN(created_at),
+           MAX(created_at),
+           NOW()
+    FROM trades
+    WHERE user_id = p_user_id AND created_at >= day_start AND created_at < day_end
+    HAVING COUNT(*) > 0
+    ON CONFLICT (user_id, trade_date) DO UPDATE SET
+        trade_count = EXCLUDED.trade_count,
+        winning_trades = EXCLUDED.winning_trades,
+        losing_trades = EXCLUDED.losing_trades,
+        pnl_count = EXCLUDED.pnl_count,
+        total_pnl = EXCLUDED.total_pnl,
+        gross_profit = EXCLUDED.gross_profit,
+        gross_loss = EXCLUDED.gross_loss,
+        max_win = EXCLUDED.max_win,
+        max_loss = EXCLUDED.max_loss,
+        pnl_sq_sum = EXCLUDED.pnl_sq_sum,
+        loss_sq_sum = EXCLUDED.loss_sq_sum,
+        notional = EXCLUDED.notional,
+        notional_count = EXCLUDED.notional_count,
+        first_trade_at = EXCLUDED.first_trade_at,
+        last_trade_at = EXCLUDED.last_trade_at,
+        updated_at = EXCLUDED.updated_at;
+    IF NOT FOUND THEN
+        -- Last trade of the day deleted or moved away
+        DELETE FROM user_pnl_daily WHERE user_id = p_user_id AND trade_date = p_day;
+    END IF;
+
+    IF p_symbol IS NOT NULL THEN
+        INSERT INTO user_symbol_pnl_daily (
+            user_id, trade_date, symbol, trade_count, winning_trades, losing_trades, total_pnl, updated_at
+        )
+        SELECT p_user_id, p_day, p_symbol,
+               COUNT(*),
+               COUNT(*) FILTER (WHERE pnl > 0),
+               COUNT(*) FILTER (WHERE pnl < 0),
+               COALESCE(SUM(pnl), 0),
+               NOW()
+        FROM trades
+        WHERE user_id = p_user_id AND created_at >= day_start AND created_at < day_end
+          AND symbol = p_symbol
+        HAVING COUNT(*) > 0
+        ON CONFLICT (user_id, trade_date, symbol) DO UPDATE SET
+            trade_count = EXCLUDED.trade_count,
+            winning_trades = EXCLUDED.winning_trades,
+            losing_trades = EXCLUDED.losing_trades,
+            total_pnl = EXCLUDED.total_pnl,
+            updated_at = EXCLUDED.updated_at;
+        IF NOT FOUND THEN
+            DELETE FROM user_symbol_pnl_daily
+            WHERE user_id = p_user_id AND trade_date = p_day AND symbol = p_symbol;
+        END IF;
+    END IF;
+
+    INSERT INTO user_strategy_pnl_daily (
+        user_id, trade_date, strategy, trade_count, winning_trades, losing_trades, total_pnl, updated_at
+    )
+    SELECT p_user_id, p_day, COALESCE(p_strategy, ''),
+           COUNT(*),
+           COUNT(*) FILTER (WHERE pnl > 0),
+           COUNT(*) FILTER (WHERE pnl < 0),
+           COALESCE(SUM(pnl), 0),
+           NOW()
+    FROM trades
+    WHERE user_id = p_user_id AND created_at >= day_start AND created_at < day_end
+      AND COALESCE(strategy, '') = COALESCE(p_strategy, '')
+    HAVING COUNT(*) > 0
+    ON CONFLICT (user_id, trade_date, strategy) DO UPDATE SET
+        trade_count = EXCLUDED.trade_count,
+        winning_trades = EXCLUDED.winning_trades,
+        losing_trades = EXCLUDED.losing_trades,
+        total_pnl = EXCLUDED.total_pnl,
+        updated_at = EXCLUDED.updated_at;
+    IF NOT FOUND THEN
+        DELETE FROM user_strategy_pnl_daily
+        WHERE user_id = p_user_id AND trade_date = p_day AND strategy = COALESCE(p_strategy, '');
+    END IF;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION trades_pnl_rollup_trigger() RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM refresh_trade_pnl_rollups(
+            OLD.user_id, (OLD.created_at AT TIME ZONE 'UTC')::date, OLD.symbol, OLD.strategy
+        );
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM refresh_trade_pnl_rollups(
+            NEW.user_id, (NEW.created_at AT TIME ZONE 'UTC')::date, NEW.symbol, NEW.strategy
+        );
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_trades_pnl_rollup ON trades;
+CREATE TRIGGER trg_trades_pnl_rollup
+AFTER INSERT OR DELETE OR UPDATE OF user_id, symbol, strategy, pnl, quantity, price, created_at ON trades
+FOR EACH ROW EXECUTE FUNCTION trades_pnl_rollup_trigger();
+
+-- Backfill from existing trades
+DELETE FROM user_pnl_daily;
+INSERT INTO user_pnl_daily (
+    user_id, trade_date, trade_count, winning_trades, losing_trades, pnl_count,
+    total_pnl, gross_profit, gross_loss, max_win, max_loss, pnl_sq_sum, loss_sq_sum,
+    notional, notional_count, first_trade_at, last_trade_at
+)
+SELECT user_id, (created_at AT TIME ZONE 'UTC')::date,
+       COUNT(*),
+       COUNT(*) FILTER (WHERE pnl > 0),
+       COUNT(*) FILTER (WHERE pnl < 0),
+       COUNT(pnl),
+       COALESCE(SUM(pnl), 0),
+       COALESCE(SUM(pnl) FILTER (WHERE pnl > 0), 0),
+       COALESCE(SUM(pnl) FILTER (WHERE pnl < 0), 0),
+       COALESCE(MAX(pnl) FILTER (WHERE pnl > 0), 0),
+       COALESCE(MIN(pnl) FILTER (WHERE pnl < 0), 0),
+       COALESCE(SUM((pnl * pnl)::double precision), 0),
+       COALESCE(SUM((pnl * pnl)::double precision) FILTER (WHERE pnl < 0), 0),
+       COALESCE(SUM(quantity * price) FILTER (WHERE quantity > 0 AND price > 0), 0),
+       COUNT(*) FILTER (WHERE quantity > 0 AND price > 0),
+       MIN(created_at),
+       MAX(created_at)
+FROM trades
+WHERE user_id IS NOT NULL AND created_at IS NOT NULL
+GROUP BY user_id, (created_at AT TIME ZONE 'UTC')::date;
+
+DELETE FROM user_symbol_pnl_daily;
+INSERT INTO user_symbol_pnl_daily (user_id, trade_date, symbol, trade_count, winning_trades, losing_trades, total_pnl)
+SELECT user_id, (created_at AT TIME ZONE 'UTC')::date, symbol,
+       COUNT(*),
+       COUNT(*) FILTER (WHERE pnl > 0),
+       COUNT(*) FILTER (WHERE pnl < 0),
+       COALESCE(SUM(pnl), 0)
+FROM trades
+WHERE user_id IS NOT NULL AND created_at IS NOT NULL AND symbol IS NOT NULL
+GROUP BY user_id, (created_at AT TIME ZONE 'UTC')::date, symbol;
+
+DELETE FROM user_strategy_pnl_daily;
+INSERT INTO user_strategy_pnl_daily (user_id, trade_date, strategy, trade_count, winning_trades, losing_trades, total_pnl)
+SELECT user_id, (created_at AT TIME ZONE 'UTC')::date, COALESCE(strategy, ''),
+       COUNT(*),
+       COUNT(*) FILTER (WHERE pnl > 0),
+       COUNT(*) FILTER (WHERE pnl < 0),
+       COALESCE(SUM(pnl), 0)
+FROM trades
+WHERE user_id IS NOT NULL AND created_at IS NOT NULL
+GROUP BY user_id, (created_at AT TIME ZONE 'UTC')::date, COALESCE(strategy, '');
+
+COMMIT;
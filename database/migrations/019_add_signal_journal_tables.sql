@@ -0,0 +1,47 @@
+-- Migration: Add signal journal tables
+-- Version: 019
+-- Date: 2026-10-18
+-- Description: Durable record of every generated signal and of its status / lifecycle stage
+--              transitions. Rows are bulk-inserted in batches by the write-behind signal journal
+--              (src/core/signal_journal.py), never from the signal generation path itself.
+--              Batches are delivered at least once (a spilled batch may be replayed), so both
+--              tables are keyed on ids generated by the journal and inserts skip duplicates.
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS signals (
+    signal_id VARCHAR(64) PRIMARY KEY,
+    strategy VARCHAR(50) NOT NULL,
+    symbol VARCHAR(50) NOT NULL,
+    action VARCHAR(10) NOT NULL,
+    entry_price DECIMAL(12,2),
+    stop_loss DECIMAL(12,2),
+    target DECIMAL(12,2),
+    confidence DOUBLE PRECISION,
+    quantity INTEGER,
+    status VARCHAR(20) NOT NULL,
+    generated_at TIMESTAMP NOT NULL,
+    valid_until TIMESTAMP,
+    metadata JSONB,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_signals_generated_at ON signals(generated_at);
+CREATE INDEX IF NOT EXISTS idx_signals_strategy_symbol ON signals(strategy, symbol);
+
+-- kind is 'status' (SignalRecorder status changes) or 'stage' (lifecycle manager transitions)
+CREATE TABLE IF NOT EXISTS signal_events (
+    id BIGSERIAL PRIMARY KEY,
+    event_id VARCHAR(32) NOT NULL UNIQUE,
+    signal_id VARCHAR(64) NOT NULL,
+    kind VARCHAR(10) NOT NULL,
+    stage VARCHAR(20) NOT NULL,
+    previous_stage VARCHAR(20),
+    event_time TIMESTAMP NOT NULL,
+    payload JSONB,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_signal_events_signal ON signal_events(signal_id, event_time);
+
+COMMIT;
@@ -99,15 +99,15 @@ router_imports = {
     'stock_analysis': ('src.api.stock_analysis', 'router'),
 }
 
+# LAZY_ROUTERS=true: mount placeholders now and import routers in a background warmup
+# (or on the first request that needs them) so health checks answer right after start
+from src.core.router_loader import RouterLoader, LazyRouterMiddleware
+lazy_routers = os.getenv('LAZY_ROUTERS', 'false').lower() == 'true'
+router_loader = RouterLoader(router_imports, routers_loaded)
+
 # Import routers dynamically
-for router_name, (module_path, router_attr) in router_imports.items():
-    try:
-        module = __import__(module_path, fromlist=[router_attr])
-        routers_loaded[router_name] = getattr(module, router_attr)
-        logger.info(f"Successfully loaded router: {router_name}")
-    except Exception as e:
-        logger.warning(f"Failed to load router {router_name}: {str(e)}")
-        routers_loaded[router_name] = None
+if not lazy_routers:
+    router_loader.import_all()
 
 # Global exception handler
 async def global_exception_handler(request, exc):
@@ -275,12 +275,22 @@ async def lifespan(app: FastAPI):
     # Schedule background tasks and yield immediately.
     app.state._startup_tasks = []
     try:
+        if router_loader.pending:
+            warmup_delay = float(os.getenv('ROUTER_WARMUP_DELAY_SECONDS', '1'))
+            app.state._startup_tasks.append(asyncio.create_task(router_loader.warmup(warmup_delay)))
+            logger.info(f"Lazy router warmup scheduled for {len(router_loader.pending)} routers ({warmup_delay}s delay)")
         app.state._startup_tasks.append(asyncio.create_task(_background_init_symbol_manager()))
         app.state._startup_tasks.append(asyncio.create_task(_background_init_orchestrator()))
         logger.info("Background initialization tasks scheduled (startup will not block health checks)")
     except Exception as e:
         logger.error(f"Failed to schedule background startup tasks: {e}")
 
+    try:
+        from monitoring.data_quality_monitor import data_quality_monitor
+        await data_quality_monitor.start()
+    except Exception as e:
+        logger.error(f"Failed to start data quality monitor: {e}")
+
     # App state for debugging
     app.state.build_timestamp = datetime.now().isoformat()
     app.state.truedata_auto_init = True  # Re-enabled with fixed sequence
@@ -305,6 +315,24 @@ async def lifespan(app: FastAPI):
         logger.info(f"🧹 Cancelled {len(tasks)} startup background tasks")
     except Exception as e:
         logger.debug(f"Startup task cleanup error: {e}")
+    try:
+        from src.core.warm_state import warm_state
+        await warm_state.stop()
+        logger.info("✅ Warm state checkpointed")
+    except Exception as e:
+        logger.error(f"Warm state checkpoint error: {e}")
+    try:
+        from src.core.signal_lifecycle_manager import stop_signal_lifecycle_management
+        await stop_signal_lifecycle_management()
+        logger.info("✅ Signal lifecycle manager stopped (signal journal flushed)")
+    except Exception as e:
+        logger.error(f"Signal lifecycle manager shutdown error: {e}")
+    try:
+        from monitoring.data_quality_monitor import data_quality_monitor
+        await data_quality_monitor.stop()
+        logger.info("✅ Data quality monitor stopped")
+    except Exception as e:
+        logger.error(f"Data quality monitor shutdown error: {e}")
     try:
         from data.truedata_client import truedata_client
         truedata_client.disconnect()
@@ -433,6 +461,14 @@ async def fix_path_stripping(request: Request, call_next):
 # Gzip compression
 app.add_middleware(GZipMiddleware, minimum_size=1000)
 
+# Lazy routers: requests that may need a pending router wait for it to be imported
+if lazy_routers:
+    app.add_middleware(
+        LazyRouterMiddleware,
+        loader=router_loader,
+        exempt_prefixes=('/health', '/ready', '/debug/import-profile')
+    )
+
 # Trusted host (for production) - DISABLED for WebSocket compatibility
 # WebSocket connections are being blocked by TrustedHostMiddleware with HTTP 403
 # Temporarily disabled until we can implement WebSocket-aware host checking
@@ -718,6 +754,14 @@ async def readiness_check():
     # Using minimal dict response to avoid any serialization overhead
     return {"status": "ready", "ok": True}
 
+# Prometheus scrape endpoint (hot-path metrics are flushed from their thread-local cells)
+@app.get("/metrics", tags=["monitoring"], include_in_schema=False)
+async def prometheus_metrics():
+    """Prometheus text exposition of the default registry"""
+    from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+    from src.utils.hot_metrics import hot_metrics  # noqa: F401 - registers the collector
+    return PlainTextResponse(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
 # Debug endpoint to check request details
 @app.get("/debug/request", tags=["debug"])
 async def debug_request(request: Request):
@@ -736,6 +780,12 @@ async def debug_request(request: Request):
         }
     }
 
+# Import-time profile of the router modules (per-module cumulative and self import cost)
+@app.get("/debug/import-profile", tags=["debug"])
+async def debug_import_profile(top: int = Query(50, ge=1, le=500)):
+    """Router load times and the slowest module imports"""
+    return router_loader.get_report(top)
+
 # Include routers with proper prefixes and error handling
 router_configs = [
     # Authentication - mounted at /auth
@@ -808,19 +858,8 @@ router_configs = [
     ('websocket', '/ws', ('websocket',)),
 ]
 
-# Mount routers
-for router_name, prefix, tags in router_configs:
-    router = routers_loaded.get(router_name)
-    if router:
-        try:
-            # Only add prefix if it's not empty
-            if prefix:
-                app.include_router(router, prefix=prefix, tags=list(tags))
-            else:
-                app.include_router(router, tags=list(tags))
-            logger.info(f"Mounted router: {router_name} at {prefix or 'root'}")
-        except Exception as e:
-            logger.error(f"Failed to mount router {router_name}: {str(e)}")
+# Mount routers (lazy mode keeps each router's slot in the route table until it is imported)
+router_loader.mount(app, router_configs, lazy=lazy_routers)
 
 # Debug endpoint (only in development)
 if os.getenv('DEBUG', 'false').lower() == 'true':
@@ -8,8 +8,10 @@ import logging
 import time
 import hashlib
 import hmac
+import math
 import jwt
 import redis.asyncio as redis
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Set, Any, Callable
 from dataclasses import dataclass, field
@@ -62,6 +64,8 @@ class SecurityConfig:
     user_rate_limit: int = 100     # requests per minute per user
     endpoint_rate_limits: Dict[str, int] = field(default_factory=dict)
     burst_multiplier: float = 1.5
+    rate_limit_sync_interval: float = 1.0  # seconds between shared-store reconciliations
+    rate_limit_max_keys: int = 100000      # in-process bucket states kept per worker
     
     # Authentication
     jwt_secret: str = "change-me-in-production"
@@ -105,13 +109,101 @@ class RateLimitRule:
     burst_limit: Optional[int] = None
     scope: str = "global"  # global, user, ip
 
+# Shared GCRA state lives under its own prefix: the sorted sets the sliding-window limiter
+# kept under rate_limit:* would make the script fail with WRONGTYPE
+RATE_LIMIT_KEY_PREFIX = "rate_limit:gcra"
+
+# Adds each worker's consumption since the last sync to the shared GCRA state in one
+# round trip. ARGV[1] = now, then (increment seconds) per key; returns the new TATs
+RECONCILE_SCRIPT = """
+local now = tonumber(ARGV[1])
+local result = {}
+for i, key in ipairs(KEYS) do
+    local tat = tonumber(redis.call('GET', key) or now)
+    if tat < now then tat = now end
+    tat = tat + tonumber(ARGV[i + 1])
+    redis.call('SET', key, tostring(tat), 'EX', math.max(1, math.ceil(tat - now)))
+    result[i] = tostring(tat)
+end
+return result
+"""
+
+class GCRABucketStore:
+    """In-process generic cell rate (token bucket) state: one theoretical arrival time per key
+    
+    Keys are kept in least-recently-used order; beyond ``max_keys`` the least recently used
+    bucket is evicted in O(1), so a flood of unique clients cannot grow memory or per-request
+    work. An evicted bucket behaves like a full one.
+    """
+    
+    def __init__(self, max_keys: int = 100000):
+        self.max_keys = max_keys
+        self._tat: "OrderedDict[str, float]" = OrderedDict()
+        self._unsynced: Dict[str, float] = {}
+        self.evictions = 0
+    
+    def consume(self, key: str, emission_interval: float, burst: int, now: float) -> Optional[float]:
+        """Take one token; returns None if allowed, else seconds until a token is available"""
+        tat = max(self._tat.get(key, now), now)
+        allow_at = tat + emission_interval - burst * emission_interval
+        if now < allow_at:
+            # Limited clients stay recent too: evicting them would hand out a fresh burst
+            self._tat.move_to_end(key)
+            return allow_at - now
+        self._tat[key] = tat + emission_interval
+        self._tat.move_to_end(key)
+        while len(self._tat) > self.max_keys:
+            self._tat.popitem(last=False)
+            self.evictions += 1
+        self._unsynced[key] = self._unsynced.get(key, 0.0) + emission_interval
+        return None
+    
+    def take_unsynced(self) -> Dict[str, float]:
+        """Consumption (in seconds of emission) since the last call, per key"""
+        unsynced, self._unsynced = self._unsynced, {}
+        return unsynced
+    
+    def requeue(self, unsynced: Dict[str, float]):
+        """Return consumption taken by a failed sync so the next one pushes it"""
+        for key, consumed in unsynced.items():
+            self._unsynced[key] = self._unsynced.get(key, 0.0) + consumed
+    
+    def merge(self, key: str, shared_tat: float):
+        """Adopt the shared state when other workers consumed more of this bucket"""
+        if shared_tat > self._tat.get(key, 0.0):
+            self._tat[key] = shared_tat
+    
+    def prune(self, now: float) -> int:
+        """Drop full buckets (TAT in the past), which behave exactly like absent keys
+        
+        O(keys); run from the periodic reconciliation, not per request.
+        """
+        stale = [key for key, tat in self._tat.items() if tat <= now]
+        for key in stale:
+            del self._tat[key]
+        return len(stale)
+    
+    def __len__(self) -> int:
+        return len(self._tat)
+
 class AdvancedRateLimiter:
-    """Advanced rate limiting with multiple strategies"""
+    """Advanced rate limiting with multiple strategies
+    
+    Buckets are evaluated in process memory (GCRA), so a request costs no Redis round trip.
+    Workers share limits through a background reconciliation that pushes local consumption
+    to Redis with one atomic script every ``rate_limit_sync_interval`` seconds; a bucket can
+    overshoot by at most what other workers consumed within one interval.
+    """
     
     def __init__(self, redis_client: redis.Redis, config: SecurityConfig):
         self.redis = redis_client
         self.config = config
         self.rules = self._load_rate_limit_rules()
+        self.buckets = GCRABucketStore(config.rate_limit_max_keys)
+        self._global_rule = RateLimitRule("global", config.global_rate_limit, 60)
+        self._reconcile_script = None
+        self._sync_task: Optional[asyncio.Task] = None
+        self.sync_stats = {'syncs': 0, 'keys_synced': 0, 'errors': 0}
         
     def _load_rate_limit_rules(self) -> List[RateLimitRule]:
         """Load rate limiting rules from configuration"""
@@ -153,8 +245,9 @@ class AdvancedRateLimiter:
         
         if not applicable_rules:
             # Apply global rate limit
-            applicable_rules = [RateLimitRule("global", self.config.global_rate_limit, 60)]
+            applicable_rules = [self._global_rule]
         
+        self._ensure_sync_task()
         for rule in applicable_rules:
             allowed, retry_after = await self._check_rule(rule, client_ip, user_id, endpoint)
             if not allowed:
@@ -167,39 +260,63 @@ class AdvancedRateLimiter:
         """Check individual rate limit rule"""
         # Determine key based on scope
         if rule.scope == "ip":
-            key = f"rate_limit:ip:{client_ip}:{rule.endpoint}"
+            key = f"{RATE_LIMIT_KEY_PREFIX}:ip:{client_ip}:{rule.endpoint}"
         elif rule.scope == "user" and user_id:
-            key = f"rate_limit:user:{user_id}:{rule.endpoint}"
+            key = f"{RATE_LIMIT_KEY_PREFIX}:user:{user_id}:{rule.endpoint}"
         else:
-            key = f"rate_limit:global:{rule.endpoint}"
-        
-        # Sliding window rate limiting
-        now = time.time()
-        window_start = now - rule.window
+            key = f"{RATE_LIMIT_KEY_PREFIX}:global:{rule.endpoint}"
         
-        # Remove old entries
-        await self.redis.zremrangebyscore(key, 0, window_start)
-        
-        # Count current requests
-        current_count = await self.redis.zcard(key)
-        
-        # Check burst limit
+        # Token bucket refilling at limit/window, holding up to the burst limit
         burst_limit = rule.burst_limit or int(rule.limit * self.config.burst_multiplier)
-        
-        if current_count >= burst_limit:
-            # Calculate retry after
-            oldest_request = await self.redis.zrange(key, 0, 0, withscores=True)
-            if oldest_request:
-                retry_after = int(oldest_request[0][1] + rule.window - now)
-                return False, max(1, retry_after)
-            return False, rule.window
-        
-        # Add current request
-        await self.redis.zadd(key, {str(now): now})
-        await self.redis.expire(key, rule.window)
+        retry_after = self.buckets.consume(key, rule.window / rule.limit, max(1, burst_limit), time.time())
+        if retry_after is not None:
+            return False, max(1, math.ceil(retry_after))
         
         return True, None
     
+    def _ensure_sync_task(self):
+        if self.redis is None or (self._sync_task is not None and not self._sync_task.done()):
+            return
+        self._sync_task = asyncio.create_task(self._sync_loop())
+    
+    async def _sync_loop(self):
+        while True:
+            try:
+                await asyncio.sleep(self.config.rate_limit_sync_interval)
+                await self.reconcile()
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                self.sync_stats['errors'] += 1
+                logger.debug(f"Rate limit reconciliation failed (local limits still enforced): {e}")
+    
+    async def reconcile(self, now: Optional[float] = None) -> int:
+        """Push local consumption to the shared store and pull in other workers' usage"""
+        now = now if now is not None else time.time()
+        self.buckets.prune(now)
+        unsynced = self.buckets.take_unsynced()
+        if not unsynced:
+            return 0
+        if self._reconcile_script is None:
+            self._reconcile_script = self.redis.register_script(RECONCILE_SCRIPT)
+        keys = list(unsynced)
+        try:
+            shared = await self._reconcile_script(keys=keys, args=[now] + [unsynced[key] for key in keys])
+        except Exception:
+            # Keep the consumption for the next sync instead of losing it
+            self.buckets.requeue(unsynced)
+            raise
+        for key, tat in zip(keys, shared):
+            self.buckets.merge(key, float(tat))
+        self.sync_stats['syncs'] += 1
+        self.sync_stats['keys_synced'] += len(keys)
+        return len(keys)
+    
+    async def close(self):
+        if self._sync_task is not None:
+            self._sync_task.cancel()
+            self._sync_task = None
+    
     def _get_client_ip(self, request: Request) -> str:
         """Extract client IP with proxy support"""
         # Check X-Forwarded-For header (proxy support)
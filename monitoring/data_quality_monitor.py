@@ -1,180 +1,258 @@
 """
 Data Quality Monitor
 Monitors and validates market data quality and integrity
+
+Streaming engine with O(1) work and bounded memory per tick:
+- Fixed-size ring buffer of tick returns per symbol with running sum/sum-of-squares,
+  so the window mean/variance never rescans history
+- Spike (absolute move or z-score), gap, staleness, cumulative-volume regression,
+  missing-field and latency detectors
+- A compact per-symbol quality score in [0, 1] published on every tick; readers get it
+  with a dict lookup (0.0 once a symbol goes stale)
+- ``record_tick`` is synchronous and thread-safe so the TrueData tick workers feed it
+  directly; alerts are queued and dispatched to async callbacks by the monitor loop
 """
 
 import asyncio
 import logging
-from typing import Dict, List, Optional, Set
-from datetime import datetime, timedelta
-import pandas as pd
-import numpy as np
-from collections import defaultdict
+import math
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Deque, Dict, List, Optional
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_THRESHOLDS = {
+    'missing_data_threshold': 0.01,  # 1% missing data allowed
+    'price_deviation_threshold': 0.05,  # 5% tick-to-tick move is a spike
+    'spike_zscore': 6.0,  # or a move this many window sigmas from the mean
+    'latency_threshold': 1000,  # 1 second
+    'gap_threshold': 300,  # 5 minutes
+    'stale_after': 30,  # seconds without a tick before the score drops to 0
+    'session_break': 6 * 3600,  # longer silences start a new session, not a gap
+    'window': 128,  # ring buffer size (ticks)
+    'min_samples': 20,  # returns needed before z-score spikes are judged
+    'score_halflife': 50,  # ticks for an anomaly's weight in the score to halve
+    'min_acceptable_score': 0.8
+}
+
+LOCK_STRIPES = 16
+MAX_PENDING_ALERTS = 1000
+ALERT_DISPATCH_INTERVAL = 1.0  # seconds between hand-offs of queued tick alerts
+OVERALL_CHECK_INTERVAL = 60.0  # seconds between whole-universe quality sweeps
+
+
+class SymbolQuality:
+    """Rolling quality state of one symbol"""
+
+    __slots__ = ('returns', 'index', 'filled', 'sum', 'sum_sq', 'last_price', 'last_volume',
+                 'last_tick', 'ticks', 'missing', 'spikes', 'gaps', 'volume_regressions',
+                 'latency_ms', 'bad_rate', 'score')
+
+    def __init__(self, window: int):
+        self.returns = [0.0] * window
+        self.index = 0
+        self.filled = 0
+        self.sum = 0.0
+        self.sum_sq = 0.0
+        self.last_price: Optional[float] = None
+        self.last_volume: Optional[float] = None
+        self.last_tick: Optional[float] = None
+        self.ticks = 0
+        self.missing = 0
+        self.spikes = 0
+        self.gaps = 0
+        self.volume_regressions = 0
+        self.latency_ms: Optional[float] = None
+        self.bad_rate = 0.0
+        self.score = 1.0
+
+    def push(self, value: float):
+        evicted = self.returns[self.index]
+        self.returns[self.index] = value
+        self.index = (self.index + 1) % len(self.returns)
+        if self.filled < len(self.returns):
+            self.filled += 1
+        else:
+            self.sum -= evicted
+            self.sum_sq -= evicted * evicted
+        self.sum += value
+        self.sum_sq += value * value
+
+    def mean_std(self):
+        if not self.filled:
+            return 0.0, 0.0
+        mean = self.sum / self.filled
+        return mean, math.sqrt(max(self.sum_sq / self.filled - mean * mean, 0.0))
+
+    def reset_window(self):
+        self.index = self.filled = 0
+        self.sum = self.sum_sq = 0.0
+        self.last_price = self.last_volume = None
+
+
 class DataQualityMonitor:
     """Monitors and validates market data quality"""
-    
-    def __init__(self, config: Dict):
-        self.config = config
-        self.quality_thresholds = config.get('data_quality', {}).get('thresholds', {
-            'missing_data_threshold': 0.01,  # 1% missing data allowed
-            'price_deviation_threshold': 0.05,  # 5% price deviation
-            'volume_spike_threshold': 3.0,  # 3x normal volume
-            'latency_threshold': 1000,  # 1 second
-            'gap_threshold': 300  # 5 minutes
-        })
-        
-        self.metrics = defaultdict(lambda: {
-            'missing_data_count': 0,
-            'total_data_points': 0,
-            'last_price': None,
-            'price_deviations': [],
-            'volume_spikes': [],
-            'latencies': [],
-            'gaps': []
-        })
-        
+
+    def __init__(self, config: Optional[Dict] = None):
+        self.config = config or {}
+        self.quality_thresholds = dict(DEFAULT_THRESHOLDS)
+        self.quality_thresholds.update(self.config.get('data_quality', {}).get('thresholds', {}))
+        self._window = int(self.quality_thresholds['window'])
+        self._decay = 0.5 ** (1.0 / max(float(self.quality_thresholds['score_halflife']), 1.0))
+
+        self.metrics: Dict[str, SymbolQuality] = {}
+        # Published scores: one float per symbol, read lock-free by strategies
+        self.scores: Dict[str, float] = {}
+        self._locks = [threading.Lock() for _ in range(LOCK_STRIPES)]
+        self._create_lock = threading.Lock()
+        self._pending_alerts: Deque[Dict] = deque(maxlen=MAX_PENDING_ALERTS)
+
         self._monitoring_task = None
         self._alert_callbacks = []
-    
+
     async def start(self):
         """Start data quality monitoring"""
         if self._monitoring_task is None:
             self._monitoring_task = asyncio.create_task(self._monitor_loop())
             logger.info("Data quality monitoring started")
-    
+
     async def stop(self):
         """Stop data quality monitoring"""
         if self._monitoring_task:
             self._monitoring_task.cancel()
+            try:
+                await self._monitoring_task
+            except asyncio.CancelledError:
+                pass
             self._monitoring_task = None
+            # Anything queued since the last pass still reaches the callbacks
+            await self._dispatch_alerts()
             logger.info("Data quality monitoring stopped")
-    
+
     def add_alert_callback(self, callback):
         """Add callback for quality alerts"""
         self._alert_callbacks.append(callback)
-    
+
+    def _state(self, symbol: str) -> SymbolQuality:
+        state = self.metrics.get(symbol)
+        if state is None:
+            with self._create_lock:
+                state = self.metrics.get(symbol)
+                if state is None:
+                    state = self.metrics[symbol] = SymbolQuality(self._window)
+        return state
+
+    def record_tick(self, symbol: str, price: Optional[float], volume: Optional[float] = None,
+                    timestamp: Optional[float] = None, exchange_time: Optional[float] = None) -> List[str]:
+        """Fold one tick into the symbol's rolling state; returns the anomalies it raised
+
+        ``timestamp`` is the receive time and ``exchange_time`` the source time, both epoch
+        seconds. Safe to call concurrently from the tick worker threads.
+        """
+        now = timestamp if timestamp is not None else time.time()
+        thresholds = self.quality_thresholds
+        state = self._state(symbol)
+        anomalies = []
+
+        with self._locks[hash(symbol) % LOCK_STRIPES]:
+            state.ticks += 1
+
+            if state.last_tick is not None:
+                silence = now - state.last_tick
+                if silence > thresholds['session_break']:
+                    state.reset_window()
+                elif silence > thresholds['gap_threshold']:
+                    state.gaps += 1
+                    anomalies.append('data_gap')
+            state.last_tick = now
+
+            if not price or price <= 0:
+                state.missing += 1
+                anomalies.append('missing_data')
+            else:
+                if state.last_price:
+                    change = (price - state.last_price) / state.last_price
+                    mean, std = state.mean_std()
+                    if (abs(change) > thresholds['price_deviation_threshold'] or
+                            (state.filled >= thresholds['min_samples'] and std > 0 and
+                             abs(change - mean) > thresholds['spike_zscore'] * std)):
+                        # Spikes stay out of the window so one bad print cannot widen the band
+                        state.spikes += 1
+                        anomalies.append('price_spike')
+                    else:
+                        state.push(change)
+                state.last_price = price
+
+            if volume is not None:
+                if state.last_volume is not None and volume < state.last_volume:
+                    # TrueData volume is cumulative for the day
+                    state.volume_regressions += 1
+                    anomalies.append('volume_regression')
+                state.last_volume = volume
+
+            if exchange_time is not None:
+                latency = max(now - exchange_time, 0.0) * 1000
+                state.latency_ms = latency if state.latency_ms is None else \
+                    state.latency_ms + (latency - state.latency_ms) * (1 - self._decay)
+                if latency > thresholds['latency_threshold']:
+                    anomalies.append('high_latency')
+
+            state.bad_rate = state.bad_rate * self._decay + (1 - self._decay) * (1.0 if anomalies else 0.0)
+            state.score = round(1.0 - state.bad_rate, 4)
+            self.scores[symbol] = state.score
+
+        for kind in anomalies:
+            self._pending_alerts.append({'type': kind, 'symbol': symbol, 'timestamp': now,
+                                         'details': {'price': price, 'volume': volume}})
+        return anomalies
+
+    def get_score(self, symbol: str, now: Optional[float] = None) -> Optional[float]:
+        """Published quality score of a symbol; 0.0 when stale, None when never seen"""
+        score = self.scores.get(symbol)
+        if score is None:
+            return None
+        state = self.metrics[symbol]
+        if (now if now is not None else time.time()) - state.last_tick > self.quality_thresholds['stale_after']:
+            return 0.0
+        return score
+
+    def is_stale(self, symbol: str, now: Optional[float] = None) -> bool:
+        state = self.metrics.get(symbol)
+        return state is None or state.last_tick is None or \
+            (now if now is not None else time.time()) - state.last_tick > self.quality_thresholds['stale_after']
+
     async def check_data_quality(self, symbol: str, data: Dict) -> bool:
         """Check quality of incoming data"""
-        metrics = self.metrics[symbol]
-        current_time = datetime.now()
-        
-        # Update total data points
-        metrics['total_data_points'] += 1
-        
-        # Check for missing data
+        timestamp = data.get('timestamp')
+        if isinstance(timestamp, datetime):
+            timestamp = timestamp.timestamp()
         if not self._validate_data_completeness(data):
-            metrics['missing_data_count'] += 1
-            await self._alert('missing_data', symbol, data)
-        
-        # Check price deviation
-        if metrics['last_price'] is not None:
-            deviation = abs(data['price'] - metrics['last_price']) / metrics['last_price']
-            metrics['price_deviations'].append(deviation)
-            
-            if deviation > self.quality_thresholds['price_deviation_threshold']:
-                await self._alert('price_deviation', symbol, {
-                    'current_price': data['price'],
-                    'last_price': metrics['last_price'],
-                    'deviation': deviation
-                })
-        
-        metrics['last_price'] = data['price']
-        
-        # Check volume spike
-        if 'volume' in data:
-            avg_volume = np.mean(metrics['volume_spikes'][-100:]) if metrics['volume_spikes'] else data['volume']
-            volume_ratio = data['volume'] / avg_volume if avg_volume > 0 else 1.0
-            
-            metrics['volume_spikes'].append(volume_ratio)
-            
-            if volume_ratio > self.quality_thresholds['volume_spike_threshold']:
-                await self._alert('volume_spike', symbol, {
-                    'current_volume': data['volume'],
-                    'average_volume': avg_volume,
-                    'ratio': volume_ratio
-                })
-        
-        # Check latency
-        if 'timestamp' in data:
-            latency = (current_time - data['timestamp']).total_seconds() * 1000
-            metrics['latencies'].append(latency)
-            
-            if latency > self.quality_thresholds['latency_threshold']:
-                await self._alert('high_latency', symbol, {
-                    'latency_ms': latency,
-                    'threshold': self.quality_thresholds['latency_threshold']
-                })
-        
-        # Check for data gaps
-        if 'timestamp' in data and metrics.get('last_timestamp'):
-            gap = (data['timestamp'] - metrics['last_timestamp']).total_seconds()
-            metrics['gaps'].append(gap)
-            
-            if gap > self.quality_thresholds['gap_threshold']:
-                await self._alert('data_gap', symbol, {
-                    'gap_seconds': gap,
-                    'threshold': self.quality_thresholds['gap_threshold']
-                })
-        
-        metrics['last_timestamp'] = data.get('timestamp')
-        
-        # Cleanup old metrics
-        self._cleanup_metrics(symbol)
-        
+            state = self._state(symbol)
+            with self._locks[hash(symbol) % LOCK_STRIPES]:
+                state.missing += 1
+        self.record_tick(symbol, data.get('price'), data.get('volume'), exchange_time=timestamp)
+        await self._dispatch_alerts()
         return self._is_data_quality_acceptable(symbol)
-    
+
     def _validate_data_completeness(self, data: Dict) -> bool:
         """Validate that all required fields are present"""
         required_fields = {'price', 'volume', 'timestamp'}
         return all(field in data for field in required_fields)
-    
+
     def _is_data_quality_acceptable(self, symbol: str) -> bool:
         """Check if data quality is within acceptable thresholds"""
-        metrics = self.metrics[symbol]
-        
-        # Check missing data ratio
-        missing_ratio = metrics['missing_data_count'] / metrics['total_data_points']
-        if missing_ratio > self.quality_thresholds['missing_data_threshold']:
+        state = self.metrics.get(symbol)
+        if state is None or not state.ticks:
+            return True
+        if state.missing / state.ticks > self.quality_thresholds['missing_data_threshold']:
+            return False
+        if state.latency_ms is not None and state.latency_ms > self.quality_thresholds['latency_threshold']:
             return False
-        
-        # Check price deviations
-        if metrics['price_deviations']:
-            avg_deviation = np.mean(metrics['price_deviations'][-100:])
-            if avg_deviation > self.quality_thresholds['price_deviation_threshold']:
-                return False
-        
-        # Check volume spikes
-        if metrics['volume_spikes']:
-            avg_spike = np.mean(metrics['volume_spikes'][-100:])
-            if avg_spike > self.quality_thresholds['volume_spike_threshold']:
-                return False
-        
-        # Check latencies
-        if metrics['latencies']:
-            avg_latency = np.mean(metrics['latencies'][-100:])
-            if avg_latency > self.quality_thresholds['latency_threshold']:
-                return False
-        
-        # Check gaps
-        if metrics['gaps']:
-            avg_gap = np.mean(metrics['gaps'][-100:])
-            if avg_gap > self.quality_thresholds['gap_threshold']:
-                return False
-        
-        return True
-    
-    def _cleanup_metrics(self, symbol: str):
-        """Clean up old metrics data"""
-        metrics = self.metrics[symbol]
-        max_history = 1000  # Keep last 1000 data points
-        
-        for key in ['price_deviations', 'volume_spikes', 'latencies', 'gaps']:
-            if len(metrics[key]) > max_history:
-                metrics[key] = metrics[key][-max_history:]
-    
+        return state.score >= self.quality_thresholds['min_acceptable_score']
+
     async def _alert(self, alert_type: str, symbol: str, details: Dict):
         """Send quality alert"""
         alert = {
@@ -183,40 +261,69 @@ class DataQualityMonitor:
             'timestamp': datetime.now(),
             'details': details
         }
-        
+
         logger.warning(f"Data quality alert: {alert}")
-        
+
         for callback in self._alert_callbacks:
             try:
                 await callback(alert)
             except Exception as e:
                 logger.error(f"Error in alert callback: {e}")
-    
+
+    async def _dispatch_alerts(self):
+        """Hand queued tick-time anomalies to the async alert callbacks"""
+        while self._pending_alerts:
+            alert = self._pending_alerts.popleft()
+            await self._alert(alert['type'], alert['symbol'], alert['details'])
+
     async def _monitor_loop(self):
         """Main monitoring loop"""
+        last_check = time.monotonic()
         while True:
             try:
+                await self._dispatch_alerts()
+
                 # Check overall data quality
-                for symbol, metrics in self.metrics.items():
-                    if not self._is_data_quality_acceptable(symbol):
-                        await self._alert('overall_quality', symbol, {
-                            'missing_ratio': metrics['missing_data_count'] / metrics['total_data_points'],
-                            'avg_price_deviation': np.mean(metrics['price_deviations'][-100:]) if metrics['price_deviations'] else 0,
-                            'avg_volume_spike': np.mean(metrics['volume_spikes'][-100:]) if metrics['volume_spikes'] else 0,
-                            'avg_latency': np.mean(metrics['latencies'][-100:]) if metrics['latencies'] else 0,
-                            'avg_gap': np.mean(metrics['gaps'][-100:]) if metrics['gaps'] else 0
-                        })
-                
-                await asyncio.sleep(60)  # Check every minute
-                
+                if time.monotonic() - last_check >= OVERALL_CHECK_INTERVAL:
+                    last_check = time.monotonic()
+                    for symbol in list(self.metrics):
+                        if not self._is_data_quality_acceptable(symbol):
+                            await self._alert('overall_quality', symbol, self.get_quality(symbol))
+
+                await asyncio.sleep(ALERT_DISPATCH_INTERVAL)
+
             except asyncio.CancelledError:
                 break
             except Exception as e:
                 logger.error(f"Error in monitoring loop: {e}")
-                await asyncio.sleep(60)
-    
+                await asyncio.sleep(ALERT_DISPATCH_INTERVAL)
+
+    def get_quality(self, symbol: str, now: Optional[float] = None) -> Optional[Dict]:
+        """Compact quality summary of one symbol"""
+        state = self.metrics.get(symbol)
+        if state is None:
+            return None
+        mean, std = state.mean_std()
+        return {
+            'score': self.get_score(symbol, now),
+            'stale': self.is_stale(symbol, now),
+            'ticks': state.ticks,
+            'missing': state.missing,
+            'spikes': state.spikes,
+            'gaps': state.gaps,
+            'volume_regressions': state.volume_regressions,
+            'return_mean': mean,
+            'return_std': std,
+            'latency_ms': state.latency_ms,
+            'last_tick': state.last_tick
+        }
+
     def get_quality_metrics(self, symbol: Optional[str] = None) -> Dict:
         """Get current quality metrics"""
         if symbol:
-            return self.metrics[symbol]
-        return dict(self.metrics) 
\ No newline at end of file
+            return self.get_quality(symbol) or {}
+        return {s: self.get_quality(s) for s in list(self.metrics)}
+
+
+# Global data quality monitor instance (fed by the TrueData tick workers)
+data_quality_monitor = DataQualityMonitor()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Offline replay benchmark for the trading loop
+Replays a tick-journal session (or a synthetic walk) through the orchestrator's
+strategy -> trade engine -> order path against the simulated broker and prints
+throughput and latency percentiles
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.core.replay_harness import JournalSource, ReplayHarness, SyntheticSource
+from src.core.simulated_broker import LatencyModel, SimulationConfig
+from src.core.tick_journal import list_segments
+
+
+def build_source(args):
+    if args.synthetic:
+        symbols = {s: 1000.0 for s in args.symbols} if args.symbols else {
+            'NIFTY-I': 24000.0, 'BANKNIFTY-I': 52000.0, 'RELIANCE': 1300.0, 'SBIN': 800.0, 'INFY': 1500.0
+        }
+        return SyntheticSource(symbols, steps=args.steps, interval_seconds=args.interval, seed=args.seed,
+                               depth_levels=args.depth_levels)
+
+    path = args.journal
+    if path is None:
+        segments = list_segments(args.journal_dir)
+        if args.session:
+            path = segments.get(args.session)
+        elif segments:
+            path = segments[max(segments)]
+    if not path:
+        raise SystemExit(f"No journal segment found in {args.journal_dir}")
+    return JournalSource(path, interval_seconds=args.interval, symbols=args.symbols or None)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Replay a trading session through the live pipeline offline')
+    parser.add_argument('--journal', help='Tick journal segment to replay (.tj or .tj.gz)')
+    parser.add_argument('--journal-dir', default=os.getenv('TICK_JOURNAL_DIR', 'data/tick_journal'))
+    parser.add_argument('--session', help='Session date (YYYYMMDD) to pick from --journal-dir')
+    parser.add_argument('--synthetic', action='store_true', help='Replay a seeded random walk instead of a journal')
+    parser.add_argument('--symbols', nargs='*', default=[], help='Restrict/define the replayed symbols')
+    parser.add_argument('--steps', type=int, default=600, help='Synthetic snapshots to generate')
+    parser.add_argument('--interval', type=float, default=1.0, help='Seconds of session per cycle')
+    parser.add_argument('--speed', type=float, default=0.0, help='Pacing multiple of real time (0 = flat out)')
+    parser.add_argument('--max-cycles', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--depth-levels', type=int, default=0, help='Synthetic depth levels per side (0 = touch only)')
+    parser.add_argument('--request-latency', help='Broker REST round trip, "mean_ms[:jitter_ms[:distribution]]"')
+    parser.add_argument('--ack-latency', help='Exchange acknowledgement latency, same format')
+    parser.add_argument('--fill-latency', help='Matching delay after acknowledgement, same format')
+    parser.add_argument('--touch-quantity', type=int, default=None, help='Liquidity at the touch without depth')
+    parser.add_argument('--verbose', action='store_true')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING)
+    logging.getLogger('src.core.replay_harness').setLevel(logging.INFO)
+
+    broker_config = SimulationConfig(
+        request_latency=LatencyModel.parse(args.request_latency),
+        ack_latency=LatencyModel.parse(args.ack_latency),
+        fill_latency=LatencyModel.parse(args.fill_latency),
+        touch_quantity=args.touch_quantity,
+        seed=args.seed
+    )
+    harness = ReplayHarness(build_source(args), broker_config=broker_config, speed=args.speed, seed=args.seed)
+    report = asyncio.run(harness.run(max_cycles=args.max_cycles))
+    print(json.dumps(report, indent=2, default=str))
+
+
+if __name__ == "__main__":
+    main()
@@ -3,7 +3,7 @@ Dashboard API endpoints for system health and trading metrics
 REAL DATA ONLY - NO FAKE METRICS
 """
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
 from typing import Dict, Any
 from datetime import datetime
 import psutil
@@ -14,6 +14,7 @@ import asyncio
 # CRITICAL FIX: Use dependencies for fast-path orchestrator access (prevents 504 timeouts)
 from src.core.orchestrator import TradingOrchestrator
 from src.core.dependencies import get_orchestrator
+from src.core.dashboard_read_model import dashboard_read_model, DashboardSources
 
 logger = logging.getLogger(__name__)
 
@@ -35,34 +36,28 @@ async def get_real_zerodha_balance(orchestrator) -> float:
         logger.info("📊 Calling get_margins() on Zerodha client...")
         # Get real margins from Zerodha
         margins = await orchestrator.zerodha_client.get_margins()
-        
-        if not margins:
-            logger.warning("⚠️ get_margins() returned None/empty from Zerodha")
-            return 0.0
-        
-        logger.info(f"📊 Raw margins response from Zerodha: {margins}")
-        
-        # Extract available cash
-        equity_data = margins.get('equity', {})
-        logger.info(f"📊 Equity data: {equity_data}")
-        
-        available_data = equity_data.get('available', {})
-        logger.info(f"📊 Available data: {available_data}")
-        
-        available_cash = available_data.get('cash', 0)
-        logger.info(f"💰 Extracted available cash: ₹{available_cash}")
-        
-        if available_cash == 0:
-            logger.warning("⚠️ Available cash is 0 - this might indicate an issue with Zerodha API response")
-            
-        logger.info(f"💰 Real Zerodha Balance for Dashboard: ₹{available_cash:,.2f}")
-        return float(available_cash)
+        return _available_cash(margins)
         
     except Exception as e:
         logger.error(f"❌ Error fetching real Zerodha balance: {e}")
         logger.error(f"❌ Exception details: {type(e).__name__}: {str(e)}")
         return 0.0
 
+def _available_cash(margins) -> float:
+    """Available cash from a Zerodha margins response"""
+    if not margins:
+        logger.warning("⚠️ get_margins() returned None/empty from Zerodha")
+        return 0.0
+    
+    # Extract available cash
+    available_cash = margins.get('equity', {}).get('available', {}).get('cash', 0)
+    logger.debug(f"💰 Extracted available cash: ₹{available_cash}")
+    
+    if available_cash == 0:
+        logger.warning("⚠️ Available cash is 0 - this might indicate an issue with Zerodha API response")
+    
+    return float(available_cash)
+
 @router.get("/health/detailed")
 async def get_detailed_health():
     """Get REAL system health status - NO FAKE DATA"""
@@ -348,27 +343,16 @@ async def get_system_notifications():
             "data": []
         }
 
-@router.get("/dashboard/summary")
-async def get_dashboard_summary(orchestrator: TradingOrchestrator = Depends(get_orchestrator)):
-    """Get comprehensive dashboard summary with LIVE autonomous trading data"""
+async def _build_dashboard_summary(sources: DashboardSources) -> Dict[str, Any]:
+    """Comprehensive dashboard summary with LIVE autonomous trading data"""
     try:
-        logger.info("📊 Getting dashboard summary with live autonomous trading data")
+        logger.info("📊 Building dashboard summary with live autonomous trading data")
+        orchestrator = await sources.orchestrator()
         
         # CRITICAL FIX: Use the correct orchestrator instance that's actively processing trades
         try:
-            # First try to get from the dependency injection (should be the active instance)
-            if orchestrator and hasattr(orchestrator, 'get_trading_status'):
-                autonomous_status = await orchestrator.get_trading_status()
-                logger.info(f"🎯 Got autonomous status from DI: {autonomous_status.get('total_trades', 0)} trades, ₹{autonomous_status.get('daily_pnl', 0):,.2f} P&L")
-            else:
-                # Fallback to get_instance method (use dependencies for fast-path)
-                from src.core.dependencies import get_orchestrator as get_orch_fallback
-                orchestrator_instance = await get_orch_fallback()
-                if orchestrator_instance:
-                    autonomous_status = await orchestrator_instance.get_trading_status()
-                    logger.info(f"🎯 Got autonomous status from get_orchestrator: {autonomous_status.get('total_trades', 0)} trades, ₹{autonomous_status.get('daily_pnl', 0):,.2f} P&L")
-                else:
-                    raise Exception("No orchestrator instance available")
+            autonomous_status = await sources.trading_status()
+            logger.info(f"🎯 Got autonomous status: {autonomous_status.get('total_trades', 0)} trades, ₹{autonomous_status.get('daily_pnl', 0):,.2f} P&L")
         except Exception as e:
             logger.error(f"Error getting autonomous status: {e}")
             # Last resort: create minimal status
@@ -387,15 +371,15 @@ async def get_dashboard_summary(orchestrator: TradingOrchestrator = Depends(get_
                 # CRITICAL FIX: Get data DIRECTLY from Zerodha API, not analytics service
                 logger.info("📊 Fetching data directly from Zerodha API (source of truth)")
                 
-                # Get today's orders directly from Zerodha
-                today_orders = await orchestrator.zerodha_client.get_orders()
+                # Get today's orders directly from Zerodha (shared with the other sections)
+                today_orders = await sources.orders()
                 if not today_orders:
                     today_orders = []
                 
                 logger.info(f"📊 Raw Zerodha orders count: {len(today_orders)}")
                 
                 # Get current positions directly from Zerodha
-                positions_data = await orchestrator.zerodha_client.get_positions()
+                positions_data = await sources.positions()
                 if not positions_data:
                     positions_data = {'net': [], 'day': []}
                 
@@ -555,7 +539,7 @@ async def get_dashboard_summary(orchestrator: TradingOrchestrator = Depends(get_
                 "daily_pnl": round(daily_pnl, 2),
                 "active_users": 1 if autonomous_status.get('system_ready') else 0,  # Show 1 user when system is ready
                 "total_pnl": round(daily_pnl, 2),  # Same as daily for now
-                "aum": await get_real_zerodha_balance(orchestrator),  # REAL Zerodha wallet balance
+                "aum": _available_cash(await sources.margins()),  # REAL Zerodha wallet balance
                 "daily_volume": round(abs(daily_pnl) * 10, 2),  # Estimated volume
                 "market_status": "OPEN" if market_open else "CLOSED",
                 "system_health": "HEALTHY",
@@ -636,11 +620,11 @@ async def get_dashboard_summary(orchestrator: TradingOrchestrator = Depends(get_
             "users": []
         }
 
-@router.get("/performance/metrics")
-async def get_performance_metrics(orchestrator: TradingOrchestrator = Depends(get_orchestrator)):
-    """Get performance metrics - DIRECTLY from Zerodha API only"""
+async def _build_performance_metrics(sources: DashboardSources) -> Dict[str, Any]:
+    """Performance metrics - DIRECTLY from Zerodha API only"""
     try:
-        logger.info("📊 Getting performance metrics directly from Zerodha")
+        logger.info("📊 Building performance metrics directly from Zerodha")
+        orchestrator = await sources.orchestrator()
         
         if not orchestrator or not orchestrator.zerodha_client:
             logger.error("❌ No Zerodha client available")
@@ -660,7 +644,7 @@ async def get_performance_metrics(orchestrator: TradingOrchestrator = Depends(ge
             }
         
         # Get today's orders directly from Zerodha
-        today_orders = await orchestrator.zerodha_client.get_orders()
+        today_orders = await sources.orders()
         if not today_orders:
             today_orders = []
         
@@ -792,7 +776,7 @@ async def get_dashboard_data():
         # Get all the data from other endpoints
         health_data = await get_detailed_health()
         trading_metrics = await get_trading_metrics()
-        summary_data = await get_dashboard_summary()
+        summary_data = await dashboard_read_model.get_payload('dashboard_summary')
         performance_data = await get_performance_summary()
         
         # STANDARDIZED RESPONSE FORMAT for frontend compatibility
@@ -869,11 +853,11 @@ async def get_dashboard_data():
             "status_code": 500
         } 
 
-@router.get("/positions/current")
-async def get_current_positions(orchestrator: TradingOrchestrator = Depends(get_orchestrator)):
-    """Get current positions - DIRECTLY from Zerodha API only"""
+async def _build_current_positions(sources: DashboardSources) -> Dict[str, Any]:
+    """Current positions - DIRECTLY from Zerodha API only"""
     try:
-        logger.info("📊 Getting current positions directly from Zerodha")
+        logger.info("📊 Building current positions directly from Zerodha")
+        orchestrator = await sources.orchestrator()
         
         if not orchestrator or not orchestrator.zerodha_client:
             logger.error("❌ No Zerodha client available")
@@ -884,7 +868,7 @@ async def get_current_positions(orchestrator: TradingOrchestrator = Depends(get_
             }
         
         # Get positions directly from Zerodha
-        positions_data = await orchestrator.zerodha_client.get_positions()
+        positions_data = await sources.positions()
         if not positions_data:
             positions_data = {'net': [], 'day': []}
         
@@ -938,11 +922,11 @@ async def get_current_positions(orchestrator: TradingOrchestrator = Depends(get_
             "data": []
         } 
 
-@router.get("/trades/today")
-async def get_trades_today(orchestrator: TradingOrchestrator = Depends(get_orchestrator)):
-    """Get today's trades - DIRECTLY from Zerodha API only"""
+async def _build_trades_today(sources: DashboardSources) -> Dict[str, Any]:
+    """Today's trades - DIRECTLY from Zerodha API only"""
     try:
-        logger.info("📊 Getting today's trades directly from Zerodha")
+        logger.info("📊 Building today's trades directly from Zerodha")
+        orchestrator = await sources.orchestrator()
         
         if not orchestrator or not orchestrator.zerodha_client:
             logger.error("❌ No Zerodha client available")
@@ -953,7 +937,7 @@ async def get_trades_today(orchestrator: TradingOrchestrator = Depends(get_orche
             }
         
         # Get today's orders directly from Zerodha
-        today_orders = await orchestrator.zerodha_client.get_orders()
+        today_orders = await sources.orders()
         if not today_orders:
             today_orders = []
         
@@ -1029,4 +1013,37 @@ async def get_trades_today(orchestrator: TradingOrchestrator = Depends(get_orche
             "success": False,
             "error": str(e),
             "data": []
-        } 
\ No newline at end of file
+        }
+
+
+# Snapshot-served endpoints: every dashboard reads the same cached build, so
+# broker load does not grow with the number of open dashboards
+dashboard_read_model.register_section('dashboard_summary', _build_dashboard_summary)
+dashboard_read_model.register_section('performance_metrics', _build_performance_metrics)
+dashboard_read_model.register_section('positions_current', _build_current_positions)
+dashboard_read_model.register_section('trades_today', _build_trades_today)
+
+@router.get("/dashboard/summary")
+async def get_dashboard_summary(request: Request):
+    """Get comprehensive dashboard summary with LIVE autonomous trading data"""
+    return await dashboard_read_model.respond(request, 'dashboard_summary')
+
+@router.get("/performance/metrics")
+async def get_performance_metrics(request: Request):
+    """Get performance metrics - DIRECTLY from Zerodha API only"""
+    return await dashboard_read_model.respond(request, 'performance_metrics')
+
+@router.get("/positions/current")
+async def get_current_positions(request: Request):
+    """Get current positions - DIRECTLY from Zerodha API only"""
+    return await dashboard_read_model.respond(request, 'positions_current')
+
+@router.get("/trades/today")
+async def get_trades_today(request: Request):
+    """Get today's trades - DIRECTLY from Zerodha API only"""
+    return await dashboard_read_model.respond(request, 'trades_today')
+
+@router.get("/dashboard/snapshot/stats")
+async def get_dashboard_snapshot_stats():
+    """Read-model refresh, cache-hit and diff statistics"""
+    return {"success": True, "data": dashboard_read_model.get_stats()}
@@ -5,7 +5,7 @@ Real-time and historical market data endpoints
 
 import logging
 from datetime import datetime
-from fastapi import APIRouter, Query, HTTPException, Depends
+from fastapi import APIRouter, Query, HTTPException, Depends, Request
 from typing import Optional, List, Dict, Any
 import sys
 import os
@@ -19,6 +19,7 @@ sys.path.insert(0, os.path.abspath('.'))
 
 # Import symbol mapping for TrueData
 from config.truedata_symbols import get_zerodha_symbol
+from src.core.dashboard_read_model import dashboard_read_model, DashboardSources
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -548,9 +549,8 @@ async def subscribe_symbols(
         logger.error(f"Error subscribing to symbols: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.get("/dashboard/summary")
-async def get_dashboard_summary():
-    """Get summary data for trading dashboard"""
+async def _build_market_summary(sources: DashboardSources) -> Dict[str, Any]:
+    """Index summary for the trading dashboard"""
     try:
         # Get data from TrueData client - fix import path for production
         try:
@@ -620,3 +620,10 @@ async def get_dashboard_summary():
             "success": False,
             "error": str(e)
         }
+
+dashboard_read_model.register_section('market_summary', _build_market_summary)
+
+@router.get("/dashboard/summary")
+async def get_dashboard_summary(request: Request):
+    """Get summary data for trading dashboard"""
+    return await dashboard_read_model.respond(request, 'market_summary')
@@ -685,3 +685,92 @@ async def get_failed_signals():
             "message": f"Error getting failed signals: {str(e)}",
             "failed_signals": []
         }
+
+@router.get("/trading-loop/latency")
+async def get_trading_loop_latency():
+    """Per-stage p50/p95/p99 latency of the trading loop, including tick-to-order"""
+    try:
+        from src.core.cycle_tracer import cycle_tracer
+        return {
+            "success": True,
+            "data": cycle_tracer.get_latency_report(),
+            "timestamp": datetime.now().isoformat()
+        }
+    except Exception as e:
+        logger.error(f"Error getting trading loop latency: {e}")
+        return {"success": False, "message": str(e), "data": {}}
+
+@router.get("/trading-loop/slow-cycles")
+async def get_trading_loop_slow_cycles(threshold_ms: float = None, limit: int = 20):
+    """Dump the slowest recorded trading cycles with their full span trees (flight recorder)"""
+    try:
+        from src.core.cycle_tracer import cycle_tracer
+        cycles = cycle_tracer.get_slow_cycles(threshold_ms=threshold_ms, limit=max(1, min(limit, 200)))
+        return {
+            "success": True,
+            "threshold_ms": cycle_tracer.slow_cycle_ms if threshold_ms is None else threshold_ms,
+            "count": len(cycles),
+            "cycles": cycles,
+            "timestamp": datetime.now().isoformat()
+        }
+    except Exception as e:
+        logger.error(f"Error getting slow trading cycles: {e}")
+        return {"success": False, "message": str(e), "cycles": []}
+
+@router.get("/execution/analytics")
+async def get_execution_analytics(group_by: str = "strategy"):
+    """Signal-to-fill latency and slippage distributions by strategy, symbol or time_of_day"""
+    try:
+        from src.core.execution_analytics import execution_analytics
+        return {
+            "success": True,
+            "data": execution_analytics.get_report(group_by),
+            "timestamp": datetime.now().isoformat()
+        }
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error getting execution analytics: {e}")
+        return {"success": False, "message": str(e), "data": {}}
+
+@router.get("/execution/timelines")
+async def get_execution_timelines(limit: int = 50, outcome: str = None):
+    """Most recent completed signal timelines with per-stage timestamps and LTP snapshots"""
+    try:
+        from src.core.execution_analytics import execution_analytics
+        timelines = execution_analytics.get_timelines(limit=max(1, min(limit, 500)), outcome=outcome)
+        return {
+            "success": True,
+            "count": len(timelines),
+            "timelines": timelines,
+            "timestamp": datetime.now().isoformat()
+        }
+    except Exception as e:
+        logger.error(f"Error getting execution timelines: {e}")
+        return {"success": False, "message": str(e), "timelines": []}
+
+@router.get("/market-internals/breadth")
+async def get_market_breadth(limit: int = 100):
+    """Running breadth counters plus the A-D line and sector-rotation series"""
+    try:
+        from src.core.orchestrator import get_orchestrator_instance
+        orchestrator = get_orchestrator_instance()
+        market_bias = getattr(orchestrator, 'market_bias', None) if orchestrator else None
+        analyzer = getattr(market_bias, 'internals_analyzer', None) if market_bias else None
+        if not analyzer:
+            return {"success": False, "message": "Market internals not available", "data": {}}
+        engine = analyzer.breadth_engine
+        return {
+            "success": True,
+            "data": {
+                "stats": engine.get_stats(),
+                "breadth": engine.breadth(),
+                "volume": engine.volume_profile(),
+                "sectors": engine.sector_rotation('internals'),
+                "series": engine.get_series(limit=max(1, min(limit, 100)))
+            },
+            "timestamp": datetime.now().isoformat()
+        }
+    except Exception as e:
+        logger.error(f"Error getting market breadth: {e}")
+        return {"success": False, "message": str(e), "data": {}}
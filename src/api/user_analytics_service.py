@@ -6,11 +6,11 @@ Integrates with database and real-time data for complete user insights
 
 import logging
 import asyncio
-from datetime import datetime, timedelta, date
+from datetime import datetime, timedelta, date, timezone
 from typing import Dict, List, Optional, Any, Tuple
 from dataclasses import dataclass
 from fastapi import APIRouter, HTTPException, Depends, Query
-from sqlalchemy import create_engine, text, func, and_, or_, desc, distinct
+from sqlalchemy import create_engine, text, func, and_, or_, desc, distinct, case, select
 from sqlalchemy.orm import sessionmaker, Session
 import pandas as pd
 import numpy as np
@@ -19,7 +19,10 @@ import json
 import redis.asyncio as redis
 import os
 
-from ..models.trading_models import User, TradingTrade, TradingPosition, Order
+from ..models.trading_models import (
+    User, TradingTrade, TradingPosition, Order,
+    UserPnlDaily, UserSymbolPnlDaily, UserStrategyPnlDaily
+)
 
 # Create an alias for compatibility with the rest of the code
 Trade = TradingTrade
@@ -29,6 +32,14 @@ from ..config.database import DatabaseConfig
 
 logger = logging.getLogger(__name__)
 
+# Rollup reads go through Core tables so they don't depend on ORM relationship configuration
+users_table = User.__table__
+positions_table = TradingPosition.__table__
+orders_table = Order.__table__
+pnl_daily = UserPnlDaily.__table__.c
+symbol_pnl_daily = UserSymbolPnlDaily.__table__.c
+strategy_pnl_daily = UserStrategyPnlDaily.__table__.c
+
 @dataclass
 class UserPerformanceMetrics:
     """Comprehensive user performance metrics"""
@@ -128,107 +139,115 @@ class UserAnalyticsService:
         return self.SessionLocal()
     
     async def get_user_performance_metrics(self, user_id: int, days: int = 30) -> UserPerformanceMetrics:
-        """Calculate comprehensive performance metrics for a user"""
+        """Calculate comprehensive performance metrics for a user from the P&L rollups"""
         db = self.get_db_session()
         try:
             # Get user
-            user = db.query(User).filter(User.id == user_id).first()
+            user = db.execute(
+                select(users_table.c.username, users_table.c.initial_capital, users_table.c.current_balance)
+                .where(users_table.c.id == user_id)
+            ).first()
             if not user:
                 raise HTTPException(status_code=404, detail="User not found")
             
-            # Calculate date ranges
+            # Calculate date ranges (rollups are keyed by UTC trade date)
             now = datetime.utcnow()
-            start_date = now - timedelta(days=days)
-            day_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
-            week_start = now - timedelta(days=7)
-            month_start = now - timedelta(days=30)
-            year_start = now - timedelta(days=365)
-            
-            # Get all trades for the period
-            trades = db.query(Trade).filter(
-                and_(Trade.user_id == user_id, Trade.created_at >= start_date)
-            ).all()
+            today = now.date()
+            start_day = (now - timedelta(days=days)).date()
+            week_start = (now - timedelta(days=7)).date()
+            month_start = (now - timedelta(days=30)).date()
+            year_start = (now - timedelta(days=365)).date()
+            
+            # One aggregate over user/day rollups replaces loading every trade row
+            D = pnl_daily
+            def pnl_since(since: date):
+                return func.coalesce(func.sum(case((D.trade_date >= since, D.total_pnl), else_=0)), 0)
+            
+            totals = db.execute(select(
+                func.coalesce(func.sum(D.trade_count), 0).label('trade_count'),
+                func.coalesce(func.sum(D.winning_trades), 0).label('winning_trades'),
+                func.coalesce(func.sum(D.losing_trades), 0).label('losing_trades'),
+                func.coalesce(func.sum(D.pnl_count), 0).label('pnl_count'),
+                func.coalesce(func.sum(D.total_pnl), 0).label('total_pnl'),
+                func.coalesce(func.sum(D.gross_profit), 0).label('gross_profit'),
+                func.coalesce(func.sum(D.gross_loss), 0).label('gross_loss'),
+                func.coalesce(func.max(D.max_win), 0).label('max_win'),
+                func.coalesce(func.min(D.max_loss), 0).label('max_loss'),
+                func.coalesce(func.sum(D.pnl_sq_sum), 0).label('pnl_sq_sum'),
+                func.coalesce(func.sum(D.loss_sq_sum), 0).label('loss_sq_sum'),
+                func.coalesce(func.sum(D.notional), 0).label('notional'),
+                func.coalesce(func.sum(D.notional_count), 0).label('notional_count'),
+                func.min(D.first_trade_at).label('first_trade_at'),
+                pnl_since(today).label('daily_pnl'),
+                pnl_since(week_start).label('weekly_pnl'),
+                pnl_since(month_start).label('monthly_pnl'),
+                pnl_since(year_start).label('yearly_pnl')
+            ).where(and_(D.user_id == user_id, D.trade_date >= start_day))).one()
             
             # Basic trading statistics
-            total_trades = len(trades)
-            winning_trades = len([t for t in trades if t.pnl and t.pnl > 0])
-            losing_trades = len([t for t in trades if t.pnl and t.pnl < 0])
+            total_trades = int(totals.trade_count)
+            winning_trades = int(totals.winning_trades)
+            losing_trades = int(totals.losing_trades)
             win_rate = (winning_trades / total_trades * 100) if total_trades > 0 else 0.0
             
             # P&L calculations
-            all_pnl = [float(t.pnl) for t in trades if t.pnl is not None]
-            total_pnl = sum(all_pnl)
-            
-            daily_trades = [t for t in trades if t.created_at >= day_start]
-            daily_pnl = sum(float(t.pnl) for t in daily_trades if t.pnl)
-            
-            weekly_trades = [t for t in trades if t.created_at >= week_start]
-            weekly_pnl = sum(float(t.pnl) for t in weekly_trades if t.pnl)
-            
-            monthly_trades = [t for t in trades if t.created_at >= month_start]
-            monthly_pnl = sum(float(t.pnl) for t in monthly_trades if t.pnl)
-            
-            yearly_trades = [t for t in trades if t.created_at >= year_start]
-            yearly_pnl = sum(float(t.pnl) for t in yearly_trades if t.pnl)
+            total_pnl = float(totals.total_pnl)
+            daily_pnl = float(totals.daily_pnl)
+            weekly_pnl = float(totals.weekly_pnl)
+            monthly_pnl = float(totals.monthly_pnl)
+            yearly_pnl = float(totals.yearly_pnl)
             
             # Win/Loss analysis
-            wins = [float(t.pnl) for t in trades if t.pnl and t.pnl > 0]
-            losses = [float(t.pnl) for t in trades if t.pnl and t.pnl < 0]
-            
-            avg_win_amount = sum(wins) / len(wins) if wins else 0.0
-            avg_loss_amount = sum(losses) / len(losses) if losses else 0.0
+            total_wins = float(totals.gross_profit)
+            total_losses = abs(float(totals.gross_loss))
+            avg_win_amount = total_wins / winning_trades if winning_trades else 0.0
+            avg_loss_amount = -total_losses / losing_trades if losing_trades else 0.0
             
             # Profit factor
-            total_wins = sum(wins) if wins else 0.0
-            total_losses = abs(sum(losses)) if losses else 0.0
             profit_factor = total_wins / total_losses if total_losses > 0 else float('inf') if total_wins > 0 else 0.0
             
             # Risk metrics
-            max_profit = max(wins) if wins else 0.0
-            max_loss = min(losses) if losses else 0.0
-            
-            # Calculate max drawdown
-            cumulative_pnl = []
-            running_total = 0
-            for trade in sorted(trades, key=lambda x: x.created_at):
-                if trade.pnl:
-                    running_total += float(trade.pnl)
-                    cumulative_pnl.append(running_total)
-            
-            max_drawdown = 0.0
-            if cumulative_pnl:
-                peak = cumulative_pnl[0]
-                for value in cumulative_pnl:
-                    if value > peak:
-                        peak = value
-                    drawdown = peak - value
-                    if drawdown > max_drawdown:
-                        max_drawdown = drawdown
-            
-            # Sharpe ratio calculation
-            sharpe_ratio = self._calculate_sharpe_ratio(all_pnl)
-            sortino_ratio = self._calculate_sortino_ratio(all_pnl)
+            max_profit = float(totals.max_win)
+            max_loss = float(totals.max_loss)
+            
+            # Max drawdown over the cumulative daily P&L curve
+            daily_rows = db.execute(
+                select(D.total_pnl).where(and_(D.user_id == user_id, D.trade_date >= start_day)).order_by(D.trade_date)
+            ).all()
+            max_drawdown = self._calculate_max_drawdown([float(r.total_pnl) for r in daily_rows])
+            
+            # Sharpe/Sortino from per-trade P&L moments kept in the rollups
+            sharpe_ratio = self._calculate_sharpe_ratio(int(totals.pnl_count), total_pnl, float(totals.pnl_sq_sum))
+            sortino_ratio = self._calculate_sortino_ratio(
+                int(totals.pnl_count), total_pnl, losing_trades, -total_losses, float(totals.loss_sq_sum)
+            )
             calmar_ratio = self._calculate_calmar_ratio(total_pnl, max_drawdown)
             
             # Trading behavior analysis
-            avg_trade_duration = self._calculate_avg_trade_duration(trades)
-            avg_position_size = self._calculate_avg_position_size(trades)
-            most_traded_symbol = self._get_most_traded_symbol(trades)
-            most_profitable_strategy = self._get_most_profitable_strategy(trades)
+            # trades rows carry a single execution timestamp, so holding time is not available
+            avg_trade_duration = 0.0
+            notional_count = int(totals.notional_count)
+            avg_position_size = float(totals.notional) / notional_count if notional_count else 0.0
+            most_traded_symbol = self._get_most_traded_symbol(db, user_id, start_day)
+            most_profitable_strategy = self._get_most_profitable_strategy(db, user_id, start_day)
             
             # Position and order analysis
-            active_positions = db.query(Position).filter(
-                and_(Position.user_id == user_id, Position.is_active == True)
-            ).count()
+            P = positions_table.c
+            open_positions = db.execute(
+                select(P.quantity, P.current_price, P.entry_price)
+                .where(and_(P.user_id == user_id, P.status == 'open'))
+            ).all()
+            active_positions = len(open_positions)
             
-            pending_orders = db.query(Order).filter(
-                and_(Order.user_id == user_id, Order.status == 'PENDING')
-            ).count()
+            pending_orders = db.execute(
+                select(func.count()).select_from(orders_table)
+                .where(and_(orders_table.c.user_id == user_id, orders_table.c.status == 'PENDING'))
+            ).scalar() or 0
             
             # Capital calculations
-            total_invested = sum(float(p.current_value) for p in db.query(Position).filter(
-                and_(Position.user_id == user_id, Position.is_active == True)
-            ).all() if p.current_value)
+            total_invested = sum(
+                float(p.current_price or p.entry_price) * p.quantity for p in open_positions if p.quantity
+            )
             
             margin_used = total_invested * 0.2  # Assuming 20% margin requirement
             available_capital = float(user.current_balance) - margin_used
@@ -236,13 +255,14 @@ class UserAnalyticsService:
             # Peak balance calculation
             peak_balance = await self._get_peak_balance(user_id)
             
-            # Activity metrics
-            last_trade = db.query(Trade).filter(Trade.user_id == user_id).order_by(desc(Trade.created_at)).first()
-            last_trade_date = last_trade.created_at if last_trade else None
+            # Activity metrics (all-time last trade, read from the rollup primary key range)
+            last_trade_date = db.execute(select(func.max(D.last_trade_at)).where(D.user_id == user_id)).scalar()
             
             # Calculate trading days
-            if trades:
-                first_trade_date = min(t.created_at for t in trades)
+            first_trade_date = totals.first_trade_at
+            if first_trade_date is not None:
+                if first_trade_date.tzinfo is not None:
+                    first_trade_date = first_trade_date.astimezone(timezone.utc).replace(tzinfo=None)
                 trading_days = (now - first_trade_date).days
             else:
                 trading_days = 0
@@ -302,9 +322,6 @@ class UserAnalyticsService:
             # Get performance metrics
             performance_metrics = await self.get_user_performance_metrics(user_id, days)
             
-            # Get user
-            user = db.query(User).filter(User.id == user_id).first()
-            
             # Generate daily P&L chart
             daily_pnl_chart = await self._generate_daily_pnl_chart(user_id, days, db)
             
@@ -325,7 +342,7 @@ class UserAnalyticsService:
             
             return UserTradingReport(
                 user_id=user_id,
-                username=user.username,
+                username=performance_metrics.username,
                 report_period=f"Last {days} days",
                 generated_at=datetime.utcnow(),
                 performance_metrics=performance_metrics,
@@ -345,76 +362,67 @@ class UserAnalyticsService:
         finally:
             db.close()
     
-    def _calculate_sharpe_ratio(self, returns: List[float]) -> float:
-        """Calculate Sharpe ratio"""
-        if not returns or len(returns) < 2:
+    def _calculate_sharpe_ratio(self, count: int, total: float, sq_sum: float) -> float:
+        """Calculate Sharpe ratio from per-trade P&L moments (count, sum, sum of squares)"""
+        if count < 2:
             return 0.0
         
-        mean_return = np.mean(returns)
-        std_return = np.std(returns)
+        mean_return = total / count
+        std_return = np.sqrt(max(sq_sum / count - mean_return ** 2, 0.0))
         
         return mean_return / std_return if std_return > 0 else 0.0
     
-    def _calculate_sortino_ratio(self, returns: List[float]) -> float:
-        """Calculate Sortino ratio (downside deviation)"""
-        if not returns or len(returns) < 2:
+    def _calculate_sortino_ratio(self, count: int, total: float, loss_count: int,
+                                 loss_sum: float, loss_sq_sum: float) -> float:
+        """Calculate Sortino ratio (downside deviation) from P&L moments"""
+        if count < 2:
             return 0.0
         
-        mean_return = np.mean(returns)
-        negative_returns = [r for r in returns if r < 0]
-        
-        if not negative_returns:
+        mean_return = total / count
+        if loss_count == 0:
             return float('inf') if mean_return > 0 else 0.0
         
-        downside_deviation = np.std(negative_returns)
+        loss_mean = loss_sum / loss_count
+        downside_deviation = np.sqrt(max(loss_sq_sum / loss_count - loss_mean ** 2, 0.0))
         return mean_return / downside_deviation if downside_deviation > 0 else 0.0
     
     def _calculate_calmar_ratio(self, total_return: float, max_drawdown: float) -> float:
         """Calculate Calmar ratio"""
         return total_return / max_drawdown if max_drawdown > 0 else 0.0
     
-    def _calculate_avg_trade_duration(self, trades: List[Trade]) -> float:
-        """Calculate average trade duration in hours"""
-        durations = []
-        for trade in trades:
-            if trade.entry_time and trade.exit_time:
-                duration = (trade.exit_time - trade.entry_time).total_seconds() / 3600
-                durations.append(duration)
-        
-        return sum(durations) / len(durations) if durations else 0.0
-    
-    def _calculate_avg_position_size(self, trades: List[Trade]) -> float:
-        """Calculate average position size"""
-        sizes = [float(trade.quantity) * float(trade.entry_price) for trade in trades 
-                if trade.quantity and trade.entry_price]
-        
-        return sum(sizes) / len(sizes) if sizes else 0.0
+    def _calculate_max_drawdown(self, pnl_series: List[float]) -> float:
+        """Maximum peak-to-trough decline of the cumulative P&L series"""
+        max_drawdown = 0.0
+        peak = None
+        running_total = 0.0
+        for pnl in pnl_series:
+            running_total += pnl
+            if peak is None or running_total > peak:
+                peak = running_total
+            max_drawdown = max(max_drawdown, peak - running_total)
+        return max_drawdown
     
-    def _get_most_traded_symbol(self, trades: List[Trade]) -> str:
+    def _get_most_traded_symbol(self, db: Session, user_id: int, start_day: date) -> str:
         """Get most frequently traded symbol"""
-        if not trades:
-            return "N/A"
-        
-        symbol_counts = {}
-        for trade in trades:
-            symbol = trade.symbol
-            symbol_counts[symbol] = symbol_counts.get(symbol, 0) + 1
-        
-        return max(symbol_counts, key=lambda x: symbol_counts[x]) if symbol_counts else "N/A"
+        S = symbol_pnl_daily
+        row = db.execute(
+            select(S.symbol, func.sum(S.trade_count).label('trades'))
+            .where(and_(S.user_id == user_id, S.trade_date >= start_day))
+            .group_by(S.symbol).order_by(desc('trades')).limit(1)
+        ).first()
+        return row.symbol if row else "N/A"
     
-    def _get_most_profitable_strategy(self, trades: List[Trade]) -> str:
+    def _get_most_profitable_strategy(self, db: Session, user_id: int, start_day: date) -> str:
         """Get most profitable trading strategy"""
-        if not trades:
-            return "N/A"
-        
-        strategy_pnl = {}
-        for trade in trades:
-            if trade.strategy and trade.pnl:
-                strategy = trade.strategy
-                strategy_pnl[strategy] = strategy_pnl.get(strategy, 0) + float(trade.pnl)
-        
-        return max(strategy_pnl, key=lambda x: strategy_pnl[x]) if strategy_pnl else "N/A"
+        G = strategy_pnl_daily
+        row = db.execute(
+            select(G.strategy, func.sum(G.total_pnl).label('pnl'))
+            .where(and_(G.user_id == user_id, G.trade_date >= start_day, G.strategy != ''))
+            .group_by(G.strategy).order_by(desc('pnl')).limit(1)
+        ).first()
+        return row.strategy if row else "N/A"
     
+
     async def _get_peak_balance(self, user_id: int) -> float:
         """Get peak balance from Redis cache or calculate"""
         try:
@@ -426,7 +434,9 @@ class UserAnalyticsService:
             # Calculate from database if not cached
             db = self.get_db_session()
             try:
-                user = db.query(User).filter(User.id == user_id).first()
+                user = db.execute(
+                    select(users_table.c.current_balance).where(users_table.c.id == user_id)
+                ).first()
                 if user:
                     # For now, use current balance as peak
                     # In a real system, you'd track this over time
@@ -447,85 +457,85 @@ class UserAnalyticsService:
             logger.error(f"❌ Error getting peak balance for user {user_id}: {e}")
             return 0.0
     
+    def _get_daily_rollups(self, db: Session, user_id: int, start_day: date) -> Dict[date, Any]:
+        """User/day rollup rows from start_day onwards, keyed by trade date"""
+        D = pnl_daily
+        rows = db.execute(
+            select(D.trade_date, D.trade_count, D.winning_trades, D.total_pnl)
+            .where(and_(D.user_id == user_id, D.trade_date >= start_day))
+        ).all()
+        return {row.trade_date: row for row in rows}
+    
     async def _generate_daily_pnl_chart(self, user_id: int, days: int, db: Session) -> List[Dict]:
         """Generate daily P&L chart data"""
         try:
             end_date = datetime.utcnow().date()
             start_date = end_date - timedelta(days=days)
             
-            # Get trades grouped by date
+            # One range read over the user/day rollups, zero-filled for days without trades
+            rollups = self._get_daily_rollups(db, user_id, start_date)
+            
             daily_data = []
+            cumulative = 0.0
             current_date = start_date
-            
             while current_date <= end_date:
-                day_start = datetime.combine(current_date, datetime.min.time())
-                day_end = datetime.combine(current_date, datetime.max.time())
-                
-                trades = db.query(Trade).filter(
-                    and_(
-                        Trade.user_id == user_id,
-                        Trade.created_at >= day_start,
-                        Trade.created_at <= day_end
-                    )
-                ).all()
-                
-                daily_pnl = sum(float(t.pnl) for t in trades if t.pnl)
-                trade_count = len(trades)
-                
+                row = rollups.get(current_date)
+                daily_pnl = float(row.total_pnl) if row else 0.0
+                cumulative += daily_pnl
                 daily_data.append({
                     'date': current_date.isoformat(),
                     'pnl': daily_pnl,
-                    'trades': trade_count,
-                    'cumulative_pnl': 0  # Will be calculated below
+                    'trades': int(row.trade_count) if row else 0,
+                    'cumulative_pnl': cumulative
                 })
-                
                 current_date += timedelta(days=1)
             
-            # Calculate cumulative P&L
-            cumulative = 0
-            for day in daily_data:
-                cumulative += day['pnl']
-                day['cumulative_pnl'] = cumulative
-            
             return daily_data
             
         except Exception as e:
             logger.error(f"❌ Error generating daily P&L chart: {e}")
             return []
     
+    def _grouped_performance(self, db: Session, columns, key: str, user_id: int, days: int,
+                             *extra_filters) -> List[Any]:
+        """Aggregate a user/<key>/day rollup table over the window, grouped by key"""
+        start_day = (datetime.utcnow() - timedelta(days=days)).date()
+        key_column = columns[key]
+        return db.execute(
+            select(
+                key_column.label('key'),
+                func.sum(columns.trade_count).label('trade_count'),
+                func.sum(columns.total_pnl).label('total_pnl'),
+                func.sum(columns.winning_trades).label('winning_trades')
+            )
+            .where(and_(columns.user_id == user_id, columns.trade_date >= start_day, *extra_filters))
+            .group_by(key_column)
+        ).all()
+    
+    def _performance_rows(self, rows: List[Any], key_name: str) -> List[Dict]:
+        data = []
+        for row in rows:
+            trade_count = int(row.trade_count or 0)
+            total_pnl = float(row.total_pnl) if row.total_pnl else 0.0
+            winning_trades = int(row.winning_trades or 0)
+            data.append({
+                key_name: row.key,
+                'trades': trade_count,
+                'total_pnl': total_pnl,
+                'avg_pnl': total_pnl / trade_count if trade_count > 0 else 0.0,
+                'win_rate': (winning_trades / trade_count * 100) if trade_count > 0 else 0,
+                'winning_trades': winning_trades
+            })
+        
+        # Sort by total P&L descending
+        data.sort(key=lambda x: x['total_pnl'], reverse=True)
+        return data
+    
     async def _generate_symbol_performance(self, user_id: int, days: int, db: Session) -> List[Dict]:
         """Generate symbol performance analysis"""
         try:
-            start_date = datetime.utcnow() - timedelta(days=days)
-            
-            # Get trades grouped by symbol
-            result = db.query(
-                Trade.symbol,
-                func.count(Trade.id).label('trade_count'),
-                func.sum(Trade.pnl).label('total_pnl'),
-                func.avg(Trade.pnl).label('avg_pnl'),
-                func.sum(func.case([(Trade.pnl > 0, 1)], else_=0)).label('winning_trades')
-            ).filter(
-                and_(Trade.user_id == user_id, Trade.created_at >= start_date)
-            ).group_by(Trade.symbol).all()
-            
-            symbol_data = []
-            for row in result:
-                win_rate = (row.winning_trades / row.trade_count * 100) if row.trade_count > 0 else 0
-                
-                symbol_data.append({
-                    'symbol': row.symbol,
-                    'trades': row.trade_count,
-                    'total_pnl': float(row.total_pnl) if row.total_pnl else 0.0,
-                    'avg_pnl': float(row.avg_pnl) if row.avg_pnl else 0.0,
-                    'win_rate': win_rate,
-                    'winning_trades': row.winning_trades
-                })
-            
-            # Sort by total P&L descending
-            symbol_data.sort(key=lambda x: x['total_pnl'], reverse=True)
-            
-            return symbol_data
+            rows = self._grouped_performance(db, symbol_pnl_daily, 'symbol', user_id, days)
+            return self._performance_rows(rows, 'symbol')
             
         except Exception as e:
             logger.error(f"❌ Error generating symbol performance: {e}")
@@ -534,36 +544,10 @@ class UserAnalyticsService:
     async def _generate_strategy_performance(self, user_id: int, days: int, db: Session) -> List[Dict]:
         """Generate strategy performance analysis"""
         try:
-            start_date = datetime.utcnow() - timedelta(days=days)
-            
-            # Get trades grouped by strategy
-            result = db.query(
-                Trade.strategy,
-                func.count(Trade.id).label('trade_count'),
-                func.sum(Trade.pnl).label('total_pnl'),
-                func.avg(Trade.pnl).label('avg_pnl'),
-                func.sum(func.case([(Trade.pnl > 0, 1)], else_=0)).label('winning_trades')
-            ).filter(
-                and_(Trade.user_id == user_id, Trade.created_at >= start_date, Trade.strategy.isnot(None))
-            ).group_by(Trade.strategy).all()
-            
-            strategy_data = []
-            for row in result:
-                win_rate = (row.winning_trades / row.trade_count * 100) if row.trade_count > 0 else 0
-                
-                strategy_data.append({
-                    'strategy': row.strategy,
-                    'trades': row.trade_count,
-                    'total_pnl': float(row.total_pnl) if row.total_pnl else 0.0,
-                    'avg_pnl': float(row.avg_pnl) if row.avg_pnl else 0.0,
-                    'win_rate': win_rate,
-                    'winning_trades': row.winning_trades
-                })
-            
-            # Sort by total P&L descending
-            strategy_data.sort(key=lambda x: x['total_pnl'], reverse=True)
-            
-            return strategy_data
+            rows = self._grouped_performance(
+                db, strategy_pnl_daily, 'strategy', user_id, days, strategy_pnl_daily.strategy != ''
+            )
+            return self._performance_rows(rows, 'strategy')
             
         except Exception as e:
             logger.error(f"❌ Error generating strategy performance: {e}")
@@ -575,32 +559,32 @@ class UserAnalyticsService:
             # Get last 12 months or specified days, whichever is less
             months_to_analyze = min(12, days // 30 + 1)
             
-            monthly_data = []
-            current_date = datetime.utcnow()
+            # Calendar months, newest first
+            months = []
+            month_start = datetime.utcnow().date().replace(day=1)
+            for _ in range(months_to_analyze):
+                months.append(month_start)
+                month_start = (month_start - timedelta(days=1)).replace(day=1)
+            
+            # At most ~365 day rollups, folded into months
+            buckets = {m: {'trades': 0, 'total_pnl': 0.0, 'winning_trades': 0} for m in months}
+            for trade_date, row in self._get_daily_rollups(db, user_id, months[-1]).items():
+                bucket = buckets.get(trade_date.replace(day=1))
+                if bucket is not None:
+                    bucket['trades'] += int(row.trade_count)
+                    bucket['total_pnl'] += float(row.total_pnl)
+                    bucket['winning_trades'] += int(row.winning_trades)
             
-            for i in range(months_to_analyze):
-                month_start = current_date.replace(day=1) - timedelta(days=30*i)
-                month_end = (month_start + timedelta(days=32)).replace(day=1) - timedelta(days=1)
-                
-                trades = db.query(Trade).filter(
-                    and_(
-                        Trade.user_id == user_id,
-                        Trade.created_at >= month_start,
-                        Trade.created_at <= month_end
-                    )
-                ).all()
-                
-                total_pnl = sum(float(t.pnl) for t in trades if t.pnl)
-                trade_count = len(trades)
-                winning_trades = len([t for t in trades if t.pnl and t.pnl > 0])
-                win_rate = (winning_trades / trade_count * 100) if trade_count > 0 else 0
-                
+            monthly_data = []
+            for month in months:
+                bucket = buckets[month]
+                trade_count = bucket['trades']
                 monthly_data.append({
-                    'month': month_start.strftime('%Y-%m'),
+                    'month': month.strftime('%Y-%m'),
                     'trades': trade_count,
-                    'total_pnl': total_pnl,
-                    'win_rate': win_rate,
-                    'winning_trades': winning_trades
+                    'total_pnl': bucket['total_pnl'],
+                    'win_rate': (bucket['winning_trades'] / trade_count * 100) if trade_count > 0 else 0,
+                    'winning_trades': bucket['winning_trades']
                 })
             
             return monthly_data
@@ -609,6 +593,7 @@ class UserAnalyticsService:
             logger.error(f"❌ Error generating monthly summary: {e}")
             return []
     
+
     async def _generate_risk_analysis(self, user_id: int, days: int, db: Session) -> Dict:
         """Generate risk analysis"""
         try:
@@ -666,6 +651,45 @@ class UserAnalyticsService:
         
         return max_consecutive
     
+    def get_leaderboard_metrics(self, db: Session, days: int) -> List[Dict]:
+        """Per-user totals for all active users in one grouped query over the rollups"""
+        D = pnl_daily
+        start_day = (datetime.utcnow() - timedelta(days=days)).date()
+        totals = select(
+            D.user_id.label('user_id'),
+            func.sum(D.trade_count).label('trade_count'),
+            func.sum(D.winning_trades).label('winning_trades'),
+            func.sum(D.pnl_count).label('pnl_count'),
+            func.sum(D.total_pnl).label('total_pnl'),
+            func.sum(D.pnl_sq_sum).label('pnl_sq_sum')
+        ).where(D.trade_date >= start_day).group_by(D.user_id).subquery()
+        
+        U = users_table.c
+        rows = db.execute(
+            select(
+                U.id, U.username, U.current_balance,
+                totals.c.trade_count, totals.c.winning_trades, totals.c.pnl_count,
+                totals.c.total_pnl, totals.c.pnl_sq_sum
+            )
+            .select_from(users_table.outerjoin(totals, totals.c.user_id == U.id))
+            .where(U.is_active == True)
+        ).all()
+        
+        user_metrics = []
+        for row in rows:
+            trade_count = int(row.trade_count or 0)
+            total_pnl = float(row.total_pnl or 0)
+            user_metrics.append({
+                'user_id': row.id,
+                'username': row.username,
+                'total_pnl': total_pnl,
+                'win_rate': (int(row.winning_trades or 0) / trade_count * 100) if trade_count > 0 else 0.0,
+                'sharpe_ratio': self._calculate_sharpe_ratio(int(row.pnl_count or 0), total_pnl, float(row.pnl_sq_sum or 0)),
+                'total_trades': trade_count,
+                'current_balance': float(row.current_balance or 0)
+            })
+        return user_metrics
+    
     async def _generate_recommendations(self, metrics: UserPerformanceMetrics, db: Session) -> List[str]:
         """Generate trading recommendations based on performance"""
         recommendations = []
@@ -861,26 +885,8 @@ async def get_users_leaderboard(
     try:
         db = service.get_db_session()
         
-        # Get all active users
-        users = db.query(User).filter(User.is_active == True).all()
-        
-        # Calculate metrics for each user
-        user_metrics = []
-        for user in users:
-            try:
-                metrics = await service.get_user_performance_metrics(user.id, days)
-                user_metrics.append({
-                    'user_id': user.id,
-                    'username': user.username,
-                    'total_pnl': metrics.total_pnl,
-                    'win_rate': metrics.win_rate,
-                    'sharpe_ratio': metrics.sharpe_ratio,
-                    'total_trades': metrics.total_trades,
-                    'current_balance': metrics.current_balance
-                })
-            except Exception as e:
-                logger.warning(f"⚠️ Error calculating metrics for user {user.id}: {e}")
-                continue
+        # Single grouped aggregate over the user/day rollups for all active users
+        user_metrics = service.get_leaderboard_metrics(db, days)
         
         # Sort by specified metric
         if metric == "total_pnl":
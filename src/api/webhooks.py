@@ -11,6 +11,17 @@ logger = logging.getLogger(__name__)
 # Initialize router
 router = APIRouter()
 
+
+def _record_order_fill(data: Dict[str, Any]):
+    """Close the signal's execution timeline when a postback reports the order filled"""
+    try:
+        if str(data.get("status", "")).upper() != "COMPLETE":
+            return
+        from src.core.execution_analytics import execution_analytics
+        execution_analytics.record_fill(data.get("order_id"), data.get("average_price") or data.get("price"))
+    except Exception as e:
+        logger.debug(f"Execution analytics fill update skipped: {e}")
+
 # Generic webhook endpoint
 # 🔥 FIX: Removed /webhooks/ prefix since router is mounted at /api/v1/webhooks
 @router.post("/generic")
@@ -53,6 +64,7 @@ async def receive_zerodha_order_update(data: Dict[str, Any], request: Request):
         
         order_id = data.get("order_id")
         status = data.get("status")
+        _record_order_fill(data)
         
         return {
             "status": "processed",
@@ -104,6 +116,7 @@ async def receive_zerodha_webhook(request: Request):
         
         if order_id and status:
             logger.info(f"📥 ORDER POSTBACK: {symbol} Order {order_id} -> {status}")
+            _record_order_fill(data)
         
         return {
             "status": "received",
@@ -9,6 +9,8 @@ import asyncio
 import logging
 from datetime import datetime
 
+from src.core.dashboard_read_model import dashboard_read_model
+
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
@@ -16,6 +18,8 @@ router = APIRouter()
 # Store active connections with user context
 active_connections: Dict[str, Set[WebSocket]] = {}
 sse_clients: Set[asyncio.Queue] = set()
+# Clients subscribed to the 'dashboard' topic receive snapshot diffs
+dashboard_subscribers: Set[WebSocket] = set()
 connection_stats = {
     'total_connections': 0,
     'active_connections': 0,
@@ -93,6 +97,8 @@ async def websocket_endpoint(websocket: WebSocket):
                         "timestamp": datetime.now().isoformat()
                     })
                     logger.info(f"Client {client_id} subscribed to {topic}")
+                    if topic == "dashboard":
+                        await subscribe_dashboard(websocket)
                 else:
                     # Handle JSON messages
                     try:
@@ -107,6 +113,8 @@ async def websocket_endpoint(websocket: WebSocket):
                         
             except asyncio.TimeoutError:
                 # Timeout is normal - just continue the loop
+                if websocket in dashboard_subscribers:
+                    dashboard_read_model.touch()
                 continue
             except WebSocketDisconnect:
                 logger.info(f"Client {client_id} disconnected normally")
@@ -129,6 +137,7 @@ async def websocket_endpoint(websocket: WebSocket):
         # Clean up connection
         if 'all' in active_connections:
             active_connections['all'].discard(websocket)
+        dashboard_subscribers.discard(websocket)
         connection_stats['active_connections'] = len(active_connections.get('all', set()))
         logger.info(f"WebSocket {client_id} disconnected. Active: {connection_stats['active_connections']}")
 
@@ -145,6 +154,8 @@ async def handle_websocket_message(websocket: WebSocket, data: Dict[str, Any], c
                 "topics": topics,
                 "timestamp": datetime.now().isoformat()
             })
+            if "dashboard" in topics:
+                await subscribe_dashboard(websocket)
         elif message_type == "get_status":
             # Return current status
             await websocket.send_json({
@@ -170,6 +181,27 @@ async def handle_websocket_message(websocket: WebSocket, data: Dict[str, Any], c
             "timestamp": datetime.now().isoformat()
         })
 
+async def subscribe_dashboard(websocket: WebSocket):
+    """Send the current dashboard snapshot; later changes arrive as dashboard_diff patches"""
+    dashboard_subscribers.add(websocket)
+    dashboard_read_model.touch()
+    await dashboard_read_model.refresh(only_missing=True)
+    await websocket.send_json(json.loads(json.dumps(dashboard_read_model.snapshot(), default=str)))
+
+async def push_dashboard_diff(message: dict):
+    """Read-model listener: fan one diff out to every dashboard subscriber"""
+    if not dashboard_subscribers:
+        return
+    payload = json.loads(json.dumps(message, default=str))
+    for connection in list(dashboard_subscribers):
+        try:
+            await connection.send_json(payload)
+        except Exception as e:
+            logger.debug(f"Dropping dashboard subscriber: {e}")
+            dashboard_subscribers.discard(connection)
+
+dashboard_read_model.add_listener(push_dashboard_diff)
+
 # Server-Sent Events as fallback
 @router.get("/sse")
 async def sse_endpoint(request: Request):
@@ -215,10 +247,11 @@ async def broadcast_message(message: dict):
         message['timestamp'] = datetime.utcnow().isoformat()
     
     # Broadcast to WebSocket clients
-    if active_connections:
+    connections = active_connections.get('all', set())
+    if connections:
         disconnected = set()
         
-        for connection in active_connections:
+        for connection in list(connections):
             try:
                 await connection.send_json(message)
             except Exception as e:
@@ -227,7 +260,7 @@ async def broadcast_message(message: dict):
         
         # Remove disconnected clients
         for conn in disconnected:
-            active_connections.discard(conn)
+            connections.discard(conn)
     
     # Broadcast to SSE clients
     for queue in sse_clients:
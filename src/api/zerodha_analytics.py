@@ -8,10 +8,11 @@ Bypasses faulty internal database for reliable data
 import logging
 from datetime import datetime, date
 from typing import Dict, List, Optional, Any
-from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi import APIRouter, HTTPException, Depends, Query, Request
 from pydantic import BaseModel
 
 from src.core.zerodha_analytics import get_zerodha_analytics_service
+from src.core.dashboard_read_model import dashboard_read_model, DashboardSources
 
 logger = logging.getLogger(__name__)
 
@@ -151,43 +152,62 @@ async def get_trade_history(
         logger.error(f"❌ Error getting trade history: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+# The dashboard default window is served from the shared read-model snapshot
+SNAPSHOT_ANALYTICS_DAYS = 30
+
+def _analytics_payload(analytics) -> Dict[str, Any]:
+    return {
+        'success': True,
+        'data': {
+            'total_trades': analytics.total_trades,
+            'winning_trades': analytics.winning_trades,
+            'losing_trades': analytics.losing_trades,
+            'win_rate': analytics.win_rate,
+            'total_pnl': analytics.total_pnl,
+            'daily_pnl': analytics.daily_pnl,
+            'weekly_pnl': analytics.weekly_pnl,
+            'monthly_pnl': analytics.monthly_pnl,
+            'avg_win': analytics.avg_win,
+            'avg_loss': analytics.avg_loss,
+            'max_win': analytics.max_win,
+            'max_loss': analytics.max_loss,
+            'active_positions': analytics.active_positions,
+            'total_positions_value': analytics.total_positions_value,
+            'available_margin': analytics.available_margin,
+            'used_margin': analytics.used_margin,
+            'net_balance': analytics.net_balance,
+            'last_trade_time': analytics.last_trade_time.isoformat() if analytics.last_trade_time else None,
+            'trading_days': analytics.trading_days,
+            'avg_trades_per_day': analytics.avg_trades_per_day
+        },
+        'source': 'ZERODHA_API',
+        'timestamp': datetime.now().isoformat()
+    }
+
+async def _build_comprehensive_analytics(sources: DashboardSources) -> Dict[str, Any]:
+    orchestrator = await sources.orchestrator()
+    if not orchestrator or not orchestrator.zerodha_client:
+        return {'success': False, 'error': 'Zerodha client not available', 'source': 'ZERODHA_API'}
+    analytics_service = await get_zerodha_analytics_service(orchestrator.zerodha_client)
+    return _analytics_payload(await analytics_service.get_comprehensive_analytics(SNAPSHOT_ANALYTICS_DAYS))
+
+# Pulls 30 days of orders plus holdings and margins - refresh at most once a minute
+dashboard_read_model.register_section('zerodha_analytics', _build_comprehensive_analytics, min_interval=60.0)
+
 @router.get("/comprehensive-analytics")
 async def get_comprehensive_analytics(
-    days: int = Query(30, description="Number of days to analyze"),
-    zerodha_client = Depends(get_zerodha_client)
+    request: Request,
+    days: int = Query(30, description="Number of days to analyze")
 ):
     """Get comprehensive analytics from Zerodha"""
+    if days == SNAPSHOT_ANALYTICS_DAYS:
+        return await dashboard_read_model.respond(request, 'zerodha_analytics')
+    
+    zerodha_client = await get_zerodha_client()
     try:
         analytics_service = await get_zerodha_analytics_service(zerodha_client)
         analytics = await analytics_service.get_comprehensive_analytics(days)
-        
-        return {
-            'success': True,
-            'data': {
-                'total_trades': analytics.total_trades,
-                'winning_trades': analytics.winning_trades,
-                'losing_trades': analytics.losing_trades,
-                'win_rate': analytics.win_rate,
-                'total_pnl': analytics.total_pnl,
-                'daily_pnl': analytics.daily_pnl,
-                'weekly_pnl': analytics.weekly_pnl,
-                'monthly_pnl': analytics.monthly_pnl,
-                'avg_win': analytics.avg_win,
-                'avg_loss': analytics.avg_loss,
-                'max_win': analytics.max_win,
-                'max_loss': analytics.max_loss,
-                'active_positions': analytics.active_positions,
-                'total_positions_value': analytics.total_positions_value,
-                'available_margin': analytics.available_margin,
-                'used_margin': analytics.used_margin,
-                'net_balance': analytics.net_balance,
-                'last_trade_time': analytics.last_trade_time.isoformat() if analytics.last_trade_time else None,
-                'trading_days': analytics.trading_days,
-                'avg_trades_per_day': analytics.avg_trades_per_day
-            },
-            'source': 'ZERODHA_API',
-            'timestamp': datetime.now().isoformat()
-        }
+        return _analytics_payload(analytics)
         
     except Exception as e:
         logger.error(f"❌ Error getting comprehensive analytics: {e}")
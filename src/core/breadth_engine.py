@@ -0,0 +1,317 @@
+"""
+Streaming Market Breadth Engine
+===============================
+Incrementally maintained market internals for the F&O universe.
+
+- Keeps advancers/decliners/unchanged, above-VWAP count, near 52-week highs/lows,
+  up/down/large-trade volume, intraday range sums and per-sector change/volume
+  aggregates as running counters
+- ``update(symbol, data)`` handles one tick in O(1): the symbol's previous
+  contribution is subtracted and the new one added
+- ``ingest(market_data)`` takes a full snapshot (what the trading loop gets from the
+  shared cache), updates only the symbols whose quote changed and drops symbols that
+  disappeared, so the counters always describe exactly the symbols in the snapshot
+- ``snapshot()`` appends one point to the A-D line and sector-rotation series; the
+  running A-D line value is kept alongside the bounded series, so reads are O(1)
+- Several sector maps can be registered (e.g. the internals analyzer's and the bias
+  system's) and share the same per-symbol state
+"""
+
+import logging
+import threading
+from collections import deque
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Thresholds match MarketInternalsAnalyzer's original full-scan implementation
+UNCHANGED_BAND_PCT = 0.1
+NEAR_52W_EXTREME = 0.02
+LARGE_TRADE_SIZE = 10000
+
+
+class _SymbolState:
+    """Contribution of one symbol to the running counters"""
+
+    __slots__ = ('fingerprint', 'breadth', 'change', 'above_vwap', 'extreme', 'volume',
+                 'up_volume', 'large_volume', 'range_pct', 'is_index')
+
+    def __init__(self, fingerprint: Tuple, data: Dict[str, Any], is_index: bool):
+        self.fingerprint = fingerprint
+        self.is_index = is_index
+        ltp = _num(data.get('ltp'))
+        change = _num(data.get('change_percent'))
+        self.change = change
+        self.breadth = 1 if change > UNCHANGED_BAND_PCT else (-1 if change < -UNCHANGED_BAND_PCT else 0)
+        vwap = data.get('vwap')
+        self.above_vwap = ltp > (_num(vwap) if vwap is not None else ltp)
+
+        high_52w = _num(data.get('year_high'))
+        low_52w = _num(data.get('year_low'))
+        if high_52w > 0 and ltp >= high_52w * (1 - NEAR_52W_EXTREME):
+            self.extreme = 1
+        elif low_52w > 0 and ltp <= low_52w * (1 + NEAR_52W_EXTREME):
+            self.extreme = -1
+        else:
+            self.extreme = 0
+
+        self.volume = _num(data.get('volume'))
+        self.up_volume = change > 0
+        self.large_volume = self.volume if _num(data.get('avg_trade_size')) > LARGE_TRADE_SIZE else 0.0
+
+        high = _num(data.get('high'))
+        low = _num(data.get('low'))
+        self.range_pct = ((high - low) / ltp * 100) if high > 0 and low > 0 and ltp > 0 else None
+
+
+def _num(value) -> float:
+    try:
+        return float(value or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _fingerprint(data: Dict[str, Any]) -> Tuple:
+    get = data.get
+    return (get('ltp'), get('change_percent'), get('volume'), get('vwap'), get('high'), get('low'))
+
+
+class _SectorAggregate:
+    __slots__ = ('change_sum', 'volume', 'count')
+
+    def __init__(self):
+        self.change_sum = 0.0
+        self.volume = 0.0
+        self.count = 0
+
+
+class BreadthEngine:
+    """Running breadth/volume/sector counters updated only for symbols that ticked"""
+
+    def __init__(self, history: int = 100, rotation_history: int = 100):
+        self._lock = threading.RLock()
+        self._symbols: Dict[str, _SymbolState] = {}
+        self._sector_maps: Dict[str, Dict[str, List[str]]] = {}
+        self._symbol_sectors: Dict[str, List[Tuple[str, str]]] = {}
+        self._sectors: Dict[Tuple[str, str], _SectorAggregate] = {}
+
+        self.total = 0
+        self.advancing = 0
+        self.declining = 0
+        self.unchanged = 0
+        self.above_vwap = 0
+        self.new_highs = 0
+        self.new_lows = 0
+        self.up_volume = 0.0
+        self.down_volume = 0.0
+        self.large_volume = 0.0
+        self.range_pct_sum = 0.0
+        self.range_count = 0
+
+        self.ad_history: Deque[int] = deque(maxlen=history)
+        self.ad_line = 0
+        self.ad_series: Deque[Dict[str, Any]] = deque(maxlen=history)
+        self.rotation_series: Deque[Dict[str, Any]] = deque(maxlen=rotation_history)
+        self.updates = 0
+        self.ingested = 0
+
+    # ------------------------------------------------------------- sector maps
+
+    def add_sector_map(self, name: str, sectors: Dict[str, List[str]]):
+        """Register a sector grouping; existing symbol state is folded in immediately"""
+        with self._lock:
+            if name in self._sector_maps:
+                self._sectors = {key: agg for key, agg in self._sectors.items() if key[0] != name}
+                for symbol, memberships in self._symbol_sectors.items():
+                    memberships[:] = [m for m in memberships if m[0] != name]
+            self._sector_maps[name] = {sector: list(symbols) for sector, symbols in sectors.items()}
+            for sector, symbols in sectors.items():
+                self._sectors[(name, sector)] = _SectorAggregate()
+                for symbol in symbols:
+                    self._symbol_sectors.setdefault(symbol, []).append((name, sector))
+                    state = self._symbols.get(symbol)
+                    if state is not None:
+                        self._apply_sector(name, sector, state, 1)
+
+    def _apply_sector(self, group: str, sector: str, state: _SymbolState, sign: int):
+        aggregate = self._sectors[(group, sector)]
+        aggregate.change_sum += sign * state.change
+        aggregate.volume += sign * state.volume
+        aggregate.count += sign
+        if aggregate.count == 0:
+            # Drop accumulated float error once the sector is empty
+            aggregate.change_sum = aggregate.volume = 0.0
+
+    # ----------------------------------------------------------------- updates
+
+    def _apply(self, symbol: str, state: _SymbolState, sign: int):
+        for group, sector in self._symbol_sectors.get(symbol, ()):
+            self._apply_sector(group, sector, state, sign)
+        if state.is_index:
+            return
+        self.total += sign
+        if state.breadth > 0:
+            self.advancing += sign
+        elif state.breadth < 0:
+            self.declining += sign
+        else:
+            self.unchanged += sign
+        if state.above_vwap:
+            self.above_vwap += sign
+        if state.extreme > 0:
+            self.new_highs += sign
+        elif state.extreme < 0:
+            self.new_lows += sign
+        if state.up_volume:
+            self.up_volume += sign * state.volume
+        else:
+            self.down_volume += sign * state.volume
+        self.large_volume += sign * state.large_volume
+        if state.range_pct is not None:
+            self.range_pct_sum += sign * state.range_pct
+            self.range_count += sign
+            if self.range_count == 0:
+                self.range_pct_sum = 0.0
+
+    def update(self, symbol: str, data: Dict[str, Any], fingerprint: Optional[Tuple] = None) -> bool:
+        """Apply one tick; returns False if the quote did not change"""
+        fingerprint = fingerprint if fingerprint is not None else _fingerprint(data)
+        with self._lock:
+            old = self._symbols.get(symbol)
+            if old is not None and old.fingerprint == fingerprint:
+                return False
+            new = _SymbolState(fingerprint, data, symbol.endswith('-I'))
+            if old is not None:
+                self._apply(symbol, old, -1)
+            self._apply(symbol, new, 1)
+            self._symbols[symbol] = new
+            self.updates += 1
+            return True
+
+    def remove(self, symbol: str):
+        with self._lock:
+            old = self._symbols.pop(symbol, None)
+            if old is not None:
+                self._apply(symbol, old, -1)
+
+    def ingest(self, market_data: Dict[str, Dict[str, Any]]) -> int:
+        """Bring the counters in line with a full snapshot; returns how many symbols changed"""
+        changed = 0
+        present = 0
+        with self._lock:
+            symbols = self._symbols
+            for symbol, data in market_data.items():
+                if not isinstance(data, dict):
+                    continue
+                present += 1
+                state = symbols.get(symbol)
+                fingerprint = _fingerprint(data)
+                if state is not None and state.fingerprint == fingerprint:
+                    continue
+                changed += self.update(symbol, data, fingerprint)
+            # Only pay for a set difference when a symbol actually disappeared
+            if present < len(symbols):
+                for symbol in [s for s in symbols if s not in market_data]:
+                    self.remove(symbol)
+                    changed += 1
+            self.ingested += 1
+        return changed
+
+    # ------------------------------------------------------------------- reads
+
+    @property
+    def ad_ratio(self) -> float:
+        return self.advancing / self.declining if self.declining > 0 else float(self.advancing)
+
+    def breadth(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'ad_ratio': self.ad_ratio,
+                'ad_line': self.ad_line,
+                'above_vwap': (self.above_vwap / self.total * 100) if self.total > 0 else 50,
+                'highs_lows': self.new_highs - self.new_lows,
+                'advancing': self.advancing,
+                'declining': self.declining,
+                'unchanged': self.unchanged
+            }
+
+    def volume_profile(self) -> Dict[str, Any]:
+        with self._lock:
+            total_volume = self.up_volume + self.down_volume
+            return {
+                'up_volume_ratio': (self.up_volume / total_volume * 100) if total_volume > 0 else 50,
+                'volume_breadth': self.up_volume - self.down_volume,
+                'institutional_flow': (self.large_volume / total_volume * 100) if total_volume > 0 else 0,
+                'total_volume': total_volume
+            }
+
+    def intraday_volatility(self) -> float:
+        """Average (high - low) / ltp in percent across non-index symbols"""
+        return self.range_pct_sum / self.range_count if self.range_count > 0 else 1.0
+
+    def sector_averages(self, group: str) -> Dict[str, Dict[str, float]]:
+        """Average change and total volume per sector with at least one symbol present"""
+        with self._lock:
+            return {
+                sector: {'change': aggregate.change_sum / aggregate.count, 'volume': aggregate.volume}
+                for (name, sector), aggregate in self._sectors.items()
+                if name == group and aggregate.count > 0
+            }
+
+    def sector_rotation(self, group: str) -> Dict[str, Any]:
+        performances = self.sector_averages(group)
+        ranked = sorted(performances.items(), key=lambda kv: kv[1]['change'], reverse=True)
+        return {
+            'leaders': [name for name, _ in ranked[:3]],
+            'laggards': [name for name, _ in ranked[-3:]],
+            'rotation_score': abs(ranked[0][1]['change'] - ranked[-1][1]['change']) if ranked else 0,
+            'performances': performances
+        }
+
+    # ------------------------------------------------------------------ series
+
+    def snapshot(self, rotation_group: Optional[str] = None) -> Dict[str, Any]:
+        """Append the current A-D difference (and sector rotation) to the series"""
+        with self._lock:
+            ad_diff = self.advancing - self.declining
+            if len(self.ad_history) == self.ad_history.maxlen:
+                self.ad_line -= self.ad_history[0]
+            self.ad_history.append(ad_diff)
+            self.ad_line += ad_diff
+            now = datetime.now().isoformat()
+            point = {'timestamp': now, 'ad_diff': ad_diff, 'ad_line': self.ad_line}
+            self.ad_series.append(point)
+            if rotation_group is not None:
+                rotation = self.sector_rotation(rotation_group)
+                self.rotation_series.append({
+                    'timestamp': now,
+                    'leaders': rotation['leaders'],
+                    'laggards': rotation['laggards'],
+                    'rotation_score': rotation['rotation_score']
+                })
+            return point
+
+    def recent_ad_diffs(self, count: int) -> List[int]:
+        with self._lock:
+            return list(self.ad_history)[-count:]
+
+    def get_series(self, limit: int = 100) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'ad_line': list(self.ad_series)[-limit:],
+                'sector_rotation': list(self.rotation_series)[-limit:]
+            }
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'symbols': len(self._symbols),
+                'breadth_symbols': self.total,
+                'updates': self.updates,
+                'snapshots_ingested': self.ingested,
+                'advancing': self.advancing,
+                'declining': self.declining,
+                'unchanged': self.unchanged,
+                'ad_line': self.ad_line
+            }
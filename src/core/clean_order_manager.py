@@ -12,6 +12,7 @@ import json
 import time
 import numpy as np
 from .order_rate_limiter import OrderRateLimiter
+from src.utils.hot_metrics import order_path_seconds, timed_async
 
 logger = logging.getLogger(__name__)
 
@@ -69,6 +70,7 @@ class OrderManager:
         
         logger.info("OrderManager initialized with available components")
     
+    @timed_async(order_path_seconds, 'order_manager', outcome=lambda order_id: 'ok' if order_id else 'rejected')
     async def place_order(self, user_id: str, order_data: Dict[str, Any]) -> str:
         """Place an order - FAIL if requirements not met"""
         try:
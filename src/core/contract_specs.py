@@ -0,0 +1,340 @@
+"""
+Contract Specs
+==============
+Per-trading-day F&O contract specifications, built once from the broker instrument dump.
+
+- Per underlying: listed option expiries, strike grid per expiry and its interval, lot size,
+  tick size and freeze quantity, keyed by the instrument ``name`` (so NIFTY never picks up
+  BANKNIFTY contracts the way a substring scan does)
+- The set of listed option tradingsymbols, for existence checks without a broker call
+- One JSON snapshot per IST trading day (``specs-YYYYMMDD.json``); a restart on the same day
+  loads it from disk instead of re-downloading instruments
+- Lookups are plain dict reads, so options signal construction needs no broker round-trips;
+  every getter returns ``None``/empty when the cache is not ready for today and callers keep
+  their existing broker path as the fallback
+- ``recall``/``remember`` memoize derived per-day results (e.g. the selected expiry)
+"""
+
+import asyncio
+import json
+import logging
+import os
+import tempfile
+from collections import Counter
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Hashable, Iterable, List, Optional
+
+import pytz
+
+logger = logging.getLogger(__name__)
+
+IST = pytz.timezone('Asia/Kolkata')
+
+FORMAT_VERSION = 1
+
+# Exchanges whose option contracts are cached (SENSEX/BANKEX options trade on BFO)
+EXCHANGES = ('NFO', 'BFO')
+
+# Index lot sizes confirmed against the exchange circulars; the instrument dump has been stale
+INDEX_LOT_SIZES = {
+    'NIFTY': 65,
+    'BANKNIFTY': 35,
+    'FINNIFTY': 40,
+    'MIDCPNIFTY': 50,
+    'SENSEX': 10,
+    'BANKEX': 15,
+}
+
+# NSE/BSE index derivative freeze quantities (units per order)
+INDEX_FREEZE_QUANTITIES = {
+    'NIFTY': 1800,
+    'BANKNIFTY': 900,
+    'FINNIFTY': 1800,
+    'MIDCPNIFTY': 2800,
+    'NIFTYNXT50': 600,
+    'SENSEX': 1000,
+    'BANKEX': 900,
+}
+
+MONTH_NAMES = ['JAN', 'FEB', 'MAR', 'APR', 'MAY', 'JUN',
+               'JUL', 'AUG', 'SEP', 'OCT', 'NOV', 'DEC']
+
+
+def trading_day(now: Optional[datetime] = None) -> str:
+    """IST trading day (YYYYMMDD)"""
+    return (now or datetime.now(IST)).astimezone(IST).strftime('%Y%m%d')
+
+
+def _expiry_date(value) -> Optional[date]:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    try:
+        return datetime.strptime(str(value)[:10], '%Y-%m-%d').date()
+    except (TypeError, ValueError):
+        return None
+
+
+def _number(value):
+    value = float(value)
+    return int(value) if value.is_integer() else value
+
+
+def format_expiry(expiry: date) -> Dict[str, Any]:
+    """Expiry entry in the shape ``get_available_expiries_for_symbol`` returns"""
+    return {
+        'date': expiry,
+        'formatted': f"{str(expiry.year)[-2:]}{MONTH_NAMES[expiry.month - 1]}",
+        'is_weekly': True,
+        'is_monthly': (expiry + timedelta(days=7)).month != expiry.month
+    }
+
+
+class ContractSpecCache:
+    """Trading-day snapshot of option contract specifications per underlying"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.session: Optional[str] = None
+        self.built_at: Optional[str] = None
+        self.source: Optional[str] = None
+        self._specs: Dict[str, Dict[str, Any]] = {}
+        self._symbols: set = set()
+        self._memo: Dict[Hashable, Any] = {}
+        self._build_lock: Optional[asyncio.Lock] = None
+        self.stats = {'hits': 0, 'misses': 0, 'builds': 0, 'loads': 0}
+
+    def path_for(self, session: str) -> str:
+        return os.path.join(self.directory, f"specs-{session}.json")
+
+    def is_ready(self) -> bool:
+        return bool(self._specs) and self.session == trading_day()
+
+    # ------------------------------------------------------------------
+    # Building and persistence
+    # ------------------------------------------------------------------
+
+    def build_from_instruments(self, instruments: Iterable[Dict[str, Any]],
+                               session: Optional[str] = None) -> int:
+        """Index a broker instrument dump; returns the number of underlyings"""
+        grouped: Dict[str, Dict[str, Any]] = {}
+        symbols = set()
+        for inst in instruments:
+            if not isinstance(inst, dict) or inst.get('instrument_type') not in ('CE', 'PE'):
+                continue
+            name = (inst.get('name') or '').upper()
+            expiry = _expiry_date(inst.get('expiry'))
+            tradingsymbol = (inst.get('tradingsymbol') or '').upper()
+            if not name or not expiry or not tradingsymbol:
+                continue
+            entry = grouped.setdefault(name, {'strikes': {}, 'lots': Counter(), 'ticks': Counter()})
+            try:
+                entry['strikes'].setdefault(expiry.isoformat(), set()).add(_number(inst.get('strike') or 0))
+                entry['lots'][int(inst.get('lot_size') or 0)] += 1
+                entry['ticks'][float(inst.get('tick_size') or 0)] += 1
+            except (TypeError, ValueError):
+                continue
+            symbols.add(tradingsymbol)
+
+        specs = {}
+        for name, entry in grouped.items():
+            strikes = {expiry: sorted(s for s in values if s > 0)
+                       for expiry, values in sorted(entry['strikes'].items())}
+            lot_size = next((lot for lot, _ in entry['lots'].most_common() if lot > 0), None)
+            tick_size = next((tick for tick, _ in entry['ticks'].most_common() if tick > 0), None)
+            specs[name] = {
+                'expiries': list(strikes),
+                'strikes': strikes,
+                'strike_interval': self._strike_interval(strikes),
+                'lot_size': lot_size,
+                'tick_size': tick_size,
+                'freeze_quantity': INDEX_FREEZE_QUANTITIES.get(name)
+            }
+
+        self.session = session or trading_day()
+        self.built_at = datetime.now(IST).isoformat()
+        self._specs = specs
+        self._symbols = symbols
+        self._memo = {}
+        return len(specs)
+
+    @staticmethod
+    def _strike_interval(strikes: Dict[str, List]) -> Optional[float]:
+        """Finest listed strike gap of the nearest expiry (wings are listed at wider gaps)"""
+        for grid in strikes.values():
+            gaps = [b - a for a, b in zip(grid, grid[1:]) if b > a]
+            if gaps:
+                return _number(round(min(gaps), 2))
+        return None
+
+    def save(self) -> Optional[str]:
+        if not self.session or not self._specs:
+            return None
+        os.makedirs(self.directory, exist_ok=True)
+        path = self.path_for(self.session)
+        payload = {
+            'version': FORMAT_VERSION,
+            'session': self.session,
+            'built_at': self.built_at,
+            'specs': self._specs,
+            'symbols': sorted(self._symbols)
+        }
+        # Write-then-rename so a crash never leaves a truncated snapshot behind
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(payload, f, separators=(',', ':'))
+        os.replace(tmp, path)
+        return path
+
+    def load(self, session: Optional[str] = None) -> bool:
+        """Load the snapshot of a trading day (today by default)"""
+        session = session or trading_day()
+        path = self.path_for(session)
+        if not os.path.exists(path):
+            return False
+        try:
+            with open(path) as f:
+                payload = json.load(f)
+            if payload.get('version') != FORMAT_VERSION or payload.get('session') != session:
+                return False
+            self.session = session
+            self.built_at = payload.get('built_at')
+            self._specs = payload.get('specs') or {}
+            self._symbols = set(payload.get('symbols') or [])
+            self._memo = {}
+            self.source = 'disk'
+            self.stats['loads'] += 1
+            return bool(self._specs)
+        except (OSError, ValueError) as e:
+            logger.warning(f"⚠️ Could not load contract specs {path}: {e}")
+            return False
+
+    async def ensure(self, broker=None) -> bool:
+        """Make the cache current for today: memory, then today's snapshot, then the broker"""
+        if self.is_ready():
+            return True
+        if self._build_lock is None:
+            self._build_lock = asyncio.Lock()
+        async with self._build_lock:
+            if self.is_ready():
+                return True
+            if self.load():
+                logger.info(f"📇 Contract specs for {self.session} loaded from disk "
+                            f"({len(self._specs)} underlyings, {len(self._symbols)} contracts)")
+                return True
+            if broker is None or not hasattr(broker, 'get_instruments'):
+                return False
+            instruments = []
+            for exchange in EXCHANGES:
+                try:
+                    dump = await broker.get_instruments(exchange)
+                    if isinstance(dump, list):
+                        instruments.extend(dump)
+                except Exception as e:
+                    logger.warning(f"⚠️ {exchange} instruments unavailable for contract specs: {e}")
+            if not instruments or not self.build_from_instruments(instruments):
+                logger.warning("⚠️ Contract specs not built - no option instruments from broker")
+                return False
+            self.source = 'broker'
+            self.stats['builds'] += 1
+            try:
+                self.save()
+            except OSError as e:
+                logger.warning(f"⚠️ Could not persist contract specs: {e}")
+            logger.info(f"📇 Contract specs for {self.session} built from broker "
+                        f"({len(self._specs)} underlyings, {len(self._symbols)} contracts)")
+            return True
+
+    # ------------------------------------------------------------------
+    # Lookups
+    # ------------------------------------------------------------------
+
+    def get_spec(self, underlying: str) -> Optional[Dict[str, Any]]:
+        spec = self._specs.get((underlying or '').upper()) if self.is_ready() else None
+        self.stats['hits' if spec else 'misses'] += 1
+        return spec
+
+    def get_expiries(self, underlying: str) -> List[Dict[str, Any]]:
+        spec = self.get_spec(underlying)
+        if not spec:
+            return []
+        return [format_expiry(_expiry_date(expiry)) for expiry in spec['expiries']]
+
+    def get_strikes(self, underlying: str, expiry: Optional[date] = None) -> List:
+        spec = self.get_spec(underlying)
+        if not spec:
+            return []
+        key = expiry.isoformat() if expiry else next(iter(spec['strikes']), None)
+        return list(spec['strikes'].get(key, []))
+
+    def resolve_expiry(self, underlying: str, code: str) -> Optional[date]:
+        """Listed expiry behind a ``YYMMM`` contract code: the month's last (monthly) expiry"""
+        spec = self.get_spec(underlying)
+        if not spec or not code:
+            return None
+        code = code.upper()
+        matches = [expiry for expiry in map(_expiry_date, spec['expiries'])
+                   if format_expiry(expiry)['formatted'] == code]
+        return max(matches) if matches else None
+
+    def get_strike_interval(self, underlying: str):
+        spec = self.get_spec(underlying)
+        return spec['strike_interval'] if spec else None
+
+    def get_lot_size(self, underlying: str) -> Optional[int]:
+        spec = self.get_spec(underlying)
+        return spec['lot_size'] if spec else None
+
+    def get_tick_size(self, underlying: str) -> Optional[float]:
+        spec = self.get_spec(underlying)
+        return spec['tick_size'] if spec else None
+
+    def get_tick_size_for_symbol(self, tradingsymbol: str) -> Optional[float]:
+        """Tick size of a listed option contract, by its tradingsymbol"""
+        tradingsymbol = (tradingsymbol or '').upper()
+        if not self.is_ready() or tradingsymbol not in self._symbols:
+            return None
+        # Longest name first so BANKNIFTY is not read as NIFTY-prefixed
+        for name in sorted(self._specs, key=len, reverse=True):
+            if tradingsymbol.startswith(name):
+                return self.get_tick_size(name)
+        return None
+
+    def get_freeze_quantity(self, underlying: str) -> Optional[int]:
+        spec = self.get_spec(underlying)
+        if spec:
+            return spec['freeze_quantity']
+        return INDEX_FREEZE_QUANTITIES.get((underlying or '').upper())
+
+    def has_symbol(self, tradingsymbol: str, underlying: str) -> Optional[bool]:
+        """Whether a contract is listed today; ``None`` when the cache cannot tell"""
+        if not self.get_spec(underlying):
+            return None
+        return (tradingsymbol or '').upper() in self._symbols
+
+    def recall(self, key: Hashable) -> Any:
+        return self._memo.get(key) if self.is_ready() else None
+
+    def remember(self, key: Hashable, value: Any) -> Any:
+        if self.is_ready() and value is not None:
+            self._memo[key] = value
+        return value
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'session': self.session,
+            'ready': self.is_ready(),
+            'source': self.source,
+            'built_at': self.built_at,
+            'underlyings': len(self._specs),
+            'contracts': len(self._symbols),
+            'memoized': len(self._memo),
+            **self.stats
+        }
+
+
+# Global contract spec cache instance
+contract_specs = ContractSpecCache(
+    directory=os.getenv('CONTRACT_SPECS_DIR', os.path.join('data', 'contract_specs'))
+)
@@ -0,0 +1,356 @@
+"""
+Trading Cycle Tracer
+====================
+Low-overhead span tracing for the trading loop.
+
+- ``begin_cycle()`` / ``end_cycle()`` bracket one trading-loop iteration; stages inside it
+  are wrapped in ``span(name)``, which nests through a context variable, so spans opened in
+  strategy or trade-engine code attach to the cycle that is running them
+- Every finished span feeds a fixed-size log-bucket histogram per stage name, giving
+  p50/p95/p99 without keeping samples around
+- The last N cycles (with their span trees) are kept in a ring buffer as a flight recorder;
+  cycles slower than ``slow_cycle_ms`` are also kept in a separate, smaller ring so they
+  survive a burst of fast cycles
+- ``mark_tick()`` stamps when the cycle's market data arrived and ``mark_order()`` records
+  tick-to-order latency when an order is handed to the broker
+"""
+
+import contextvars
+import logging
+import math
+import os
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Stage latencies are also exported to Prometheus when the metrics layer is available
+try:
+    from src.utils.hot_metrics import cycle_stage_seconds, strategy_seconds
+except ImportError:
+    cycle_stage_seconds = strategy_seconds = None
+
+_current_span: contextvars.ContextVar[Optional['Span']] = contextvars.ContextVar(
+    'cycle_tracer_span', default=None
+)
+
+
+class LatencyHistogram:
+    """Log-bucketed latency histogram (~9% bucket width) with O(1) record"""
+
+    MIN_MS = 0.001
+    BUCKETS_PER_DOUBLING = 8
+    NUM_BUCKETS = 8 * 30  # 1µs .. ~18 minutes
+
+    __slots__ = ('counts', 'count', 'total_ms', 'max_ms', 'min_ms')
+
+    def __init__(self):
+        self.counts = [0] * self.NUM_BUCKETS
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.min_ms = math.inf
+
+    def record(self, ms: float):
+        if ms <= self.MIN_MS:
+            index = 0
+        else:
+            index = min(int(math.log2(ms / self.MIN_MS) * self.BUCKETS_PER_DOUBLING),
+                        self.NUM_BUCKETS - 1)
+        self.counts[index] += 1
+        self.count += 1
+        self.total_ms += ms
+        if ms > self.max_ms:
+            self.max_ms = ms
+        if ms < self.min_ms:
+            self.min_ms = ms
+
+    def percentile(self, q: float) -> float:
+        """Approximate q-th percentile (0-100) in ms - the geometric midpoint of its bucket"""
+        if not self.count:
+            return 0.0
+        rank = max(math.ceil(self.count * q / 100.0), 1)
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= rank:
+                value = self.MIN_MS * 2 ** ((index + 0.5) / self.BUCKETS_PER_DOUBLING)
+                return min(max(value, self.min_ms), self.max_ms)
+        return self.max_ms
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'count': self.count,
+            'avg_ms': round(self.total_ms / self.count, 3) if self.count else 0.0,
+            'p50_ms': round(self.percentile(50), 3),
+            'p95_ms': round(self.percentile(95), 3),
+            'p99_ms': round(self.percentile(99), 3),
+            'max_ms': round(self.max_ms, 3)
+        }
+
+
+class Span:
+    """One timed stage; children are the spans opened while it was current"""
+
+    MAX_CHILDREN = 256
+
+    __slots__ = ('name', 'attrs', 'start', 'end', 'children', 'dropped_children',
+                 'error', '_tracer', '_token', '_parent')
+
+    def __init__(self, tracer: Optional['CycleTracer'], name: str, attrs: Dict[str, Any]):
+        self.name = name
+        self.attrs = attrs
+        self.start = 0.0
+        self.end: Optional[float] = None
+        self.children: List['Span'] = []
+        self.dropped_children = 0
+        self.error: Optional[str] = None
+        self._tracer = tracer
+        self._token = None
+        self._parent: Optional['Span'] = None
+
+    @property
+    def duration_ms(self) -> float:
+        end = self.end if self.end is not None else time.perf_counter()
+        return (end - self.start) * 1000
+
+    def __enter__(self) -> 'Span':
+        self._parent = _current_span.get()
+        self.start = time.perf_counter()
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.end = time.perf_counter()
+        if exc_type is not None:
+            self.error = exc_type.__name__
+        try:
+            _current_span.reset(self._token)
+        except ValueError:
+            # Exited from a different context than it was entered in
+            _current_span.set(self._parent)
+        parent = self._parent
+        if parent is not None:
+            if len(parent.children) < self.MAX_CHILDREN:
+                parent.children.append(self)
+            else:
+                parent.dropped_children += 1
+        self._parent = None
+        if self._tracer is not None:
+            self._tracer._record(self.name, self.duration_ms)
+        return False
+
+    async def __aenter__(self) -> 'Span':
+        return self.__enter__()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return self.__exit__(exc_type, exc, tb)
+
+    def to_dict(self, origin: Optional[float] = None) -> Dict[str, Any]:
+        origin = self.start if origin is None else origin
+        data = {
+            'name': self.name,
+            'offset_ms': round((self.start - origin) * 1000, 3),
+            'duration_ms': round(self.duration_ms, 3)
+        }
+        if self.attrs:
+            data['attrs'] = self.attrs
+        if self.error:
+            data['error'] = self.error
+        if self.children:
+            data['children'] = [child.to_dict(origin) for child in self.children]
+        if self.dropped_children:
+            data['dropped_children'] = self.dropped_children
+        return data
+
+
+class _NullSpan:
+    """Returned when tracing is disabled - a no-op context manager"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class CycleTrace(Span):
+    """Root span of one trading cycle"""
+
+    __slots__ = ('cycle_id', 'started_at', 'tick_at', 'orders')
+
+    def __init__(self, tracer: 'CycleTracer', cycle_id: int, attrs: Dict[str, Any]):
+        super().__init__(None, 'cycle', attrs)
+        self.cycle_id = cycle_id
+        self.started_at = datetime.now().isoformat()
+        self.tick_at: Optional[float] = None
+        self.orders: List[Dict[str, Any]] = []
+
+    def to_dict(self, origin: Optional[float] = None) -> Dict[str, Any]:
+        data = super().to_dict(origin)
+        data['cycle_id'] = self.cycle_id
+        data['started_at'] = self.started_at
+        if self.orders:
+            data['orders'] = self.orders
+        return data
+
+
+class CycleTracer:
+    """Per-cycle span tracer with stage histograms and a flight recorder of recent cycles"""
+
+    def __init__(self, capacity: int = 200, slow_cycle_ms: float = 5000.0,
+                 slow_capacity: int = 50, enabled: bool = True):
+        self.enabled = enabled
+        self.slow_cycle_ms = slow_cycle_ms
+        self.recent: Deque[CycleTrace] = deque(maxlen=capacity)
+        self.slow: Deque[CycleTrace] = deque(maxlen=slow_capacity)
+        self.histograms: Dict[str, LatencyHistogram] = {}
+        self._exported: Dict[str, Any] = {}
+        self.cycle_id = 0
+        self.since = datetime.now().isoformat()
+        self._cycle: Optional[CycleTrace] = None
+
+    # ------------------------------------------------------------------ cycles
+
+    def begin_cycle(self, **attrs) -> Optional[CycleTrace]:
+        """Open a new cycle trace; an unfinished previous cycle is closed first"""
+        if not self.enabled:
+            return None
+        if self._cycle is not None:
+            self.end_cycle()
+        self.cycle_id += 1
+        cycle = CycleTrace(self, self.cycle_id, attrs)
+        cycle.__enter__()
+        self._cycle = cycle
+        return cycle
+
+    def end_cycle(self, **attrs) -> Optional[CycleTrace]:
+        cycle = self._cycle
+        if cycle is None:
+            return None
+        self._cycle = None
+        cycle.attrs.update(attrs)
+        cycle.__exit__(None, None, None)
+        duration_ms = cycle.duration_ms
+        self._record('cycle', duration_ms)
+        self.recent.append(cycle)
+        if duration_ms >= self.slow_cycle_ms:
+            self.slow.append(cycle)
+            logger.warning(f"🐢 SLOW TRADING CYCLE #{cycle.cycle_id}: {duration_ms:.0f}ms "
+                           f"(threshold {self.slow_cycle_ms:.0f}ms) - {self._slowest_stage(cycle)}")
+        return cycle
+
+    def discard_cycle(self):
+        """Drop the open cycle without recording it (e.g. no market data this iteration)"""
+        cycle = self._cycle
+        if cycle is not None:
+            self._cycle = None
+            cycle.__exit__(None, None, None)
+
+    @property
+    def current_cycle(self) -> Optional[CycleTrace]:
+        return self._cycle
+
+    @staticmethod
+    def _slowest_stage(cycle: CycleTrace) -> str:
+        if not cycle.children:
+            return 'no stages recorded'
+        slowest = max(cycle.children, key=lambda s: s.duration_ms)
+        return f"slowest stage {slowest.name} {slowest.duration_ms:.0f}ms"
+
+    # ------------------------------------------------------------------- spans
+
+    def span(self, name: str, **attrs):
+        """Context manager (sync or async) timing one stage under the current span"""
+        if not self.enabled:
+            return _NULL_SPAN
+        return Span(self, name, attrs)
+
+    def _record(self, name: str, duration_ms: float):
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = LatencyHistogram()
+        histogram.record(duration_ms)
+        exported = self._exported.get(name)
+        if exported is None and cycle_stage_seconds is not None:
+            exported = self._exported[name] = (
+                strategy_seconds.labels(name[len('strategy.'):]) if name.startswith('strategy.')
+                else cycle_stage_seconds.labels(name))
+        if exported is not None:
+            exported.observe(duration_ms / 1000.0)
+
+    # ------------------------------------------------------- tick-to-order
+
+    def mark_tick(self):
+        """Stamp the moment this cycle's market data was received"""
+        if self._cycle is not None:
+            self._cycle.tick_at = time.perf_counter()
+
+    def mark_order(self, signal: Optional[Dict[str, Any]] = None) -> Optional[float]:
+        """Record tick-to-order latency for an order being handed to the broker"""
+        cycle = self._cycle
+        if cycle is None or cycle.tick_at is None:
+            return None
+        latency_ms = (time.perf_counter() - cycle.tick_at) * 1000
+        self._record('tick_to_order', latency_ms)
+        if len(cycle.orders) < Span.MAX_CHILDREN:
+            signal = signal or {}
+            cycle.orders.append({
+                'symbol': signal.get('symbol'),
+                'strategy': signal.get('strategy'),
+                'tick_to_order_ms': round(latency_ms, 3)
+            })
+        return latency_ms
+
+    # ----------------------------------------------------------------- reports
+
+    def get_latency_report(self) -> Dict[str, Any]:
+        ranked = sorted(self.histograms.items(), key=lambda kv: -kv[1].percentile(95))
+        return {
+            'enabled': self.enabled,
+            'since': self.since,
+            'cycles': self.cycle_id,
+            'slow_cycle_ms': self.slow_cycle_ms,
+            'slow_cycles_recorded': len(self.slow),
+            'tick_to_order': self.histograms['tick_to_order'].to_dict()
+            if 'tick_to_order' in self.histograms else None,
+            'stages': {name: histogram.to_dict() for name, histogram in ranked}
+        }
+
+    def get_slow_cycles(self, threshold_ms: Optional[float] = None, limit: int = 20) -> List[Dict[str, Any]]:
+        """Slowest recorded cycles at or above the threshold, with their span trees"""
+        threshold = self.slow_cycle_ms if threshold_ms is None else threshold_ms
+        candidates = {id(c): c for c in list(self.recent) + list(self.slow)}.values()
+        slow = [c for c in candidates if c.end is not None and c.duration_ms >= threshold]
+        slow.sort(key=lambda c: -c.duration_ms)
+        return [cycle.to_dict() for cycle in slow[:limit]]
+
+    def get_recent_cycles(self, limit: int = 20) -> List[Dict[str, Any]]:
+        return [cycle.to_dict() for cycle in list(self.recent)[-limit:]]
+
+    def reset(self):
+        self.histograms.clear()
+        self.recent.clear()
+        self.slow.clear()
+        self.since = datetime.now().isoformat()
+
+
+# Global tracer for the orchestrator trading loop
+cycle_tracer = CycleTracer(
+    capacity=int(os.getenv('CYCLE_TRACE_CAPACITY', '200')),
+    slow_cycle_ms=float(os.getenv('SLOW_CYCLE_MS', '5000')),
+    enabled=os.getenv('CYCLE_TRACING_ENABLED', 'true').lower() == 'true'
+)
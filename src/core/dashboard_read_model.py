@@ -0,0 +1,384 @@
+"""
+Dashboard Read Model
+====================
+One shared, versioned snapshot of everything the dashboards poll.
+
+- Sections (summary, positions, trades, ...) are registered by the API routers as
+  async builders; one refresh builds every due section from a shared set of
+  broker/orchestrator reads (orders, positions, margins, trading status are
+  fetched at most once per refresh)
+- Refreshes run on a schedule while someone is reading, and early (debounced)
+  when a fill, position change or P&L tick is reported through ``notify()``
+- HTTP readers get the cached section with a content ETag and 304 on If-None-Match
+- Listeners (the websocket) receive JSON merge-patch diffs of changed sections
+
+Broker and DB load therefore depends on the refresh rate, not on how many
+dashboards are open.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Set
+
+from src.core.signal_pipeline import CycleMemo
+
+logger = logging.getLogger(__name__)
+
+# Keys that change on every build and must not affect ETags or diffs
+VOLATILE_KEYS = frozenset({'timestamp', 'last_updated', 'server_time'})
+
+
+def _stable(value: Any) -> Any:
+    """Copy of ``value`` without volatile keys (for hashing and diffing)"""
+    if isinstance(value, dict):
+        return {k: _stable(v) for k, v in value.items() if k not in VOLATILE_KEYS}
+    if isinstance(value, list):
+        return [_stable(v) for v in value]
+    return value
+
+
+def merge_patch_diff(old: Any, new: Any) -> Any:
+    """RFC 7386 JSON merge patch turning ``old`` into ``new`` (None removes a key)"""
+    if not isinstance(old, dict) or not isinstance(new, dict):
+        return new
+    patch = {}
+    for key in old.keys() - new.keys():
+        patch[key] = None
+    for key, value in new.items():
+        if key not in old:
+            patch[key] = value
+        elif old[key] != value:
+            patch[key] = merge_patch_diff(old[key], value) if isinstance(value, dict) else value
+    return patch
+
+
+class DashboardSources:
+    """Broker/orchestrator reads shared by all sections built in one refresh"""
+
+    def __init__(self, memo: CycleMemo):
+        self._memo = memo
+
+    async def _get(self, key: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        return await self._memo.aget_or_compute('dashboard', key, fetch)
+
+    async def orchestrator(self):
+        async def fetch():
+            from src.core.dependencies import get_orchestrator
+            return await get_orchestrator()
+        return await self._get('orchestrator', fetch)
+
+    async def trading_status(self) -> Dict[str, Any]:
+        async def fetch():
+            orchestrator = await self.orchestrator()
+            if orchestrator and hasattr(orchestrator, 'get_trading_status'):
+                return await orchestrator.get_trading_status()
+            raise Exception("No orchestrator instance available")
+        return await self._get('trading_status', fetch)
+
+    async def orders(self) -> List[Dict]:
+        async def fetch():
+            orchestrator = await self.orchestrator()
+            if not orchestrator or not orchestrator.zerodha_client:
+                return []
+            return await orchestrator.zerodha_client.get_orders() or []
+        return await self._get('orders', fetch)
+
+    async def positions(self) -> Dict[str, List[Dict]]:
+        async def fetch():
+            orchestrator = await self.orchestrator()
+            if not orchestrator or not orchestrator.zerodha_client:
+                return {'net': [], 'day': []}
+            return await orchestrator.zerodha_client.get_positions() or {'net': [], 'day': []}
+        return await self._get('positions', fetch)
+
+    async def margins(self) -> Dict[str, Any]:
+        async def fetch():
+            orchestrator = await self.orchestrator()
+            if not orchestrator or not orchestrator.zerodha_client:
+                return {}
+            return await orchestrator.zerodha_client.get_margins() or {}
+        return await self._get('margins', fetch)
+
+
+@dataclass
+class _Section:
+    name: str
+    builder: Callable[[DashboardSources], Awaitable[Dict[str, Any]]]
+    min_interval: float
+    payload: Optional[Dict[str, Any]] = None
+    stable: Any = None
+    etag: Optional[str] = None
+    version: int = 0
+    built_at: float = 0.0
+    build_ms: float = 0.0
+    builds: int = 0
+    errors: int = 0
+    last_error: Optional[str] = None
+
+
+@dataclass
+class _Stats:
+    refreshes: int = 0
+    event_refreshes: int = 0
+    http_hits: int = 0
+    not_modified: int = 0
+    diffs_pushed: int = 0
+    events: Dict[str, int] = field(default_factory=dict)
+
+
+class DashboardReadModel:
+    """Versioned dashboard snapshot refreshed on a schedule and on trading events"""
+
+    def __init__(self, refresh_interval: float = 5.0, event_debounce: float = 1.0,
+                 idle_timeout: float = 60.0):
+        self.refresh_interval = refresh_interval
+        self.event_debounce = event_debounce
+        self.idle_timeout = idle_timeout
+        self.version = 0
+        self._sections: Dict[str, _Section] = {}
+        self._listeners: List[Callable[[Dict[str, Any]], Awaitable[None]]] = []
+        self._memo = CycleMemo(max_cycle_seconds=max(refresh_interval, 1.0))
+        self._dirty: Set[str] = set()
+        self._last_read = 0.0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._refresh_task: Optional[asyncio.Future] = None
+        self._lock = threading.Lock()
+        self.stats = _Stats()
+
+    # ------------------------------------------------------------------ setup
+
+    def register_section(self, name: str,
+                         builder: Callable[[DashboardSources], Awaitable[Dict[str, Any]]],
+                         min_interval: Optional[float] = None):
+        """Register a snapshot section; ``min_interval`` throttles slow sections"""
+        self._sections[name] = _Section(name, builder, min_interval or 0.0)
+
+    def add_listener(self, listener: Callable[[Dict[str, Any]], Awaitable[None]]):
+        """Register an async callback receiving ``dashboard_diff`` messages"""
+        if listener not in self._listeners:
+            self._listeners.append(listener)
+
+    # ----------------------------------------------------------------- events
+
+    def touch(self):
+        """Mark the snapshot as being watched (keeps the scheduled refresh running)"""
+        self._last_read = time.monotonic()
+        self._ensure_running()
+
+    def notify(self, reason: str, sections: Optional[Iterable[str]] = None):
+        """
+        Report a trading event (fill, position change, P&L tick).
+        Safe to call from any thread; refreshes are debounced.
+        """
+        with self._lock:
+            self._dirty.update(sections if sections is not None else self._sections)
+            self.stats.events[reason] = self.stats.events.get(reason, 0) + 1
+        loop, wakeup = self._loop, self._wakeup
+        if loop is None or wakeup is None or loop.is_closed():
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            wakeup.set()
+        else:
+            loop.call_soon_threadsafe(wakeup.set)
+
+    # ---------------------------------------------------------------- refresh
+
+    def _ensure_running(self):
+        if self._task is not None and not self._task.done():
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._loop = loop
+        self._wakeup = asyncio.Event()
+        self._task = loop.create_task(self._run())
+
+    async def stop(self):
+        """Stop the scheduled refresher (it restarts on the next read)"""
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+
+    def _watched(self) -> bool:
+        return time.monotonic() - self._last_read < self.idle_timeout
+
+    async def _run(self):
+        logger.info("📊 Dashboard read model refresher started")
+        while self._watched():
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.refresh_interval)
+                # Event-driven refresh: let a burst of events settle first
+                await asyncio.sleep(self.event_debounce)
+                event_driven = True
+            except asyncio.TimeoutError:
+                event_driven = False
+            self._wakeup.clear()
+            with self._lock:
+                dirty, self._dirty = self._dirty, set()
+            await self.refresh(dirty if event_driven else None)
+            if event_driven:
+                self.stats.event_refreshes += 1
+        logger.info("📊 Dashboard read model refresher idle - stopped")
+
+    async def refresh(self, sections: Optional[Iterable[str]] = None, only_missing: bool = False):
+        """Rebuild due sections now; refreshes never overlap"""
+        while self._refresh_task is not None and not self._refresh_task.done():
+            await asyncio.shield(self._refresh_task)
+        self._refresh_task = asyncio.ensure_future(self._refresh(sections, only_missing))
+        await asyncio.shield(self._refresh_task)
+
+    async def _refresh(self, sections: Optional[Iterable[str]], only_missing: bool):
+        now = time.monotonic()
+        names = set(sections) if sections is not None else set(self._sections)
+        due = [
+            s for name, s in self._sections.items()
+            if name in names and (
+                s.payload is None or (not only_missing and now - s.built_at >= s.min_interval)
+            )
+        ]
+        if not due:
+            return
+        self._memo.begin_cycle()
+        sources = DashboardSources(self._memo)
+        results = await asyncio.gather(*(self._build(s, sources) for s in due))
+        self.stats.refreshes += 1
+
+        changes = {name: patch for name, patch in results if patch is not None}
+        if changes:
+            self.version += 1
+            for name in changes:
+                self._sections[name].version = self.version
+            await self._publish(changes)
+
+    async def _build(self, section: _Section, sources: DashboardSources):
+        start = time.perf_counter()
+        try:
+            payload = await section.builder(sources)
+        except Exception as e:
+            section.errors += 1
+            section.last_error = str(e)
+            section.built_at = time.monotonic()
+            logger.error(f"❌ Dashboard section {section.name} build failed: {e}")
+            if section.payload is not None:
+                return section.name, None
+            payload = {"success": False, "error": str(e), "timestamp": datetime.utcnow().isoformat()}
+        section.build_ms = (time.perf_counter() - start) * 1000
+        section.built_at = time.monotonic()
+        section.builds += 1
+
+        stable = _stable(payload)
+        patch = merge_patch_diff(section.stable, stable) if section.stable is not None else stable
+        section.payload = payload
+        if section.stable is not None and not patch:
+            return section.name, None
+        section.stable = stable
+        digest = hashlib.sha1(json.dumps(stable, sort_keys=True, default=str).encode()).hexdigest()
+        section.etag = f'W/"{digest[:20]}"'
+        return section.name, patch
+
+    async def _publish(self, changes: Dict[str, Any]):
+        if not self._listeners:
+            return
+        message = {
+            "type": "dashboard_diff",
+            "version": self.version,
+            "sections": {
+                name: {"etag": self._sections[name].etag, "patch": patch}
+                for name, patch in changes.items()
+            },
+            "timestamp": datetime.utcnow().isoformat()
+        }
+        for listener in list(self._listeners):
+            try:
+                await listener(message)
+                self.stats.diffs_pushed += 1
+            except Exception as e:
+                logger.error(f"❌ Dashboard diff listener failed: {e}")
+
+    # ------------------------------------------------------------------- read
+
+    async def get(self, name: str) -> _Section:
+        """Current section, built on first use; readers never trigger extra broker calls"""
+        self.touch()
+        section = self._sections[name]
+        if section.payload is None:
+            await self.refresh([name], only_missing=True)
+        return section
+
+    async def get_payload(self, name: str) -> Dict[str, Any]:
+        return (await self.get(name)).payload
+
+    async def respond(self, request, name: str):
+        """HTTP response for a section with ETag / If-None-Match support"""
+        from fastapi.responses import JSONResponse, Response
+
+        section = await self.get(name)
+        self.stats.http_hits += 1
+        headers = {
+            "ETag": section.etag or "",
+            "Cache-Control": "no-cache",
+            "X-Snapshot-Version": str(section.version)
+        }
+        if_none_match = request.headers.get('if-none-match') if request is not None else None
+        if if_none_match and section.etag and section.etag in [t.strip() for t in if_none_match.split(',')]:
+            self.stats.not_modified += 1
+            return Response(status_code=304, headers=headers)
+        return JSONResponse(content=json.loads(json.dumps(section.payload, default=str)), headers=headers)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Full snapshot (sent to websocket clients when they subscribe)"""
+        return {
+            "type": "dashboard_snapshot",
+            "version": self.version,
+            "sections": {
+                name: {"etag": s.etag, "data": s.payload}
+                for name, s in self._sections.items() if s.payload is not None
+            },
+            "timestamp": datetime.utcnow().isoformat()
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        return {
+            'version': self.version,
+            'running': self._task is not None and not self._task.done(),
+            'refreshes': self.stats.refreshes,
+            'event_refreshes': self.stats.event_refreshes,
+            'http_hits': self.stats.http_hits,
+            'not_modified': self.stats.not_modified,
+            'diffs_pushed': self.stats.diffs_pushed,
+            'events': dict(self.stats.events),
+            'sources': self._memo.get_stats(),
+            'sections': {
+                name: {
+                    'version': s.version,
+                    'age_seconds': round(now - s.built_at, 2) if s.built_at else None,
+                    'build_ms': round(s.build_ms, 2),
+                    'builds': s.builds,
+                    'errors': s.errors,
+                    'last_error': s.last_error
+                }
+                for name, s in self._sections.items()
+            }
+        }
+
+
+# Global instance shared by the dashboard, market data and analytics routers
+dashboard_read_model = DashboardReadModel()
@@ -0,0 +1,310 @@
+"""
+Execution Analytics
+===================
+Signal-to-fill timeline, latency and slippage analytics.
+
+- Each signal gets a compact timeline: one monotonic timestamp and one LTP snapshot per
+  stage (generated → deduped → risk_approved → order_sent → broker_ack → filled)
+- Broker order ids and recorded signal ids are aliased to the timeline, so fills reported
+  by postbacks or ``SignalRecorder.update_signal_status`` land on the right signal
+- On fill the timeline is closed and folded into per-strategy, per-symbol and
+  per-time-of-day (IST, 15 minute buckets) distributions of decision latency
+  (generated → order_sent), broker ack latency, signal-to-fill latency and slippage
+- Slippage is in basis points, signed so that positive is adverse: versus the signal
+  entry price and versus the LTP when the order was sent (arrival price)
+- Open timelines and completed ones are both bounded, so memory stays flat all session
+"""
+
+import logging
+import os
+import time
+from collections import OrderedDict, deque
+from datetime import datetime
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+import pytz
+
+from src.core.cycle_tracer import LatencyHistogram
+
+logger = logging.getLogger(__name__)
+
+STAGES = ('generated', 'deduped', 'risk_approved', 'order_sent', 'broker_ack', 'filled')
+_STAGE_INDEX = {stage: index for index, stage in enumerate(STAGES)}
+
+IST = pytz.timezone('Asia/Kolkata')
+
+
+def _live_ltp(symbol: str) -> Optional[float]:
+    """LTP from the TrueData shared cache, falling back to the orchestrator's market data cache"""
+    try:
+        from data.truedata_client import live_market_data
+        price = (live_market_data.get(symbol) or {}).get('ltp', 0)
+        if price and price > 0:
+            return float(price)
+    except Exception:
+        pass
+    try:
+        from src.core.orchestrator import get_orchestrator_instance
+        orchestrator = get_orchestrator_instance()
+        cache = getattr(orchestrator, 'market_data_cache', None) or {}
+        price = (cache.get(symbol) or {}).get('ltp', 0)
+        if price and price > 0:
+            return float(price)
+    except Exception:
+        pass
+    return None
+
+
+class ExecutionTimeline:
+    """Per-signal stage timestamps (monotonic) and LTP snapshots"""
+
+    __slots__ = ('key', 'strategy', 'symbol', 'action', 'entry_price', 'created_at',
+                 'stamps', 'ltps', 'order_id', 'fill_price', 'outcome')
+
+    def __init__(self, key: str, signal: Dict[str, Any]):
+        self.key = key
+        self.strategy = signal.get('strategy') or 'unknown'
+        self.symbol = signal.get('symbol') or ''
+        self.action = str(signal.get('action') or signal.get('side') or 'BUY').upper()
+        self.entry_price = float(signal.get('entry_price') or 0.0)
+        self.created_at = datetime.now(IST)
+        self.stamps: List[Optional[float]] = [None] * len(STAGES)
+        self.ltps: List[Optional[float]] = [None] * len(STAGES)
+        self.order_id: Optional[str] = None
+        self.fill_price: Optional[float] = None
+        self.outcome: Optional[str] = None
+
+    def elapsed_ms(self, start: str, end: str) -> Optional[float]:
+        t0 = self.stamps[_STAGE_INDEX[start]]
+        t1 = self.stamps[_STAGE_INDEX[end]]
+        if t0 is None or t1 is None:
+            return None
+        return (t1 - t0) * 1000
+
+    def slippage_bps(self, reference: Optional[float]) -> Optional[float]:
+        """Fill versus reference in bps; positive means the fill was worse for us"""
+        if not reference or reference <= 0 or not self.fill_price:
+            return None
+        diff = (self.fill_price - reference) / reference * 10000
+        return diff if self.action == 'BUY' else -diff
+
+    @property
+    def time_bucket(self) -> str:
+        minute = self.created_at.minute - self.created_at.minute % 15
+        return f"{self.created_at.hour:02d}:{minute:02d}"
+
+    def to_dict(self) -> Dict[str, Any]:
+        origin = self.stamps[0]
+        stages = {}
+        for stage, stamp, ltp in zip(STAGES, self.stamps, self.ltps):
+            if stamp is None:
+                continue
+            stages[stage] = {
+                't_ms': round((stamp - origin) * 1000, 3) if origin is not None else None,
+                'ltp': ltp
+            }
+        return {
+            'signal_id': self.key,
+            'strategy': self.strategy,
+            'symbol': self.symbol,
+            'action': self.action,
+            'entry_price': self.entry_price,
+            'created_at': self.created_at.isoformat(),
+            'order_id': self.order_id,
+            'fill_price': self.fill_price,
+            'outcome': self.outcome,
+            'stages': stages
+        }
+
+
+class _Distribution:
+    """Latency histograms plus a bounded window of slippage samples for one group"""
+
+    LATENCIES = (
+        ('decision_ms', 'generated', 'order_sent'),
+        ('broker_ack_ms', 'order_sent', 'broker_ack'),
+        ('order_to_fill_ms', 'order_sent', 'filled'),
+        ('signal_to_fill_ms', 'generated', 'filled'),
+    )
+
+    __slots__ = ('fills', 'latencies', 'slippage_entry', 'slippage_arrival')
+
+    def __init__(self, window: int):
+        self.fills = 0
+        self.latencies = {name: LatencyHistogram() for name, _, _ in self.LATENCIES}
+        self.slippage_entry: Deque[float] = deque(maxlen=window)
+        self.slippage_arrival: Deque[float] = deque(maxlen=window)
+
+    def add(self, timeline: ExecutionTimeline):
+        self.fills += 1
+        for name, start, end in self.LATENCIES:
+            elapsed = timeline.elapsed_ms(start, end)
+            if elapsed is not None:
+                self.latencies[name].record(elapsed)
+        entry = timeline.slippage_bps(timeline.entry_price)
+        if entry is not None:
+            self.slippage_entry.append(entry)
+        arrival = timeline.slippage_bps(timeline.ltps[_STAGE_INDEX['order_sent']])
+        if arrival is not None:
+            self.slippage_arrival.append(arrival)
+
+    @staticmethod
+    def _summary(samples: Deque[float]) -> Optional[Dict[str, float]]:
+        if not samples:
+            return None
+        ordered = sorted(samples)
+
+        def pct(q):
+            return round(ordered[min(int(len(ordered) * q / 100), len(ordered) - 1)], 2)
+        return {
+            'count': len(ordered),
+            'mean_bps': round(sum(ordered) / len(ordered), 2),
+            'p50_bps': pct(50),
+            'p95_bps': pct(95),
+            'worst_bps': round(ordered[-1], 2)
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'fills': self.fills,
+            'latency': {name: hist.to_dict() for name, hist in self.latencies.items() if hist.count},
+            'slippage_vs_entry': self._summary(self.slippage_entry),
+            'slippage_vs_arrival': self._summary(self.slippage_arrival)
+        }
+
+
+class ExecutionAnalytics:
+    """Tracks signal timelines through execution and aggregates latency/slippage distributions"""
+
+    GROUPS = ('strategy', 'symbol', 'time_of_day')
+
+    def __init__(self, max_open: int = 2000, max_completed: int = 2000,
+                 slippage_window: int = 500,
+                 ltp_lookup: Optional[Callable[[str], Optional[float]]] = None):
+        self.max_open = max_open
+        self.slippage_window = slippage_window
+        self.ltp_lookup = ltp_lookup or _live_ltp
+        self._open: 'OrderedDict[str, ExecutionTimeline]' = OrderedDict()
+        self._aliases: Dict[str, str] = {}
+        self.completed: Deque[ExecutionTimeline] = deque(maxlen=max_completed)
+        self.overall = _Distribution(slippage_window)
+        self.groups: Dict[str, Dict[str, _Distribution]] = {group: {} for group in self.GROUPS}
+        self.stage_counts = {stage: 0 for stage in STAGES}
+        self.dropped = 0
+
+    @staticmethod
+    def _signal_key(signal: Dict[str, Any]) -> Optional[str]:
+        return signal.get('signal_id') or signal.get('recorded_signal_id')
+
+    def _resolve(self, key: Optional[str]) -> Optional[ExecutionTimeline]:
+        if not key:
+            return None
+        key = self._aliases.get(key, key)
+        return self._open.get(key)
+
+    def stamp(self, signal: Dict[str, Any], stage: str, ltp: Optional[float] = None) -> Optional[ExecutionTimeline]:
+        """Record that ``signal`` reached ``stage`` now, with an LTP snapshot"""
+        try:
+            key = self._signal_key(signal)
+            if not key:
+                return None
+            timeline = self._resolve(key)
+            if timeline is None:
+                # Signals that skip the orchestrator (e.g. management exits) start mid-timeline
+                timeline = self._open[key] = ExecutionTimeline(key, signal)
+                self._evict()
+            recorded_id = signal.get('recorded_signal_id')
+            if recorded_id and recorded_id != timeline.key:
+                self._aliases[recorded_id] = timeline.key
+
+            index = _STAGE_INDEX[stage]
+            if timeline.stamps[index] is None:
+                timeline.stamps[index] = time.perf_counter()
+                timeline.ltps[index] = ltp if ltp is not None else self.ltp_lookup(timeline.symbol)
+                self.stage_counts[stage] += 1
+            return timeline
+        except Exception as e:
+            logger.debug(f"Execution analytics stamp failed: {e}")
+            return None
+
+    def link_order(self, signal: Dict[str, Any], order_id: Optional[str]):
+        """Broker acknowledged the order - stamp broker_ack and alias the order id"""
+        timeline = self.stamp(signal, 'broker_ack')
+        if timeline is not None and order_id:
+            timeline.order_id = str(order_id)
+            self._aliases[str(order_id)] = timeline.key
+
+    def record_fill(self, ref: str, fill_price: Optional[float]) -> Optional[ExecutionTimeline]:
+        """Close the timeline for a signal id, recorded signal id or broker order id"""
+        timeline = self._resolve(str(ref) if ref is not None else None)
+        if timeline is None or not fill_price or float(fill_price) <= 0:
+            return None
+        timeline.fill_price = float(fill_price)
+        index = _STAGE_INDEX['filled']
+        timeline.stamps[index] = time.perf_counter()
+        timeline.ltps[index] = self.ltp_lookup(timeline.symbol)
+        self.stage_counts['filled'] += 1
+        self._complete(timeline, 'FILLED')
+
+        slippage = timeline.slippage_bps(timeline.entry_price)
+        if slippage is not None and abs(slippage) >= 50:
+            logger.warning(f"💸 HIGH SLIPPAGE: {timeline.symbol} {timeline.action} filled ₹{timeline.fill_price:.2f} "
+                           f"vs signal ₹{timeline.entry_price:.2f} ({slippage:+.1f} bps, {timeline.strategy})")
+        return timeline
+
+    def discard(self, signal_or_ref, outcome: str = 'DROPPED'):
+        """Close a timeline that will never fill (filtered, rejected or failed)"""
+        ref = self._signal_key(signal_or_ref) if isinstance(signal_or_ref, dict) else signal_or_ref
+        timeline = self._resolve(ref)
+        if timeline is not None:
+            self._complete(timeline, outcome)
+
+    def _complete(self, timeline: ExecutionTimeline, outcome: str):
+        timeline.outcome = outcome
+        self._open.pop(timeline.key, None)
+        self.completed.append(timeline)
+        if outcome != 'FILLED':
+            return
+        self.overall.add(timeline)
+        for group, value in (('strategy', timeline.strategy), ('symbol', timeline.symbol),
+                             ('time_of_day', timeline.time_bucket)):
+            bucket = self.groups[group].get(value)
+            if bucket is None:
+                bucket = self.groups[group][value] = _Distribution(self.slippage_window)
+            bucket.add(timeline)
+
+    def _evict(self):
+        while len(self._open) > self.max_open:
+            key, _ = self._open.popitem(last=False)
+            self.dropped += 1
+            for alias in [a for a, k in self._aliases.items() if k == key]:
+                del self._aliases[alias]
+        # Aliases of completed timelines are only needed briefly (late postbacks are ignored)
+        if len(self._aliases) > self.max_open * 4:
+            live = set(self._open)
+            self._aliases = {a: k for a, k in self._aliases.items() if k in live}
+
+    def get_report(self, group_by: str = 'strategy') -> Dict[str, Any]:
+        if group_by not in self.groups:
+            raise ValueError(f"group_by must be one of {self.GROUPS}")
+        groups = self.groups[group_by]
+        return {
+            'group_by': group_by,
+            'stages': list(STAGES),
+            'stage_counts': dict(self.stage_counts),
+            'open_timelines': len(self._open),
+            'dropped_timelines': self.dropped,
+            'overall': self.overall.to_dict(),
+            'groups': {name: groups[name].to_dict() for name in sorted(groups)}
+        }
+
+    def get_timelines(self, limit: int = 50, outcome: Optional[str] = None) -> List[Dict[str, Any]]:
+        timelines = [t for t in self.completed if outcome is None or t.outcome == outcome]
+        return [t.to_dict() for t in timelines[-limit:]]
+
+
+# Global execution analytics shared by the orchestrator, trade engine and postback handlers
+execution_analytics = ExecutionAnalytics(
+    max_open=int(os.getenv('EXECUTION_ANALYTICS_MAX_OPEN', '2000')),
+    max_completed=int(os.getenv('EXECUTION_ANALYTICS_MAX_COMPLETED', '2000'))
+)
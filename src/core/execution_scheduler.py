@@ -0,0 +1,297 @@
+"""
+Execution Scheduler
+===================
+Deadline-aware priority scheduling of order executions with bounded concurrency.
+
+- One heap ordered by (priority class, deadline, arrival): exits, then stops, then hedges,
+  then entries; within a class the earliest signal deadline goes first
+- Orders run as concurrent tasks, capped per user and per broker session; an order whose
+  user or session is at its cap waits without blocking orders behind it
+- Orders whose signal deadline has passed are dropped, never executed late
+- Risk checks run inside each order's task, not serially at the head of the queue; a
+  rejected order is dropped instead of stalling the queue
+- A user's risk check and execution run under one per-user lock, so two of their orders
+  cannot both pass the check against the same headroom; different users run concurrently
+- Queue latency (enqueue to start) is tracked per class and exported as
+  ``trading_system_execution_queue_seconds``
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import math
+import time
+from dataclasses import dataclass, field
+from enum import IntEnum
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+try:
+    from src.utils.hot_metrics import execution_queue_seconds
+except ImportError:
+    execution_queue_seconds = None
+
+
+class PriorityClass(IntEnum):
+    """Lower values run first"""
+    EXIT = 0
+    STOP = 1
+    HEDGE = 2
+    ENTRY = 3
+
+
+@dataclass
+class ScheduledOrder:
+    """An order waiting in (or running from) the scheduler"""
+    order: Any
+    priority_class: PriorityClass
+    user_id: str
+    session: str
+    deadline: Optional[float] = None  # time.monotonic() after which the order is stale
+    enqueued_at: float = field(default_factory=time.monotonic)
+    cancelled: bool = False
+
+    @property
+    def order_id(self) -> str:
+        return getattr(self.order, 'order_id', '')
+
+    def expired(self, now: float) -> bool:
+        return self.deadline is not None and now >= self.deadline
+
+
+class ExecutionScheduler:
+    """Priority heap feeding a concurrency-bounded pool of order executions"""
+
+    def __init__(self, execute: Callable[[Any], Awaitable[Any]],
+                 can_execute: Optional[Callable[[Any], Awaitable[bool]]] = None,
+                 max_in_flight_per_user: int = 1, max_in_flight_per_session: int = 8,
+                 max_queue_size: int = 1000, sweep_interval: float = 1.0):
+        self.execute = execute
+        self.can_execute = can_execute
+        self.max_in_flight_per_user = max_in_flight_per_user
+        self.max_in_flight_per_session = max_in_flight_per_session
+        self.max_queue_size = max_queue_size
+        self.sweep_interval = sweep_interval
+
+        self._heap: List[tuple] = []
+        self._by_order_id: Dict[str, ScheduledOrder] = {}
+        self._sequence = itertools.count()
+        self._user_in_flight: Dict[str, int] = {}
+        self._session_in_flight: Dict[str, int] = {}
+        self._user_locks: Dict[str, asyncio.Lock] = {}
+        self._tasks: set = set()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._latency_metrics: Dict[PriorityClass, Any] = {}
+        self.stats = {cls.name.lower(): {'queued': 0, 'started': 0, 'expired': 0, 'rejected': 0,
+                                         'dropped': 0, 'latency_sum': 0.0, 'latency_max': 0.0}
+                      for cls in PriorityClass}
+
+    # ------------------------------------------------------------------ queueing
+
+    def submit(self, order: Any, priority_class: PriorityClass = PriorityClass.ENTRY,
+               deadline: Optional[float] = None, user_id: Optional[str] = None,
+               session: str = 'default') -> bool:
+        """Queue an order; False when the queue is full of equal or higher priority work"""
+        item = ScheduledOrder(order=order, priority_class=PriorityClass(priority_class),
+                              user_id=user_id or getattr(order, 'user_id', '') or 'default',
+                              session=session, deadline=deadline)
+        if len(self._heap) >= self.max_queue_size and not self._make_room(item):
+            self.stats[item.priority_class.name.lower()]['dropped'] += 1
+            logger.warning(f"Execution queue full - dropped {item.priority_class.name} order {item.order_id}")
+            return False
+        heapq.heappush(self._heap, self._key(item))
+        if item.order_id:
+            self._by_order_id[item.order_id] = item
+        self.stats[item.priority_class.name.lower()]['queued'] += 1
+        self._wake()
+        return True
+
+    def _key(self, item: ScheduledOrder) -> tuple:
+        deadline = item.deadline if item.deadline is not None else math.inf
+        return (int(item.priority_class), deadline, next(self._sequence), item)
+
+    def _make_room(self, item: ScheduledOrder) -> bool:
+        """Purge stale orders, then evict the least urgent one if ``item`` outranks it"""
+        self._purge(time.monotonic())
+        if len(self._heap) < self.max_queue_size:
+            return True
+        worst = max(self._heap, key=lambda entry: entry[:3])
+        if worst[0] <= int(item.priority_class):
+            return False
+        self._heap.remove(worst)
+        heapq.heapify(self._heap)
+        self._discard(worst[-1], 'dropped')
+        return True
+
+    def cancel(self, order_id: str) -> bool:
+        item = self._by_order_id.pop(order_id, None)
+        if item is None:
+            return False
+        item.cancelled = True
+        return True
+
+    def get(self, order_id: str) -> Optional[ScheduledOrder]:
+        return self._by_order_id.get(order_id)
+
+    def clear(self):
+        self._heap.clear()
+        self._by_order_id.clear()
+
+    # ------------------------------------------------------------------ dispatch
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            if self._heap:
+                # Orders submitted before start should not wait for the first sweep
+                self._wakeup.set()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def _wake(self):
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _run(self):
+        while True:
+            try:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.sweep_interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+                self.dispatch()
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Error dispatching execution queue: {e}")
+
+    def dispatch(self) -> int:
+        """Start every queued order that fits the concurrency caps; returns how many started"""
+        now = time.monotonic()
+        started = 0
+        waiting = []
+        while self._heap:
+            entry = heapq.heappop(self._heap)
+            item = entry[-1]
+            if item.cancelled:
+                continue
+            if item.expired(now):
+                self._discard(item, 'expired')
+                continue
+            if not self._has_capacity(item):
+                # Capped user or session: keep it queued, keep looking for other work
+                waiting.append(entry)
+                continue
+            self._start(item, now)
+            started += 1
+        for entry in waiting:
+            heapq.heappush(self._heap, entry)
+        return started
+
+    def _purge(self, now: float):
+        live = []
+        for entry in self._heap:
+            item = entry[-1]
+            if item.cancelled:
+                continue
+            if item.expired(now):
+                self._discard(item, 'expired')
+                continue
+            live.append(entry)
+        if len(live) != len(self._heap):
+            self._heap = live
+            heapq.heapify(self._heap)
+
+    def _discard(self, item: ScheduledOrder, reason: str):
+        self._by_order_id.pop(item.order_id, None)
+        self.stats[item.priority_class.name.lower()][reason] += 1
+        logger.info(f"Execution queue {reason} {item.priority_class.name} order {item.order_id}")
+
+    def _has_capacity(self, item: ScheduledOrder) -> bool:
+        return (self._user_in_flight.get(item.user_id, 0) < self.max_in_flight_per_user
+                and self._session_in_flight.get(item.session, 0) < self.max_in_flight_per_session)
+
+    def _start(self, item: ScheduledOrder, now: float):
+        self._by_order_id.pop(item.order_id, None)
+        self._user_in_flight[item.user_id] = self._user_in_flight.get(item.user_id, 0) + 1
+        self._session_in_flight[item.session] = self._session_in_flight.get(item.session, 0) + 1
+        self._observe(item, now - item.enqueued_at)
+        task = asyncio.create_task(self._run_order(item))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def _user_lock(self, user_id: str) -> asyncio.Lock:
+        lock = self._user_locks.get(user_id)
+        if lock is None:
+            lock = self._user_locks[user_id] = asyncio.Lock()
+        return lock
+
+    async def _run_order(self, item: ScheduledOrder):
+        try:
+            # Check and act atomically per user: the check must see the exposure of the
+            # user's previous order, not race it
+            async with self._user_lock(item.user_id):
+                if self.can_execute is not None and not await self.can_execute(item.order):
+                    self.stats[item.priority_class.name.lower()]['rejected'] += 1
+                    return
+                await self.execute(item.order)
+        except Exception as e:
+            logger.error(f"Error executing order {item.order_id}: {e}")
+        finally:
+            self._user_in_flight[item.user_id] -= 1
+            self._session_in_flight[item.session] -= 1
+            # A slot opened up: dispatch whatever was waiting for it
+            self._wake()
+
+    def _observe(self, item: ScheduledOrder, latency: float):
+        stats = self.stats[item.priority_class.name.lower()]
+        stats['started'] += 1
+        stats['latency_sum'] += latency
+        stats['latency_max'] = max(stats['latency_max'], latency)
+        if execution_queue_seconds is not None:
+            child = self._latency_metrics.get(item.priority_class)
+            if child is None:
+                child = self._latency_metrics[item.priority_class] = execution_queue_seconds.labels(
+                    item.priority_class.name.lower())
+            child.observe(latency)
+
+    # ------------------------------------------------------------------ status
+
+    async def drain(self):
+        """Wait for in-flight orders (tests and shutdown)"""
+        while self._tasks:
+            await asyncio.gather(*list(self._tasks), return_exceptions=True)
+
+    def depth(self) -> Dict[str, int]:
+        counts = {cls.name.lower(): 0 for cls in PriorityClass}
+        for entry in self._heap:
+            if not entry[-1].cancelled:
+                counts[entry[-1].priority_class.name.lower()] += 1
+        return counts
+
+    def get_stats(self) -> Dict[str, Any]:
+        latency = {}
+        for name, stats in self.stats.items():
+            latency[name] = {
+                **{k: v for k, v in stats.items() if not k.startswith('latency')},
+                'avg_latency_ms': round(stats['latency_sum'] / stats['started'] * 1000, 3) if stats['started'] else 0.0,
+                'max_latency_ms': round(stats['latency_max'] * 1000, 3)
+            }
+        return {
+            'depth': self.depth(),
+            'in_flight': sum(self._user_in_flight.values()),
+            'in_flight_by_session': {k: v for k, v in self._session_in_flight.items() if v},
+            'classes': latency
+        }
@@ -0,0 +1,233 @@
+"""
+Market Depth Microstructure Engine
+==================================
+Incremental order-book analytics on top of Kite full-mode (5-level) depth ticks.
+
+Per instrument it keeps, updated in O(1) on every depth tick:
+- Order-book imbalance (level 1 and 5-level), EWMA smoothed
+- Microprice (size-weighted mid)
+- Order flow imbalance (Cont-Kukanov-Stoikov OFI) from best-quote changes
+- Queue depletion rates at the best bid / best ask
+- Spread statistics (EWMA mean and variance, in basis points)
+- Trade-sign estimates (Lee-Ready: quote rule, tick rule at the mid)
+
+Strategies read everything through ``market_depth_engine.get_metrics(symbol)``.
+"""
+
+import logging
+import math
+import threading
+import time
+from typing import Dict, List, Optional, Any
+
+logger = logging.getLogger(__name__)
+
+DEPTH_LEVELS = 5
+
+
+class _DepthState:
+    """Running microstructure state for one instrument"""
+
+    __slots__ = (
+        'bid', 'ask', 'bid_qty', 'ask_qty', 'mid', 'ltp', 'volume', 'last_trade_px',
+        'last_sign', 'ts_ns', 'updates', 'trades',
+        'imbalance_l1', 'imbalance_l5', 'imbalance_l1_ewma', 'imbalance_l5_ewma',
+        'microprice', 'ofi_ewma', 'ofi_cum',
+        'bid_depletion_rate', 'ask_depletion_rate',
+        'spread_bps', 'spread_mean_bps', 'spread_var_bps',
+        'buy_volume', 'sell_volume', 'buy_volume_ewma', 'sell_volume_ewma', 'sign_ewma',
+        'total_bid_qty', 'total_ask_qty',
+    )
+
+    def __init__(self):
+        for name in self.__slots__:
+            setattr(self, name, 0)
+
+
+class MarketDepthEngine:
+    """Incremental per-instrument order-book analytics"""
+
+    def __init__(self, halflife_ticks: float = 20.0):
+        # EWMA weight per tick from the configured half-life
+        self.alpha = 1.0 - 0.5 ** (1.0 / max(halflife_ticks, 1.0))
+        self._states: Dict[str, _DepthState] = {}
+        self._lock = threading.Lock()
+
+    def on_depth(self, symbol: str, ts_ns: int, ltp: float, volume: int,
+                 bid_px, bid_qty, ask_px, ask_qty):
+        """
+        Update state from one depth tick.
+
+        ``bid_px``/``bid_qty``/``ask_px``/``ask_qty`` are indexable sequences of
+        up to DEPTH_LEVELS levels (lists or NumPy rows), best level first.
+        """
+        best_bid = float(bid_px[0])
+        best_ask = float(ask_px[0])
+        if best_bid <= 0 or best_ask <= 0 or best_ask < best_bid:
+            return
+
+        bq = float(bid_qty[0])
+        aq = float(ask_qty[0])
+        total_bid = float(sum(bid_qty[:DEPTH_LEVELS]))
+        total_ask = float(sum(ask_qty[:DEPTH_LEVELS]))
+        mid = (best_bid + best_ask) / 2
+        a = self.alpha
+
+        with self._lock:
+            s = self._states.get(symbol)
+            if s is None:
+                s = self._states[symbol] = _DepthState()
+            first = s.updates == 0
+            dt = (ts_ns - s.ts_ns) / 1e9 if not first and ts_ns > s.ts_ns else 0.0
+
+            # 1. Order-book imbalance and microprice
+            s.imbalance_l1 = (bq - aq) / (bq + aq) if (bq + aq) > 0 else 0.0
+            s.imbalance_l5 = (total_bid - total_ask) / (total_bid + total_ask) if (total_bid + total_ask) > 0 else 0.0
+            s.microprice = (best_bid * aq + best_ask * bq) / (bq + aq) if (bq + aq) > 0 else mid
+
+            # 2. Spread statistics (EWMA mean / variance in bps)
+            spread_bps = (best_ask - best_bid) / mid * 10000
+            if first:
+                s.imbalance_l1_ewma = s.imbalance_l1
+                s.imbalance_l5_ewma = s.imbalance_l5
+                s.spread_mean_bps = spread_bps
+                s.spread_var_bps = 0.0
+            else:
+                s.imbalance_l1_ewma += a * (s.imbalance_l1 - s.imbalance_l1_ewma)
+                s.imbalance_l5_ewma += a * (s.imbalance_l5 - s.imbalance_l5_ewma)
+                diff = spread_bps - s.spread_mean_bps
+                s.spread_mean_bps += a * diff
+                s.spread_var_bps = (1 - a) * (s.spread_var_bps + a * diff * diff)
+            s.spread_bps = spread_bps
+
+            if not first:
+                # 3. OFI from best-quote changes
+                e_bid = (bq if best_bid >= s.bid else 0.0) - (s.bid_qty if best_bid <= s.bid else 0.0)
+                e_ask = (aq if best_ask <= s.ask else 0.0) - (s.ask_qty if best_ask >= s.ask else 0.0)
+                ofi = e_bid - e_ask
+                s.ofi_cum += ofi
+                s.ofi_ewma += a * (ofi - s.ofi_ewma)
+
+                # 4. Queue depletion at the best quotes (qty consumed per second)
+                if dt > 0:
+                    bid_depleted = self._depleted(s.bid, s.bid_qty, best_bid, bq, is_bid=True)
+                    ask_depleted = self._depleted(s.ask, s.ask_qty, best_ask, aq, is_bid=False)
+                    s.bid_depletion_rate += a * (bid_depleted / dt - s.bid_depletion_rate)
+                    s.ask_depletion_rate += a * (ask_depleted / dt - s.ask_depletion_rate)
+
+                # 5. Lee-Ready trade sign on the traded volume since last tick
+                traded = volume - s.volume
+                if traded > 0 and ltp > 0:
+                    if ltp > s.mid:
+                        sign = 1
+                    elif ltp < s.mid:
+                        sign = -1
+                    elif ltp > s.last_trade_px:
+                        sign = 1
+                    elif ltp < s.last_trade_px:
+                        sign = -1
+                    else:
+                        sign = s.last_sign
+                    if sign > 0:
+                        s.buy_volume += traded
+                    elif sign < 0:
+                        s.sell_volume += traded
+                    s.buy_volume_ewma += a * ((traded if sign > 0 else 0) - s.buy_volume_ewma)
+                    s.sell_volume_ewma += a * ((traded if sign < 0 else 0) - s.sell_volume_ewma)
+                    s.sign_ewma += a * (sign - s.sign_ewma)
+                    s.last_sign = sign
+                    s.last_trade_px = ltp
+                    s.trades += 1
+            elif ltp > 0:
+                s.last_trade_px = ltp
+
+            s.bid, s.ask, s.bid_qty, s.ask_qty = best_bid, best_ask, bq, aq
+            s.total_bid_qty, s.total_ask_qty = total_bid, total_ask
+            s.mid = mid
+            s.ltp = ltp
+            s.volume = volume
+            s.ts_ns = ts_ns
+            s.updates += 1
+
+    @staticmethod
+    def _depleted(prev_px: float, prev_qty: float, px: float, qty: float, is_bid: bool) -> float:
+        """Quantity removed from the best queue between two snapshots"""
+        if px == prev_px:
+            return max(prev_qty - qty, 0.0)
+        moved_away = px < prev_px if is_bid else px > prev_px
+        return prev_qty if moved_away else 0.0
+
+    def on_depth_book(self, symbol: str, depth: Dict[str, List[Dict]], ltp: float,
+                      volume: int, ts_ns: Optional[int] = None):
+        """Update state from a Kite-format depth dict (``{'buy': [...], 'sell': [...]}``)"""
+        buy = depth.get('buy') or []
+        sell = depth.get('sell') or []
+        if not buy or not sell:
+            return
+        self.on_depth(
+            symbol,
+            ts_ns if ts_ns is not None else time.monotonic_ns(),
+            ltp, volume,
+            [level.get('price', 0) for level in buy[:DEPTH_LEVELS]],
+            [level.get('quantity', 0) for level in buy[:DEPTH_LEVELS]],
+            [level.get('price', 0) for level in sell[:DEPTH_LEVELS]],
+            [level.get('quantity', 0) for level in sell[:DEPTH_LEVELS]],
+        )
+
+    def get_metrics(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """Current microstructure metrics for a symbol, or None if no depth seen"""
+        s = self._states.get(symbol)
+        if s is None or s.updates == 0:
+            return None
+        signed = s.buy_volume + s.sell_volume
+        return {
+            'best_bid': s.bid,
+            'best_ask': s.ask,
+            'mid': s.mid,
+            'microprice': s.microprice,
+            'microprice_offset_bps': (s.microprice - s.mid) / s.mid * 10000 if s.mid > 0 else 0.0,
+            'imbalance_l1': s.imbalance_l1,
+            'imbalance_l5': s.imbalance_l5,
+            'imbalance_l1_ewma': s.imbalance_l1_ewma,
+            'imbalance_l5_ewma': s.imbalance_l5_ewma,
+            'ofi_ewma': s.ofi_ewma,
+            'ofi_cumulative': s.ofi_cum,
+            'bid_depletion_rate': s.bid_depletion_rate,
+            'ask_depletion_rate': s.ask_depletion_rate,
+            'spread_bps': s.spread_bps,
+            'spread_mean_bps': s.spread_mean_bps,
+            'spread_std_bps': math.sqrt(max(s.spread_var_bps, 0.0)),
+            'total_bid_qty': s.total_bid_qty,
+            'total_ask_qty': s.total_ask_qty,
+            'buy_volume': s.buy_volume,
+            'sell_volume': s.sell_volume,
+            'buy_volume_ewma': s.buy_volume_ewma,
+            'sell_volume_ewma': s.sell_volume_ewma,
+            'trade_sign_ewma': s.sign_ewma,
+            'signed_volume_ratio': (s.buy_volume - s.sell_volume) / signed if signed > 0 else 0.0,
+            'trade_count': s.trades,
+            'updates': s.updates,
+            'age_seconds': (time.monotonic_ns() - s.ts_ns) / 1e9,
+        }
+
+    def has_depth(self, symbol: str) -> bool:
+        s = self._states.get(symbol)
+        return s is not None and s.updates > 0
+
+    def reset(self, symbol: Optional[str] = None):
+        """Drop state for one symbol, or all symbols (e.g. at session start)"""
+        with self._lock:
+            if symbol is None:
+                self._states.clear()
+            else:
+                self._states.pop(symbol, None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'instruments': len(self._states),
+            'alpha': self.alpha,
+        }
+
+
+# Global instance
+market_depth_engine = MarketDepthEngine()
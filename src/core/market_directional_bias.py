@@ -99,6 +99,9 @@ class MarketDirectionalBias:
             'METALS': ['TATASTEEL', 'JSWSTEEL', 'HINDALCO', 'VEDL', 'COALINDIA'],
             'ENERGY': ['RELIANCE', 'ONGC', 'BPCL', 'IOC', 'GAIL']
         }
+        # Sector averages come from the internals analyzer's streaming breadth engine
+        if self.internals_analyzer:
+            self.internals_analyzer.breadth_engine.add_sector_map('bias', self.major_sectors)
         
         # HISTORICAL DATA FOR TREND ANALYSIS
         self.nifty_history = []  # Last 20 data points
@@ -940,27 +943,32 @@ class MarketDirectionalBias:
         try:
             sector_scores = {}
             
-            for sector_name, symbols in self.major_sectors.items():
-                sector_changes = []
+            if self.use_internals and self.internals_analyzer:
+                # Running per-sector aggregates (already ingested this cycle by analyze_market_internals)
+                sector_averages = {
+                    name: perf['change']
+                    for name, perf in self.internals_analyzer.breadth_engine.sector_averages('bias').items()
+                }
+            else:
+                sector_averages = {}
+                for sector_name, symbols in self.major_sectors.items():
+                    sector_changes = [
+                        float(market_data[symbol].get('change_percent', 0))
+                        for symbol in symbols if market_data.get(symbol)
+                    ]
+                    if sector_changes:
+                        sector_averages[sector_name] = np.mean(sector_changes)
+            
+            for sector_name, sector_avg in sector_averages.items():
+                sector_scores[sector_name] = sector_avg
                 
-                for symbol in symbols:
-                    symbol_data = market_data.get(symbol, {})
-                    if symbol_data:
-                        change_percent = float(symbol_data.get('change_percent', 0))
-                        sector_changes.append(change_percent)
+                # Update sector history
+                if sector_name not in self.sector_history:
+                    self.sector_history[sector_name] = []
                 
-                if sector_changes:
-                    # Calculate sector average change
-                    sector_avg = np.mean(sector_changes)
-                    sector_scores[sector_name] = sector_avg
-                    
-                    # Update sector history
-                    if sector_name not in self.sector_history:
-                        self.sector_history[sector_name] = []
-                    
-                    self.sector_history[sector_name].append(sector_avg)
-                    if len(self.sector_history[sector_name]) > self.max_history:
-                        self.sector_history[sector_name] = self.sector_history[sector_name][-self.max_history:]
+                self.sector_history[sector_name].append(sector_avg)
+                if len(self.sector_history[sector_name]) > self.max_history:
+                    self.sector_history[sector_name] = self.sector_history[sector_name][-self.max_history:]
             
             if not sector_scores:
                 return 0.0
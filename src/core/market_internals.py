@@ -12,6 +12,8 @@ from dataclasses import dataclass, field
 import numpy as np
 from collections import deque
 
+from src.core.breadth_engine import BreadthEngine
+
 logger = logging.getLogger(__name__)
 
 @dataclass
@@ -66,7 +68,10 @@ class MarketInternalsAnalyzer:
         # Historical data storage
         self.price_history = {}  # symbol -> deque of prices
         self.volume_history = {}  # symbol -> deque of volumes
-        self.breadth_history = deque(maxlen=100)  # Historical breadth data
+        
+        # Streaming breadth: running counters updated only for symbols that ticked
+        self.breadth_engine = BreadthEngine(history=100)
+        self.breadth_history = self.breadth_engine.ad_history  # Historical A-D differences
         
         # Market regime detection
         self.regime_history = deque(maxlen=20)
@@ -102,6 +107,8 @@ class MarketInternalsAnalyzer:
                       'PHOENIXLTD', 'SOBHA', 'SUNTECK']
         }
         
+        self.breadth_engine.add_sector_map('internals', self.sector_constituents)
+        
         # Choppiness detection
         self.choppiness_window = 14
         self.choppiness_threshold = 61.8  # Above this = choppy market
@@ -121,6 +128,9 @@ class MarketInternalsAnalyzer:
         try:
             internals = MarketInternals()
             
+            # 0. Fold the symbols that changed since the last call into the running counters
+            self.breadth_engine.ingest(market_data)
+            
             # 1. Calculate Market Breadth
             breadth_metrics = self._calculate_breadth(market_data)
             internals.advance_decline_ratio = breadth_metrics['ad_ratio']
@@ -183,64 +193,11 @@ class MarketInternalsAnalyzer:
             return MarketInternals()
     
     def _calculate_breadth(self, market_data: Dict) -> Dict:
-        """Calculate market breadth indicators"""
+        """Market breadth from the streaming engine (call after ``breadth_engine.ingest``)"""
         try:
-            advancing = 0
-            declining = 0
-            unchanged = 0
-            above_vwap = 0
-            total_stocks = 0
-            new_highs = 0
-            new_lows = 0
-            
-            for symbol, data in market_data.items():
-                # Skip indices
-                if symbol.endswith('-I'):
-                    continue
-                    
-                total_stocks += 1
-                
-                # Price change
-                change_pct = data.get('change_percent', 0)
-                if change_pct > 0.1:
-                    advancing += 1
-                elif change_pct < -0.1:
-                    declining += 1
-                else:
-                    unchanged += 1
-                
-                # VWAP comparison
-                ltp = data.get('ltp', 0)
-                vwap = data.get('vwap', ltp)  # Use LTP if VWAP not available
-                if ltp > vwap:
-                    above_vwap += 1
-                
-                # 52-week highs/lows (simplified - would need historical data)
-                high_52w = data.get('year_high', 0)
-                low_52w = data.get('year_low', 0)
-                if high_52w > 0 and ltp >= high_52w * 0.98:  # Within 2% of 52w high
-                    new_highs += 1
-                elif low_52w > 0 and ltp <= low_52w * 1.02:  # Within 2% of 52w low
-                    new_lows += 1
-            
-            # Calculate ratios
-            ad_ratio = advancing / declining if declining > 0 else advancing
-            above_vwap_pct = (above_vwap / total_stocks * 100) if total_stocks > 0 else 50
-            
-            # Update A-D line
-            ad_diff = advancing - declining
-            self.breadth_history.append(ad_diff)
-            ad_line = sum(self.breadth_history)
-            
-            return {
-                'ad_ratio': ad_ratio,
-                'ad_line': ad_line,
-                'above_vwap': above_vwap_pct,
-                'highs_lows': new_highs - new_lows,
-                'advancing': advancing,
-                'declining': declining,
-                'unchanged': unchanged
-            }
+            # Append this cycle's A-D difference to the A-D line and rotation series
+            self.breadth_engine.snapshot(rotation_group='internals')
+            return self.breadth_engine.breadth()
             
         except Exception as e:
             logger.error(f"Error calculating breadth: {e}")
@@ -255,43 +212,9 @@ class MarketInternalsAnalyzer:
             }
     
     def _analyze_volume_profile(self, market_data: Dict) -> Dict:
-        """Analyze volume distribution and flow"""
+        """Up/down and large-trade volume from the streaming engine's running counters"""
         try:
-            up_volume = 0
-            down_volume = 0
-            total_volume = 0
-            large_trades_volume = 0
-            
-            for symbol, data in market_data.items():
-                # Skip indices
-                if symbol.endswith('-I'):
-                    continue
-                
-                volume = data.get('volume', 0)
-                change_pct = data.get('change_percent', 0)
-                
-                total_volume += volume
-                
-                if change_pct > 0:
-                    up_volume += volume
-                else:
-                    down_volume += volume
-                
-                # Detect institutional volume (simplified)
-                avg_trade_size = data.get('avg_trade_size', 0)
-                if avg_trade_size > 10000:  # Large average trade size
-                    large_trades_volume += volume
-            
-            up_volume_ratio = (up_volume / total_volume * 100) if total_volume > 0 else 50
-            volume_breadth = up_volume - down_volume
-            institutional_ratio = (large_trades_volume / total_volume * 100) if total_volume > 0 else 0
-            
-            return {
-                'up_volume_ratio': up_volume_ratio,
-                'volume_breadth': volume_breadth,
-                'institutional_flow': institutional_ratio,
-                'total_volume': total_volume
-            }
+            return self.breadth_engine.volume_profile()
             
         except Exception as e:
             logger.error(f"Error analyzing volume profile: {e}")
@@ -311,27 +234,12 @@ class MarketInternalsAnalyzer:
             vix_open = vix_data.get('open', vix_level)
             vix_change = ((vix_level - vix_open) / vix_open * 100) if vix_open > 0 else 0
             
-            # Calculate intraday volatility
-            price_ranges = []
-            for symbol, data in market_data.items():
-                if symbol.endswith('-I'):
-                    continue
-                    
-                high = data.get('high', 0)
-                low = data.get('low', 0)
-                close = data.get('ltp', 0)
-                
-                if high > 0 and low > 0 and close > 0:
-                    # True Range as % of price
-                    true_range_pct = ((high - low) / close) * 100
-                    price_ranges.append(true_range_pct)
-            
-            # Average intraday volatility
-            intraday_vol = np.mean(price_ranges) if price_ranges else 1.0
+            # Average intraday range (% of price) - maintained incrementally
+            intraday_vol = self.breadth_engine.intraday_volatility()
             
             # Calculate realized volatility (simplified)
             if len(self.breadth_history) > 5:
-                recent_changes = list(self.breadth_history)[-5:]
+                recent_changes = self.breadth_engine.recent_ad_diffs(5)
                 realized_vol = np.std(recent_changes) if recent_changes else 1.0
             else:
                 realized_vol = intraday_vol
@@ -557,55 +465,14 @@ class MarketInternalsAnalyzer:
             return 50.0
     
     def _analyze_sector_rotation(self, market_data: Dict) -> Dict:
-        """Analyze sector rotation patterns"""
+        """Analyze sector rotation patterns from running per-sector aggregates"""
         try:
-            sector_performances = {}
-            
-            for sector_name, constituents in self.sector_constituents.items():
-                sector_changes = []
-                sector_volumes = []
-                
-                for symbol in constituents:
-                    if symbol in market_data:
-                        change = market_data[symbol].get('change_percent', 0)
-                        volume = market_data[symbol].get('volume', 0)
-                        sector_changes.append(change)
-                        sector_volumes.append(volume)
-                
-                if sector_changes:
-                    avg_change = np.mean(sector_changes)
-                    total_volume = sum(sector_volumes)
-                    sector_performances[sector_name] = {
-                        'change': avg_change,
-                        'volume': total_volume
-                    }
-            
-            # Sort sectors by performance
-            sorted_sectors = sorted(sector_performances.items(), 
-                                  key=lambda x: x[1]['change'], 
-                                  reverse=True)
-            
-            # Identify leaders and laggards
-            leaders = [s[0] for s in sorted_sectors[:3]]
-            laggards = [s[0] for s in sorted_sectors[-3:]]
-            
-            # Calculate rotation score (spread between best and worst)
-            if sorted_sectors:
-                best_performance = sorted_sectors[0][1]['change']
-                worst_performance = sorted_sectors[-1][1]['change']
-                rotation_score = abs(best_performance - worst_performance)
-            else:
-                rotation_score = 0
+            rotation = self.breadth_engine.sector_rotation('internals')
             
             # Store for history
-            self.sector_performance = sector_performances
+            self.sector_performance = rotation['performances']
             
-            return {
-                'leaders': leaders,
-                'laggards': laggards,
-                'rotation_score': rotation_score,
-                'performances': sector_performances
-            }
+            return rotation
             
         except Exception as e:
             logger.error(f"Error analyzing sector rotation: {e}")
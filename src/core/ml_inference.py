@@ -0,0 +1,110 @@
+"""
+ML Inference
+============
+Batched confidence scoring for strategy signal candidates.
+
+- ``InferenceBatch`` collects every candidate feature row of a cycle and scores them with
+  one scaler transform and one ``predict_proba`` per model snapshot instead of one sklearn
+  call per signal; results come back keyed by the caller's signal reference
+- ``FeatureCache`` keeps the symbol-level part of a feature vector per bar, so the
+  indicator work behind it (RSI, HP filter, MACD, ...) runs once per symbol and bar no
+  matter how many signals or re-evaluations reuse it
+"""
+
+import logging
+from collections import defaultdict
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+
+from src.core.ml_training_service import MLTrainingService, ml_training_service
+
+logger = logging.getLogger(__name__)
+
+
+class FeatureCache:
+    """Per-symbol feature blocks valid for one bar"""
+
+    def __init__(self, bar_seconds: int = 60, max_symbols: int = 2000):
+        self.bar_seconds = bar_seconds
+        self.max_symbols = max_symbols
+        self._bar: Optional[int] = None
+        self._entries: Dict[str, Any] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def bar_index(self, timestamp: float) -> int:
+        return int(timestamp // self.bar_seconds)
+
+    def get(self, symbol: str, timestamp: float, builder: Callable[[], Any]) -> Any:
+        """Cached value for ``symbol`` in the bar containing ``timestamp``; built on a miss"""
+        bar = self.bar_index(timestamp)
+        if bar != self._bar:
+            # New bar: everything cached for the previous one is stale
+            self._entries.clear()
+            self._bar = bar
+        value = self._entries.get(symbol)
+        if value is not None:
+            self.hits += 1
+            return value
+        self.misses += 1
+        value = builder()
+        if len(self._entries) < self.max_symbols:
+            self._entries[symbol] = value
+        return value
+
+    def invalidate(self, symbol: Optional[str] = None):
+        if symbol is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(symbol, None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            'bar': self._bar,
+            'symbols': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+
+class InferenceBatch:
+    """Feature rows of one cycle, scored together per model"""
+
+    def __init__(self, service: Optional[MLTrainingService] = None):
+        self.service = service or ml_training_service
+        self._rows: Dict[str, List[Tuple[Hashable, np.ndarray]]] = defaultdict(list)
+
+    def add(self, model_key: str, ref: Hashable, features) -> bool:
+        """Queue one candidate; empty feature vectors are ignored"""
+        row = np.asarray(features, dtype=float).ravel()
+        if row.size == 0:
+            return False
+        self._rows[model_key].append((ref, row))
+        return True
+
+    def __len__(self) -> int:
+        return sum(len(rows) for rows in self._rows.values())
+
+    def score(self) -> Dict[Hashable, float]:
+        """Positive-class probability per ref; refs without a usable model are omitted"""
+        probabilities: Dict[Hashable, float] = {}
+        for model_key, rows in self._rows.items():
+            snapshot = self.service.snapshot(model_key)
+            if snapshot is None:
+                continue
+            width = snapshot.scaler.n_features_in_
+            usable = [(ref, row) for ref, row in rows if row.shape[0] == width]
+            if not usable:
+                continue
+            try:
+                scored = snapshot.predict_proba_batch(np.vstack([row for _, row in usable]))
+            except Exception as e:
+                logger.debug(f"Batched ML inference failed for {model_key}: {e}")
+                continue
+            for (ref, _), probability in zip(usable, scored):
+                probabilities[ref] = float(probability)
+        self._rows.clear()
+        return probabilities
@@ -0,0 +1,327 @@
+"""
+ML Training Service
+===================
+Shared off-loop training of the strategy confidence-boost models.
+
+- Feature/label history per model key lives in preallocated NumPy ring buffers
+  (``FeatureBuffer``): O(1) append, bounded memory, no ``list.pop(0)``
+- Scaling, the optional stratified train/test split and the RandomForest fit run in a
+  process pool (``spawn`` context, so the live feed threads are never forked); the
+  event loop only awaits the result
+- Every fit publishes an immutable, versioned ``ModelSnapshot``; strategies read
+  ``snapshot(key)``, a single reference that is swapped atomically, so predictions always
+  use a complete model and the trading loop never waits on training
+- At most one fit per key is in flight; a retrain is scheduled once ``retrain_every``
+  new samples have arrived
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def fit_model(X: np.ndarray, y: np.ndarray, model_params: Dict[str, Any],
+              holdout: bool, seed: int) -> Dict[str, Any]:
+    """Scale, split and fit one model (runs in a worker process)"""
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.metrics import balanced_accuracy_score
+    from sklearn.model_selection import train_test_split
+    from sklearn.preprocessing import StandardScaler
+
+    started = time.perf_counter()
+    if holdout and len(X) >= 100:
+        # Stratified so both classes reach the test set; plain split if a class is too small
+        try:
+            X_train, X_test, y_train, y_test = train_test_split(
+                X, y, test_size=0.2, random_state=seed, stratify=y)
+        except ValueError:
+            X_train, X_test, y_train, y_test = train_test_split(
+                X, y, test_size=0.2, random_state=seed)
+    else:
+        X_train, X_test, y_train, y_test = X, X, y, y
+
+    scaler = StandardScaler()
+    X_train_scaled = scaler.fit_transform(X_train)
+    X_test_scaled = scaler.transform(X_test)
+    model = RandomForestClassifier(**model_params)
+    model.fit(X_train_scaled, y_train)
+
+    balanced_accuracy = None
+    if len(np.unique(y_test)) >= 2:
+        balanced_accuracy = float(balanced_accuracy_score(y_test, model.predict(X_test_scaled)))
+    return {
+        'scaler': scaler,
+        'model': model,
+        'test_score': float(model.score(X_test_scaled, y_test)),
+        'balanced_accuracy': balanced_accuracy,
+        'positive_ratio': float(np.mean(y)),
+        'test_positive_ratio': float(np.mean(y_test)) if len(y_test) else 0.0,
+        'fit_seconds': time.perf_counter() - started
+    }
+
+
+class FeatureBuffer:
+    """Fixed-capacity ring buffer of feature rows and labels"""
+
+    def __init__(self, capacity: int, n_features: Optional[int] = None):
+        self.capacity = capacity
+        self.n_features = n_features
+        self.X: Optional[np.ndarray] = None
+        self.y = np.zeros(capacity, dtype=np.int8)
+        self.index = 0
+        self.size = 0
+        self.total = 0
+        if n_features:
+            self.X = np.zeros((capacity, n_features))
+
+    def append(self, features, label: int) -> bool:
+        row = np.asarray(features, dtype=float).ravel()
+        if self.X is None:
+            self.n_features = row.shape[0]
+            self.X = np.zeros((self.capacity, self.n_features))
+        if row.shape[0] != self.n_features or not np.all(np.isfinite(row)):
+            return False
+        self.X[self.index] = row
+        self.y[self.index] = label
+        self.index = (self.index + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+        self.total += 1
+        return True
+
+    def arrays(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Chronological copies of the buffered samples"""
+        if self.X is None or not self.size:
+            return np.zeros((0, self.n_features or 0)), np.zeros(0, dtype=np.int8)
+        if self.size < self.capacity:
+            return self.X[:self.size].copy(), self.y[:self.size].copy()
+        order = np.r_[self.index:self.capacity, 0:self.index]
+        return self.X[order], self.y[order]
+
+    def __len__(self) -> int:
+        return self.size
+
+
+@dataclass(frozen=True)
+class ModelSnapshot:
+    """Immutable trained model published by the service"""
+    key: str
+    version: int
+    model: Any
+    scaler: Any
+    samples: int
+    test_score: float
+    balanced_accuracy: Optional[float]
+    positive_ratio: float
+    fit_seconds: float
+    trained_at: str = field(default_factory=lambda: datetime.now().isoformat())
+
+    def predict_proba(self, features) -> float:
+        """Probability of the positive class for one feature row"""
+        return float(self.predict_proba_batch(np.asarray(features, dtype=float).reshape(1, -1))[0])
+
+    def predict_proba_batch(self, X: np.ndarray) -> np.ndarray:
+        """Positive-class probabilities for a matrix of rows in one vectorized call"""
+        proba = self.model.predict_proba(self.scaler.transform(X))
+        classes = list(self.model.classes_)
+        if 1 not in classes:
+            return np.zeros(len(X))
+        return proba[:, classes.index(1)]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'version': self.version,
+            'samples': self.samples,
+            'test_score': round(self.test_score, 4),
+            'balanced_accuracy': None if self.balanced_accuracy is None else round(self.balanced_accuracy, 4),
+            'positive_ratio': round(self.positive_ratio, 4),
+            'fit_seconds': round(self.fit_seconds, 3),
+            'trained_at': self.trained_at
+        }
+
+
+class _ModelState:
+    def __init__(self, key: str, buffer: FeatureBuffer, min_samples: int, retrain_every: int,
+                 model_params: Dict[str, Any], holdout: bool, seed: int):
+        self.key = key
+        self.buffer = buffer
+        self.min_samples = min_samples
+        self.retrain_every = retrain_every
+        self.model_params = model_params
+        self.holdout = holdout
+        self.seed = seed
+        self.snapshot: Optional[ModelSnapshot] = None
+        self.since_fit = 0
+        self.task: Optional[asyncio.Task] = None
+        self.fits = 0
+        self.failures = 0
+
+
+class MLTrainingService:
+    """Trains strategy models off the event loop and publishes versioned snapshots"""
+
+    def __init__(self, max_workers: int = 1, executor: str = 'process'):
+        self.max_workers = max_workers
+        self.executor_kind = executor
+        self._executor: Optional[Executor] = None
+        self._models: Dict[str, _ModelState] = {}
+
+    def register(self, key: str, capacity: int = 1000, min_samples: int = 50, retrain_every: int = 20,
+                 model_params: Optional[Dict[str, Any]] = None, holdout: bool = False,
+                 seed: int = 42, n_features: Optional[int] = None) -> FeatureBuffer:
+        """Declare a model; registering an existing key keeps its history and snapshot"""
+        state = self._models.get(key)
+        if state is None:
+            state = self._models[key] = _ModelState(
+                key, FeatureBuffer(capacity, n_features), min_samples, retrain_every,
+                dict(model_params or {'n_estimators': 100, 'random_state': seed}), holdout, seed)
+        return state.buffer
+
+    def _state(self, key: str) -> _ModelState:
+        state = self._models.get(key)
+        if state is None:
+            raise KeyError(f"ML model '{key}' is not registered")
+        return state
+
+    def add_sample(self, key: str, features, label: int) -> bool:
+        """Buffer one labelled sample; schedules a background retrain when one is due"""
+        state = self._state(key)
+        if not state.buffer.append(features, label):
+            return False
+        state.since_fit += 1
+        if state.since_fit >= state.retrain_every or state.snapshot is None:
+            self.request_training(key)
+        return True
+
+    def load_samples(self, key: str, features, labels) -> int:
+        """Bulk-load persisted history (oldest first)"""
+        state = self._state(key)
+        loaded = sum(1 for f, label in zip(features, labels) if state.buffer.append(f, int(label)))
+        state.since_fit += loaded
+        return loaded
+
+    def samples(self, key: str) -> Tuple[np.ndarray, np.ndarray]:
+        return self._state(key).buffer.arrays()
+
+    def sample_count(self, key: str) -> int:
+        state = self._models.get(key)
+        return len(state.buffer) if state else 0
+
+    def samples_seen(self, key: str) -> int:
+        """Lifetime samples accepted for a key (keeps counting once the buffer wraps)"""
+        state = self._models.get(key)
+        return state.buffer.total if state else 0
+
+    def snapshot(self, key: str) -> Optional[ModelSnapshot]:
+        state = self._models.get(key)
+        return state.snapshot if state else None
+
+    def request_training(self, key: str) -> Optional[asyncio.Task]:
+        """Start a background fit unless one is in flight or not enough data is buffered"""
+        state = self._state(key)
+        if state.task is not None and not state.task.done():
+            return state.task
+        if len(state.buffer) < state.min_samples:
+            return None
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return None
+        state.task = loop.create_task(self.train(key))
+        return state.task
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.executor_kind == 'process':
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers, mp_context=multiprocessing.get_context('spawn'))
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                    thread_name_prefix='MLTrain')
+        return self._executor
+
+    async def train(self, key: str) -> Optional[ModelSnapshot]:
+        """Fit on the buffered history in the pool and publish the new snapshot"""
+        state = self._state(key)
+        X, y = state.buffer.arrays()
+        if len(X) < state.min_samples:
+            return state.snapshot
+        if len(np.unique(y)) < 2:
+            logger.debug(f"ML training skipped for {key} - need both positive and negative samples")
+            return state.snapshot
+
+        state.since_fit = 0
+        loop = asyncio.get_running_loop()
+        try:
+            result = await loop.run_in_executor(
+                self._get_executor(), fit_model, X, y, state.model_params, state.holdout, state.seed)
+        except Exception as e:
+            state.failures += 1
+            logger.error(f"❌ ML training failed for {key}: {e}")
+            if self._executor is not None and 'BrokenProcessPool' in type(e).__name__:
+                self._executor = None
+            return state.snapshot
+
+        state.fits += 1
+        snapshot = ModelSnapshot(
+            key=key,
+            version=(state.snapshot.version + 1) if state.snapshot else 1,
+            model=result['model'],
+            scaler=result['scaler'],
+            samples=len(X),
+            test_score=result['test_score'],
+            balanced_accuracy=result['balanced_accuracy'],
+            positive_ratio=result['positive_ratio'],
+            fit_seconds=result['fit_seconds']
+        )
+        # Atomic hot-swap: readers see either the old or the new complete model
+        state.snapshot = snapshot
+
+        if (result['test_score'] >= 0.99 and state.holdout and
+                result['test_positive_ratio'] < 0.05):
+            logger.warning(f"⚠️ ML MODEL {key}: 100% accuracy with {result['test_positive_ratio'] * 100:.1f}% "
+                           f"positive samples - likely predicting majority class only")
+        balanced = snapshot.balanced_accuracy
+        logger.info(f"🤖 ML MODEL {key} v{snapshot.version}: {len(X)} samples, "
+                    f"score={snapshot.test_score:.3f}"
+                    f"{'' if balanced is None else f', balanced_acc={balanced:.3f}'} "
+                    f"(pos={snapshot.positive_ratio * 100:.0f}%, fit {snapshot.fit_seconds:.2f}s off-loop)")
+        return snapshot
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'executor': self.executor_kind,
+            'models': {
+                key: {
+                    'samples': len(state.buffer),
+                    'lifetime_samples': state.buffer.total,
+                    'since_fit': state.since_fit,
+                    'training': state.task is not None and not state.task.done(),
+                    'fits': state.fits,
+                    'failures': state.failures,
+                    'snapshot': state.snapshot.to_dict() if state.snapshot else None
+                }
+                for key, state in self._models.items()
+            }
+        }
+
+
+# Global ML training service instance
+ml_training_service = MLTrainingService(
+    max_workers=int(os.getenv('ML_TRAINING_WORKERS', '1')),
+    executor=os.getenv('ML_TRAINING_EXECUTOR', 'process')
+)
@@ -13,6 +13,10 @@ from typing import Dict, List, Optional, Any
 import sys
 import os
 from src.core.market_directional_bias import MarketDirectionalBias
+from src.core.signal_pipeline import SignalPipeline, cycle_memo
+from src.core.dashboard_read_model import dashboard_read_model
+from src.core.cycle_tracer import cycle_tracer
+from src.core.execution_analytics import execution_analytics
 import pytz
 from urllib.parse import urlparse
 import redis
@@ -776,6 +780,12 @@ class TradingOrchestrator:
                 token_len = len(self.zerodha_client.access_token) if has_token else 0
                 self.logger.info(f"✅ PRESERVING existing Zerodha client (token length: {token_len})")
                 self.logger.info(f"   🚨 NOT creating new client - reusing existing to preserve fresh token")
+            elif self.config.get('paper_trading') and os.getenv('PAPER_BROKER', '').lower() == 'simulated':
+                # Paper orders go to the simulated exchange instead of the real account
+                from src.core.paper_trader import PaperTradingBroker
+                self.zerodha_client = PaperTradingBroker()
+                await self.zerodha_client.connect()
+                self.logger.info("🧪 Paper trading via simulated broker (PAPER_BROKER=simulated)")
             else:
                 # No existing client, create new one
                 try:
@@ -804,6 +814,9 @@ class TradingOrchestrator:
                 except Exception as e:
                     self.logger.warning(f"⚠️ Zerodha client connection verification failed: {e}")
             
+            # Today's contract specs (expiries, strikes, lot/tick/freeze) - from disk after a restart
+            await self._refresh_contract_specs(force=True)
+            
             # CRITICAL FIX: Set Zerodha client in trade engine after initialization
             if hasattr(self, 'trade_engine') and self.trade_engine and self.zerodha_client:
                 self.trade_engine.zerodha_client = self.zerodha_client
@@ -879,6 +892,13 @@ class TradingOrchestrator:
     async def _warmup_signal_enhancer(self):
         """Pre-load historical data into signal enhancer for accurate scoring from startup"""
         try:
+            # 📦 Restore the last warm-state checkpoint; the warmup below then only tops up
+            if hasattr(signal_enhancer, 'export_warm_state'):
+                from src.core.warm_state import warm_state
+                warm_state.register('signal_enhancer', signal_enhancer)
+                warm_state.restore('signal_enhancer')
+                await warm_state.start()
+            
             # Set Zerodha client for historical data fetching
             if self.zerodha_client:
                 signal_enhancer.set_zerodha_client(self.zerodha_client)
@@ -2069,14 +2089,18 @@ class TradingOrchestrator:
         """Process market data from shared connection and run strategies"""
         try:
             # Get market data from shared connection instead of creating new TrueData connection
-            market_data = await self._get_market_data_from_api()
+            with cycle_tracer.span('market_data_refresh'):
+                market_data = await self._get_market_data_from_api()
             
             if not market_data:
                 self.logger.warning("⚠️ No market data available for strategy processing")
                 return
+            # Tick-to-order latency is measured from here
+            cycle_tracer.mark_tick()
                 
             # Transform market data for strategies
-            transformed_data = self._transform_market_data_for_strategies(market_data)
+            with cycle_tracer.span('transform_market_data'):
+                transformed_data = self._transform_market_data_for_strategies(market_data)
             
             # Run strategies with market data
             await self._run_strategies(transformed_data)
@@ -2091,12 +2115,10 @@ class TradingOrchestrator:
             # Signals still GENERATE and LOG (for elite recommendations)
             # Position management still works
             # Only NEW ENTRY EXECUTION is blocked at trade engine stage
-            import pytz
-            from datetime import datetime as dt, time as dt_time
-            ist = pytz.timezone('Asia/Kolkata')
-            now_ist = dt.now(ist)
+            # Module-level datetime/time so a replay clock can stand in for the wall clock
+            now_ist = datetime.now(self.ist_timezone)
             current_time_ist = now_ist.time()
-            no_new_entries_after = dt_time(15, 0)  # 3:00 PM IST
+            no_new_entries_after = time(15, 0)  # 3:00 PM IST
             
             # Set flag for execution stage (checked before placing orders)
             self._block_new_entries = current_time_ist >= no_new_entries_after
@@ -2114,6 +2136,9 @@ class TradingOrchestrator:
             # Signals will be generated, logged, and positions will be tracked
             # The _block_new_entries flag is checked at execution stage
             
+            # New cycle: drop IV rank / expiry / MTF / broker lookups memoized last cycle
+            cycle_memo.begin_cycle()
+            
             all_signals = []
             # 🚨 PERFORMANCE OPTIMIZATION: Reduce market data processing load
             transformed_data = self._optimize_market_data_processing(market_data)
@@ -2121,7 +2146,6 @@ class TradingOrchestrator:
             # 🎯 STEP 1: FETCH OPTION CHAINS for key underlyings (every 2 minutes to avoid timeout issues)
             # 🔧 FIX: Changed from every 5 cycles (~5s) to every 2 minutes (120s)
             # Option chain fetching takes ~15s which was consuming the 30s strategy timeout
-            import time as time_module
             if not hasattr(self, '_last_option_chain_fetch'):
                 self._last_option_chain_fetch = 0
             
@@ -2131,7 +2155,8 @@ class TradingOrchestrator:
             if current_time_epoch - self._last_option_chain_fetch >= OPTION_CHAIN_INTERVAL_SECONDS:
                 try:
                     self.logger.info(f"🔄 Fetching option chains (every {OPTION_CHAIN_INTERVAL_SECONDS}s)...")
-                    transformed_data = await self._fetch_and_merge_option_chains(transformed_data)
+                    with cycle_tracer.span('option_chains'):
+                        transformed_data = await self._fetch_and_merge_option_chains(transformed_data)
                     self._last_option_chain_fetch = current_time_epoch
                 except Exception as e:
                     self.logger.debug(f"Could not fetch option chains: {e}")
@@ -2140,7 +2165,8 @@ class TradingOrchestrator:
             # CRITICAL FIX: Pass RAW market_data (not transformed) - bias needs NIFTY-I which is filtered out in transformed_data
             try:
                 if hasattr(self, 'market_bias') and self.market_bias:
-                    current_bias = await self.market_bias.update_market_bias(market_data)  # FIX: Use raw data with NIFTY-I
+                    with cycle_tracer.span('market_bias'):
+                        current_bias = await self.market_bias.update_market_bias(market_data)  # FIX: Use raw data with NIFTY-I
                     bias_summary = self.market_bias.get_current_bias_summary()
                     
                     # 🚨 DATA FLOW CHECK: Log every 5 cycles for debugging
@@ -2179,18 +2205,21 @@ class TradingOrchestrator:
                         
                         # 🚨 STEP 1: ALWAYS sync real Zerodha positions first (prevent orphans)
                         if self.position_tracker:
-                            await self._sync_real_positions_to_strategy(strategy_instance)
+                            with cycle_tracer.span('position_sync', strategy=strategy_key):
+                                await self._sync_real_positions_to_strategy(strategy_instance)
                             self.logger.debug(f"✅ Position sync completed for {strategy_key}")
                         
                         # 🚨 STEP 2: Enrich market data with OPTIONS data for position management
-                        enriched_data = await self._enrich_market_data_with_options(transformed_data)
+                        with cycle_tracer.span('enrich_options', strategy=strategy_key):
+                            enriched_data = await self._enrich_market_data_with_options(transformed_data)
                         
                         # 🎯 STEP 3: ACTIVE POSITION MANAGEMENT (with enriched data including options)
                         # 🔥 FIX: Always call manage_existing_positions - it syncs with Zerodha!
                         # Previously, if local active_positions was empty, real Zerodha positions were NEVER managed.
                         # This caused positions with RSI > 90 to never trigger exit logic.
                         if hasattr(strategy_instance, 'manage_existing_positions'):
-                            await strategy_instance.manage_existing_positions(enriched_data)
+                            with cycle_tracer.span('manage_positions', strategy=strategy_key):
+                                await strategy_instance.manage_existing_positions(enriched_data)
                             self.logger.debug(f"🎯 {strategy_key}: Position management completed (local: {len(strategy_instance.active_positions)})")
                         
                         # 🔄 PROCESS PENDING MANAGEMENT ACTIONS: Handle any queued management actions from previous cycles
@@ -2232,10 +2261,11 @@ class TradingOrchestrator:
                         timeout_seconds = 5.0 if strategy_key == 'regime_adaptive_controller' else 15.0
                         
                         try:
-                            await asyncio.wait_for(
-                                strategy_instance.on_market_data(enriched_data),
-                                timeout=timeout_seconds
-                            )
+                            with cycle_tracer.span(f"strategy.{strategy_key}"):
+                                await asyncio.wait_for(
+                                    strategy_instance.on_market_data(enriched_data),
+                                    timeout=timeout_seconds
+                                )
                         except asyncio.TimeoutError:
                             self.logger.warning(f"⏰ TIMEOUT: {strategy_key}.on_market_data() exceeded {timeout_seconds}s - skipping")
                             continue
@@ -2256,7 +2286,8 @@ class TradingOrchestrator:
                                         continue
                                     
                                     # 🎯 POST-SIGNAL LTP VALIDATION: Fix 0.0 entry prices
-                                    validated_signal = await self._validate_and_fix_signal_ltp(signal)
+                                    with cycle_tracer.span('signal.ltp_validation', symbol=symbol, strategy=strategy_key):
+                                        validated_signal = await self._validate_and_fix_signal_ltp(signal)
                                     
                                     # 🔧 FIX 2026-01-01: Comprehensive exit detection (matches trade_engine.py)
                                     # Exit signals bypass position opening decision - they close existing positions
@@ -2288,9 +2319,10 @@ class TradingOrchestrator:
                                                 metadata={'is_exit': True}
                                             )
                                         else:
-                                            decision_result = await self._evaluate_position_opening_decision(
-                                                validated_signal, market_data, strategy_instance
-                                            )
+                                            with cycle_tracer.span('signal.opening_decision', symbol=symbol, strategy=strategy_key):
+                                                decision_result = await self._evaluate_position_opening_decision(
+                                                    validated_signal, market_data, strategy_instance
+                                                )
                                         
                                         if decision_result.decision.value != "APPROVED":
                                             # 🚨 CRITICAL: Check if this is a REVERSAL signal that should trigger exit
@@ -2343,7 +2375,8 @@ class TradingOrchestrator:
                                         # 🎯 RECORD SIGNAL TO ELITE RECOMMENDATIONS
                                         try:
                                             from src.core.signal_recorder import record_signal
-                                            signal_id = await record_signal(validated_signal, strategy_key)
+                                            with cycle_tracer.span('signal.record', symbol=symbol, strategy=strategy_key):
+                                                signal_id = await record_signal(validated_signal, strategy_key)
                                             validated_signal['recorded_signal_id'] = signal_id
                                             self.logger.info(f"📊 SIGNAL RECORDED TO ELITE: {signal_id} - {symbol} {validated_signal.get('action')}")
                                             
@@ -2358,6 +2391,7 @@ class TradingOrchestrator:
                                         except Exception as record_error:
                                             self.logger.error(f"❌ Failed to record signal to elite recommendations: {record_error}")
                                         
+                                        execution_analytics.stamp(validated_signal, 'generated')
                                         all_signals.append(validated_signal.copy())
                                         signals_generated += 1
                                         self.logger.info(f"✅ VALIDATED SIGNAL: {strategy_key} -> {validated_signal}")
@@ -2406,170 +2440,54 @@ class TradingOrchestrator:
                     self.logger.error(f"all_signals type: {type(all_signals)}, contents: {all_signals[:3] if len(all_signals) > 3 else all_signals}")
                     return
                 
-                # 🎯 STEP 1: SIGNAL ENHANCEMENT - Apply quality filters and confluence checks
-                try:
-                    self.logger.info(f"🎯 ENHANCING {len(all_signals)} signals with quality filters...")
-                    enhanced_signals = await signal_enhancer.enhance_signals(all_signals, market_data)
-                    self.logger.info(f"✅ ENHANCEMENT: {len(all_signals)} → {len(enhanced_signals)} signals passed quality filters")
-                    all_signals = enhanced_signals
-                except Exception as enhance_err:
-                    self.logger.error(f"❌ Signal enhancement error: {enhance_err}")
-                    # Continue with unenhanced signals (fallback)
-                
-                # 🎯 STEP 2: STRATEGY COORDINATION - Resolve conflicts
-                try:
-                    # Get current market regime
-                    current_regime = 'NEUTRAL'  # Default
-                    if hasattr(self, 'market_bias') and self.market_bias:
-                        current_regime = getattr(self.market_bias, 'current_regime', 'NEUTRAL')
-                    
-                    self.logger.info(f"🎯 COORDINATING strategies in {current_regime} regime...")
-                    coordinated_signals = await strategy_coordinator.coordinate_signals(all_signals, current_regime)
-                    self.logger.info(f"✅ COORDINATION: {len(all_signals)} → {len(coordinated_signals)} signals after conflict resolution")
-                    all_signals = coordinated_signals
-                except Exception as coord_err:
-                    self.logger.error(f"❌ Strategy coordination error: {coord_err}")
-                    # Continue with uncoordinated signals (fallback)
-                
-                # 🎯 STEP 3: DEDUPLICATION - Remove duplicates
-                filtered_signals = await signal_deduplicator.process_signals(all_signals)
-
-                # Generic executed-today suppression at orchestrator level (no hardcoded symbols)
-                # 🚨 CRITICAL FIX: Must use AWAIT for async Redis client!
-                try:
-                    import datetime as _dt
-                    today = _dt.datetime.now().strftime('%Y-%m-%d')
-                    if getattr(signal_deduplicator, 'redis_client', None):
-                        kept = []
-                        for s in filtered_signals:
-                            key = f"executed_signals:{today}:{s.get('symbol')}:{s.get('action','BUY')}"
-                            # 🚨 FIX: Redis client is ASYNC - must await the call!
-                            # Without await, .get() returns coroutine object (always truthy)
-                            # causing ALL signals to be blocked as "DEDUPLICATED_TODAY"
-                            already = await signal_deduplicator.redis_client.get(key)
-                            if already:
-                                self._track_signal_failed(s, 'DEDUPLICATED_TODAY')
-                            else:
-                                kept.append(s)
-                        filtered_signals = kept
-                except Exception:
-                    pass
-
-                # 🚨 CRITICAL FIX: Increase orchestrator signal limit to allow trading
-                try:
-                    max_signals_per_cycle = int(os.getenv('MAX_SIGNALS_PER_CYCLE', '5'))  # Increased from 3 to 5
-                except Exception:
-                    max_signals_per_cycle = 5  # FIXED: Allow 5 signals per cycle
-                if len(filtered_signals) > max_signals_per_cycle:
-                    self.logger.info(f"⚖️ Throttling signals: {len(filtered_signals)} → {max_signals_per_cycle} per cycle")
-                    filtered_signals = filtered_signals[:max_signals_per_cycle]
+                # 🎯 VALIDATION PIPELINE: enhancement → coordination → dedup → per-signal gates
+                # (cheap gates run before Redis lookups; per-stage stats in get_signal_stats())
+                with cycle_tracer.span('signal_pipeline', signals=len(all_signals)):
+                    filtered_signals = await self._get_signal_pipeline().run(
+                        list(all_signals), {'market_data': market_data}
+                    )
+                passed_ids = set()
+                for signal in filtered_signals:
+                    execution_analytics.stamp(signal, 'deduped')
+                    passed_ids.add(signal.get('signal_id'))
+                for signal in all_signals:
+                    if signal.get('signal_id') not in passed_ids:
+                        execution_analytics.discard(signal, 'FILTERED')
                 
                 if filtered_signals:
                     if self.trade_engine:
                         self.logger.info(f"🚀 SENDING {len(filtered_signals)} signals to trade engine for execution")
                         
-                        # 🔥 CROSS-STRATEGY SYMBOL LOCK - Prevent churning across strategies
-                        # If one strategy trades a symbol, other strategies cannot trade it for 5 minutes
-                        if not hasattr(self, '_cross_strategy_lock'):
-                            self._cross_strategy_lock: Dict[str, tuple] = {}  # symbol -> (strategy, timestamp, action)
-                        
-                        cross_lock_window = 300  # 5 minutes
-                        now = datetime.now()
-                        
-                        # Filter out signals blocked by cross-strategy lock
-                        cross_filtered = []
-                        for signal in filtered_signals:
+                        # 🚨 CRITICAL FIX: Record orders BEFORE execution to prevent duplicates
+                        # This ensures that if another signal generation cycle runs while orders are being placed,
+                        # it will see these pending orders and block duplicate signals
+                        for i, signal in enumerate(filtered_signals):
                             symbol = signal.get('symbol', 'UNKNOWN')
-                            strategy_key = signal.get('strategy', 'unknown')
-                            action = signal.get('action', 'BUY')
-                            
-                            if symbol in self._cross_strategy_lock:
-                                locked_strategy, lock_time, locked_action = self._cross_strategy_lock[symbol]
-                                elapsed = (now - lock_time).total_seconds()
-                                
-                                if elapsed < cross_lock_window and locked_strategy != strategy_key:
-                                    self.logger.warning(f"🔒 CROSS-STRATEGY LOCK: {symbol} locked by {locked_strategy} ({elapsed:.0f}s ago)")
-                                    self.logger.warning(f"   Blocking {strategy_key} {action} to prevent churning")
-                                    continue  # Skip this signal
+                            action = signal.get('action', 'UNKNOWN')
+                            quantity = signal.get('quantity', 0)
+                            self.logger.info(f"   📋 Signal {i+1}: {symbol} {action} qty={quantity}")
                             
-                            # Lock this symbol for this strategy
-                            self._cross_strategy_lock[symbol] = (strategy_key, now, action)
-                            cross_filtered.append(signal)
-                        
-                        if len(cross_filtered) < len(filtered_signals):
-                            self.logger.info(f"🔒 CROSS-STRATEGY FILTER: {len(filtered_signals)} → {len(cross_filtered)} (blocked churning)")
-                        
-                        filtered_signals = cross_filtered
+                            # Record order placement to prevent duplicates (matches base_strategy pattern)
+                            try:
+                                strategy_key = signal.get('strategy', 'unknown')
+                                if strategy_key in self.strategies:
+                                    strategy_instance = self.strategies[strategy_key].get('instance')
+                                    if strategy_instance and hasattr(strategy_instance, '_record_order_placement'):
+                                        strategy_instance._record_order_placement(symbol)
+                                        self.logger.debug(f"🔒 LOCKED: {symbol} - Duplicate prevention activated for 2 minutes")
+                            except Exception as record_err:
+                                self.logger.warning(f"Could not record order placement for {symbol}: {record_err}")
                         
-                        if not filtered_signals:
-                            self.logger.info("📭 All signals blocked by cross-strategy lock")
-                        else:
-                            # 🔧 FIX 2026-01-01: Block NEW ENTRY execution after 3 PM, but allow EXITS
-                            # Signals were already generated and logged to recommendations above
-                            # This only blocks the actual ORDER EXECUTION for new positions
-                            if getattr(self, '_block_new_entries', False):
-                                # Filter: Allow EXIT signals (closing positions), block ENTRY signals
-                                entry_blocked = []
-                                exit_allowed = []
-                                for sig in filtered_signals:
-                                    action = sig.get('action', 'BUY')
-                                    # Comprehensive exit detection (matches trade_engine.py)
-                                    is_exit = (
-                                        sig.get('is_exit', False) or
-                                        sig.get('is_square_off', False) or
-                                        sig.get('signal_type') == 'POSITION_EXIT' or
-                                        sig.get('signal_type') == 'EXIT' or
-                                        'EXIT' in sig.get('tag', '').upper() or
-                                        sig.get('metadata', {}).get('is_exit', False) or
-                                        sig.get('metadata', {}).get('position_exit', False) or
-                                        sig.get('metadata', {}).get('closing_action', False) or
-                                        sig.get('metadata', {}).get('management_action', False) or
-                                        sig.get('exit_reason') is not None
-                                    )
-                                    # EXIT actions: SELL when closing long, BUY when closing short
-                                    if is_exit:
-                                        exit_allowed.append(sig)
-                                    else:
-                                        entry_blocked.append(sig)
-                                        self.logger.info(f"⏰ ENTRY BLOCKED: {sig.get('symbol')} {action} (after 3 PM - logged to recommendations only)")
-                                
-                                if entry_blocked:
-                                    self.logger.info(f"⏰ BLOCKED {len(entry_blocked)} new entries (after 3 PM) - signals logged to elite recommendations")
-                                
-                                filtered_signals = exit_allowed
-                                if not filtered_signals:
-                                    self.logger.info("📭 No EXIT signals to execute (new entries blocked after 3 PM)")
-                            
-                            if filtered_signals:
-                                # 🚨 CRITICAL FIX: Record orders BEFORE execution to prevent duplicates
-                                # This ensures that if another signal generation cycle runs while orders are being placed,
-                                # it will see these pending orders and block duplicate signals
-                                for i, signal in enumerate(filtered_signals):
-                                    symbol = signal.get('symbol', 'UNKNOWN')
-                                    action = signal.get('action', 'UNKNOWN')
-                                    quantity = signal.get('quantity', 0)
-                                    self.logger.info(f"   📋 Signal {i+1}: {symbol} {action} qty={quantity}")
-                                    
-                                    # Record order placement to prevent duplicates (matches base_strategy pattern)
-                                    try:
-                                        strategy_key = signal.get('strategy', 'unknown')
-                                        if strategy_key in self.strategies:
-                                            strategy_instance = self.strategies[strategy_key].get('instance')
-                                            if strategy_instance and hasattr(strategy_instance, '_record_order_placement'):
-                                                strategy_instance._record_order_placement(symbol)
-                                                self.logger.debug(f"🔒 LOCKED: {symbol} - Duplicate prevention activated for 2 minutes")
-                                    except Exception as record_err:
-                                        self.logger.warning(f"Could not record order placement for {symbol}: {record_err}")
-                                
-                                await self.trade_engine.process_signals(filtered_signals)
-                                self.logger.info(f"✅ Trade engine processing completed for {len(filtered_signals)} signals")
+                        with cycle_tracer.span('trade_engine', signals=len(filtered_signals)):
+                            await self.trade_engine.process_signals(filtered_signals)
+                        self.logger.info(f"✅ Trade engine processing completed for {len(filtered_signals)} signals")
                     else:
                         self.logger.error("❌ Trade engine not available - signals cannot be processed")
                         # TRACK: Mark all signals as failed due to no trade engine
                         for signal in filtered_signals:
                             self._track_signal_failed(signal, "No trade engine available")
                 else:
-                    self.logger.info("📭 No high-quality signals after deduplication")
+                    self.logger.info("📭 No high-quality signals after validation pipeline")
                     # TRACK: Mark dedup-only outcomes as skipped rather than failed
                     for signal in all_signals:
                         reason = "Filtered out by quality/deduplication"
@@ -2597,6 +2515,143 @@ class TradingOrchestrator:
         except Exception as e:
             self.logger.error(f"Error running strategies: {e}")
     
+    def _get_signal_pipeline(self) -> SignalPipeline:
+        """Build (once) the ordered validation stages applied to each cycle's raw signals"""
+        if getattr(self, '_signal_pipeline', None) is None:
+            self._signal_pipeline = (
+                SignalPipeline('orchestrator_signals')
+                # Best-effort stages: a failure keeps the signals as they were
+                .add_stage('enhancement', self._stage_enhance, cost=50, batch=True, inputs=('market_data',),
+                           on_error='pass')
+                .add_stage('coordination', self._stage_coordinate, cost=20, batch=True, on_error='pass')
+                # Safety gates (default on_error='reject'): a failure sends nothing this cycle
+                .add_stage('deduplication', self._stage_deduplicate, cost=30, batch=True)
+                # Per-signal gates - re-ordered cheapest first by the pipeline
+                .add_stage('executed_today', self._stage_executed_today, cost=10)
+                .add_stage('entry_window', self._stage_entry_window, cost=1)
+                .add_stage('cycle_throttle', self._stage_cycle_throttle, cost=1, batch=True)
+                .add_stage('cross_strategy_lock', self._stage_cross_strategy_lock, cost=1, batch=True)
+            )
+        return self._signal_pipeline
+    
+    async def _stage_enhance(self, signals: List[Dict], context: Dict) -> List[Dict]:
+        """STEP 1: SIGNAL ENHANCEMENT - Apply quality filters and confluence checks"""
+        try:
+            self.logger.info(f"🎯 ENHANCING {len(signals)} signals with quality filters...")
+            enhanced_signals = await signal_enhancer.enhance_signals(signals, context['market_data'])
+            self.logger.info(f"✅ ENHANCEMENT: {len(signals)} → {len(enhanced_signals)} signals passed quality filters")
+            return enhanced_signals
+        except Exception as enhance_err:
+            self.logger.error(f"❌ Signal enhancement error: {enhance_err}")
+            return signals  # Continue with unenhanced signals (fallback)
+    
+    async def _stage_coordinate(self, signals: List[Dict], context: Dict) -> List[Dict]:
+        """STEP 2: STRATEGY COORDINATION - Resolve conflicts"""
+        try:
+            current_regime = 'NEUTRAL'  # Default
+            if hasattr(self, 'market_bias') and self.market_bias:
+                current_regime = getattr(self.market_bias, 'current_regime', 'NEUTRAL')
+            
+            self.logger.info(f"🎯 COORDINATING strategies in {current_regime} regime...")
+            coordinated_signals = await strategy_coordinator.coordinate_signals(signals, current_regime)
+            self.logger.info(f"✅ COORDINATION: {len(signals)} → {len(coordinated_signals)} signals after conflict resolution")
+            return coordinated_signals
+        except Exception as coord_err:
+            self.logger.error(f"❌ Strategy coordination error: {coord_err}")
+            return signals  # Continue with uncoordinated signals (fallback)
+    
+    async def _stage_deduplicate(self, signals: List[Dict], context: Dict) -> List[Dict]:
+        """STEP 3: DEDUPLICATION - Remove duplicates"""
+        return await signal_deduplicator.process_signals(signals)
+    
+    async def _stage_executed_today(self, signal: Dict, context: Dict) -> Optional[str]:
+        """Generic executed-today suppression at orchestrator level (no hardcoded symbols)"""
+        redis_client = getattr(signal_deduplicator, 'redis_client', None)
+        if not redis_client:
+            return None
+        try:
+            today = datetime.now().strftime('%Y-%m-%d')
+            key = f"executed_signals:{today}:{signal.get('symbol')}:{signal.get('action','BUY')}"
+            # 🚨 FIX: Redis client is ASYNC - must await the call!
+            if await redis_client.get(key):
+                self._track_signal_failed(signal, 'DEDUPLICATED_TODAY')
+                return 'DEDUPLICATED_TODAY'
+        except Exception:
+            pass
+        return None
+    
+    @staticmethod
+    def _is_exit_signal(sig: Dict) -> bool:
+        """Comprehensive exit detection (matches trade_engine.py)"""
+        metadata = sig.get('metadata', {}) or {}
+        return bool(
+            sig.get('is_exit', False) or
+            sig.get('is_square_off', False) or
+            sig.get('signal_type') == 'POSITION_EXIT' or
+            sig.get('signal_type') == 'EXIT' or
+            'EXIT' in sig.get('tag', '').upper() or
+            metadata.get('is_exit', False) or
+            metadata.get('position_exit', False) or
+            metadata.get('closing_action', False) or
+            metadata.get('management_action', False) or
+            sig.get('exit_reason') is not None
+        )
+    
+    def _stage_entry_window(self, signal: Dict, context: Dict) -> Optional[str]:
+        """
+        🔧 FIX 2026-01-01: Block NEW ENTRY execution after 3 PM, but allow EXITS
+        Signals are still generated and logged to recommendations upstream
+        """
+        if getattr(self, '_block_new_entries', False) and not self._is_exit_signal(signal):
+            self.logger.info(f"⏰ ENTRY BLOCKED: {signal.get('symbol')} {signal.get('action', 'BUY')} (after 3 PM - logged to recommendations only)")
+            return 'ENTRY_BLOCKED_AFTER_3PM'
+        return None
+    
+    def _stage_cycle_throttle(self, signals: List[Dict], context: Dict) -> List[Dict]:
+        """Cap the number of signals sent to the trade engine per cycle"""
+        try:
+            max_signals_per_cycle = int(os.getenv('MAX_SIGNALS_PER_CYCLE', '5'))
+        except Exception:
+            max_signals_per_cycle = 5
+        if len(signals) > max_signals_per_cycle:
+            self.logger.info(f"⚖️ Throttling signals: {len(signals)} → {max_signals_per_cycle} per cycle")
+            return signals[:max_signals_per_cycle]
+        return signals
+    
+    def _stage_cross_strategy_lock(self, signals: List[Dict], context: Dict) -> List[Dict]:
+        """
+        🔥 CROSS-STRATEGY SYMBOL LOCK - Prevent churning across strategies
+        If one strategy trades a symbol, other strategies cannot trade it for 5 minutes
+        """
+        if not hasattr(self, '_cross_strategy_lock'):
+            self._cross_strategy_lock: Dict[str, tuple] = {}  # symbol -> (strategy, timestamp, action)
+        
+        cross_lock_window = 300  # 5 minutes
+        now = datetime.now()
+        
+        cross_filtered = []
+        for signal in signals:
+            symbol = signal.get('symbol', 'UNKNOWN')
+            strategy_key = signal.get('strategy', 'unknown')
+            action = signal.get('action', 'BUY')
+            
+            if symbol in self._cross_strategy_lock:
+                locked_strategy, lock_time, locked_action = self._cross_strategy_lock[symbol]
+                elapsed = (now - lock_time).total_seconds()
+                
+                if elapsed < cross_lock_window and locked_strategy != strategy_key:
+                    self.logger.warning(f"🔒 CROSS-STRATEGY LOCK: {symbol} locked by {locked_strategy} ({elapsed:.0f}s ago)")
+                    self.logger.warning(f"   Blocking {strategy_key} {action} to prevent churning")
+                    continue
+            
+            # Lock this symbol for this strategy
+            self._cross_strategy_lock[symbol] = (strategy_key, now, action)
+            cross_filtered.append(signal)
+        
+        if len(cross_filtered) < len(signals):
+            self.logger.info(f"🔒 CROSS-STRATEGY FILTER: {len(signals)} → {len(cross_filtered)} (blocked churning)")
+        return cross_filtered
+    
     def _track_signal_generated(self, strategy: str, signal: Dict):
         """Track signal generation for analytics"""
         try:
@@ -2691,11 +2746,14 @@ class TradingOrchestrator:
     def get_signal_stats(self) -> Dict:
         """Get signal generation and execution statistics"""
         if not hasattr(self, 'signal_stats'):
-            return {
+            stats = {
                 'generated': 0, 'executed': 0, 'failed': 0,
                 'by_strategy': {}, 'recent_signals': [], 'failed_signals': []
             }
-        return self.signal_stats.copy()
+        else:
+            stats = self.signal_stats.copy()
+        stats['pipeline'] = self._get_signal_pipeline().get_stats()
+        return stats
     
     async def _clear_successful_signals(self, signals: List[Dict], execution_results):
         """Clear signals from strategy instances only if execution was successful"""
@@ -3904,6 +3962,9 @@ class TradingOrchestrator:
                 # This prevents trading on stale cached data after market hours
                 market_is_open = self._is_market_open()
                 
+                # Build the new day's contract specs (pre-market on a normal day)
+                await self._refresh_contract_specs()
+                
                 if not market_is_open:
                     # Market is closed - cleanup and sleep longer
                     self._cleanup_after_market_hours()
@@ -3973,8 +4034,11 @@ class TradingOrchestrator:
                     self.logger.debug(f"Zerodha connection check skipped: {zerodha_check_err}")
                 
                 # Process market data - simple approach, no aggressive timeouts
+                # Each iteration is one traced cycle (stage latencies in cycle_tracer)
+                cycle_tracer.begin_cycle()
                 try:
-                    market_data = await self._get_market_data_from_api()
+                    with cycle_tracer.span('market_data_fetch'):
+                        market_data = await self._get_market_data_from_api()
                 except Exception as fetch_err:
                     self.logger.debug(f"Market data fetch issue: {fetch_err}")
                     market_data = {}
@@ -3999,6 +4063,7 @@ class TradingOrchestrator:
                             for key, info in self.strategies.items():
                                 if info.get('active', False):
                                     self.logger.warning(f"   Active strategy: {key}")
+                    cycle_tracer.end_cycle(symbols=len(market_data))
                     
                     # 🚀 CRITICAL FIX: Yield to let HTTP handlers run
                     await asyncio.sleep(0.1)  # Brief yield point
@@ -4012,6 +4077,7 @@ class TradingOrchestrator:
                 else:
                     # No data - but DON'T trigger TrueData reconnection!
                     # TrueData's health monitor handles this
+                    cycle_tracer.discard_cycle()
                     consecutive_failures += 1
                     if consecutive_failures % 10 == 0:  # Log every 10th failure
                         self.logger.warning(f"⚠️ No market data (failure #{consecutive_failures}) - TrueData health monitor will handle")
@@ -4020,9 +4086,11 @@ class TradingOrchestrator:
                 await asyncio.sleep(1)
                 
             except asyncio.CancelledError:
+                cycle_tracer.discard_cycle()
                 self.logger.info("🛑 Trading loop cancelled")
                 break
             except Exception as e:
+                cycle_tracer.end_cycle(error=type(e).__name__)
                 consecutive_failures += 1
                 if consecutive_failures % 10 == 1:  # Log every 10th error
                     self.logger.error(f"❌ Error in trading loop (failure #{consecutive_failures}): {e}")
@@ -4192,6 +4260,21 @@ class TradingOrchestrator:
         
         self.logger.info("🐕 Trading loop watchdog stopped")
 
+    async def _refresh_contract_specs(self, force: bool = False) -> bool:
+        """Make the per-day contract spec cache current; broker retries at most once a minute"""
+        from src.core.contract_specs import contract_specs
+        if contract_specs.is_ready():
+            return True
+        now = time_module.time()
+        if not force and now - getattr(self, '_contract_specs_attempt', 0) < 60:
+            return False
+        self._contract_specs_attempt = now
+        try:
+            return await contract_specs.ensure(self.zerodha_client)
+        except Exception as e:
+            self.logger.warning(f"⚠️ Contract specs refresh failed: {e}")
+            return False
+    
     def _is_market_open(self) -> bool:
         """Check if market is currently open (IST timezone)"""
         try:
@@ -4509,6 +4592,13 @@ class TradingOrchestrator:
                 if market_prices:
                     await self.position_tracker.update_market_prices(market_prices)
                     self.logger.debug(f"📊 Updated {len(market_prices)} market prices in position tracker")
+                    
+                    # Same bar feeds the rolling correlation/VaR engine
+                    if self.risk_manager and hasattr(self.risk_manager, 'update_market_prices'):
+                        self.risk_manager.update_market_prices(market_prices)
+                    
+                    # P&L tick: refresh the position-derived dashboard sections
+                    dashboard_read_model.notify('pnl_tick', ('dashboard_summary', 'positions_current'))
                 
                 # Update every 30 seconds
                 await asyncio.sleep(30)
@@ -4970,8 +5060,6 @@ class TradingOrchestrator:
         Returns: {'valid': bool, 'age_seconds': float}
         """
         try:
-            import time
-            
             # Check if strategy has signal timestamps
             if not hasattr(strategy_instance, 'signal_timestamps'):
                 # No timestamp tracking - allow signal
@@ -4984,7 +5072,7 @@ class TradingOrchestrator:
             
             # Calculate signal age
             signal_timestamp = strategy_instance.signal_timestamps[symbol]
-            current_time = time.time()
+            current_time = time_module.time()
             age_seconds = current_time - signal_timestamp
             
             # Check against expiry (120 seconds = 2 minutes)
@@ -0,0 +1,246 @@
+"""
+Order Dispatch Scheduler
+========================
+Central pacing of broker API calls against Zerodha Kite's per-API-key rate ceilings.
+
+- One lane per (API key, call kind): ``orders`` (place / modify / cancel: 10/s and
+  200/min), ``quotes`` (1/s), ``historical`` (3/s) and ``other`` (10/s). Every user session
+  on the same API key shares its lanes
+- Each lane holds weighted token buckets, one per limit window, sized at ``headroom`` of the
+  published ceiling; a call takes ``weight`` tokens from all of them
+- Calls that find tokens go straight through. Otherwise they wait in a priority heap, so exits
+  go before stop-loss modifications, which go before other modifications and new entries
+  (FIFO within a class). A burst at market open is spread out instead of failing with 429s
+- New entries give up after ``entry_max_wait`` seconds (``OrderDispatchTimeout``); exits
+  wait as long as they need
+- Queueing delay per kind and priority is exported as
+  ``trading_system_order_dispatch_wait_seconds``
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import os
+import time
+from enum import IntEnum
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+try:
+    from src.utils.hot_metrics import hot_metrics, order_dispatch_wait_seconds
+except ImportError:
+    hot_metrics = order_dispatch_wait_seconds = None
+
+# Published Kite Connect ceilings per API key: (requests, window seconds)
+KITE_LIMITS: Dict[str, Tuple[Tuple[int, float], ...]] = {
+    'orders': ((10, 1.0), (200, 60.0)),
+    'quotes': ((1, 1.0),),
+    'historical': ((3, 1.0),),
+    'other': ((10, 1.0),),
+}
+
+# KiteConnect method name -> lane
+API_KINDS = {
+    'place_order': 'orders',
+    'modify_order': 'orders',
+    'cancel_order': 'orders',
+    'quote': 'quotes',
+    'ltp': 'quotes',
+    'ohlc': 'quotes',
+    'historical_data': 'historical',
+}
+
+EXIT_TAGS = ('PARTIAL_EXIT', 'FULL_EXIT', 'STOP_LOSS', 'TARGET_HIT', 'SQUARE_OFF')
+STOP_ORDER_TYPES = ('SL', 'SL-M')
+
+
+class DispatchPriority(IntEnum):
+    """Lower values are dispatched first"""
+    EXIT = 0
+    STOP_LOSS = 1
+    MODIFY = 2
+    ENTRY = 3
+    NORMAL = 4
+
+
+class OrderDispatchTimeout(Exception):
+    """A call waited longer than its class allows for broker capacity"""
+
+
+def api_kind(method_name: str) -> str:
+    return API_KINDS.get(method_name, 'other')
+
+
+def order_priority(order_params: Dict[str, Any]) -> DispatchPriority:
+    """EXIT for position-closing orders, ENTRY otherwise (same rules as the broker's exit check)"""
+    metadata = order_params.get('metadata') or {}
+    if (order_params.get('tag', '') in EXIT_TAGS or metadata.get('partial_exit', False)
+            or metadata.get('is_exit', False)):
+        return DispatchPriority.EXIT
+    return DispatchPriority.ENTRY
+
+
+def modification_priority(order_params: Dict[str, Any]) -> DispatchPriority:
+    """STOP_LOSS when the modification moves a trigger, MODIFY otherwise"""
+    if order_params.get('trigger_price') or order_params.get('order_type') in STOP_ORDER_TYPES:
+        return DispatchPriority.STOP_LOSS
+    return DispatchPriority.MODIFY
+
+
+class TokenWindow:
+    """Token bucket refilling ``capacity`` tokens per ``period`` seconds"""
+
+    def __init__(self, capacity: float, period: float, now: float):
+        self.capacity = capacity
+        self.rate = capacity / period
+        self.tokens = capacity
+        self.updated = now
+
+    def refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self, weight: float) -> float:
+        return max(0.0, (weight - self.tokens) / self.rate)
+
+
+class DispatchLane:
+    """Token windows and waiting calls of one (API key, kind)"""
+
+    def __init__(self, key: str, kind: str, limits: Sequence[Tuple[int, float]], headroom: float, now: float):
+        self.key = key
+        self.kind = kind
+        self.windows = [TokenWindow(max(1, int(limit * headroom)), period, now) for limit, period in limits]
+        self.waiting: List[list] = []
+        self.task: Optional[asyncio.Task] = None
+        self.granted = 0
+        self.queued = 0
+        self.max_wait = 0.0
+
+    def delay(self, weight: float, now: float) -> float:
+        """Seconds until ``weight`` tokens are available in every window"""
+        for window in self.windows:
+            window.refill(now)
+        return max(window.delay(weight) for window in self.windows)
+
+    def take(self, weight: float):
+        for window in self.windows:
+            window.tokens -= weight
+
+
+class OrderDispatchScheduler:
+    """Priority-ordered, rate-limited dispatch of broker API calls per API key"""
+
+    def __init__(self, limits: Dict[str, Tuple[Tuple[int, float], ...]] = None, headroom: float = 0.8,
+                 entry_max_wait: float = 10.0):
+        self.limits = limits or KITE_LIMITS
+        self.headroom = headroom
+        self.entry_max_wait = entry_max_wait
+        self._lanes: Dict[Tuple[str, str], DispatchLane] = {}
+        self._sequence = itertools.count()
+        self._wait_metrics: Dict[Tuple[str, int], Any] = {}
+
+    def _lane(self, key: str, kind: str) -> DispatchLane:
+        lane = self._lanes.get((key, kind))
+        if lane is None:
+            limits = self.limits.get(kind) or self.limits['other']
+            lane = self._lanes[(key, kind)] = DispatchLane(key, kind, limits, self.headroom, time.monotonic())
+        return lane
+
+    async def acquire(self, key: str, kind: str = 'orders', priority: Optional[int] = None,
+                      weight: float = 1.0, max_wait: Optional[float] = None) -> float:
+        """Wait for capacity for one call; returns the queueing delay in seconds
+
+        ``priority`` defaults to ENTRY for orders and NORMAL otherwise. ENTRY calls use
+        ``entry_max_wait`` unless ``max_wait`` is given; exceeding it raises
+        ``OrderDispatchTimeout``.
+        """
+        if priority is None:
+            priority = DispatchPriority.ENTRY if kind == 'orders' else DispatchPriority.NORMAL
+        if max_wait is None and priority == DispatchPriority.ENTRY:
+            max_wait = self.entry_max_wait
+        lane = self._lane(key, kind)
+        now = time.monotonic()
+
+        # Fast path: nobody queued ahead and tokens available
+        if not lane.waiting and lane.delay(weight, now) == 0.0:
+            lane.take(weight)
+            lane.granted += 1
+            self._observe(kind, priority, 0.0)
+            return 0.0
+
+        future = asyncio.get_running_loop().create_future()
+        entry = [int(priority), next(self._sequence), weight, future, now]
+        heapq.heappush(lane.waiting, entry)
+        lane.queued += 1
+        if lane.task is None or lane.task.done():
+            lane.task = asyncio.create_task(self._drain(lane))
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), max_wait)
+        except asyncio.TimeoutError:
+            if future.done() and not future.cancelled():
+                return future.result()
+            future.cancel()
+            raise OrderDispatchTimeout(
+                f"{kind} call for {key} waited over {max_wait:.1f}s for broker capacity "
+                f"({len(lane.waiting)} queued)")
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+
+    async def _drain(self, lane: DispatchLane):
+        while lane.waiting:
+            priority, _, weight, future, enqueued = lane.waiting[0]
+            if future.done():
+                # Timed out or cancelled while queued
+                heapq.heappop(lane.waiting)
+                continue
+            now = time.monotonic()
+            delay = lane.delay(weight, now)
+            if delay > 0:
+                # Re-evaluate the head afterwards: a higher-priority call may have arrived
+                await asyncio.sleep(delay)
+                continue
+            heapq.heappop(lane.waiting)
+            lane.take(weight)
+            lane.granted += 1
+            waited = now - enqueued
+            lane.max_wait = max(lane.max_wait, waited)
+            self._observe(lane.kind, priority, waited)
+            future.set_result(waited)
+
+    def _observe(self, kind: str, priority: int, waited: float):
+        if order_dispatch_wait_seconds is None:
+            return
+        child = self._wait_metrics.get((kind, priority))
+        if child is None:
+            child = self._wait_metrics[(kind, priority)] = order_dispatch_wait_seconds.labels(
+                kind, DispatchPriority(priority).name.lower())
+        child.observe(waited)
+
+    def queue_depth(self) -> int:
+        return sum(len(lane.waiting) for lane in self._lanes.values())
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            f"{key}:{kind}": {
+                'granted': lane.granted,
+                'queued': lane.queued,
+                'waiting': len(lane.waiting),
+                'max_wait_seconds': round(lane.max_wait, 3),
+                'tokens': [round(window.tokens, 2) for window in lane.windows]
+            }
+            for (key, kind), lane in self._lanes.items()
+        }
+
+
+# Global order dispatch scheduler instance
+order_dispatcher = OrderDispatchScheduler(
+    headroom=float(os.getenv('ORDER_DISPATCH_HEADROOM', '0.8')),
+    entry_max_wait=float(os.getenv('ORDER_DISPATCH_ENTRY_MAX_WAIT', '10'))
+)
+if hot_metrics is not None:
+    hot_metrics.gauge('trading_system_order_dispatch_queue_depth',
+                      'Broker API calls waiting for rate-limit capacity', order_dispatcher.queue_depth)
@@ -19,6 +19,7 @@ from core.exceptions import OrderError
 from .system_evolution import SystemEvolution
 from .capital_manager import CapitalManager
 from ..models.schema import Trade
+from src.utils.hot_metrics import order_path_seconds, timed_async
 
 logger = logging.getLogger(__name__)
 
@@ -142,6 +143,7 @@ class OrderManager:
             logger.error(f"Error placing strategy order: {str(e)}")
             raise OrderError(f"Failed to place strategy order: {str(e)}")
 
+    @timed_async(order_path_seconds, 'order_manager', outcome=lambda order_id: 'ok' if order_id else 'rejected')
     async def place_order(self, user_id: str, order: Order) -> str:
         """Place a new order with user-specific handling and capital management"""
         try:
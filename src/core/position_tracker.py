@@ -19,6 +19,7 @@ Built to compete with institutional position management systems.
 import asyncio
 import logging
 from datetime import datetime, timedelta
+from collections import deque
 from typing import Dict, List, Optional, Any, Tuple
 from dataclasses import dataclass, asdict
 import json
@@ -29,6 +30,8 @@ from scipy.optimize import minimize
 import warnings
 warnings.filterwarnings('ignore')
 
+from src.core.dashboard_read_model import dashboard_read_model
+
 logger = logging.getLogger(__name__)
 
 @dataclass
@@ -168,8 +171,8 @@ class ProfessionalRiskAnalytics:
             
             # Align arrays to same length
             min_length = min(len(position_returns), len(market_returns))
-            pos_returns = position_returns[-min_length:]
-            mkt_returns = market_returns[-min_length:]
+            pos_returns = np.asarray(position_returns)[-min_length:]
+            mkt_returns = np.asarray(market_returns)[-min_length:]
             
             # Calculate beta using linear regression
             covariance = np.cov(pos_returns, mkt_returns)[0, 1]
@@ -194,8 +197,8 @@ class ProfessionalRiskAnalytics:
                 return 0.0
             
             min_length = min(len(position_returns), len(portfolio_returns))
-            pos_returns = position_returns[-min_length:]
-            port_returns = portfolio_returns[-min_length:]
+            pos_returns = np.asarray(position_returns)[-min_length:]
+            port_returns = np.asarray(portfolio_returns)[-min_length:]
             
             correlation = np.corrcoef(pos_returns, port_returns)[0, 1]
             return correlation if not np.isnan(correlation) else 0.0
@@ -236,7 +239,7 @@ class ProductionPositionTracker:
         self.capital = 0.0
         self.peak_capital = self.capital
         self.previous_capital = self.capital
-        self.capital_history = []  # For VaR calculations
+        self.capital_history = deque(maxlen=500)  # For VaR calculations (bounded)
         
         # PROFESSIONAL PERFORMANCE TRACKING
         self.total_pnl = 0.0
@@ -260,8 +263,8 @@ class ProductionPositionTracker:
         self.time_performance = {}      # Performance by time periods
         
         # MARKET DATA for analytics
-        self.market_returns = []  # For beta/alpha calculations
-        self.portfolio_returns = []  # For correlation analysis
+        self.market_returns = deque(maxlen=500)  # For beta/alpha calculations
+        self.portfolio_returns = deque(maxlen=500)  # For correlation analysis
         
         # PROFESSIONAL ALERTS
         self.risk_alerts = []
@@ -414,6 +417,10 @@ class ProductionPositionTracker:
                     'position': position.to_dict()
                 })
             
+            # Broker syncs come from the dashboard refresh itself - don't re-trigger it
+            if not is_broker_sync:
+                dashboard_read_model.notify('position_change')
+            
             self.logger.info(f"Updated position for {symbol}: {quantity} @ {price}")
             return True
             
@@ -472,6 +479,8 @@ class ProductionPositionTracker:
                     'exit_price': exit_price
                 })
             
+            dashboard_read_model.notify('fill')
+            
             self.logger.info(f"Closed position for {symbol}: PnL = {realized_pnl:.2f}")
             return realized_pnl
             
@@ -0,0 +1,379 @@
+"""
+Session Replay Harness
+======================
+Deterministic, offline end-to-end run of the orchestrator pipeline.
+
+- ``ReplayClock`` is an injectable clock; ``install()`` points the module-level
+  ``datetime`` / ``time`` / ``asyncio.sleep`` references of the pipeline modules at it,
+  so strategy throttles, signal ages, dedup windows and the 3 PM entry cut-off all
+  follow session time instead of the wall clock
+- Market data comes from a recorded tick-journal session (``JournalSource``) or a
+  seeded random walk (``SyntheticSource``); both yield raw snapshots in the TrueData
+  schema the trading loop reads
+- ``SimulatedBroker`` stands in for ``ZerodhaIntegration`` on the orchestrator, the
+  trade engine and the order manager; pass a ``SimulationConfig`` for latency, depth
+  and rejection models (its latencies advance the replay clock, not the wall clock)
+- ``ReplayHarness.run()`` drives the real ``_transform_market_data_for_strategies`` →
+  ``_run_strategies`` → trade engine flow once per snapshot, as fast as possible or at
+  N× session speed, and reports throughput and per-stage latency
+"""
+
+import asyncio
+import importlib
+import logging
+import random
+import time as _time
+from contextlib import contextmanager
+from datetime import datetime as _datetime, timedelta
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import pytz
+
+from src.core.cycle_tracer import LatencyHistogram, cycle_tracer
+from src.core.simulated_broker import SimulatedBroker, SimulationConfig
+from src.core.tick_journal import SOURCES, TickJournalReader, TickRecord
+
+logger = logging.getLogger(__name__)
+
+IST = pytz.timezone('Asia/Kolkata')
+
+# Modules whose module-level clock references are redirected while a replay runs
+CLOCK_MODULES = (
+    'src.core.orchestrator',
+    'src.core.trade_engine',
+    'src.core.clean_order_manager',
+    'src.core.signal_deduplicator',
+    'src.core.signal_recorder',
+    'src.core.contract_specs',
+    'src.core.position_opening_decision',
+    'src.core.risk_manager',
+    'strategies.base_strategy',
+    'strategies.optimized_volume_scalper',
+    'strategies.regime_adaptive_controller',
+    'strategies.news_impact_scalper',
+    'strategies.momentum_surfer',
+    'src.core.simulated_broker',
+)
+
+
+class _ClockDatetimeMeta(type):
+    """Keep ``isinstance(x, datetime)`` true for ordinary datetimes inside patched modules"""
+
+    def __instancecheck__(cls, obj):
+        return isinstance(obj, _datetime)
+
+    def __subclasscheck__(cls, subclass):
+        return issubclass(subclass, _datetime)
+
+
+class _ClockTime:
+    """``time`` module proxy whose ``time()`` reads the replay clock"""
+
+    def __init__(self, clock: 'ReplayClock'):
+        self._clock = clock
+
+    def time(self) -> float:
+        return self._clock.time()
+
+    def __getattr__(self, name):
+        return getattr(_time, name)
+
+
+class _ClockAsyncio:
+    """``asyncio`` module proxy whose ``sleep()`` advances the replay clock instead of waiting"""
+
+    def __init__(self, clock: 'ReplayClock'):
+        self._clock = clock
+
+    async def sleep(self, delay, result=None):
+        if delay and delay > 0:
+            self._clock.advance(delay)
+        await asyncio.sleep(0)
+        return result
+
+    def __getattr__(self, name):
+        return getattr(asyncio, name)
+
+
+class ReplayClock:
+    """
+    Settable session clock. Aware ``now(tz)`` converts from the session epoch;
+    naive ``now()`` is IST wall time, which is what the production host reports.
+    """
+
+    def __init__(self, start: Optional[float] = None):
+        self._ts = start if start is not None else _time.time()
+        self._installed: List[Tuple[Any, str, Any]] = []
+        self.datetime = self._datetime_class()
+
+    def _datetime_class(self):
+        clock = self
+
+        class ClockDatetime(_datetime, metaclass=_ClockDatetimeMeta):
+            @classmethod
+            def now(cls, tz=None):
+                return clock.now(tz)
+
+            @classmethod
+            def today(cls):
+                return clock.now()
+
+            @classmethod
+            def utcnow(cls):
+                return _datetime.utcfromtimestamp(clock.time())
+
+        ClockDatetime.__name__ = 'datetime'
+        return ClockDatetime
+
+    def time(self) -> float:
+        return self._ts
+
+    def now(self, tz=None) -> _datetime:
+        if tz is not None:
+            return _datetime.fromtimestamp(self._ts, tz)
+        return _datetime.fromtimestamp(self._ts, IST).replace(tzinfo=None)
+
+    def set(self, ts: float):
+        """Move to ``ts``; the clock never runs backwards"""
+        if ts > self._ts:
+            self._ts = ts
+
+    def reset(self, ts: float):
+        """Jump to ``ts`` unconditionally (start of a session)"""
+        self._ts = ts
+
+    def advance(self, seconds: float):
+        self._ts += seconds
+
+    @contextmanager
+    def install(self, modules: Iterable[str] = CLOCK_MODULES):
+        """Redirect the clock references of ``modules`` for the duration of the block"""
+        if self._installed:
+            raise RuntimeError("ReplayClock is already installed")
+        time_proxy = _ClockTime(self)
+        asyncio_proxy = _ClockAsyncio(self)
+        try:
+            for name in modules:
+                try:
+                    module = importlib.import_module(name)
+                except Exception as e:
+                    logger.debug(f"Replay clock: skipping {name} ({e})")
+                    continue
+                for attr, value in list(vars(module).items()):
+                    if value is _datetime:
+                        replacement = self.datetime
+                    elif value is _time:
+                        replacement = time_proxy
+                    elif value is asyncio:
+                        replacement = asyncio_proxy
+                    else:
+                        continue
+                    self._installed.append((module, attr, value))
+                    setattr(module, attr, replacement)
+            yield self
+        finally:
+            for module, attr, value in reversed(self._installed):
+                setattr(module, attr, value)
+            self._installed.clear()
+
+
+# ------------------------------------------------------------------ sources
+
+class JournalSource:
+    """Snapshots of a recorded tick-journal session every ``interval_seconds`` of session time"""
+
+    def __init__(self, path: str, interval_seconds: float = 1.0, symbols: Optional[List[str]] = None):
+        self.path = path
+        self.interval_seconds = interval_seconds
+        self.symbols = set(symbols) if symbols else None
+
+    def __iter__(self) -> Iterator[Tuple[float, Dict[str, Dict[str, Any]]]]:
+        reader = TickJournalReader(self.path)
+        snapshots = reader.snapshots(self.interval_seconds)
+        try:
+            for ts_ns, snapshot in snapshots:
+                if self.symbols is not None:
+                    snapshot = {s: d for s, d in snapshot.items() if s in self.symbols}
+                yield ts_ns / 1e9, snapshot
+        finally:
+            # Release the reader's view of the segment before unmapping it
+            snapshots.close()
+            reader.close()
+
+
+class SyntheticSource:
+    """Seeded random-walk session: identical output for identical arguments"""
+
+    def __init__(self, symbols: Dict[str, float], steps: int = 300, interval_seconds: float = 1.0,
+                 start: Optional[_datetime] = None, volatility: float = 0.0005, seed: int = 42,
+                 depth_levels: int = 0, depth_quantity: int = 500):
+        self.symbols = symbols
+        self.steps = steps
+        self.interval_seconds = interval_seconds
+        self.start = start or IST.localize(_datetime.combine(_datetime.now(IST).date(), _datetime.min.time())
+                                           + timedelta(hours=9, minutes=20))
+        if self.start.tzinfo is None:
+            self.start = IST.localize(self.start)
+        self.volatility = volatility
+        self.seed = seed
+        # Kite-style 5-level depth (random sizes around ``depth_quantity``) when > 0
+        self.depth_levels = depth_levels
+        self.depth_quantity = depth_quantity
+
+    def __iter__(self) -> Iterator[Tuple[float, Dict[str, Dict[str, Any]]]]:
+        rng = random.Random(self.seed)
+        start_ts = self.start.timestamp()
+        state = {
+            symbol: {'ltp': price, 'open': price, 'high': price, 'low': price, 'volume': 0}
+            for symbol, price in self.symbols.items()
+        }
+        for step in range(self.steps):
+            ts = start_ts + step * self.interval_seconds
+            snapshot = {}
+            for symbol, previous_close in self.symbols.items():
+                s = state[symbol]
+                tick = 0.05
+                ltp = max(tick, round(s['ltp'] * (1 + rng.gauss(0, self.volatility)) / tick) * tick)
+                s['ltp'] = ltp
+                s['high'] = max(s['high'], ltp)
+                s['low'] = min(s['low'], ltp)
+                s['volume'] += rng.randint(0, 5000)
+                spread = tick * rng.randint(1, 3)
+                record = TickRecord(
+                    int(ts * 1e9), symbol, SOURCES['replay'], ltp, round(ltp - spread, 2), round(ltp + spread, 2),
+                    s['open'], s['high'], s['low'], previous_close,
+                    (ltp - previous_close) / previous_close * 100, s['volume'], 0, 0
+                )
+                snapshot[symbol] = record.to_market_data()
+                if self.depth_levels:
+                    snapshot[symbol]['depth'] = {
+                        side: [{'price': round(touch + sign * tick * level, 2),
+                                'quantity': rng.randint(1, 2 * self.depth_quantity), 'orders': rng.randint(1, 20)}
+                               for level in range(self.depth_levels)]
+                        for side, touch, sign in (('buy', record.bid, -1), ('sell', record.ask, 1))
+                    }
+            yield ts, snapshot
+
+
+# ------------------------------------------------------------------ harness
+
+class ReplayHarness:
+    """Drive the orchestrator's strategy → trade engine flow over a replayed session"""
+
+    def __init__(self, source: Iterable[Tuple[float, Dict[str, Dict[str, Any]]]],
+                 strategies: Optional[Dict[str, Any]] = None,
+                 broker: Optional[SimulatedBroker] = None,
+                 broker_config: Optional[SimulationConfig] = None,
+                 clock: Optional[ReplayClock] = None,
+                 orchestrator=None,
+                 speed: float = 0.0,
+                 seed: int = 42,
+                 clock_modules: Iterable[str] = CLOCK_MODULES):
+        self.source = source
+        self.strategies = strategies
+        self.clock = clock or ReplayClock()
+        self.broker = broker or SimulatedBroker(clock=self.clock, config=broker_config)
+        self.orchestrator = orchestrator
+        self.speed = speed
+        self.seed = seed
+        self.clock_modules = tuple(clock_modules)
+        self.cycle_latency = LatencyHistogram()
+        self.cycles = 0
+
+    async def _build(self):
+        if self.orchestrator is None:
+            from src.core.orchestrator import TradingOrchestrator
+            self.orchestrator = TradingOrchestrator({'paper_trading': True})
+        orchestrator = self.orchestrator
+        orchestrator.zerodha_client = self.broker
+        trade_engine = getattr(orchestrator, 'trade_engine', None)
+        if trade_engine is not None:
+            trade_engine.zerodha_client = self.broker
+        order_manager = getattr(orchestrator, 'order_manager', None)
+        if order_manager is not None and hasattr(order_manager, 'zerodha_client'):
+            order_manager.zerodha_client = self.broker
+        # What DailyCapitalSync would load from the broker's margins at startup
+        position_tracker = getattr(orchestrator, 'position_tracker', None)
+        if position_tracker is not None and hasattr(position_tracker, 'set_capital'):
+            await position_tracker.set_capital(self.broker.get_margins_sync())
+
+        if self.strategies is None:
+            # The production strategy set, initialised against the simulated broker
+            orchestrator.require_backtest_validation = False
+            await orchestrator._load_strategies()
+        else:
+            orchestrator.strategies.clear()
+            for key, instance in self.strategies.items():
+                if hasattr(instance, 'set_orchestrator'):
+                    instance.set_orchestrator(orchestrator)
+                else:
+                    instance.orchestrator = orchestrator
+                orchestrator.strategies[key] = {'name': key, 'instance': instance, 'active': True, 'last_signal': None}
+
+    async def run(self, max_cycles: Optional[int] = None) -> Dict[str, Any]:
+        """Replay the source through the pipeline and return the benchmark report"""
+        random.seed(self.seed)
+        try:
+            import numpy as np
+            np.random.seed(self.seed)
+        except ImportError:
+            pass
+
+        with self.clock.install(self.clock_modules):
+            await self._build()
+            orchestrator = self.orchestrator
+            cycle_tracer.reset()
+            first_ts = last_ts = None
+            wall_start = _time.perf_counter()
+
+            for ts, snapshot in self.source:
+                if max_cycles is not None and self.cycles >= max_cycles:
+                    break
+                if first_ts is None:
+                    first_ts = ts
+                    self.clock.reset(ts)
+                if self.speed > 0:
+                    # Pace against the wall clock: session time / speed
+                    delay = (ts - first_ts) / self.speed - (_time.perf_counter() - wall_start)
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                self.clock.set(ts)
+                last_ts = ts
+                if not snapshot:
+                    continue
+
+                started = _time.perf_counter()
+                cycle_tracer.begin_cycle()
+                self.broker.update_quotes(snapshot)
+                with cycle_tracer.span('transform_market_data'):
+                    transformed = orchestrator._transform_market_data_for_strategies(snapshot)
+                cycle_tracer.mark_tick()
+                await orchestrator._run_strategies(transformed)
+                cycle_tracer.end_cycle(symbols=len(snapshot))
+                self.cycle_latency.record((_time.perf_counter() - started) * 1000.0)
+                self.cycles += 1
+
+            wall_seconds = _time.perf_counter() - wall_start
+
+        session_seconds = (last_ts - first_ts) if first_ts is not None else 0.0
+        tracer_report = cycle_tracer.get_latency_report()
+        report = {
+            'cycles': self.cycles,
+            'session_seconds': session_seconds,
+            'wall_seconds': wall_seconds,
+            'speedup': session_seconds / wall_seconds if wall_seconds > 0 else 0.0,
+            'cycles_per_second': self.cycles / wall_seconds if wall_seconds > 0 else 0.0,
+            'cycle_latency': self.cycle_latency.to_dict(),
+            'stages': tracer_report.get('stages', {}),
+            'tick_to_order': tracer_report.get('tick_to_order', {}),
+            'broker': self.broker.get_stats()
+        }
+        if hasattr(orchestrator, 'get_signal_stats'):
+            try:
+                report['signals'] = orchestrator.get_signal_stats()
+            except Exception as e:
+                logger.debug(f"Signal stats unavailable: {e}")
+        logger.info(f"🎬 Replay finished: {self.cycles} cycles, {session_seconds:.0f}s of session in "
+                    f"{wall_seconds:.2f}s ({report['speedup']:.1f}x), "
+                    f"p99 cycle {report['cycle_latency']['p99_ms']:.1f}ms")
+        return report
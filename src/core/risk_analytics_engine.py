@@ -0,0 +1,394 @@
+"""
+Rolling Risk Analytics Engine
+=============================
+Bounded-memory correlation and VaR for intraday risk checks.
+
+- Prices arrive as aligned bars (one dict of symbol -> price per bar)
+- Returns are kept in a fixed-size ring buffer per symbol slot (NaN when a
+  symbol has no price in a bar), so memory is fixed for the whole session
+- Once every slot is taken, a new symbol takes over the least recently updated
+  slot without an open exposure; it is only dropped (and counted) when none is free
+- EWMA mean / covariance is updated incrementally in O(n_symbols²) per bar;
+  correlation between two symbols is then an O(1) read
+- Portfolio sigma (w'Σw) and Σw are cached whenever exposures or covariance
+  change, so the marginal VaR of adding a position is O(1) at signal time
+- ``RollingReturnWindow`` keeps a sorted window of a scalar return stream for
+  incremental historical and parametric VaR/CVaR
+"""
+
+import bisect
+import logging
+import math
+import threading
+import time
+from collections import deque
+from statistics import NormalDist
+from typing import Dict, List, Optional, Tuple, Any
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# NSE cash session 09:15-15:30
+SESSION_SECONDS = 6.25 * 3600
+
+_NORMAL = NormalDist()
+
+
+def _z_score(confidence: float) -> float:
+    return _NORMAL.inv_cdf(confidence)
+
+
+def _parametric_cvar_multiplier(confidence: float) -> float:
+    """Expected shortfall of a standard normal beyond the VaR quantile"""
+    return _NORMAL.pdf(_z_score(confidence)) / (1 - confidence)
+
+
+class RollingReturnWindow:
+    """Fixed-size window over a return stream with incremental VaR/CVaR"""
+
+    def __init__(self, window: int = 500):
+        self.window = max(2, window)
+        self._fifo: deque = deque()
+        self._sorted: List[float] = []
+        self._sum = 0.0
+        self._sum_sq = 0.0
+
+    def add(self, value: float):
+        """Add one return, evicting the oldest once the window is full"""
+        value = float(value)
+        if not math.isfinite(value):
+            return
+        if len(self._fifo) >= self.window:
+            old = self._fifo.popleft()
+            del self._sorted[bisect.bisect_left(self._sorted, old)]
+            self._sum -= old
+            self._sum_sq -= old * old
+        self._fifo.append(value)
+        bisect.insort(self._sorted, value)
+        self._sum += value
+        self._sum_sq += value * value
+
+    def __len__(self) -> int:
+        return len(self._fifo)
+
+    @property
+    def values(self) -> np.ndarray:
+        return np.fromiter(self._fifo, dtype=float, count=len(self._fifo))
+
+    def mean(self) -> float:
+        n = len(self._fifo)
+        return self._sum / n if n else 0.0
+
+    def std(self) -> float:
+        n = len(self._fifo)
+        if n < 2:
+            return 0.0
+        var = (self._sum_sq - self._sum * self._sum / n) / (n - 1)
+        return math.sqrt(max(var, 0.0))
+
+    def historical_var_cvar(self, confidence: float = 0.95) -> Tuple[float, float]:
+        """
+        Historical VaR / CVaR as positive loss fractions.
+
+        The quantile is read directly from the sorted window and CVaR averages
+        only the tail, so the cost is O(tail) rather than a full sort.
+        """
+        n = len(self._sorted)
+        if n == 0:
+            return 0.0, 0.0
+        k = max(1, int(math.ceil((1 - confidence) * n - 1e-9)))
+        var_return = self._sorted[k - 1]
+        cvar_return = sum(self._sorted[:k]) / k
+        return abs(min(var_return, 0.0)), abs(min(cvar_return, 0.0))
+
+    def parametric_var_cvar(self, confidence: float = 0.95) -> Tuple[float, float]:
+        """Gaussian VaR / CVaR from the running mean and standard deviation"""
+        sigma = self.std()
+        mu = self.mean()
+        var = max(_z_score(confidence) * sigma - mu, 0.0)
+        cvar = max(_parametric_cvar_multiplier(confidence) * sigma - mu, 0.0)
+        return var, cvar
+
+    def clear(self):
+        self._fifo.clear()
+        self._sorted.clear()
+        self._sum = 0.0
+        self._sum_sq = 0.0
+
+
+class RollingCovarianceEngine:
+    """EWMA covariance / correlation over aligned per-bar returns"""
+
+    def __init__(self, max_symbols: int = 256, window: int = 750,
+                 halflife_bars: float = 60.0, min_bars: int = 20,
+                 horizon_seconds: float = SESSION_SECONDS):
+        self.max_symbols = max_symbols
+        self.window = window
+        self.alpha = 1.0 - 0.5 ** (1.0 / max(halflife_bars, 1.0))
+        self.min_bars = min_bars
+        self.horizon_seconds = horizon_seconds
+        self._lock = threading.Lock()
+
+        self._slots: Dict[str, int] = {}
+        self._symbols: List[str] = []
+        self._dropped_symbols = 0
+        self._evicted_symbols = 0
+
+        n = max_symbols
+        # Bar sequence at which each slot last had a price, for LRU eviction
+        self._sequence = 0
+        self._last_seen = np.zeros(n, dtype=np.int64)
+        self._last_price = np.full(n, np.nan)
+        self._mean = np.zeros(n)
+        self._cov = np.zeros((n, n))
+        self._obs = np.zeros(n, dtype=np.int64)
+        # Ring buffer of aligned returns [bar, slot]
+        self._returns = np.full((window, n), np.nan)
+        self._head = 0
+        self._bars = 0
+
+        # EWMA of bar spacing, used to scale per-bar sigma to the VaR horizon
+        self._last_bar_ts: Optional[float] = None
+        self._bar_seconds = 0.0
+
+        # Cached portfolio quantities for O(1) marginal checks
+        self._exposure = np.zeros(n)
+        self._sigma_w = np.zeros(n)
+        self._port_variance = 0.0
+
+    # ------------------------------------------------------------------ updates
+
+    def _slot_for(self, symbol: str) -> Optional[int]:
+        slot = self._slots.get(symbol)
+        if slot is None:
+            if len(self._symbols) < self.max_symbols:
+                slot = len(self._symbols)
+                self._symbols.append(symbol)
+            else:
+                slot = self._evict_slot()
+                if slot is None:
+                    self._dropped_symbols += 1
+                    if self._dropped_symbols == 1 or self._dropped_symbols % 1000 == 0:
+                        logger.warning(f"⚠️ Covariance engine full ({self.max_symbols} symbols, all held or "
+                                       f"current) - dropped {symbol} ({self._dropped_symbols} drops so far)")
+                    return None
+                self._symbols[slot] = symbol
+            self._slots[symbol] = slot
+        self._last_seen[slot] = self._sequence
+        return slot
+
+    def _evict_slot(self) -> Optional[int]:
+        """Free the least recently updated slot with no exposure; None if every slot is in use"""
+        candidates = np.where(self._exposure == 0.0, self._last_seen, np.iinfo(np.int64).max)
+        slot = int(np.argmin(candidates))
+        # Slots priced in the current bar (or held) are never taken over
+        if candidates[slot] >= self._sequence:
+            return None
+        evicted = self._symbols[slot]
+        del self._slots[evicted]
+        self._last_price[slot] = np.nan
+        self._mean[slot] = 0.0
+        self._cov[slot, :] = 0.0
+        self._cov[:, slot] = 0.0
+        self._obs[slot] = 0
+        self._returns[:, slot] = np.nan
+        self._sigma_w[slot] = 0.0
+        self._evicted_symbols += 1
+        if self._evicted_symbols == 1:
+            logger.warning(f"⚠️ Covariance engine full ({self.max_symbols} symbols) - "
+                           f"evicting least recently updated symbols, starting with {evicted}")
+        else:
+            logger.debug(f"Covariance engine evicted {evicted} from slot {slot}")
+        return slot
+
+    def on_prices(self, prices: Dict[str, float], ts: Optional[float] = None) -> int:
+        """
+        Ingest one aligned bar of prices.
+
+        Returns the number of symbols whose return entered the covariance.
+        """
+        ts = time.monotonic() if ts is None else ts
+        with self._lock:
+            self._sequence += 1
+            slots = []
+            values = []
+            for symbol, price in prices.items():
+                if not price or price <= 0:
+                    continue
+                slot = self._slot_for(symbol)
+                if slot is not None:
+                    slots.append(slot)
+                    values.append(float(price))
+            if not slots:
+                return 0
+
+            idx = np.asarray(slots, dtype=np.intp)
+            px = np.asarray(values)
+            prev = self._last_price[idx]
+            self._last_price[idx] = px
+
+            has_prev = ~np.isnan(prev)
+            row = np.full(self.max_symbols, np.nan)
+            updated = 0
+            if has_prev.any():
+                idx = idx[has_prev]
+                ret = px[has_prev] / prev[has_prev] - 1.0
+                row[idx] = ret
+                self._update_moments(idx, ret)
+                updated = len(idx)
+
+            if updated:
+                self._returns[self._head] = row
+                self._head = (self._head + 1) % self.window
+                self._bars += 1
+                if self._last_bar_ts is not None and ts > self._last_bar_ts:
+                    dt = ts - self._last_bar_ts
+                    self._bar_seconds = dt if self._bar_seconds == 0 else self._bar_seconds + self.alpha * (dt - self._bar_seconds)
+                self._refresh_portfolio()
+            self._last_bar_ts = ts
+            return updated
+
+    def _update_moments(self, idx: np.ndarray, ret: np.ndarray):
+        """Masked EWMA update of mean and covariance for the symbols present in this bar"""
+        a = self.alpha
+        first = self._obs[idx] == 0
+        if first.any():
+            self._mean[idx[first]] = ret[first]
+        diff = ret - self._mean[idx]
+        self._mean[idx] += a * diff
+        block = np.ix_(idx, idx)
+        self._cov[block] = (1 - a) * (self._cov[block] + a * np.outer(diff, diff))
+        self._obs[idx] += 1
+
+    def set_exposures(self, exposures: Dict[str, float]):
+        """Set current signed position values (currency) and refresh cached portfolio sigma"""
+        with self._lock:
+            self._exposure[:] = 0.0
+            for symbol, value in exposures.items():
+                slot = self._slots.get(symbol)
+                if slot is not None:
+                    self._exposure[slot] += value
+            self._refresh_portfolio()
+
+    def _refresh_portfolio(self):
+        n = len(self._symbols)
+        w = self._exposure[:n]
+        self._sigma_w[:n] = self._cov[:n, :n] @ w
+        self._port_variance = max(float(w @ self._sigma_w[:n]), 0.0)
+
+    # -------------------------------------------------------------------- reads
+
+    def _horizon_scale(self) -> float:
+        if self._bar_seconds <= 0:
+            return 1.0
+        return math.sqrt(max(self.horizon_seconds / self._bar_seconds, 1.0))
+
+    def has_history(self, symbol: str) -> bool:
+        slot = self._slots.get(symbol)
+        return slot is not None and self._obs[slot] >= self.min_bars
+
+    def correlation(self, symbol1: str, symbol2: str) -> float:
+        """EWMA correlation between two symbols (0.0 until both have enough history)"""
+        i = self._slots.get(symbol1)
+        j = self._slots.get(symbol2)
+        if i is None or j is None:
+            return 0.0
+        if i == j:
+            return 1.0
+        if self._obs[i] < self.min_bars or self._obs[j] < self.min_bars:
+            return 0.0
+        denom = self._cov[i, i] * self._cov[j, j]
+        if denom <= 0:
+            return 0.0
+        return float(self._cov[i, j] / math.sqrt(denom))
+
+    def correlation_matrix(self, symbols: Optional[List[str]] = None) -> Tuple[List[str], np.ndarray]:
+        """Correlation matrix for the given (or all warmed-up) symbols"""
+        with self._lock:
+            if symbols is None:
+                symbols = [s for s in self._symbols if self._obs[self._slots[s]] >= self.min_bars]
+            else:
+                symbols = [s for s in symbols if s in self._slots]
+            idx = np.asarray([self._slots[s] for s in symbols], dtype=np.intp)
+            cov = self._cov[np.ix_(idx, idx)]
+        std = np.sqrt(np.clip(np.diag(cov), 0, None))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            corr = cov / np.outer(std, std)
+        corr = np.nan_to_num(corr)
+        np.fill_diagonal(corr, 1.0)
+        return symbols, corr
+
+    def portfolio_var(self, confidence: float = 0.95) -> Tuple[float, float]:
+        """Parametric (VaR, CVaR) of the current exposures over the horizon, in currency"""
+        sigma = math.sqrt(self._port_variance) * self._horizon_scale()
+        return _z_score(confidence) * sigma, _parametric_cvar_multiplier(confidence) * sigma
+
+    def incremental_var(self, symbol: str, value: float, confidence: float = 0.95) -> Optional[float]:
+        """
+        Parametric portfolio VaR after adding ``value`` of ``symbol`` - O(1).
+
+        Returns None when the symbol has no covariance history yet.
+        """
+        slot = self._slots.get(symbol)
+        if slot is None or self._obs[slot] < self.min_bars:
+            return None
+        variance = self._port_variance + 2 * value * self._sigma_w[slot] + value * value * self._cov[slot, slot]
+        return _z_score(confidence) * math.sqrt(max(variance, 0.0)) * self._horizon_scale()
+
+    def historical_portfolio_var(self, exposures: Optional[Dict[str, float]] = None,
+                                 confidence: float = 0.95) -> Tuple[float, float]:
+        """Historical-simulation (VaR, CVaR) of exposures over the return window, per bar, in currency"""
+        with self._lock:
+            n_bars = min(self._bars, self.window)
+            if n_bars == 0:
+                return 0.0, 0.0
+            if exposures is None:
+                n = len(self._symbols)
+                idx = np.flatnonzero(self._exposure[:n])
+                w = self._exposure[idx]
+            else:
+                pairs = [(self._slots[s], v) for s, v in exposures.items() if s in self._slots]
+                if not pairs:
+                    return 0.0, 0.0
+                idx = np.asarray([p[0] for p in pairs], dtype=np.intp)
+                w = np.asarray([p[1] for p in pairs])
+            if len(idx) == 0:
+                return 0.0, 0.0
+            rows = self._returns[:n_bars, idx]
+        pnl = np.nan_to_num(rows) @ w
+        k = max(1, int(math.ceil((1 - confidence) * len(pnl) - 1e-9)))
+        tail = np.partition(pnl, k - 1)[:k]
+        var_pnl = tail.max()
+        return abs(min(var_pnl, 0.0)), abs(min(tail.mean(), 0.0))
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'symbols': len(self._symbols),
+            'max_symbols': self.max_symbols,
+            'dropped_symbols': self._dropped_symbols,
+            'evicted_symbols': self._evicted_symbols,
+            'bars': self._bars,
+            'window': self.window,
+            'bar_seconds': round(self._bar_seconds, 3),
+            'memory_bytes': int(self._returns.nbytes + self._cov.nbytes),
+        }
+
+    def reset(self):
+        """Drop all state (slots are kept allocated)"""
+        with self._lock:
+            self._slots.clear()
+            self._symbols.clear()
+            self._last_seen[:] = 0
+            self._last_price[:] = np.nan
+            self._mean[:] = 0.0
+            self._cov[:] = 0.0
+            self._obs[:] = 0
+            self._returns[:] = np.nan
+            self._head = 0
+            self._bars = 0
+            self._last_bar_ts = None
+            self._bar_seconds = 0.0
+            self._exposure[:] = 0.0
+            self._sigma_w[:] = 0.0
+            self._port_variance = 0.0
@@ -20,6 +20,7 @@ from .models import Position, OptionType
 from ..events import EventBus, EventType, TradingEvent
 from .position_tracker import ProductionPositionTracker
 from .greeks_risk_manager import GreeksRiskManager
+from .risk_analytics_engine import RollingReturnWindow, RollingCovarianceEngine
 
 logger = logging.getLogger(__name__)
 
@@ -110,16 +111,17 @@ class RiskMetrics:
 class ValueAtRiskCalculator:
     """Calculate portfolio Value at Risk (VaR) and CVaR"""
 
-    def __init__(self):
-        self.returns_history = []
-        self.position_returns = defaultdict(list)
+    def __init__(self, window: int = 500, position_window: int = 250):
+        # Bounded windows with incremental quantiles - no full-history rescans
+        self.returns_history = RollingReturnWindow(window)
+        self.position_returns = defaultdict(lambda: RollingReturnWindow(position_window))
 
     def add_return(self, daily_return: float, position_returns: Optional[Dict[str, float]] = None):
         """Add daily return data"""
-        self.returns_history.append(daily_return)
+        self.returns_history.add(daily_return)
         if position_returns:
             for position_id, ret in position_returns.items():
-                self.position_returns[position_id].append(ret)
+                self.position_returns[position_id].add(ret)
 
     def calculate_portfolio_var(self, portfolio_value: float, time_horizon: float, confidence_level: float) -> Tuple[float, float]:
         """Calculate VaR and CVaR for portfolio
@@ -130,18 +132,18 @@ class ValueAtRiskCalculator:
         if len(self.returns_history) < 20:  # Need minimum history
             return 0.0, 0.0
 
-        returns = np.array(self.returns_history)
-        # Scale returns for time horizon (square root of time)
-        scaled_returns = returns * np.sqrt(time_horizon)
-        # Calculate VaR (percentile method)
-        var_percentile = (1 - confidence_level) * 100
-        var_return = np.percentile(scaled_returns, var_percentile)
-        var_amount = abs(var_return * portfolio_value)
-        # Calculate CVaR (expected shortfall)
-        cvar_returns = scaled_returns[scaled_returns <= var_return]
-        cvar_return = np.mean(cvar_returns) if len(cvar_returns) > 0 else var_return
-        cvar_amount = abs(cvar_return * portfolio_value)
-        return var_amount, cvar_amount
+        # Historical quantile read from the sorted window, scaled by square root of time
+        var_return, cvar_return = self.returns_history.historical_var_cvar(confidence_level)
+        scale = np.sqrt(time_horizon)
+        return var_return * scale * portfolio_value, cvar_return * scale * portfolio_value
+
+    def calculate_parametric_var(self, portfolio_value: float, time_horizon: float, confidence_level: float) -> Tuple[float, float]:
+        """Gaussian VaR and CVaR from the running moments of the return window"""
+        if len(self.returns_history) < 20:
+            return 0.0, 0.0
+        var_return, cvar_return = self.returns_history.parametric_var_cvar(confidence_level)
+        scale = np.sqrt(time_horizon)
+        return var_return * scale * portfolio_value, cvar_return * scale * portfolio_value
 
     def calculate_position_var(self, position: Position, portfolio_var: float, confidence_level: float = 0.95) -> float:
         """Calculate VaR for individual position"""
@@ -153,33 +155,37 @@ class ValueAtRiskCalculator:
             return portfolio_var * 0.5  # Conservative estimate
 
         # Calculate from position-specific returns
-        returns = np.array(self.position_returns[position_id])
-        var_percentile = (1 - confidence_level) * 100
-        var_return = np.percentile(returns, var_percentile)
+        var_return, _ = self.position_returns[position_id].historical_var_cvar(confidence_level)
         position_value = position.quantity * position.current_price
         return abs(var_return * position_value)
 
 class CorrelationTracker:
     """Track and analyze correlations between positions"""
 
-    def __init__(self):
-        self.price_history = defaultdict(list)
-        self.correlation_matrix = pd.DataFrame()
+    def __init__(self, max_symbols: int = 256, window: int = 750, halflife_bars: float = 60.0):
+        # Fixed-size ring buffers + incremental EWMA covariance (bounded for the whole session)
+        self.engine = RollingCovarianceEngine(max_symbols=max_symbols, window=window,
+                                              halflife_bars=halflife_bars)
         self.last_update = None
 
+    def update_prices(self, prices: Dict[str, float]):
+        """Feed one aligned bar of prices - O(n_symbols²)"""
+        if self.engine.on_prices(prices):
+            self.last_update = datetime.now()
+
     def update_price(self, symbol: str, price: float):
-        """Update price history for symbol"""
-        self.price_history[symbol].append(price)
-        # Update correlation matrix periodically
-        if (not self.last_update or
-            (datetime.now() - self.last_update).seconds > 300):  # Every 5 minutes
-            self._update_correlation_matrix()
+        """Update price for a single symbol (prefer update_prices for aligned bars)"""
+        self.update_prices({symbol: price})
 
     def get_correlation(self, symbol1: str, symbol2: str) -> float:
-        """Get correlation between two symbols"""
-        if symbol1 in self.correlation_matrix.index and symbol2 in self.correlation_matrix.columns:
-            return self.correlation_matrix.loc[symbol1, symbol2]
-        return 0.0
+        """Get correlation between two symbols - O(1)"""
+        return self.engine.correlation(symbol1, symbol2)
+
+    @property
+    def correlation_matrix(self) -> pd.DataFrame:
+        """Correlation matrix of all warmed-up symbols (built on demand for reporting)"""
+        symbols, corr = self.engine.correlation_matrix()
+        return pd.DataFrame(corr, index=symbols, columns=symbols)
 
     def get_portfolio_correlation_risk(self, positions: List[Position]) -> float:
         """Calculate overall portfolio correlation risk"""
@@ -203,26 +209,6 @@ class CorrelationTracker:
             return min(avg_correlation * 100, 100)  # Scale to 0-100
         return 0.0
 
-    def _update_correlation_matrix(self):
-        """Update correlation matrix from price history"""
-        if len(self.price_history) < 2:
-            return
-
-        # Convert price histories to returns
-        returns_data = {}
-        for symbol, prices in self.price_history.items():
-            if len(prices) > 1:
-                returns = np.diff(prices) / prices[:-1]
-                returns_data[symbol] = returns
-
-        if len(returns_data) < 2:
-            return
-
-        # Create correlation matrix
-        df = pd.DataFrame(returns_data)
-        self.correlation_matrix = df.corr()
-        self.last_update = datetime.now()
-
     def _get_base_symbol(self, symbol: str) -> str:
         """Extract base symbol from option symbol"""
         if 'BANKNIFTY' in symbol:
@@ -432,7 +418,7 @@ class RiskManager:
                 return False, f"Correlation limit exceeded for {symbol}"
             
             # Check 6: VaR limit
-            if self.would_exceed_var_limit(position_value):
+            if self.would_exceed_var_limit(position_value, symbol):
                 return False, f"VaR limit would be exceeded"
             
             # Check 7: Emergency stop
@@ -470,10 +456,8 @@ class RiskManager:
             if unrealized_pnl != 0:
                 logger.info(f"💰 DAILY P&L UPDATE: Realized: ₹{realized_pnl:.2f} + Unrealized: ₹{unrealized_pnl:.2f} = Total: ₹{self.daily_pnl:.2f}")
             
-            # Calculate portfolio VaR
-            self.portfolio_var = self.var_calculator.calculate_portfolio_var(
-                self.position_tracker.positions
-            )
+            # Calculate portfolio VaR (cached parametric estimate from the rolling engine)
+            self.portfolio_var, _ = self.correlation_tracker.engine.portfolio_var()
             
             # Check for risk breaches
             self.check_risk_breaches()
@@ -632,14 +616,19 @@ class RiskManager:
             logger.error(f"Error checking correlation limit: {e}")
             return True  # Conservative: assume limit exceeded on error
             
-    def would_exceed_var_limit(self, position_value: float) -> bool:
+    def would_exceed_var_limit(self, position_value: float, symbol: Optional[str] = None) -> bool:
         """Check if position would exceed VaR limits"""
         try:
             total_capital = self.position_tracker.capital
             max_var = total_capital * self.risk_limits['max_portfolio_var_percent']
             
-            # Estimate new VaR with additional position
-            estimated_new_var = self.portfolio_var + (position_value * 0.02)  # Rough estimate
+            # Marginal parametric VaR from cached portfolio covariance (O(1)) when the
+            # symbol has history, otherwise fall back to the rough 2% estimate
+            estimated_new_var = None
+            if symbol:
+                estimated_new_var = self.correlation_tracker.engine.incremental_var(symbol, position_value)
+            if estimated_new_var is None:
+                estimated_new_var = self.portfolio_var + (position_value * 0.02)  # Rough estimate
             
             return estimated_new_var > max_var
 
@@ -647,6 +636,26 @@ class RiskManager:
             logger.error(f"Error checking VaR limit: {e}")
             return True  # Conservative: assume limit exceeded on error
             
+    def update_market_prices(self, prices: Dict[str, float]):
+        """
+        Feed one bar of prices into the rolling correlation/VaR engine and
+        refresh the cached portfolio VaR from current positions.
+        """
+        try:
+            self.correlation_tracker.update_prices(prices)
+            
+            exposures = {}
+            for pos in self.position_tracker.positions.values():
+                value = abs(pos.current_price * pos.quantity)
+                exposures[pos.symbol] = -value if getattr(pos, 'side', 'long') == 'short' else value
+            
+            engine = self.correlation_tracker.engine
+            engine.set_exposures(exposures)
+            self.portfolio_var, _ = engine.portfolio_var()
+            
+        except Exception as e:
+            logger.error(f"Error updating risk analytics prices: {e}")
+            
     def generate_risk_alerts(self):
         """Generate risk alerts for warning conditions"""
         try:
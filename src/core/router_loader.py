@@ -0,0 +1,274 @@
+"""
+Router Loader
+=============
+Imports and mounts the API routers listed in ``main.py``.
+
+- Eager mode (default) imports every router at startup, as before
+- Lazy mode registers a placeholder per router from the manifest and imports the
+  real modules in a background warmup task, or on the first request that needs them.
+  Lazy imports run in a worker thread (one at a time) so the event loop keeps serving
+  /health and /ready; mounting happens back on the loop
+- Placeholders keep each router's position in the route table, so route precedence
+  (including the catch-all SPA route) is the same in both modes
+- Every router import runs under ``ImportProfiler``, which records per-module
+  cumulative and self import time for the debug endpoint
+"""
+
+import asyncio
+import builtins
+import importlib.util
+import logging
+import sys
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from starlette.routing import BaseRoute, Match, NoMatchFound
+
+logger = logging.getLogger(__name__)
+
+
+class ImportProfiler:
+    """Times first-time imports by wrapping ``builtins.__import__`` while active"""
+
+    def __init__(self):
+        self._original_import = builtins.__import__
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._active = 0
+        self._hook = self._import
+        self.modules: Dict[str, Dict[str, Any]] = {}
+
+    def install(self):
+        with self._lock:
+            self._active += 1
+            if self._active == 1:
+                self._original_import = builtins.__import__
+                builtins.__import__ = self._hook
+
+    def uninstall(self):
+        with self._lock:
+            self._active = max(self._active - 1, 0)
+            if self._active == 0 and builtins.__import__ is self._hook:
+                builtins.__import__ = self._original_import
+
+    def __enter__(self) -> 'ImportProfiler':
+        self.install()
+        return self
+
+    def __exit__(self, *exc):
+        self.uninstall()
+
+    @staticmethod
+    def _resolve(name: str, globals_: Optional[dict], level: int) -> str:
+        if level == 0 or not globals_:
+            return name
+        package = globals_.get('__package__') or globals_.get('__name__', '')
+        try:
+            return importlib.util.resolve_name('.' * level + name, package)
+        except (ImportError, ValueError):
+            return name
+
+    def _pending_name(self, name: str, globals_, fromlist, level: int) -> Optional[str]:
+        """Name of the module this import will load for the first time, if any"""
+        module_name = self._resolve(name, globals_, level)
+        if not module_name:
+            return None
+        if module_name not in sys.modules:
+            return module_name
+        # ``from pkg import submodule`` loads the submodule without a nested __import__ call
+        for item in fromlist or ():
+            if item != '*' and f"{module_name}.{item}" not in sys.modules:
+                return f"{module_name}.{item}"
+        return None
+
+    def _import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        module_name = self._pending_name(name, globals, fromlist, level)
+        if module_name is None:
+            return self._original_import(name, globals, locals, fromlist, level)
+
+        stack = self._local.__dict__.setdefault('stack', [])
+        parent = stack[-1][0] if stack else None
+        stack.append([module_name, 0.0])
+        start = time.perf_counter()
+        try:
+            return self._original_import(name, globals, locals, fromlist, level)
+        finally:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            _, children_ms = stack.pop()
+            if stack:
+                stack[-1][1] += elapsed_ms
+            if module_name not in self.modules:
+                self.modules[module_name] = {
+                    'cumulative_ms': round(elapsed_ms, 3),
+                    'self_ms': round(max(elapsed_ms - children_ms, 0.0), 3),
+                    'parent': parent
+                }
+
+    def report(self, top: int = 50) -> Dict[str, Any]:
+        ranked = sorted(self.modules.items(), key=lambda kv: -kv[1]['cumulative_ms'])
+        return {
+            'modules_profiled': len(self.modules),
+            'total_self_ms': round(sum(m['self_ms'] for m in self.modules.values()), 3),
+            'slowest': [{'module': name, **stats} for name, stats in ranked[:top]]
+        }
+
+
+class _PendingRouterRoute(BaseRoute):
+    """Route-table placeholder for a router that has not been imported yet"""
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def matches(self, scope) -> Tuple[Match, Dict[str, Any]]:
+        return Match.NONE, {}
+
+    def url_path_for(self, name: str, /, **path_params: Any):
+        raise NoMatchFound(name, path_params)
+
+    async def handle(self, scope, receive, send):  # pragma: no cover - never matched
+        raise RuntimeError(f"Router {self.name} is not loaded")
+
+
+class RouterLoader:
+    """Imports routers from the manifest and mounts them eagerly or lazily"""
+
+    def __init__(self, router_imports: Dict[str, Tuple[str, str]],
+                 routers_loaded: Optional[Dict[str, Any]] = None,
+                 profiler: Optional[ImportProfiler] = None):
+        self.router_imports = router_imports
+        self.routers_loaded = routers_loaded if routers_loaded is not None else {}
+        self.profiler = profiler or ImportProfiler()
+        self.load_times_ms: Dict[str, float] = {}
+        self.lazy = False
+        self._app = None
+        self._pending: Dict[str, Tuple[_PendingRouterRoute, str, Tuple[str, ...]]] = {}
+        self._load_task: Optional[asyncio.Future] = None
+        self._import_lock = threading.Lock()
+
+    def import_router(self, router_name: str):
+        """Import one router (profiled); returns the router or None on failure"""
+        if router_name in self.routers_loaded:
+            return self.routers_loaded[router_name]
+        module_path, router_attr = self.router_imports[router_name]
+        start = time.perf_counter()
+        try:
+            with self.profiler:
+                module = __import__(module_path, fromlist=[router_attr])
+            router = getattr(module, router_attr)
+            logger.info(f"Successfully loaded router: {router_name}")
+        except Exception as e:
+            logger.warning(f"Failed to load router {router_name}: {str(e)}")
+            router = None
+        self.load_times_ms[router_name] = round((time.perf_counter() - start) * 1000, 3)
+        self.routers_loaded[router_name] = router
+        return router
+
+    def _import_serialized(self, router_name: str):
+        # Worker-thread entry point: one router import at a time
+        with self._import_lock:
+            return self.import_router(router_name)
+
+    def import_all(self):
+        for router_name in self.router_imports:
+            self.import_router(router_name)
+
+    def mount(self, app, router_configs: Iterable[Tuple[str, str, Tuple[str, ...]]], lazy: bool = False):
+        """Mount routers in manifest order; lazy mode inserts placeholders instead of importing"""
+        self._app = app
+        self.lazy = lazy
+        for router_name, prefix, tags in router_configs:
+            if lazy and router_name not in self.routers_loaded:
+                placeholder = _PendingRouterRoute(router_name)
+                app.router.routes.append(placeholder)
+                self._pending[router_name] = (placeholder, prefix, tuple(tags))
+                continue
+            router = self.import_router(router_name)
+            if router:
+                self._include(router_name, router, prefix, tags)
+
+    def _include(self, router_name: str, router, prefix: str, tags, placeholder=None):
+        app = self._app
+        routes = app.router.routes
+        before = len(routes)
+        try:
+            # Only add prefix if it's not empty
+            if prefix:
+                app.include_router(router, prefix=prefix, tags=list(tags))
+            else:
+                app.include_router(router, tags=list(tags))
+            if placeholder is not None:
+                added = routes[before:]
+                del routes[before:]
+                index = routes.index(placeholder)
+                routes[index:index + 1] = added
+                app.openapi_schema = None
+            logger.info(f"Mounted router: {router_name} at {prefix or 'root'}")
+        except Exception as e:
+            del routes[before:]
+            logger.error(f"Failed to mount router {router_name}: {str(e)}")
+
+    def _activate(self, router_name: str, router):
+        placeholder, prefix, tags = self._pending.pop(router_name)
+        if router:
+            self._include(router_name, router, prefix, tags, placeholder)
+        else:
+            self._app.router.routes.remove(placeholder)
+        self._app.state.routers_loaded = sum(1 for r in self.routers_loaded.values() if r is not None)
+
+    @property
+    def pending(self) -> List[str]:
+        return list(self._pending)
+
+    async def load_pending(self):
+        """Import every pending router; concurrent callers share one load"""
+        if not self._pending:
+            return
+        if self._load_task is None or self._load_task.done():
+            self._load_task = asyncio.ensure_future(self._load_all())
+        await asyncio.shield(self._load_task)
+
+    async def _load_all(self):
+        start = time.perf_counter()
+        count = len(self._pending)
+        for router_name in list(self._pending):
+            # Import off the loop so health checks and other requests keep running;
+            # route table changes stay on the loop
+            router = await asyncio.to_thread(self._import_serialized, router_name)
+            self._activate(router_name, router)
+        logger.info(f"✅ Lazy router warmup loaded {count} routers in {(time.perf_counter() - start):.2f}s")
+
+    async def warmup(self, delay_seconds: float = 0.0):
+        """Background warmup: import the pending routers after a short delay"""
+        try:
+            if delay_seconds > 0:
+                await asyncio.sleep(delay_seconds)
+            await self.load_pending()
+        except Exception as e:
+            logger.error(f"❌ Lazy router warmup failed: {e}")
+
+    def get_report(self, top: int = 50) -> Dict[str, Any]:
+        return {
+            'lazy': self.lazy,
+            'pending_routers': self.pending,
+            'routers_loaded': sum(1 for r in self.routers_loaded.values() if r is not None),
+            'total_routers': len(self.router_imports),
+            'router_load_ms': dict(sorted(self.load_times_ms.items(), key=lambda kv: -kv[1])),
+            'imports': self.profiler.report(top)
+        }
+
+
+class LazyRouterMiddleware:
+    """ASGI middleware that loads pending routers before dispatching a request that may need them"""
+
+    def __init__(self, app, loader: RouterLoader, exempt_prefixes: Tuple[str, ...] = ()):
+        self.app = app
+        self.loader = loader
+        self.exempt_prefixes = tuple(exempt_prefixes)
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] in ('http', 'websocket') and self.loader.pending:
+            path = scope.get('path', '')
+            if path != '/' and not path.startswith(self.exempt_prefixes):
+                await self.loader.load_pending()
+        await self.app(scope, receive, send)
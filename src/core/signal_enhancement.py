@@ -11,6 +11,7 @@ Enhancements:
 4. Adaptive confidence based on recent performance
 5. Statistical significance testing
 6. Historical data warmup for accurate scoring from startup
+7. Warm-state checkpoints (history + performance) so restarts only top up recent candles
 """
 
 import logging
@@ -46,6 +47,10 @@ class SignalEnhancer:
         self.zerodha_client = None
         self._warmup_complete = False
         
+        # Restored checkpoint (see src/core/warm_state.py)
+        self._restored_symbols = set()
+        self._restored_age: Optional[float] = None
+        
         logger.info("✅ Signal Enhancement Layer initialized")
     
     def set_zerodha_client(self, client):
@@ -69,17 +74,32 @@ class SignalEnhancer:
             logger.warning("⚠️ No Zerodha client available for warmup")
             return 0
         
+        from src.core.warm_state import FRESH_SECONDS
+        
         warmed_up = 0
+        topped_up = 0
         logger.info(f"🔥 WARMUP: Loading {days} days of history for {len(symbols)} symbols...")
         
         # Limit to top 50 symbols to avoid rate limits
         symbols_to_warm = symbols[:50]
+        restored_age = self._restored_age
         
         for symbol in symbols_to_warm:
             if symbol in self.warmed_up_symbols:
                 continue
                 
             try:
+                # Restored from a checkpoint: fresh needs nothing, otherwise fetch only the gap
+                if symbol in self._restored_symbols and restored_age is not None and restored_age < days * 86400:
+                    if restored_age > FRESH_SECONDS:
+                        since = datetime.now() - timedelta(seconds=restored_age)
+                        for candle in await self._fetch_symbol_history(symbol, days, from_date=since):
+                            self._append_candle(symbol, candle)
+                        topped_up += 1
+                    self.warmed_up_symbols.add(symbol)
+                    warmed_up += 1
+                    continue
+                
                 # Fetch 5-minute candles for the last few days
                 candles = await self._fetch_symbol_history(symbol, days)
                 
@@ -105,11 +125,15 @@ class SignalEnhancer:
                 continue
         
         self._warmup_complete = True
+        if restored_age is not None:
+            logger.info(f"📦 WARMUP: {warmed_up - topped_up} symbols served from checkpoint, "
+                        f"{topped_up} topped up since {restored_age / 60:.0f} min ago")
         logger.info(f"✅ WARMUP COMPLETE: {warmed_up} symbols with {len(self.price_history.get(symbols_to_warm[0] if symbols_to_warm else '', []))} price points each")
         return warmed_up
     
-    async def _fetch_symbol_history(self, symbol: str, days: int) -> List[Dict]:
-        """Fetch historical candle data for a symbol"""
+    async def _fetch_symbol_history(self, symbol: str, days: int,
+                                    from_date: Optional[datetime] = None) -> List[Dict]:
+        """Fetch historical candle data for a symbol (from ``from_date`` for a top-up)"""
         try:
             if not self.zerodha_client:
                 return []
@@ -117,9 +141,8 @@ class SignalEnhancer:
             # Check if zerodha_client has get_historical_data method
             if hasattr(self.zerodha_client, 'get_historical_data'):
                 # 🚨 CRITICAL FIX: Use from_date/to_date parameters (not days)
-                from datetime import datetime, timedelta
                 to_date = datetime.now()
-                from_date = to_date - timedelta(days=days)
+                from_date = from_date or to_date - timedelta(days=days)
                 
                 candles = await self.zerodha_client.get_historical_data(
                     symbol=symbol,
@@ -136,6 +159,46 @@ class SignalEnhancer:
             logger.debug(f"Error fetching history for {symbol}: {e}")
             return []
     
+    def _append_candle(self, symbol: str, candle: Dict):
+        """Append one top-up candle, keeping the 50-point live history bound"""
+        close = candle.get('close', 0)
+        volume = candle.get('volume', 0)
+        if close > 0:
+            self.price_history[symbol].append(close)
+            del self.price_history[symbol][:-50]
+        if volume > 0:
+            self.volume_history[symbol].append(volume)
+            del self.volume_history[symbol][:-50]
+    
+    def export_warm_state(self) -> Dict:
+        """Checkpointable state: market history, calibration and recent outcomes"""
+        return {
+            'price_history': {s: list(v) for s, v in self.price_history.items() if v},
+            'volume_history': {s: list(v) for s, v in self.volume_history.items() if v},
+            'strategy_performance': {k: dict(v) for k, v in self.strategy_performance.items()},
+            'signal_history': [dict(s) for s in self.signal_history],
+            'warmed_up_symbols': sorted(self.warmed_up_symbols)
+        }
+    
+    def restore_warm_state(self, state: Dict, age_seconds: float):
+        """Load a checkpoint written by ``export_warm_state``"""
+        for symbol, prices in state.get('price_history', {}).items():
+            self.price_history[symbol] = [float(p) for p in prices][-50:]
+        for symbol, volumes in state.get('volume_history', {}).items():
+            self.volume_history[symbol] = [float(v) for v in volumes][-50:]
+        self.strategy_performance.update(state.get('strategy_performance', {}))
+        history = []
+        for entry in state.get('signal_history', [])[-100:]:
+            entry = dict(entry)
+            try:
+                entry['timestamp'] = datetime.fromisoformat(entry['timestamp'])
+            except (KeyError, TypeError, ValueError):
+                entry['timestamp'] = datetime.now()
+            history.append(entry)
+        self.signal_history = history
+        self._restored_symbols = set(state.get('warmed_up_symbols', [])) & set(self.price_history)
+        self._restored_age = age_seconds
+    
     def is_symbol_warmed_up(self, symbol: str) -> bool:
         """Check if a symbol has sufficient historical data"""
         return (
@@ -0,0 +1,310 @@
+"""
+Signal Journal
+==============
+Write-behind persistence of recorded signals and their status / lifecycle transitions.
+
+- ``append`` only enqueues a JSON-able row on a bounded in-memory queue; the signal path
+  never waits on the database
+- A background task drains the queue in batches of up to ``batch_size`` rows (or whatever
+  is pending every ``flush_interval`` seconds) and bulk-inserts each batch in one
+  transaction from a worker thread (``DatabaseSink``, tables from migration 019)
+- Backpressure: once ``max_pending`` rows are queued, further rows are set aside for the
+  spill file (written by the drain task from a worker thread, never on the event loop)
+  instead of growing the queue; ``append`` returns False for them
+- Failed batches are appended to an fsync'd JSONL spill file and the sink is rested for
+  ``retry_seconds``; the spill is replayed on the next start or once the sink recovers.
+  Delivery is at-least-once, inserts skip rows that already exist
+"""
+
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from datetime import datetime
+from typing import Any, Deque, Dict, Iterable, List, Optional
+
+from sqlalchemy import text
+
+logger = logging.getLogger(__name__)
+
+SIGNAL_COLUMNS = ('signal_id', 'strategy', 'symbol', 'action', 'entry_price', 'stop_loss', 'target',
+                  'confidence', 'quantity', 'status', 'generated_at', 'valid_until', 'metadata')
+EVENT_COLUMNS = ('event_id', 'signal_id', 'kind', 'stage', 'previous_stage', 'event_time', 'payload')
+
+
+def _isoformat(value: Any) -> Any:
+    return value.isoformat() if hasattr(value, 'isoformat') else value
+
+
+def _dumps(value: Any) -> Optional[str]:
+    return json.dumps(value, default=str, separators=(',', ':')) if value else None
+
+
+class DatabaseSink:
+    """Bulk inserts journal batches into ``signals`` / ``signal_events``"""
+
+    def __init__(self, engine=None):
+        self._engine = engine
+
+    def available(self) -> bool:
+        return self._engine is not None or bool(os.getenv('DATABASE_URL'))
+
+    @property
+    def engine(self):
+        if self._engine is None:
+            from src.core.database import get_engine
+            self._engine = get_engine()
+        return self._engine
+
+    def _insert(self, table: str, columns: Iterable[str], key: str, json_column: str) -> str:
+        columns = list(columns)
+        json_cast = self.engine.dialect.name == 'postgresql'
+        values = [f"CAST(:{c} AS JSONB)" if c == json_column and json_cast else f":{c}" for c in columns]
+        return (f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join(values)}) "
+                f"ON CONFLICT ({key}) DO NOTHING")
+
+    def write_batch(self, rows: List[Dict[str, Any]]):
+        """One transaction per batch; raises on failure so the batch gets spilled"""
+        signals = [row for row in rows if row['kind'] == 'signal']
+        events = [row for row in rows if row['kind'] != 'signal']
+        with self.engine.begin() as conn:
+            if signals:
+                conn.execute(text(self._insert('signals', SIGNAL_COLUMNS, 'signal_id', 'metadata')), signals)
+            if events:
+                conn.execute(text(self._insert('signal_events', EVENT_COLUMNS, 'event_id', 'payload')), events)
+
+
+class SignalJournal:
+    """Bounded write-behind queue with batched flushes and a local spill file"""
+
+    def __init__(self, sink=None, spill_dir: str = 'data/signal_journal', max_pending: int = 10000,
+                 batch_size: int = 500, flush_interval: float = 1.0, retry_seconds: float = 30.0,
+                 max_spill_bytes: int = 256 * 1024 * 1024):
+        self.sink = sink or DatabaseSink()
+        self.spill_dir = spill_dir
+        self.spill_path = os.path.join(spill_dir, 'spill.jsonl')
+        self.replay_path = os.path.join(spill_dir, 'replay.jsonl')
+        self.max_pending = max_pending
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.retry_seconds = retry_seconds
+        self.max_spill_bytes = max_spill_bytes
+
+        self.enabled = False
+        self._pending: Deque[Dict[str, Any]] = deque()
+        # Rows refused by a full queue, waiting for the drain task to spill them
+        self._overflow: List[Dict[str, Any]] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._spill_lock = threading.Lock()
+        self._retry_at = 0.0
+        self.stats = {
+            'queued': 0,
+            'written': 0,
+            'batches': 0,
+            'spilled': 0,
+            'replayed': 0,
+            'dropped': 0,
+            'max_pending_seen': 0,
+            'last_error': None
+        }
+
+    # ------------------------------------------------------------------ producers
+
+    def append(self, row: Dict[str, Any]) -> bool:
+        """Queue one row; False when disabled or when the full queue pushed it to the spill file"""
+        if not self.enabled:
+            return False
+        if len(self._pending) >= self.max_pending:
+            if len(self._overflow) >= self.max_pending:
+                self.stats['dropped'] += 1
+            else:
+                self._overflow.append(row)
+                if self._wakeup is not None:
+                    self._wakeup.set()
+            return False
+        self._pending.append(row)
+        self.stats['queued'] += 1
+        if len(self._pending) > self.stats['max_pending_seen']:
+            self.stats['max_pending_seen'] = len(self._pending)
+        if len(self._pending) >= self.batch_size and self._wakeup is not None:
+            self._wakeup.set()
+        return True
+
+    def append_signal(self, record) -> bool:
+        """Journal a newly recorded ``SignalRecord``"""
+        return self.append({
+            'kind': 'signal',
+            'signal_id': record.signal_id,
+            'strategy': record.strategy,
+            'symbol': record.symbol,
+            'action': record.action,
+            'entry_price': record.entry_price,
+            'stop_loss': record.stop_loss,
+            'target': record.target,
+            'confidence': record.confidence,
+            'quantity': record.quantity,
+            'status': record.status.value,
+            'generated_at': _isoformat(record.timestamp),
+            'valid_until': _isoformat(record.valid_until),
+            'metadata': _dumps(record.metadata)
+        })
+
+    def append_event(self, signal_id: str, kind: str, stage: str, previous_stage: Optional[str] = None,
+                     payload: Optional[Dict[str, Any]] = None, event_time: Optional[datetime] = None) -> bool:
+        """Journal a status change (``kind='status'``) or lifecycle transition (``kind='stage'``)"""
+        return self.append({
+            'kind': kind,
+            'event_id': uuid.uuid4().hex,
+            'signal_id': signal_id,
+            'stage': stage,
+            'previous_stage': previous_stage,
+            'event_time': _isoformat(event_time or datetime.now()),
+            'payload': _dumps(payload)
+        })
+
+    # ------------------------------------------------------------------ spill file
+
+    def _spill(self, rows: List[Dict[str, Any]]):
+        with self._spill_lock:
+            try:
+                os.makedirs(self.spill_dir, exist_ok=True)
+                size = os.path.getsize(self.spill_path) if os.path.exists(self.spill_path) else 0
+                if size >= self.max_spill_bytes:
+                    self.stats['dropped'] += len(rows)
+                    logger.error(f"❌ Signal journal spill full ({size} bytes) - dropped {len(rows)} rows")
+                    return
+                with open(self.spill_path, 'a') as f:
+                    f.write(''.join(json.dumps(row, default=str, separators=(',', ':')) + '\n' for row in rows))
+                    f.flush()
+                    os.fsync(f.fileno())
+                self.stats['spilled'] += len(rows)
+            except Exception as e:
+                self.stats['dropped'] += len(rows)
+                logger.error(f"❌ Signal journal spill failed, dropped {len(rows)} rows: {e}")
+
+    async def _spill_overflow(self):
+        """Write rows refused by the full queue to the spill file, off the event loop"""
+        if self._overflow:
+            rows, self._overflow = self._overflow, []
+            await asyncio.to_thread(self._spill, rows)
+
+    def has_spill(self) -> bool:
+        return os.path.exists(self.replay_path) or os.path.exists(self.spill_path)
+
+    def replay_spill(self) -> int:
+        """Write spilled rows to the sink (blocking); the file is only removed once all of it landed"""
+        with self._spill_lock:
+            if not os.path.exists(self.replay_path):
+                if not os.path.exists(self.spill_path):
+                    return 0
+                os.replace(self.spill_path, self.replay_path)
+        rows = []
+        with open(self.replay_path) as f:
+            for line in f:
+                try:
+                    rows.append(json.loads(line))
+                except ValueError:
+                    # Torn last line of a crash mid-write
+                    logger.warning("⚠️ Skipping unreadable signal journal spill line")
+        for start in range(0, len(rows), self.batch_size):
+            self.sink.write_batch(rows[start:start + self.batch_size])
+        os.remove(self.replay_path)
+        self.stats['replayed'] += len(rows)
+        return len(rows)
+
+    # ------------------------------------------------------------------ drain
+
+    async def flush(self) -> int:
+        """Drain everything queued so far; returns rows written to the sink"""
+        written = 0
+        while self._pending:
+            batch = [self._pending.popleft() for _ in range(min(self.batch_size, len(self._pending)))]
+            if time.time() < self._retry_at:
+                await asyncio.to_thread(self._spill, batch)
+                continue
+            try:
+                await asyncio.to_thread(self.sink.write_batch, batch)
+                written += len(batch)
+                self.stats['written'] += len(batch)
+                self.stats['batches'] += 1
+            except Exception as e:
+                self._retry_at = time.time() + self.retry_seconds
+                self.stats['last_error'] = str(e)
+                logger.warning(f"⚠️ Signal journal batch failed, spilling {len(batch)} rows: {e}")
+                await asyncio.to_thread(self._spill, batch)
+        return written
+
+    async def _replay_if_due(self):
+        if time.time() < self._retry_at or not self.has_spill():
+            return
+        try:
+            replayed = await asyncio.to_thread(self.replay_spill)
+            if replayed:
+                logger.info(f"📼 Signal journal replayed {replayed} spilled rows")
+        except Exception as e:
+            self._retry_at = time.time() + self.retry_seconds
+            self.stats['last_error'] = str(e)
+            logger.warning(f"⚠️ Signal journal spill replay failed: {e}")
+
+    async def _drain_loop(self):
+        while self.enabled:
+            try:
+                if len(self._pending) < self.batch_size and not self._overflow:
+                    self._wakeup.clear()
+                    try:
+                        await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+                    except asyncio.TimeoutError:
+                        pass
+                await self._spill_overflow()
+                await self._replay_if_due()
+                await self.flush()
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Signal journal drain loop error: {e}")
+
+    # ------------------------------------------------------------------ lifecycle
+
+    async def start(self):
+        if self._task is not None and not self._task.done():
+            return
+        if not self.sink.available():
+            logger.info("📼 Signal journal disabled - no database configured")
+            return
+        self.enabled = True
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._drain_loop())
+        logger.info(f"📼 Signal journal started (batch {self.batch_size}, max pending {self.max_pending})")
+
+    async def stop(self):
+        """Stop draining and flush what is left (to the sink, or to the spill file)"""
+        self.enabled = False
+        if self._task is not None:
+            # Wake the loop so an in-flight batch finishes instead of being cancelled mid-write
+            self._wakeup.set()
+            await self._task
+            self._task = None
+        await self._spill_overflow()
+        await self.flush()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            'enabled': self.enabled,
+            'pending': len(self._pending),
+            'overflow': len(self._overflow),
+            'spill_pending': self.has_spill()
+        }
+
+
+# Global signal journal instance
+signal_journal = SignalJournal(
+    spill_dir=os.getenv('SIGNAL_JOURNAL_DIR', 'data/signal_journal'),
+    max_pending=int(os.getenv('SIGNAL_JOURNAL_MAX_PENDING', '10000')),
+    batch_size=int(os.getenv('SIGNAL_JOURNAL_BATCH_SIZE', '500'))
+)
@@ -90,6 +90,10 @@ class SignalLifecycleManager:
         self.elite_scanner = None
         self.redis_client = None
         
+        # Write-behind persistence of stage transitions
+        from src.core.signal_journal import signal_journal
+        self.journal = signal_journal
+        
         # Background task
         self.cleanup_task = None
         self.running = False
@@ -107,6 +111,8 @@ class SignalLifecycleManager:
             # Start background cleanup task
             self.cleanup_task = asyncio.create_task(self._cleanup_loop())
             
+            await self.journal.start()
+            
             logger.info("🚀 Signal Lifecycle Manager started")
             
         except Exception as e:
@@ -124,6 +130,8 @@ class SignalLifecycleManager:
                 except asyncio.CancelledError:
                     pass
             
+            await self.journal.stop()
+            
             logger.info("🛑 Signal Lifecycle Manager stopped")
             
         except Exception as e:
@@ -141,6 +149,7 @@ class SignalLifecycleManager:
                 'entry_price': signal_data.get('entry_price', 0.0),
                 'registered_at': datetime.now().isoformat()
             }
+            self.journal.append_event(signal_id, 'stage', stage.value, event_time=self.signal_timestamps[signal_id])
             
             logger.debug(f"📝 Signal registered: {signal_id} -> {stage.value}")
             
@@ -157,6 +166,7 @@ class SignalLifecycleManager:
                 # Update timestamp for certain stages
                 if stage in [SignalLifecycleStage.EXECUTED, SignalLifecycleStage.FAILED, SignalLifecycleStage.EXPIRED]:
                     self.signal_timestamps[signal_id] = datetime.now()
+                self.journal.append_event(signal_id, 'stage', stage.value, old_stage.value)
                 
                 logger.debug(f"🔄 Signal stage updated: {signal_id} -> {old_stage.value} → {stage.value}")
             
@@ -0,0 +1,276 @@
+"""
+Signal Validation Pipeline
+==========================
+Explicit, ordered validation stages between signal generation and execution.
+
+- Each stage declares its cost and the context inputs it reads
+- Per-signal filter stages between two batch stages are re-ordered cheapest first,
+  so cheap rejections short-circuit before expensive (broker/Redis) checks run
+- Intermediate results shared across checks (IV rank, days to expiry, MTF analysis,
+  broker position lookups) are memoized per (cycle, symbol) in ``cycle_memo``
+- Each stage has a failure policy: safety gates (``on_error='reject'``, the default) drop
+  the signals when they raise or their inputs are missing; best-effort stages
+  (``on_error='pass'``) let them through unchanged
+- Per-stage pass/reject counts and latency are kept for monitoring
+"""
+
+import asyncio
+import logging
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+ON_ERROR_POLICIES = ('reject', 'pass')
+
+
+class CycleMemo:
+    """Memoizes intermediate results per (trading cycle, symbol, key)"""
+
+    def __init__(self, max_cycle_seconds: float = 60.0):
+        self.cycle_id = 0
+        # Safety net: values never outlive this even if no one calls begin_cycle()
+        self.max_cycle_seconds = max_cycle_seconds
+        self._cycle_started = time.monotonic()
+        self._values: Dict[Tuple[str, str], Any] = {}
+        self._inflight: Dict[Tuple[str, str], asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def begin_cycle(self, cycle_id: Optional[int] = None):
+        """Start a new cycle - everything memoized in the previous one is dropped"""
+        self.cycle_id = self.cycle_id + 1 if cycle_id is None else cycle_id
+        self._cycle_started = time.monotonic()
+        self._values.clear()
+        self._inflight.clear()
+
+    def _check_rollover(self):
+        if time.monotonic() - self._cycle_started > self.max_cycle_seconds:
+            self.begin_cycle()
+
+    def get_or_compute(self, symbol: str, key: str, compute: Callable[[], Any]) -> Any:
+        """Return the memoized value for (symbol, key), computing it once per cycle"""
+        self._check_rollover()
+        memo_key = (symbol, key)
+        value = self._values.get(memo_key, _MISSING)
+        if value is not _MISSING:
+            self.hits += 1
+            return value
+        self.misses += 1
+        value = compute()
+        self._values[memo_key] = value
+        return value
+
+    async def aget_or_compute(self, symbol: str, key: str,
+                              compute: Callable[[], Awaitable[Any]]) -> Any:
+        """Async variant - concurrent callers for the same key share one computation"""
+        self._check_rollover()
+        memo_key = (symbol, key)
+        value = self._values.get(memo_key, _MISSING)
+        if value is not _MISSING:
+            self.hits += 1
+            return value
+
+        pending = self._inflight.get(memo_key)
+        if pending is not None:
+            self.hits += 1
+            return await asyncio.shield(pending)
+
+        self.misses += 1
+        cycle_id = self.cycle_id
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[memo_key] = future
+        try:
+            value = await compute()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()  # Mark retrieved so asyncio doesn't warn
+            raise
+        else:
+            future.set_result(value)
+            if self.cycle_id == cycle_id:
+                self._values[memo_key] = value
+            return value
+        finally:
+            if self._inflight.get(memo_key) is future:
+                del self._inflight[memo_key]
+
+    def get_stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            'cycle_id': self.cycle_id,
+            'entries': len(self._values),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / total, 3) if total else 0.0
+        }
+
+
+@dataclass
+class PipelineStage:
+    """
+    One validation stage.
+
+    Filter stages (``batch=False``) are called per signal as
+    ``func(signal, context) -> Optional[str]`` and return a rejection reason or None.
+    Batch stages are called as ``func(signals, context) -> List[Dict]``.
+    Either form may be sync or async.
+
+    ``on_error`` decides what happens to the signals when the stage raises or one of its
+    ``inputs`` is missing from the context: ``'reject'`` drops them, ``'pass'`` keeps them.
+    """
+    name: str
+    func: Callable
+    cost: float = 1.0
+    batch: bool = False
+    inputs: Tuple[str, ...] = ()
+    on_error: str = 'reject'
+
+
+@dataclass
+class StageStats:
+    evaluated: int = 0
+    passed: int = 0
+    rejected: int = 0
+    errors: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+    calls: int = 0
+    reasons: Dict[str, int] = field(default_factory=lambda: defaultdict(int))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'evaluated': self.evaluated,
+            'passed': self.passed,
+            'rejected': self.rejected,
+            'errors': self.errors,
+            'avg_ms': round(self.total_ms / self.calls, 3) if self.calls else 0.0,
+            'max_ms': round(self.max_ms, 3),
+            'top_reasons': dict(sorted(self.reasons.items(), key=lambda kv: -kv[1])[:5])
+        }
+
+
+class SignalPipeline:
+    """Runs signals through ordered stages with short-circuiting and stats"""
+
+    def __init__(self, name: str = 'signal_pipeline'):
+        self.name = name
+        self._stages: List[PipelineStage] = []
+        self._plan: Optional[List[PipelineStage]] = None
+        self.stats: Dict[str, StageStats] = {}
+        self.runs = 0
+        self.last_run_ms = 0.0
+
+    def add_stage(self, name: str, func: Callable, cost: float = 1.0,
+                  batch: bool = False, inputs: Tuple[str, ...] = (),
+                  on_error: str = 'reject') -> 'SignalPipeline':
+        """Append a stage (declaration order is the dependency order)"""
+        if on_error not in ON_ERROR_POLICIES:
+            raise ValueError(f"on_error must be one of {ON_ERROR_POLICIES}, got {on_error!r}")
+        self._stages.append(PipelineStage(name, func, cost, batch, tuple(inputs), on_error))
+        self.stats[name] = StageStats()
+        self._plan = None
+        return self
+
+    @property
+    def plan(self) -> List[PipelineStage]:
+        """Execution order: batch stages are barriers, filters between them run cheapest first"""
+        if self._plan is None:
+            plan: List[PipelineStage] = []
+            run: List[PipelineStage] = []
+            for stage in self._stages:
+                if stage.batch:
+                    plan.extend(sorted(run, key=lambda s: s.cost))
+                    run = []
+                    plan.append(stage)
+                else:
+                    run.append(stage)
+            plan.extend(sorted(run, key=lambda s: s.cost))
+            self._plan = plan
+        return self._plan
+
+    async def run(self, signals: List[Dict], context: Optional[Dict[str, Any]] = None) -> List[Dict]:
+        """Run signals through every stage; returns the signals that survive"""
+        context = context if context is not None else {}
+        run_start = time.perf_counter()
+        self.runs += 1
+
+        for stage in self.plan:
+            if not signals:
+                break
+            stats = self.stats[stage.name]
+            missing = [key for key in stage.inputs if key not in context]
+            if missing:
+                if stage.on_error == 'pass':
+                    logger.warning(f"⚠️ {self.name}: stage '{stage.name}' missing inputs {missing} - skipped")
+                    continue
+                logger.error(f"❌ {self.name}: stage '{stage.name}' missing inputs {missing} - "
+                             f"rejected {len(signals)} signals")
+                stats.evaluated += len(signals)
+                stats.rejected += len(signals)
+                stats.reasons['missing_inputs'] += len(signals)
+                signals = []
+                break
+
+            stage_start = time.perf_counter()
+            stats.evaluated += len(signals)
+            try:
+                if stage.batch:
+                    result = stage.func(signals, context)
+                    if asyncio.iscoroutine(result):
+                        result = await result
+                    kept = list(result or [])
+                    if len(kept) < len(signals):
+                        stats.reasons[stage.name] += len(signals) - len(kept)
+                else:
+                    kept = []
+                    for signal in signals:
+                        reason = stage.func(signal, context)
+                        if asyncio.iscoroutine(reason):
+                            reason = await reason
+                        if reason:
+                            stats.reasons[str(reason)] += 1
+                        else:
+                            kept.append(signal)
+            except Exception as e:
+                # A broken safety gate must fail closed; only best-effort stages pass signals on
+                stats.errors += 1
+                if stage.on_error == 'pass':
+                    logger.error(f"❌ {self.name}: stage '{stage.name}' failed, passing signals through: {e}")
+                    kept = signals
+                else:
+                    logger.error(f"❌ {self.name}: stage '{stage.name}' failed, rejecting "
+                                 f"{len(signals)} signals: {e}")
+                    stats.reasons['stage_error'] += len(signals)
+                    kept = []
+
+            elapsed_ms = (time.perf_counter() - stage_start) * 1000
+            stats.calls += 1
+            stats.total_ms += elapsed_ms
+            stats.max_ms = max(stats.max_ms, elapsed_ms)
+            stats.passed += len(kept)
+            stats.rejected += len(signals) - len(kept)
+            signals = kept
+
+        self.last_run_ms = (time.perf_counter() - run_start) * 1000
+        return signals
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'runs': self.runs,
+            'last_run_ms': round(self.last_run_ms, 3),
+            'order': [stage.name for stage in self.plan],
+            'stages': {stage.name: self.stats[stage.name].to_dict() for stage in self.plan},
+            'memo': cycle_memo.get_stats()
+        }
+
+
+# Global per-cycle memo shared by strategies and the orchestrator
+cycle_memo = CycleMemo()
@@ -183,19 +183,9 @@ class SignalRecorder:
         # They're still marked as EXPIRED but remain visible for review
         self.signal_validity_hours = self.config.get('signal_validity_hours', 4.0)  # 4 hours
         
-        # Database connection (if available)
-        self.db_enabled = False
-        self._initialize_database()
-        
-    def _initialize_database(self):
-        """Initialize database connection for persistence"""
-        try:
-            # Try to initialize database connection
-            # This is optional - system works without database
-            pass
-        except Exception as e:
-            logger.debug(f"Database not available for signal recording: {e}")
-            self.db_enabled = False
+        # Database persistence is write-behind (batched off the signal path)
+        from src.core.signal_journal import signal_journal
+        self.journal = signal_journal
     
     async def record_signal(self, signal: Dict[str, Any], strategy: str) -> str:
         """
@@ -269,9 +259,8 @@ class SignalRecorder:
             self.daily_stats['total_signals'] += 1
             self._update_strategy_performance(strategy, 'signal_generated')
             
-            # Persist to database if available
-            if self.db_enabled:
-                await self._persist_signal_to_db(signal_record)
+            # Queue for batched database persistence (never waits on the database)
+            self.journal.append_signal(signal_record)
             
             logger.info(f"📊 SIGNAL RECORDED: {signal_id} - {strategy} {symbol} {action} @ ₹{entry_price}")
             logger.info(f"   Added to Elite Recommendations (Total: {len(self.elite_recommendations)})")
@@ -306,6 +295,21 @@ class SignalRecorder:
                 signal_record.pnl_percent = execution_data.get('pnl_percent')
                 signal_record.outcome = execution_data.get('outcome')
             
+            # Close the signal's execution timeline (latency / slippage analytics)
+            from src.core.execution_analytics import execution_analytics
+            if status == SignalStatus.EXECUTED and signal_record.execution_price:
+                execution_analytics.record_fill(signal_id, signal_record.execution_price)
+            elif status in (SignalStatus.FAILED_EXECUTION, SignalStatus.EXPIRED, SignalStatus.CANCELLED):
+                execution_analytics.discard(signal_id, status.value)
+            
+            self.journal.append_event(signal_id, 'status', status.value, old_status.value, payload={
+                'execution_price': signal_record.execution_price,
+                'execution_status': signal_record.execution_status,
+                'pnl': signal_record.pnl,
+                'pnl_percent': signal_record.pnl_percent,
+                'outcome': signal_record.outcome
+            } if execution_data else None)
+            
             # Update elite recommendation
             await self._update_elite_recommendation(signal_id, signal_record)
             
@@ -640,19 +644,6 @@ class SignalRecorder:
                 
         except Exception as e:
             logger.error(f"❌ Error in _clear_expired_from_redis: {e}")
-    
-    async def _persist_signal_to_db(self, signal_record: SignalRecord):
-        """Persist signal record to database (if available)"""
-        try:
-            if not self.db_enabled:
-                return
-            
-            # Database persistence logic would go here
-            # For now, just log that we would persist
-            logger.debug(f"Would persist signal {signal_record.signal_id} to database")
-            
-        except Exception as e:
-            logger.error(f"Error persisting signal to database: {e}")
 
 # Global signal recorder instance
 signal_recorder = SignalRecorder()
@@ -0,0 +1,905 @@
+"""
+Simulated Broker
+================
+Local exchange + broker stand-in for ``ZerodhaIntegration`` used by replays and paper trading.
+
+- Implements the surface the orchestrator, trade engine and order manager call:
+  place/modify/cancel orders, order history, positions, margins, quotes and option LTPs,
+  plus the options lookups strategies use (expiries, strikes, symbol validation, volume),
+  answered from today's contract specs and the simulated quotes
+- Price-time priority matching against the latest quote fed through ``update_quotes``:
+  marketable orders walk the opposite side of the depth (or the touch when the quote
+  has no depth), so large orders slip through levels and fill partially when the
+  displayed liquidity runs out; the remainder rests until later quotes cross it
+- Displayed liquidity is consumed by our fills until the next quote for the symbol
+  replaces it, so orders placed against the same quote compete for it in priority order
+- Configurable request (REST round trip), acknowledgement and fill latency distributions;
+  orders sit in ``OPEN PENDING`` until acknowledged and cannot match before their fill time
+- Exchange/RMS rejections for freeze quantity and off-tick prices, and Kite-style
+  ``Too many requests`` rate-limit errors (10/s, 200/min, 3000/day, 25 modifications)
+- Positions, average prices and realised P&L are kept Kite-style (``net`` positions)
+- Fills are reported to ``execution_analytics`` the way the order postback does
+- Timestamps come from an injectable clock (anything with ``now()``/``time()``), so a
+  replay clock makes order history and latencies deterministic
+"""
+
+import asyncio
+import itertools
+import logging
+import math
+import os
+import random
+import re
+import time as _time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from datetime import datetime, time as dt_time
+from decimal import Decimal, ROUND_CEILING, ROUND_FLOOR, ROUND_HALF_UP
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from src.core.contract_specs import INDEX_FREEZE_QUANTITIES
+
+logger = logging.getLogger(__name__)
+
+OPEN_PENDING = 'OPEN PENDING'
+OPEN = 'OPEN'
+TRIGGER_PENDING = 'TRIGGER PENDING'
+COMPLETE = 'COMPLETE'
+CANCELLED = 'CANCELLED'
+REJECTED = 'REJECTED'
+
+LIVE_STATUSES = (OPEN_PENDING, OPEN, TRIGGER_PENDING)
+
+# Fraction of notional blocked for intraday (MIS) equity/futures; option buys block the premium
+MIS_MARGIN_FRACTION = 0.2
+
+# NSE/BSE index derivative freeze quantities (units per order)
+DEFAULT_FREEZE_QUANTITIES = dict(INDEX_FREEZE_QUANTITIES)
+
+_OPTION_RE = re.compile(r'\d+(CE|PE)$')
+
+
+def _is_option(symbol: str) -> bool:
+    return bool(_OPTION_RE.search(symbol.upper()))
+
+
+def _is_derivative(symbol: str) -> bool:
+    upper = symbol.upper()
+    return _is_option(upper) or upper.endswith('-I') or upper.endswith('FUT')
+
+
+def _on_tick(price: float, tick: float) -> bool:
+    return (Decimal(str(price)) % Decimal(str(tick))) == 0
+
+
+def _align_to_tick(price: float, tick: float, action: str, mode: str = 'conservative') -> float:
+    """Same alignment ZerodhaIntegration applies before sending: conservative for limits, nearest for triggers"""
+    if not price or tick <= 0:
+        return price
+    steps = Decimal(str(price)) / Decimal(str(tick))
+    if mode == 'nearest':
+        rounding = ROUND_HALF_UP
+    else:
+        rounding = ROUND_FLOOR if action == 'BUY' else ROUND_CEILING
+    return float(steps.to_integral_value(rounding=rounding) * Decimal(str(tick)))
+
+
+@dataclass
+class LatencyModel:
+    """Latency distribution in milliseconds: ``fixed``, ``normal``, ``lognormal`` or ``exponential``"""
+    mean_ms: float = 0.0
+    jitter_ms: float = 0.0
+    distribution: str = 'lognormal'
+
+    def sample(self, rng: random.Random) -> float:
+        """One draw, in seconds, never negative"""
+        if self.mean_ms <= 0:
+            return 0.0
+        if self.distribution == 'exponential':
+            ms = rng.expovariate(1.0 / self.mean_ms)
+        elif self.distribution == 'fixed' or self.jitter_ms <= 0:
+            ms = self.mean_ms
+        elif self.distribution == 'normal':
+            ms = rng.gauss(self.mean_ms, self.jitter_ms)
+        else:
+            # Lognormal with the requested mean and standard deviation: a long right tail
+            sigma2 = math.log(1 + (self.jitter_ms / self.mean_ms) ** 2)
+            ms = rng.lognormvariate(math.log(self.mean_ms) - sigma2 / 2, math.sqrt(sigma2))
+        return max(ms, 0.0) / 1000.0
+
+    @classmethod
+    def parse(cls, spec: Optional[str]) -> 'LatencyModel':
+        """``"mean[:jitter[:distribution]]"``, e.g. ``"25:10:lognormal"``"""
+        if not spec:
+            return cls()
+        parts = spec.split(':')
+        return cls(
+            mean_ms=float(parts[0]),
+            jitter_ms=float(parts[1]) if len(parts) > 1 and parts[1] else 0.0,
+            distribution=parts[2] if len(parts) > 2 and parts[2] else 'lognormal'
+        )
+
+
+@dataclass
+class SimulationConfig:
+    """Execution model knobs; the defaults fill instantly at the touch with no latency"""
+    request_latency: LatencyModel = field(default_factory=LatencyModel)
+    ack_latency: LatencyModel = field(default_factory=LatencyModel)
+    fill_latency: LatencyModel = field(default_factory=LatencyModel)
+    tick_size: float = 0.05
+    tick_sizes: Dict[str, float] = field(default_factory=dict)
+    # Align LIMIT/trigger prices to the tick before "sending", like ZerodhaIntegration does
+    align_to_tick: bool = True
+    freeze_quantities: Dict[str, int] = field(default_factory=lambda: dict(DEFAULT_FREEZE_QUANTITIES))
+    # Liquidity at the touch when a quote carries no depth (None = unlimited)
+    touch_quantity: Optional[int] = None
+    orders_per_second: int = 10
+    orders_per_minute: int = 200
+    orders_per_day: int = 3000
+    modifications_per_order: int = 25
+    seed: int = 42
+
+    @classmethod
+    def from_env(cls) -> 'SimulationConfig':
+        """Paper-trading defaults with ``SIM_*`` overrides"""
+        touch = os.getenv('SIM_TOUCH_QUANTITY')
+        return cls(
+            request_latency=LatencyModel.parse(os.getenv('SIM_REQUEST_LATENCY', '30:10')),
+            ack_latency=LatencyModel.parse(os.getenv('SIM_ACK_LATENCY', '10:5')),
+            fill_latency=LatencyModel.parse(os.getenv('SIM_FILL_LATENCY', '2:1')),
+            tick_size=float(os.getenv('SIM_TICK_SIZE', '0.05')),
+            align_to_tick=os.getenv('SIM_ALIGN_TO_TICK', 'true').lower() == 'true',
+            touch_quantity=int(touch) if touch else None,
+            seed=int(os.getenv('SIM_SEED', '42'))
+        )
+
+
+class SimulatedBroker:
+    """Kite-compatible broker simulation filling orders against a replayed or live quote stream"""
+
+    def __init__(self, initial_cash: float = 1_000_000.0, clock=None, user_id: str = 'SIMULATED',
+                 config: Optional[SimulationConfig] = None):
+        # Attributes callers probe on the real client
+        self.kite = None
+        self.access_token = 'simulated'
+        self.user_id = user_id
+        self.is_connected = True
+        self.ticker_connected = False
+        self._unified_cache: Dict[str, Any] = {}
+
+        self.clock = clock or datetime
+        self.config = config or SimulationConfig()
+        self._rng = random.Random(self.config.seed)
+        self.initial_cash = initial_cash
+        self.cash = initial_cash
+
+        self._quotes: Dict[str, Dict[str, Any]] = {}
+        # Liquidity our fills took from the current quote: symbol -> {(side, price): quantity}
+        self._consumed: Dict[str, Dict[Tuple[str, float], int]] = {}
+        self._orders: 'OrderedDict[str, Dict[str, Any]]' = OrderedDict()
+        self._history: Dict[str, List[Dict[str, Any]]] = {}
+        self._positions: Dict[str, Dict[str, Any]] = {}
+        # Live (pending, open, trigger-pending) order ids per symbol
+        self._resting: Dict[str, List[str]] = {}
+        self._order_seq = itertools.count(1)
+        self._priority_seq = itertools.count(1)
+        self._fill_listeners: List[Callable[[Dict[str, Any]], None]] = []
+
+        # Kite order-rate windows
+        self._second_window: Deque[float] = deque()
+        self._minute_window: Deque[float] = deque()
+        self._day_count = 0
+        self._day = None
+
+        self.stats = {
+            'orders_placed': 0,
+            'orders_filled': 0,
+            'orders_rejected': 0,
+            'orders_cancelled': 0,
+            'orders_modified': 0,
+            'rate_limited': 0,
+            'fills': 0,
+            'partial_fills': 0,
+            'filled_quantity': 0,
+            'turnover': 0.0
+        }
+        self.rejections: Dict[str, int] = {}
+        self.last_error: Optional[str] = None
+
+    # ------------------------------------------------------------- connection
+
+    async def initialize(self) -> bool:
+        return True
+
+    async def connect(self) -> bool:
+        return True
+
+    async def disconnect(self) -> bool:
+        return True
+
+    async def update_access_token(self, access_token: str):
+        self.access_token = access_token
+
+    async def start_websocket_for_symbols(self, symbols: List[str]) -> bool:
+        return True
+
+    def is_market_open(self) -> bool:
+        now = self.clock.now()
+        return now.weekday() < 5 and dt_time(9, 15) <= now.time() <= dt_time(15, 30)
+
+    def get_connection_status(self) -> Dict:
+        return {
+            'name': 'simulated',
+            'state': 'connected',
+            'is_connected': True,
+            'mock_mode': False,
+            'ws_connected': False,
+            'open_orders': sum(len(ids) for ids in self._resting.values())
+        }
+
+    async def get_account_info(self) -> Dict:
+        return {
+            'user_id': self.user_id,
+            'broker': 'Simulated',
+            'products': ['CNC', 'MIS', 'NRML'],
+            'order_types': ['MARKET', 'LIMIT', 'SL', 'SL-M'],
+            'last_updated': self.clock.now().isoformat(),
+            'connection_status': 'connected'
+        }
+
+    def _now_ts(self) -> float:
+        clock_time = getattr(self.clock, 'time', None)
+        if isinstance(self.clock, type) or not callable(clock_time):
+            return _time.time()
+        return clock_time()
+
+    # ---------------------------------------------------------------- quotes
+
+    def update_quotes(self, market_data: Dict[str, Dict[str, Any]]) -> int:
+        """Take the latest quotes (TrueData schema, optional Kite ``depth``) and match; returns fills"""
+        fills = 0
+        for symbol, quote in market_data.items():
+            if not isinstance(quote, dict):
+                continue
+            if quote is not self._quotes.get(symbol):
+                # Fresh quote: displayed liquidity is replenished
+                self._quotes[symbol] = quote
+                self._consumed.pop(symbol, None)
+            if self._resting.get(symbol):
+                fills += self._match(symbol)
+        return fills
+
+    def _quote(self, symbol: str) -> Optional[Dict[str, Any]]:
+        quote = self._quotes.get(symbol)
+        if quote is None and symbol.endswith('-I'):
+            quote = self._quotes.get(symbol[:-2])
+        return quote
+
+    def _ltp(self, symbol: str) -> float:
+        quote = self._quote(symbol)
+        return float(quote.get('ltp') or 0) if quote else 0.0
+
+    def get_websocket_ticks(self, symbols: List[str] = None) -> Dict[str, Any]:
+        if not symbols:
+            return dict(self._quotes)
+        return {s: self._quotes[s] for s in symbols if s in self._quotes}
+
+    async def get_quotes(self, symbols: List[str]) -> Dict[str, Dict]:
+        result = {}
+        for symbol in symbols or []:
+            quote = self._quote(symbol)
+            if not quote:
+                continue
+            result[symbol] = {
+                'last_price': quote.get('ltp', 0),
+                'ohlc': {
+                    'open': quote.get('open', 0),
+                    'high': quote.get('high', 0),
+                    'low': quote.get('low', 0),
+                    'close': quote.get('previous_close', quote.get('close', 0))
+                },
+                'volume': quote.get('volume', 0),
+                'change': quote.get('change', 0),
+                'change_percent': quote.get('change_percent', 0)
+            }
+            if quote.get('depth'):
+                result[symbol]['depth'] = quote['depth']
+        return result
+
+    def get_options_ltp_sync(self, options_symbol: str) -> Optional[float]:
+        return self._ltp(options_symbol) or None
+
+    async def get_options_ltp(self, options_symbol: str) -> Optional[float]:
+        return self.get_options_ltp_sync(options_symbol)
+
+    async def get_multiple_options_quotes(self, options_symbols: List[str]) -> Dict[str, Dict]:
+        result = {}
+        for symbol in options_symbols or []:
+            quote = self._quote(symbol)
+            if quote:
+                result[symbol] = {
+                    'ltp': float(quote.get('ltp') or 0),
+                    'volume': int(quote.get('volume') or 0),
+                    'oi': int(quote.get('oi') or 0),
+                    'bid': quote.get('bid', 0),
+                    'ask': quote.get('ask', 0)
+                }
+        return result
+
+    async def get_option_chain(self, underlying_symbol: str, expiry: str = None, strikes: int = 10) -> Dict[str, Any]:
+        # No chain data in a quote replay - callers treat an empty chain as unavailable
+        return {}
+
+    async def get_historical_data(self, symbol: str, interval: str = "5minute",
+                                  from_date: datetime = None, to_date: datetime = None,
+                                  exchange: str = "NSE") -> List[Dict]:
+        return []
+
+    async def get_intraday_candles(self, symbol: str, minutes: int = 5) -> List[Dict]:
+        return []
+
+    async def get_instruments(self, exchange: str = 'NFO') -> List[Dict]:
+        return []
+
+    # -------------------------------------------------------- options lookups
+    # Same signatures as ZerodhaIntegration; answered from today's contract specs, falling
+    # back to the option symbols present in the simulated quotes
+
+    @staticmethod
+    def _contract_specs():
+        from src.core.contract_specs import contract_specs
+        return contract_specs
+
+    def _quoted_symbols(self) -> List[str]:
+        return list(self._quotes)
+
+    def _quoted_strikes(self, underlying_symbol: str, expiry: str) -> List[int]:
+        pattern = re.compile(rf"^{re.escape(underlying_symbol.upper())}{re.escape(expiry.upper())}(\d+)(CE|PE)$")
+        return sorted({int(m.group(1)) for m in map(pattern.match, self._quoted_symbols()) if m})
+
+    async def validate_options_symbol(self, options_symbol: str) -> bool:
+        symbol = (options_symbol or '').upper()
+        underlying = re.match(r'^([A-Z&-]+?)\d{2}', symbol)
+        listed = self._contract_specs().has_symbol(symbol, underlying.group(1)) if underlying else None
+        if listed is not None:
+            return listed
+        return self._quote(symbol) is not None
+
+    async def get_available_expiries_for_symbol(self, underlying_symbol: str, exchange: str = "NFO") -> List[Dict]:
+        return self._contract_specs().get_expiries(underlying_symbol)
+
+    async def get_available_strikes_for_symbol(self, underlying_symbol: str, expiry: str) -> List[int]:
+        specs = self._contract_specs()
+        expiry_date = specs.resolve_expiry(underlying_symbol, expiry)
+        if expiry_date is not None:
+            return [int(strike) for strike in specs.get_strikes(underlying_symbol, expiry_date)
+                    if float(strike).is_integer()]
+        return self._quoted_strikes(underlying_symbol, expiry)
+
+    async def find_closest_available_strike(self, underlying_symbol: str, target_strike: int, expiry: str,
+                                            option_type: str = 'CE') -> Optional[int]:
+        strikes = await self.get_available_strikes_for_symbol(underlying_symbol, expiry)
+        return min(strikes, key=lambda strike: abs(strike - target_strike)) if strikes else None
+
+    async def get_nearby_atm_options_ltp(self, underlying_symbol: str, atm_strike: int, expiry: str,
+                                         option_type: str = 'CE', band: int = 2) -> Dict[str, float]:
+        interval = self._contract_specs().get_strike_interval(underlying_symbol) or 50
+        candidates = [f"{underlying_symbol}{expiry}{int(atm_strike + k * interval)}{option_type}"
+                      for k in range(-band, band + 1) if atm_strike + k * interval > 0]
+        quotes = await self.get_multiple_options_quotes(candidates)
+        return {symbol: data['ltp'] for symbol, data in quotes.items() if data.get('ltp', 0) > 0}
+
+    async def get_options_volume(self, options_symbol: str) -> Optional[int]:
+        quote = self._quote(options_symbol)
+        if not quote:
+            return None
+        return int(quote.get('volume') or 0) or None
+
+    async def calculate_atr_from_zerodha(self, symbol: str, period: int = 14) -> float:
+        """ATR over daily candles, as the real client computes it; 0.0 without enough history"""
+        candles = await self.get_historical_data(symbol, interval='day')
+        if len(candles) <= period:
+            return 0.0
+        true_ranges = [max(c['high'] - c['low'], abs(c['high'] - p['close']), abs(c['low'] - p['close']))
+                       for p, c in zip(candles, candles[1:])]
+        return sum(true_ranges[-period:]) / period
+
+    # ------------------------------------------------------------ rate limits
+
+    def _rate_limit_error(self) -> Optional[str]:
+        """Kite order-placement limits; consumes a slot when allowed"""
+        now = self._now_ts()
+        day = self.clock.now().date()
+        if day != self._day:
+            self._day, self._day_count = day, 0
+        while self._second_window and now - self._second_window[0] >= 1.0:
+            self._second_window.popleft()
+        while self._minute_window and now - self._minute_window[0] >= 60.0:
+            self._minute_window.popleft()
+
+        if self._day_count >= self.config.orders_per_day:
+            return 'Maximum allowed order requests exceeded'
+        if (len(self._second_window) >= self.config.orders_per_second
+                or len(self._minute_window) >= self.config.orders_per_minute):
+            return 'Too many requests'
+        self._second_window.append(now)
+        self._minute_window.append(now)
+        self._day_count += 1
+        return None
+
+    def _kite_error(self, message: str, kind: str) -> None:
+        # No order is created - the real client logs the exception and returns None
+        self.stats['rate_limited'] += 1
+        self.rejections[kind] = self.rejections.get(kind, 0) + 1
+        self.last_error = message
+        logger.error(f"❌ SIM order request failed: {message}")
+
+    async def _round_trip(self):
+        delay = self.config.request_latency.sample(self._rng)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    # ---------------------------------------------------------------- orders
+
+    def _tick_size(self, symbol: str) -> float:
+        return self.config.tick_sizes.get(symbol, self.config.tick_size)
+
+    def _freeze_quantity(self, symbol: str) -> Optional[int]:
+        if not _is_derivative(symbol):
+            return None
+        upper = symbol.upper()
+        # Longest underlying first so NIFTYNXT50 is not read as NIFTY
+        for underlying in sorted(self.config.freeze_quantities, key=len, reverse=True):
+            if upper.startswith(underlying):
+                return self.config.freeze_quantities[underlying]
+        return None
+
+    def _new_order(self, order_params: Dict) -> Dict[str, Any]:
+        symbol = order_params.get('symbol') or order_params.get('tradingsymbol', '')
+        action = (order_params.get('action') or order_params.get('transaction_type')
+                  or order_params.get('side') or 'BUY').upper()
+        order_type = (order_params.get('order_type') or 'MARKET').upper()
+        quantity = int(order_params.get('quantity') or 0)
+        price = float(order_params.get('price') or order_params.get('entry_price') or 0) \
+            if order_type in ('LIMIT', 'SL') else 0.0
+        trigger_price = float(order_params.get('trigger_price') or 0)
+        if self.config.align_to_tick:
+            tick = self._tick_size(symbol)
+            price = _align_to_tick(price, tick, action)
+            trigger_price = _align_to_tick(trigger_price, tick, action, mode='nearest')
+        now = self.clock.now().replace(tzinfo=None)
+        return {
+            'order_id': f"SIM{next(self._order_seq):010d}",
+            'exchange_order_id': None,
+            'status': OPEN_PENDING,
+            'status_message': None,
+            'tradingsymbol': symbol,
+            'exchange': order_params.get('exchange') or ('NFO' if _is_derivative(symbol) else 'NSE'),
+            'transaction_type': action,
+            'order_type': order_type,
+            'product': order_params.get('product', 'MIS'),
+            'validity': order_params.get('validity', 'DAY'),
+            'quantity': quantity,
+            'filled_quantity': 0,
+            'pending_quantity': quantity,
+            'cancelled_quantity': 0,
+            'price': price,
+            'trigger_price': trigger_price,
+            'average_price': 0.0,
+            'tag': order_params.get('tag'),
+            'order_timestamp': now,
+            'exchange_timestamp': None,
+            # Simulation state (not part of the Kite order shape)
+            '_priority': next(self._priority_seq),
+            '_ack_at': 0.0,
+            '_eligible_at': 0.0,
+            '_modifications': 0
+        }
+
+    def _reject(self, order: Dict[str, Any], reason: str, kind: str = 'validation') -> None:
+        order['status'] = REJECTED
+        order['status_message'] = reason
+        order['pending_quantity'] = 0
+        self.stats['orders_rejected'] += 1
+        self.rejections[kind] = self.rejections.get(kind, 0) + 1
+        self.last_error = reason
+        self._snapshot(order)
+        logger.warning(f"🚫 SIM REJECTED {order['tradingsymbol']} {order['transaction_type']} "
+                       f"x{order['quantity']}: {reason}")
+
+    def _price_error(self, order: Dict[str, Any]) -> Optional[str]:
+        tick = self._tick_size(order['tradingsymbol'])
+        for key, label in (('price', 'price'), ('trigger_price', 'trigger price')):
+            if order[key] and not _on_tick(order[key], tick):
+                return (f"Tick size for this script is {tick}. Kindly enter {label} in the "
+                        f"multiple of tick size for this script")
+        return None
+
+    def _validate(self, order: Dict[str, Any]) -> Optional[Tuple[str, str]]:
+        """(kind, reason) for the first failed check, or None"""
+        if not order['tradingsymbol']:
+            return 'validation', 'Missing symbol'
+        if order['quantity'] <= 0:
+            return 'validation', f"Invalid quantity: {order['quantity']}"
+        if order['transaction_type'] not in ('BUY', 'SELL'):
+            return 'validation', f"Invalid transaction type: {order['transaction_type']}"
+        if order['order_type'] not in ('MARKET', 'LIMIT', 'SL', 'SL-M'):
+            return 'validation', f"Invalid order type: {order['order_type']}"
+        if order['order_type'] in ('LIMIT', 'SL') and order['price'] <= 0:
+            return 'validation', 'Price required for LIMIT/SL orders'
+        if order['order_type'] in ('SL', 'SL-M') and order['trigger_price'] <= 0:
+            return 'validation', 'Trigger price required for SL orders'
+        price_error = self._price_error(order)
+        if price_error:
+            return 'tick_size', price_error
+        freeze = self._freeze_quantity(order['tradingsymbol'])
+        if freeze is not None and order['quantity'] > freeze:
+            return 'freeze_quantity', (f"Quantity {order['quantity']} exceeds the freeze quantity of {freeze}. "
+                                       f"Split the order or use iceberg")
+        if self._quote(order['tradingsymbol']) is None:
+            return 'no_quote', f"No quote for {order['tradingsymbol']}"
+        return None
+
+    async def place_order(self, order_params: Dict) -> Optional[str]:
+        """Place an order; returns the order id, or None if it failed or was rejected (like the real client)"""
+        limited = self._rate_limit_error()
+        if limited:
+            self._kite_error(limited, 'rate_limit')
+            return None
+        await self._round_trip()
+
+        order = self._new_order(order_params)
+        self._orders[order['order_id']] = order
+        self.stats['orders_placed'] += 1
+        failure = self._validate(order)
+        if failure:
+            self._reject(order, failure[1], failure[0])
+            return None
+
+        now = self._now_ts()
+        order['_ack_at'] = now + self.config.ack_latency.sample(self._rng)
+        order['_eligible_at'] = order['_ack_at'] + self.config.fill_latency.sample(self._rng)
+        symbol = self._book_symbol(order['tradingsymbol'])
+        self._resting.setdefault(symbol, []).append(order['order_id'])
+        self._snapshot(order)
+        self._match(symbol)
+        return order['order_id']
+
+    async def modify_order(self, order_id: str, order_params: Dict) -> Dict:
+        order = self._orders.get(order_id)
+        if order is None or order['status'] not in LIVE_STATUSES:
+            return {}
+        if order['_modifications'] >= self.config.modifications_per_order:
+            self._kite_error('Maximum allowed order modifications exceeded', 'modification_limit')
+            return {}
+        await self._round_trip()
+        if order['status'] not in LIVE_STATUSES:
+            # Filled or cancelled while the request was in flight
+            return {}
+
+        previous = {key: order[key] for key in ('price', 'trigger_price', 'order_type', 'quantity')}
+        tick = self._tick_size(order['tradingsymbol'])
+        for key, mode in (('price', 'conservative'), ('trigger_price', 'nearest')):
+            if order_params.get(key) is not None:
+                value = float(order_params[key])
+                order[key] = _align_to_tick(value, tick, order['transaction_type'], mode) \
+                    if self.config.align_to_tick else value
+        if order_params.get('order_type'):
+            order['order_type'] = order_params['order_type'].upper()
+        price_error = self._price_error(order)
+        quantity = int(order_params.get('quantity') or order['quantity'])
+        if price_error or quantity < order['filled_quantity']:
+            order.update(previous)
+            self.last_error = price_error or f"Quantity below filled quantity {order['filled_quantity']}"
+            return {}
+        order['quantity'] = quantity
+        order['pending_quantity'] = quantity - order['filled_quantity']
+        # A new price or a larger size goes to the back of the queue
+        if order['price'] != previous['price'] or order['quantity'] > previous['quantity']:
+            order['_priority'] = next(self._priority_seq)
+        order['_modifications'] += 1
+        self.stats['orders_modified'] += 1
+        self._snapshot(order)
+        self._match(self._book_symbol(order['tradingsymbol']))
+        return {'order_id': order_id}
+
+    async def cancel_order(self, order_id: str) -> bool:
+        order = self._orders.get(order_id)
+        if order is None or order['status'] not in LIVE_STATUSES:
+            return False
+        await self._round_trip()
+        if order['status'] not in LIVE_STATUSES:
+            return False
+        order['status'] = CANCELLED
+        order['cancelled_quantity'] = order['pending_quantity']
+        order['pending_quantity'] = 0
+        self._unrest(order)
+        self.stats['orders_cancelled'] += 1
+        self._snapshot(order)
+        return True
+
+    async def get_order_status(self, order_id: str) -> Optional[List[Dict]]:
+        self._advance_all()
+        history = self._history.get(order_id)
+        return [dict(entry) for entry in history] if history else None
+
+    def get_orders_sync(self) -> list:
+        self._advance_all()
+        return [self._public(order) for order in self._orders.values()]
+
+    async def get_orders(self) -> List[Dict]:
+        return self.get_orders_sync()
+
+    @staticmethod
+    def _public(order: Dict[str, Any]) -> Dict[str, Any]:
+        return {k: v for k, v in order.items() if not k.startswith('_')}
+
+    def _snapshot(self, order: Dict[str, Any]):
+        self._history.setdefault(order['order_id'], []).append(self._public(order))
+
+    def _book_symbol(self, symbol: str) -> str:
+        if symbol not in self._quotes and symbol.endswith('-I') and symbol[:-2] in self._quotes:
+            return symbol[:-2]
+        return symbol
+
+    def _unrest(self, order: Dict[str, Any]):
+        resting = self._resting.get(self._book_symbol(order['tradingsymbol']))
+        if resting and order['order_id'] in resting:
+            resting.remove(order['order_id'])
+
+    # -------------------------------------------------------------- matching
+
+    def _advance(self, symbol: str, now: float):
+        """Acknowledge orders whose ack latency has elapsed"""
+        for order_id in self._resting.get(symbol, ()):
+            order = self._orders[order_id]
+            if order['status'] == OPEN_PENDING and order['_ack_at'] <= now:
+                order['status'] = TRIGGER_PENDING if order['order_type'] in ('SL', 'SL-M') else OPEN
+                order['exchange_order_id'] = f"X{order['order_id'][3:]}"
+                self._snapshot(order)
+
+    def _advance_all(self):
+        now = self._now_ts()
+        for symbol in list(self._resting):
+            if self._resting[symbol]:
+                self._match(symbol, now)
+
+    @staticmethod
+    def _triggered(order: Dict[str, Any], ltp: float) -> bool:
+        if order['transaction_type'] == 'BUY':
+            return ltp >= order['trigger_price']
+        return 0 < ltp <= order['trigger_price']
+
+    def _levels(self, symbol: str, action: str) -> List[List[Any]]:
+        """Opposite-side liquidity as [price, remaining], best first; remaining None is unlimited"""
+        quote = self._quotes[symbol]
+        side = 'sell' if action == 'BUY' else 'buy'
+        levels = []
+        for level in (quote.get('depth') or {}).get(side) or ():
+            price = float(level.get('price') or 0)
+            quantity = int(level.get('quantity') or 0)
+            if price > 0 and quantity > 0:
+                levels.append((price, quantity))
+        if not levels:
+            ltp = float(quote.get('ltp') or 0)
+            touch = float(quote.get('ask' if action == 'BUY' else 'bid') or 0) or ltp
+            if touch <= 0:
+                return []
+            levels = [(touch, self.config.touch_quantity)]
+        levels.sort(key=lambda level: level[0], reverse=(action == 'SELL'))
+        consumed = self._consumed.get(symbol, {})
+        return [[price, None if quantity is None else quantity - consumed.get((side, price), 0)]
+                for price, quantity in levels]
+
+    @staticmethod
+    def _priority_key(order: Dict[str, Any]):
+        """Best price first (MARKET ahead of any limit), then time"""
+        if order['transaction_type'] == 'BUY':
+            price = math.inf if order['order_type'] == 'MARKET' else order['price']
+            return -price, order['_priority']
+        price = -math.inf if order['order_type'] == 'MARKET' else order['price']
+        return price, order['_priority']
+
+    def _match(self, symbol: str, now: Optional[float] = None) -> int:
+        """Match live orders on ``symbol`` against its current quote in price-time priority"""
+        now = self._now_ts() if now is None else now
+        self._advance(symbol, now)
+        quote = self._quotes.get(symbol)
+        if quote is None:
+            return 0
+        ltp = float(quote.get('ltp') or 0)
+
+        eligible = {'BUY': [], 'SELL': []}
+        for order_id in self._resting.get(symbol, ()):
+            order = self._orders[order_id]
+            if order['status'] == OPEN_PENDING or order['_eligible_at'] > now:
+                continue
+            if order['status'] == TRIGGER_PENDING:
+                if not self._triggered(order, ltp):
+                    continue
+                order['status'] = OPEN
+                order['order_type'] = 'MARKET' if order['order_type'] == 'SL-M' else 'LIMIT'
+                self._snapshot(order)
+            eligible[order['transaction_type']].append(order)
+
+        fills = 0
+        for action, orders in eligible.items():
+            if not orders:
+                continue
+            orders.sort(key=self._priority_key)
+            side = 'sell' if action == 'BUY' else 'buy'
+            levels = self._levels(symbol, action)
+            consumed = self._consumed.setdefault(symbol, {})
+            for order in orders:
+                for level in levels:
+                    price, remaining = level
+                    if order['pending_quantity'] == 0:
+                        break
+                    if order['order_type'] != 'MARKET' and (
+                            price > order['price'] if action == 'BUY' else price < order['price']):
+                        break
+                    if remaining is not None and remaining <= 0:
+                        continue
+                    quantity = order['pending_quantity'] if remaining is None else min(order['pending_quantity'], remaining)
+                    self._fill(order, quantity, price)
+                    fills += 1
+                    if remaining is not None:
+                        level[1] = remaining - quantity
+                        consumed[(side, price)] = consumed.get((side, price), 0) + quantity
+                if order['status'] != OPEN:
+                    self._unrest(order)
+        return fills
+
+    def _fill(self, order: Dict[str, Any], quantity: int, price: float):
+        filled = order['filled_quantity']
+        order['average_price'] = (order['average_price'] * filled + price * quantity) / (filled + quantity)
+        order['filled_quantity'] = filled + quantity
+        order['pending_quantity'] -= quantity
+        order['exchange_timestamp'] = self.clock.now().replace(tzinfo=None)
+        self._apply_position(order, quantity, price)
+        self.stats['fills'] += 1
+        self.stats['filled_quantity'] += quantity
+        self.stats['turnover'] += quantity * price
+        if order['pending_quantity'] == 0:
+            order['status'] = COMPLETE
+            self.stats['orders_filled'] += 1
+            self._on_complete(order)
+        else:
+            self.stats['partial_fills'] += 1
+        self._snapshot(order)
+
+    def _on_complete(self, order: Dict[str, Any]):
+        """Report the fill the way the Kite postback does"""
+        try:
+            from src.core.execution_analytics import execution_analytics
+            execution_analytics.record_fill(order['order_id'], order['average_price'])
+        except Exception as e:
+            logger.debug(f"Execution analytics fill hook failed: {e}")
+        for listener in self._fill_listeners:
+            try:
+                listener(self._public(order))
+            except Exception as e:
+                logger.debug(f"Fill listener error: {e}")
+
+    def add_fill_listener(self, listener: Callable[[Dict[str, Any]], None]):
+        """Register a callback invoked with a copy of each completed order"""
+        if listener not in self._fill_listeners:
+            self._fill_listeners.append(listener)
+
+    # ------------------------------------------------------------- positions
+
+    def _apply_position(self, order: Dict[str, Any], quantity: int, price: float):
+        symbol = order['tradingsymbol']
+        position = self._positions.get(symbol)
+        if position is None:
+            position = self._positions[symbol] = {
+                'tradingsymbol': symbol, 'exchange': order['exchange'], 'product': order['product'],
+                'quantity': 0, 'average_price': 0.0, 'realised': 0.0,
+                'buy_quantity': 0, 'buy_value': 0.0, 'sell_quantity': 0, 'sell_value': 0.0
+            }
+        signed = quantity if order['transaction_type'] == 'BUY' else -quantity
+        if order['transaction_type'] == 'BUY':
+            position['buy_quantity'] += quantity
+            position['buy_value'] += quantity * price
+        else:
+            position['sell_quantity'] += quantity
+            position['sell_value'] += quantity * price
+
+        held = position['quantity']
+        if held == 0 or (held > 0) == (signed > 0):
+            # Opening or adding: blend the average price
+            total = abs(held) + quantity
+            position['average_price'] = (position['average_price'] * abs(held) + price * quantity) / total
+            position['quantity'] = held + signed
+            return
+
+        # Reducing, closing or flipping
+        closed = min(abs(held), quantity)
+        direction = 1 if held > 0 else -1
+        realised = (price - position['average_price']) * closed * direction
+        position['realised'] += realised
+        self.cash += realised
+        position['quantity'] = held + signed
+        if position['quantity'] == 0:
+            position['average_price'] = 0.0
+        elif (position['quantity'] > 0) != (held > 0):
+            position['average_price'] = price
+
+    def _position_view(self, position: Dict[str, Any]) -> Dict[str, Any]:
+        quantity = position['quantity']
+        last_price = self._ltp(position['tradingsymbol']) or position['average_price']
+        unrealised = (last_price - position['average_price']) * quantity if quantity else 0.0
+        view = dict(position)
+        view.update({
+            'last_price': last_price,
+            'unrealised': unrealised,
+            'pnl': position['realised'] + unrealised,
+            'm2m': position['realised'] + unrealised,
+            'buy_price': position['buy_value'] / position['buy_quantity'] if position['buy_quantity'] else 0.0,
+            'sell_price': position['sell_value'] / position['sell_quantity'] if position['sell_quantity'] else 0.0,
+            'value': position['sell_value'] - position['buy_value']
+        })
+        return view
+
+    def get_positions_sync(self) -> Dict:
+        net = [self._position_view(p) for p in self._positions.values()]
+        return {'net': net, 'day': [dict(p) for p in net]}
+
+    async def get_positions(self) -> Dict:
+        return self.get_positions_sync()
+
+    async def get_holdings(self) -> Dict:
+        return {}
+
+    # --------------------------------------------------------------- margins
+
+    def get_required_margin_for_order(self, symbol: str, quantity: int, order_type: str = 'BUY',
+                                      product: str = 'MIS') -> float:
+        price = self._ltp(symbol)
+        if _is_option(symbol) and order_type.upper() == 'BUY':
+            return price * quantity
+        return price * quantity * (MIS_MARGIN_FRACTION if product == 'MIS' else 1.0)
+
+    def _utilised(self) -> float:
+        return sum(
+            abs(p['quantity']) * (p['average_price'] if _is_option(p['tradingsymbol']) and p['quantity'] > 0
+                                  else p['average_price'] * MIS_MARGIN_FRACTION)
+            for p in self._positions.values() if p['quantity']
+        )
+
+    def get_margins_sync(self) -> float:
+        unrealised = sum(self._position_view(p)['unrealised'] for p in self._positions.values() if p['quantity'])
+        return self.cash + unrealised - self._utilised()
+
+    async def get_margins(self) -> Dict:
+        utilised = self._utilised()
+        available = self.get_margins_sync()
+        return {
+            'equity': {
+                'enabled': True,
+                'net': available,
+                'available': {'cash': self.cash, 'live_balance': available, 'opening_balance': self.initial_cash},
+                'utilised': {'debits': utilised, 'span': 0.0, 'exposure': utilised}
+            }
+        }
+
+    async def get_wallet_balance(self) -> float:
+        return self.get_margins_sync()
+
+    # ----------------------------------------------------------------- stats
+
+    def get_pnl(self) -> Dict[str, float]:
+        views = [self._position_view(p) for p in self._positions.values()]
+        realised = sum(v['realised'] for v in views)
+        unrealised = sum(v['unrealised'] for v in views)
+        return {'realised': realised, 'unrealised': unrealised, 'total': realised + unrealised}
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            'open_orders': sum(len(ids) for ids in self._resting.values()),
+            'positions': sum(1 for p in self._positions.values() if p['quantity']),
+            'symbols_quoted': len(self._quotes),
+            'rejections': dict(self.rejections),
+            'pnl': self.get_pnl()
+        }
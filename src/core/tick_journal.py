@@ -0,0 +1,496 @@
+"""
+Tick Journal
+============
+Append-only, memory-mapped journal of every live tick, with replay.
+
+- Fixed 104-byte little-endian records (``RECORD``) written with ``struct.pack_into``
+  straight into an mmap of the current segment; the file grows in ``GROW_BYTES`` steps
+- Symbols are interned: the first tick of a symbol in a segment is preceded by a
+  symbol-definition record, so every segment is self-describing
+- One segment per IST trading day (``ticks-YYYYMMDD.tj``); a segment is trimmed and
+  gzip-compressed in the background once the day rolls over
+- ``TickJournalReader`` iterates plain or compressed segments and can ``replay`` a
+  session at N× speed into a ``live_market_data``-style dict (TrueData schema), which
+  is the same interface the trading loop reads market data from
+"""
+
+import asyncio
+import gzip
+import logging
+import mmap
+import os
+import shutil
+import struct
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional, Tuple
+
+import pytz
+
+logger = logging.getLogger(__name__)
+
+IST = pytz.timezone('Asia/Kolkata')
+
+MAGIC = b'TJNL'
+VERSION = 1
+
+# magic, version, record size, session date (YYYYMMDD), created ns, record count
+HEADER = struct.Struct('<4sHH8sqq')
+HEADER_SIZE = 64
+COUNT_OFFSET = 24
+
+# ts_ns, symbol id, kind, source,
+# ltp, bid, ask, open, high, low, previous close, change %,
+# volume, oi, oi change
+RECORD = struct.Struct('<qIHH8d3q')
+RECORD_SIZE = RECORD.size
+SYMBOL_DEF = struct.Struct('<qIHH')
+MAX_SYMBOL_BYTES = RECORD_SIZE - SYMBOL_DEF.size
+
+KIND_TICK = 0
+KIND_SYMBOL = 1
+
+SOURCES = {'truedata': 1, 'zerodha': 2, 'replay': 3}
+SOURCE_NAMES = {code: name for name, code in SOURCES.items()}
+
+GROW_BYTES = 4 * 1024 * 1024
+
+SEGMENT_SUFFIX = '.tj'
+COMPRESSED_SUFFIX = '.tj.gz'
+
+
+def _num(value) -> float:
+    try:
+        return float(value or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _session_bounds(ts_ns: int) -> Tuple[str, int]:
+    """IST session date (YYYYMMDD) of a timestamp and the ns timestamp of the next IST midnight"""
+    day = datetime.fromtimestamp(ts_ns / 1e9, IST).date()
+    next_midnight = IST.localize(datetime.combine(day + timedelta(days=1), datetime.min.time()))
+    return day.strftime('%Y%m%d'), int(next_midnight.timestamp() * 1e9)
+
+
+def segment_path(directory: str, session: str, compressed: bool = False) -> str:
+    return os.path.join(directory, f"ticks-{session}{COMPRESSED_SUFFIX if compressed else SEGMENT_SUFFIX}")
+
+
+def list_segments(directory: str) -> Dict[str, str]:
+    """Map session date -> segment path, preferring the uncompressed file if both exist"""
+    segments: Dict[str, str] = {}
+    if not os.path.isdir(directory):
+        return segments
+    for name in sorted(os.listdir(directory)):
+        if not name.startswith('ticks-'):
+            continue
+        if name.endswith(COMPRESSED_SUFFIX):
+            segments.setdefault(name[6:-len(COMPRESSED_SUFFIX)], os.path.join(directory, name))
+        elif name.endswith(SEGMENT_SUFFIX):
+            segments[name[6:-len(SEGMENT_SUFFIX)]] = os.path.join(directory, name)
+    return segments
+
+
+class _Segment:
+    """One open, memory-mapped day segment"""
+
+    def __init__(self, path: str, session: str):
+        self.path = path
+        self.session = session
+        self.symbol_ids: Dict[str, int] = {}
+        exists = os.path.exists(path) and os.path.getsize(path) >= HEADER_SIZE
+        self.fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        if not exists:
+            os.ftruncate(self.fd, HEADER_SIZE + GROW_BYTES)
+        self.size = os.fstat(self.fd).st_size
+        self.mm = mmap.mmap(self.fd, self.size)
+        if exists:
+            self._recover()
+        else:
+            HEADER.pack_into(self.mm, 0, MAGIC, VERSION, RECORD_SIZE, session.encode(), time.time_ns(), 0)
+            self.count = 0
+
+    def _recover(self):
+        """Reopen a segment after a restart: rebuild the symbol table and find the end"""
+        magic, version, record_size, _, _, count = HEADER.unpack_from(self.mm, 0)
+        if magic != MAGIC or record_size != RECORD_SIZE:
+            raise ValueError(f"{self.path} is not a v{VERSION} tick journal segment")
+        capacity = (self.size - HEADER_SIZE) // RECORD_SIZE
+        # The count is written after each record, so a crash can only leave it short
+        while count < capacity and SYMBOL_DEF.unpack_from(self.mm, HEADER_SIZE + count * RECORD_SIZE)[0] != 0:
+            count += 1
+        self.count = count
+        for index in range(count):
+            offset = HEADER_SIZE + index * RECORD_SIZE
+            _, symbol_id, kind, _ = SYMBOL_DEF.unpack_from(self.mm, offset)
+            if kind == KIND_SYMBOL:
+                raw = self.mm[offset + SYMBOL_DEF.size:offset + RECORD_SIZE]
+                self.symbol_ids[raw.rstrip(b'\x00').decode('utf-8', 'replace')] = symbol_id
+        logger.info(f"📼 Tick journal resumed {os.path.basename(self.path)} at record {count}")
+
+    def reserve(self) -> int:
+        """Offset for the next record, growing the mapping when full"""
+        offset = HEADER_SIZE + self.count * RECORD_SIZE
+        if offset + RECORD_SIZE > self.size:
+            self.mm.flush()
+            self.mm.close()
+            self.size += GROW_BYTES
+            os.ftruncate(self.fd, self.size)
+            self.mm = mmap.mmap(self.fd, self.size)
+        return offset
+
+    def commit(self):
+        self.count += 1
+        struct.pack_into('<q', self.mm, COUNT_OFFSET, self.count)
+
+    def close(self):
+        """Flush and trim the preallocated tail"""
+        self.mm.flush()
+        self.mm.close()
+        os.ftruncate(self.fd, HEADER_SIZE + self.count * RECORD_SIZE)
+        os.close(self.fd)
+
+
+def compress_segment(path: str) -> str:
+    """gzip a closed segment next to itself and remove the original"""
+    target = path[:-len(SEGMENT_SUFFIX)] + COMPRESSED_SUFFIX
+    partial = target + '.part'
+    with open(path, 'rb') as src, gzip.open(partial, 'wb', compresslevel=6) as dst:
+        shutil.copyfileobj(src, dst, 1024 * 1024)
+    os.replace(partial, target)
+    os.remove(path)
+    return target
+
+
+class TickJournal:
+    """Thread-safe append-only tick writer (TrueData workers and the Kite ticker are threads)"""
+
+    def __init__(self, directory: str, enabled: bool = True, compress: bool = True):
+        self.directory = directory
+        self.enabled = enabled
+        self.compress = compress
+        self._lock = threading.Lock()
+        self._segment: Optional[_Segment] = None
+        self._segment_end_ns = 0
+        self._started = False
+        self.records = 0
+        self.errors = 0
+        self.rotations = 0
+
+    # ----------------------------------------------------------------- segments
+
+    def _start(self):
+        os.makedirs(self.directory, exist_ok=True)
+        self._started = True
+        if self.compress:
+            # Segments left uncompressed by a previous run (crash or restart across midnight)
+            today = _session_bounds(time.time_ns())[0]
+            stale = [path for session, path in list_segments(self.directory).items()
+                     if session < today and path.endswith(SEGMENT_SUFFIX)]
+            for path in stale:
+                self._compress_async(path)
+
+    def _open_segment(self, ts_ns: int):
+        if not self._started:
+            self._start()
+        session, self._segment_end_ns = _session_bounds(ts_ns)
+        path = segment_path(self.directory, session)
+        self._segment = _Segment(path, session)
+        logger.info(f"📼 Tick journal segment opened: {path}")
+
+    def _rotate(self, ts_ns: int):
+        closed = self._segment
+        self._segment = None
+        if closed is not None:
+            closed.close()
+            self.rotations += 1
+            if self.compress:
+                self._compress_async(closed.path)
+        self._open_segment(ts_ns)
+
+    def _compress_async(self, path: str):
+        def run():
+            try:
+                target = compress_segment(path)
+                logger.info(f"📼 Tick journal segment compressed: {target}")
+            except Exception as e:
+                logger.error(f"❌ Tick journal compression failed for {path}: {e}")
+
+        threading.Thread(target=run, name='tick-journal-compress', daemon=True).start()
+
+    def _symbol_id(self, segment: _Segment, symbol: str, ts_ns: int, source: int) -> int:
+        symbol_id = segment.symbol_ids.get(symbol)
+        if symbol_id is None:
+            symbol_id = len(segment.symbol_ids)
+            offset = segment.reserve()
+            SYMBOL_DEF.pack_into(segment.mm, offset, ts_ns, symbol_id, KIND_SYMBOL, source)
+            segment.mm[offset + SYMBOL_DEF.size:offset + RECORD_SIZE] = \
+                symbol.encode('utf-8')[:MAX_SYMBOL_BYTES].ljust(MAX_SYMBOL_BYTES, b'\x00')
+            segment.commit()
+            segment.symbol_ids[symbol] = symbol_id
+        return symbol_id
+
+    # ------------------------------------------------------------------ writes
+
+    def append(self, symbol: str, ltp: float, bid: float = 0.0, ask: float = 0.0,
+               open_price: float = 0.0, high: float = 0.0, low: float = 0.0,
+               previous_close: float = 0.0, change_percent: float = 0.0,
+               volume: int = 0, oi: int = 0, oi_change: int = 0,
+               source: str = 'truedata', ts_ns: Optional[int] = None) -> bool:
+        """Append one tick; never raises into the tick path"""
+        if not self.enabled:
+            return False
+        ts_ns = ts_ns or time.time_ns()
+        source_code = SOURCES.get(source, 0)
+        try:
+            with self._lock:
+                if self._segment is None or ts_ns >= self._segment_end_ns:
+                    self._rotate(ts_ns)
+                segment = self._segment
+                symbol_id = self._symbol_id(segment, symbol, ts_ns, source_code)
+                # reserve() may remap, so take the offset before touching segment.mm
+                offset = segment.reserve()
+                RECORD.pack_into(segment.mm, offset, ts_ns, symbol_id, KIND_TICK, source_code,
+                                 ltp, bid, ask, open_price, high, low, previous_close, change_percent,
+                                 int(volume), int(oi), int(oi_change))
+                segment.commit()
+                self.records += 1
+            return True
+        except Exception as e:
+            self.errors += 1
+            if self.errors <= 5 or self.errors % 1000 == 0:
+                logger.error(f"❌ Tick journal write failed ({self.errors} errors): {e}")
+            return False
+
+    def record(self, symbol: str, data: Dict[str, Any], source: str = 'truedata') -> bool:
+        """Append a TrueData-schema market data dict"""
+        if not self.enabled:
+            return False
+        return self.append(
+            symbol, _num(data.get('ltp')), _num(data.get('bid')), _num(data.get('ask')),
+            _num(data.get('open')), _num(data.get('high')), _num(data.get('low')),
+            _num(data.get('previous_close', data.get('close'))), _num(data.get('change_percent')),
+            _num(data.get('volume')), _num(data.get('oi')), _num(data.get('oi_change')),
+            source=source
+        )
+
+    def record_kite_ticks(self, ticks: List[Dict], token_to_symbol: Dict[int, str]) -> int:
+        """Append a batch of raw Kite WebSocket ticks"""
+        if not self.enabled:
+            return 0
+        written = 0
+        for tick in ticks:
+            token = tick.get('instrument_token')
+            if not token:
+                continue
+            ltp = _num(tick.get('last_price'))
+            ohlc = tick.get('ohlc') or {}
+            previous_close = _num(ohlc.get('close'))
+            depth = tick.get('depth') or {}
+            buy = depth.get('buy') or [{}]
+            sell = depth.get('sell') or [{}]
+            written += self.append(
+                token_to_symbol.get(token) or f"TOKEN_{token}", ltp,
+                _num(buy[0].get('price')), _num(sell[0].get('price')),
+                _num(ohlc.get('open')), _num(ohlc.get('high')), _num(ohlc.get('low')), previous_close,
+                ((ltp - previous_close) / previous_close * 100) if previous_close > 0 else 0.0,
+                _num(tick.get('volume_traded', tick.get('volume'))), _num(tick.get('oi')),
+                source='zerodha'
+            )
+        return written
+
+    def close(self):
+        """Close the current segment (it is compressed on the next rotation or restart)"""
+        with self._lock:
+            if self._segment is not None:
+                self._segment.close()
+                self._segment = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        segment = self._segment
+        return {
+            'enabled': self.enabled,
+            'directory': self.directory,
+            'current_segment': segment.path if segment else None,
+            'segment_records': segment.count if segment else 0,
+            'segment_symbols': len(segment.symbol_ids) if segment else 0,
+            'records_written': self.records,
+            'rotations': self.rotations,
+            'errors': self.errors
+        }
+
+
+class TickRecord:
+    __slots__ = ('ts_ns', 'symbol', 'source', 'ltp', 'bid', 'ask', 'open', 'high', 'low',
+                 'previous_close', 'change_percent', 'volume', 'oi', 'oi_change')
+
+    def __init__(self, ts_ns, symbol, source, ltp, bid, ask, open_price, high, low,
+                 previous_close, change_percent, volume, oi, oi_change):
+        self.ts_ns = ts_ns
+        self.symbol = symbol
+        self.source = source
+        self.ltp = ltp
+        self.bid = bid
+        self.ask = ask
+        self.open = open_price
+        self.high = high
+        self.low = low
+        self.previous_close = previous_close
+        self.change_percent = change_percent
+        self.volume = volume
+        self.oi = oi
+        self.oi_change = oi_change
+
+    def to_market_data(self) -> Dict[str, Any]:
+        """Render in the TrueData schema the trading loop consumes"""
+        ltp = self.ltp
+        previous_close = self.previous_close or ltp
+        ohlc_available = self.high > 0 and self.low > 0 and self.open > 0 and self.high != self.low
+        return {
+            'symbol': self.symbol,
+            'ltp': ltp,
+            'close': previous_close,
+            'previous_close': previous_close,
+            'high': self.high,
+            'low': self.low,
+            'open': self.open,
+            'volume': self.volume,
+            'change': ltp - previous_close,
+            'changeper': self.change_percent,
+            'change_percent': self.change_percent,
+            'bid': self.bid,
+            'ask': self.ask,
+            'oi': self.oi,
+            'oi_change': self.oi_change,
+            'timestamp': datetime.fromtimestamp(self.ts_ns / 1e9, IST).replace(tzinfo=None).isoformat(),
+            'source': f"journal_{SOURCE_NAMES.get(self.source, 'unknown')}",
+            'ohlc_available': ohlc_available,
+            'data_quality': {
+                'has_ohlc': ohlc_available,
+                'has_volume': self.volume > 0,
+                'has_change_percent': self.change_percent != 0,
+                'has_previous_close': previous_close > 0 and previous_close != ltp,
+                'calculated_change_percent': False,
+                'has_oi': self.oi > 0
+            }
+        }
+
+
+class TickJournalReader:
+    """Sequential reader over one segment (plain or gzip-compressed)"""
+
+    def __init__(self, path: str):
+        self.path = path
+        if path.endswith(COMPRESSED_SUFFIX):
+            with gzip.open(path, 'rb') as f:
+                self._buffer = f.read()
+            self._mm = None
+        else:
+            with open(path, 'rb') as f:
+                self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self._buffer = self._mm
+        magic, version, record_size, session, created_ns, count = HEADER.unpack_from(self._buffer, 0)
+        if magic != MAGIC or record_size != RECORD_SIZE:
+            raise ValueError(f"{path} is not a v{VERSION} tick journal segment")
+        self.session = session.decode()
+        self.created_ns = created_ns
+        capacity = (len(self._buffer) - HEADER_SIZE) // RECORD_SIZE
+        # Live segments are preallocated: stop at the first unwritten (zero) record
+        while count < capacity and SYMBOL_DEF.unpack_from(self._buffer, HEADER_SIZE + count * RECORD_SIZE)[0] != 0:
+            count += 1
+        self.count = count
+        self.symbols: List[str] = []
+
+    @classmethod
+    def for_session(cls, directory: str, session: str) -> 'TickJournalReader':
+        path = list_segments(directory).get(session)
+        if path is None:
+            raise FileNotFoundError(f"No tick journal segment for {session} in {directory}")
+        return cls(path)
+
+    def __iter__(self) -> Iterator[TickRecord]:
+        symbols: Dict[int, str] = {}
+        view = memoryview(self._buffer)[HEADER_SIZE:HEADER_SIZE + self.count * RECORD_SIZE]
+        try:
+            for index, fields in enumerate(RECORD.iter_unpack(view)):
+                ts_ns, symbol_id, kind, source = fields[:4]
+                if kind == KIND_SYMBOL:
+                    offset = index * RECORD_SIZE + SYMBOL_DEF.size
+                    name = bytes(view[offset:offset + MAX_SYMBOL_BYTES]).rstrip(b'\x00').decode('utf-8', 'replace')
+                    symbols[symbol_id] = name
+                    self.symbols.append(name)
+                    continue
+                yield TickRecord(ts_ns, symbols.get(symbol_id, f"SYMBOL_{symbol_id}"), source, *fields[4:])
+        finally:
+            view.release()
+
+    def snapshots(self, interval_seconds: float = 1.0) -> Iterator[Tuple[int, Dict[str, Dict[str, Any]]]]:
+        """
+        Yield ``(ts_ns, market_data)`` every ``interval_seconds`` of journal time, where
+        ``market_data`` is a copy of the latest quote per symbol at that point
+        """
+        interval_ns = int(interval_seconds * 1e9)
+        state: Dict[str, Dict[str, Any]] = {}
+        next_ns = None
+        last_ts = None
+        for tick in self:
+            if next_ns is None:
+                next_ns = tick.ts_ns + interval_ns
+            while tick.ts_ns >= next_ns:
+                yield next_ns, dict(state)
+                next_ns += interval_ns
+            state[tick.symbol] = tick.to_market_data()
+            last_ts = tick.ts_ns
+        if state:
+            yield last_ts, dict(state)
+
+    async def replay(self, speed: float = 1.0,
+                     target: Optional[Dict[str, Dict[str, Any]]] = None,
+                     on_tick: Optional[Callable[[str, Dict[str, Any]], Optional[Awaitable]]] = None,
+                     symbols: Optional[List[str]] = None) -> int:
+        """
+        Replay the session into ``target`` (e.g. ``live_market_data``) at ``speed``× the
+        recorded pace; ``speed <= 0`` replays as fast as possible. ``on_tick`` is called
+        with ``(symbol, market_data)`` after each write. Returns the number of ticks replayed.
+        """
+        wanted = set(symbols) if symbols else None
+        replayed = 0
+        origin_ns = None
+        start = time.monotonic()
+        for tick in self:
+            if wanted is not None and tick.symbol not in wanted:
+                continue
+            if speed > 0:
+                if origin_ns is None:
+                    origin_ns = tick.ts_ns
+                delay = (tick.ts_ns - origin_ns) / 1e9 / speed - (time.monotonic() - start)
+                # Sleep only when meaningfully ahead; bursts of ticks are written back to back
+                if delay > 0.001:
+                    await asyncio.sleep(delay)
+            data = tick.to_market_data()
+            if target is not None:
+                target[tick.symbol] = data
+            if on_tick is not None:
+                result = on_tick(tick.symbol, data)
+                if asyncio.iscoroutine(result):
+                    await result
+            replayed += 1
+            if speed <= 0 and replayed % 5000 == 0:
+                await asyncio.sleep(0)
+        return replayed
+
+    def close(self):
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+        self._buffer = b''
+
+
+# Global tick journal instance
+tick_journal = TickJournal(
+    directory=os.getenv('TICK_JOURNAL_DIR', os.path.join('data', 'tick_journal')),
+    enabled=os.getenv('TICK_JOURNAL_ENABLED', 'true').lower() == 'true',
+    compress=os.getenv('TICK_JOURNAL_COMPRESS', 'true').lower() == 'true'
+)
@@ -14,6 +14,8 @@ logger = logging.getLogger(__name__)
 from src.core.paper_trading_user_manager import PaperTradingUserManager
 from src.core.database_schema_manager import DatabaseSchemaManager
 from src.core.order_rate_limiter import OrderRateLimiter
+from src.core.cycle_tracer import cycle_tracer
+from src.core.execution_analytics import execution_analytics
 from sqlalchemy import text
 
 class TradeEngine:
@@ -176,7 +178,8 @@ class TradeEngine:
                         self.logger.warning(f"⚠️ Could not refresh margin: {margin_refresh_err}")
                 
                 logger.info(f"Processing signal {signal.get('signal_id')}: {signal.get('symbol')} {signal.get('action')}")
-                result = await self._process_live_signal(signal)
+                with cycle_tracer.span('execute_signal', symbol=signal.get('symbol'), strategy=signal.get('strategy')):
+                    result = await self._process_live_signal(signal)
                 if result:
                     logger.info(f"✅ Execution result: {result}")
                 else:
@@ -285,6 +288,7 @@ class TradeEngine:
     
     def _track_signal_execution_failed(self, signal: Dict, reason: str):
         """Track failed signal execution and route high-confidence orders to elite recommendations"""
+        execution_analytics.discard(signal, 'FAILED')
         try:
             # Get orchestrator instance to update stats
             from src.core.orchestrator import get_orchestrator_instance
@@ -1325,6 +1329,8 @@ class TradeEngine:
             else:
                 self.logger.info(f"🎯 PRIORITY EXECUTION: Management action bypassing rate limits")
             
+            execution_analytics.stamp(signal, 'risk_approved')
+            
             # Process through order manager if available
             if self.order_manager:
                 return await self._process_signal_through_order_manager(signal)
@@ -1357,7 +1363,12 @@ class TradeEngine:
             
             # Submit order - CRITICAL FIX: OrderManager expects (user_id, order_data)
             user_id = signal.get('user_id', 'system')
-            order_id = await self.order_manager.place_order(user_id, order)
+            cycle_tracer.mark_order(signal)
+            execution_analytics.stamp(signal, 'order_sent')
+            with cycle_tracer.span('order.submit', symbol=signal.get('symbol')):
+                order_id = await self.order_manager.place_order(user_id, order)
+            if order_id:
+                execution_analytics.link_order(signal, order_id)
             
             # Log order placement
             self.logger.info(f"📋 Order placed: {order_id} for user {user_id}")
@@ -1390,10 +1401,10 @@ class TradeEngine:
             # 🚨 CRITICAL FIX 2025-12-31: Add time check for NEW positions
             # This path BYPASSED risk_manager validation - caused trades after 3 PM!
             import pytz
-            from datetime import datetime as dt, time as dt_time
+            from datetime import time as dt_time
             
             ist = pytz.timezone('Asia/Kolkata')
-            now_ist = dt.now(ist)
+            now_ist = datetime.now(ist)
             current_time_ist = now_ist.time()
             no_new_positions_after = dt_time(15, 0)  # 3:00 PM IST
             
@@ -1426,7 +1437,12 @@ class TradeEngine:
             order = self._create_order_from_signal(signal)
             
             # Place order through Zerodha
-            order_id = await self.zerodha_client.place_order(order)
+            cycle_tracer.mark_order(signal)
+            execution_analytics.stamp(signal, 'order_sent')
+            with cycle_tracer.span('order.submit', symbol=signal.get('symbol')):
+                order_id = await self.zerodha_client.place_order(order)
+            if order_id:
+                execution_analytics.link_order(signal, order_id)
             
             if order_id:
                 self.logger.info(f"📋 Zerodha order placed: {order_id}")
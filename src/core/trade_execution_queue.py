@@ -1,185 +1,187 @@
 from typing import Dict, List, Optional
 import asyncio
 import logging
+import time
 from datetime import datetime
-from collections import deque
 
 from ..models.schema import Order, OrderStatus, OrderType
 from ..core.order_manager import OrderManager
 from ..core.risk_manager import RiskManager
 from ..core.position_tracker import ProductionPositionTracker
+from ..core.execution_scheduler import ExecutionScheduler, PriorityClass
 
 logger = logging.getLogger(__name__)
 
+STOP_ORDER_TYPES = (OrderType.STOP, OrderType.STOP_LIMIT, OrderType.TRAILING_STOP)
+
 class TradeExecutionQueue:
     def __init__(
         self,
         order_manager: OrderManager,
         risk_manager: RiskManager,
         position_tracker: ProductionPositionTracker,
-        max_queue_size: int = 1000
+        max_queue_size: int = 1000,
+        max_in_flight_per_user: int = 1,
+        max_in_flight_per_session: int = 8
     ):
         self.order_manager = order_manager
         self.risk_manager = risk_manager
         self.position_tracker = position_tracker
-        
-        # Queue for pending orders
-        self.pending_orders: deque[Order] = deque(maxlen=max_queue_size)
-        
-        # Queue for high priority orders (e.g., stop losses)
-        self.priority_orders: deque[Order] = deque(maxlen=max_queue_size)
-        
-        # Lock for queue operations
-        self.queue_lock = asyncio.Lock()
-        
-        # Event for queue processing
-        self.processing_event = asyncio.Event()
-        
+
+        # Priority heap (exit > stop > hedge > entry, then signal deadline) with
+        # bounded concurrent executions per user and per broker session
+        self.scheduler = ExecutionScheduler(
+            self._execute_order,
+            can_execute=self._can_execute_order,
+            max_in_flight_per_user=max_in_flight_per_user,
+            max_in_flight_per_session=max_in_flight_per_session,
+            max_queue_size=max_queue_size
+        )
+
         # Start queue processing
-        asyncio.create_task(self._process_queue())
-        
-    async def add_order(self, order: Order, priority: bool = False):
-        """Add order to execution queue"""
-        async with self.queue_lock:
-            if priority:
-                self.priority_orders.append(order)
-            else:
-                self.pending_orders.append(order)
-                
-            # Signal queue processing
-            self.processing_event.set()
-            
-        logger.info(f"Added order {order.order_id} to {'priority' if priority else 'pending'} queue")
-        
+        self.scheduler.start()
+
+    async def add_order(
+        self,
+        order: Order,
+        priority: bool = False,
+        priority_class: Optional[PriorityClass] = None,
+        deadline: Optional[datetime] = None,
+        session: str = 'default'
+    ) -> bool:
+        """Add order to execution queue
+
+        ``priority_class`` is derived when not given: EXIT for orders that reduce an open
+        position, STOP for ``priority=True`` or stop order types, HEDGE for legs linked to
+        other orders, ENTRY otherwise. ``deadline`` is the signal's expiry; the order is
+        dropped unexecuted once it passes.
+        """
+        if priority_class is None:
+            priority_class = await self._classify_order(order, priority)
+
+        deadline_at = None
+        if deadline is not None:
+            deadline_at = time.monotonic() + (deadline - datetime.now()).total_seconds()
+
+        added = self.scheduler.submit(order, priority_class, deadline=deadline_at,
+                                      user_id=order.user_id, session=session)
+        if added:
+            logger.info(f"Added order {order.order_id} to execution queue as {priority_class.name}")
+        return added
+
+    async def _classify_order(self, order: Order, priority: bool = False) -> PriorityClass:
+        """Priority class from the order's side against the current position"""
+        side = self._order_side(order)
+        try:
+            position = await self.position_tracker.get_position(order.symbol)
+        except Exception as e:
+            logger.warning(f"Position lookup failed for {order.symbol}: {e}")
+            position = None
+
+        if position is not None and getattr(position, 'quantity', 0) and side is not None:
+            position_side = 'SELL' if str(getattr(position, 'side', 'long')).lower() == 'short' else 'BUY'
+            if side != position_side:
+                # Opposite side of an open position: closes or reduces it
+                return PriorityClass.EXIT
+
+        if priority or order.order_type in STOP_ORDER_TYPES:
+            return PriorityClass.STOP
+        if order.related_orders:
+            # Leg linked to another order (spread / hedge)
+            return PriorityClass.HEDGE
+        return PriorityClass.ENTRY
+
+    @staticmethod
+    def _order_side(order: Order) -> Optional[str]:
+        """BUY / SELL from an explicit side, else from the sign of the quantity"""
+        side = getattr(order, 'side', None) or getattr(order, 'transaction_type', None)
+        if side:
+            side = str(getattr(side, 'value', side)).upper()
+            return 'SELL' if side in ('SELL', 'SHORT') else 'BUY'
+        if order.quantity:
+            return 'SELL' if order.quantity < 0 else 'BUY'
+        return None
+
     async def process_order_update(self, update: Dict):
         """Process order status update"""
         order_id = update.get("order_id")
         new_status = update.get("status")
-        
+
         if not order_id or not new_status:
             logger.error("Invalid order update received")
             return
-            
-        # Update order status in queues
-        async with self.queue_lock:
-            # Check priority queue
-            for order in self.priority_orders:
-                if order.order_id == order_id:
-                    order.status = OrderStatus(new_status)
-                    break
-                    
-            # Check pending queue
-            for order in self.pending_orders:
-                if order.order_id == order_id:
-                    order.status = OrderStatus(new_status)
-                    break
-                    
+
+        # Update order status if it is still queued
+        queued = self.scheduler.get(order_id)
+        if queued is not None:
+            queued.order.status = OrderStatus(new_status)
+            if queued.order.status in (OrderStatus.CANCELLED, OrderStatus.REJECTED, OrderStatus.EXPIRED):
+                self.scheduler.cancel(order_id)
+
         logger.info(f"Updated order {order_id} status to {new_status}")
-        
-    async def _process_queue(self):
-        """Process orders in queue"""
-        while True:
-            try:
-                # Wait for processing signal
-                await self.processing_event.wait()
-                
-                # Process priority orders first
-                await self._process_priority_orders()
-                
-                # Process pending orders
-                await self._process_pending_orders()
-                
-                # Clear processing event
-                self.processing_event.clear()
-                
-            except Exception as e:
-                logger.error(f"Error processing order queue: {str(e)}")
-                
-            # Small delay to prevent CPU spinning
-            await asyncio.sleep(0.1)
-            
-    async def _process_priority_orders(self):
-        """Process high priority orders"""
-        async with self.queue_lock:
-            while self.priority_orders:
-                order = self.priority_orders[0]
-                
-                # Check if order can be executed
-                if await self._can_execute_order(order):
-                    # Execute order
-                    await self._execute_order(order)
-                    
-                    # Remove from queue
-                    self.priority_orders.popleft()
-                else:
-                    # Skip to next order
-                    break
-                    
-    async def _process_pending_orders(self):
-        """Process regular pending orders"""
-        async with self.queue_lock:
-            while self.pending_orders:
-                order = self.pending_orders[0]
-                
-                # Check if order can be executed
-                if await self._can_execute_order(order):
-                    # Execute order
-                    await self._execute_order(order)
-                    
-                    # Remove from queue
-                    self.pending_orders.popleft()
-                else:
-                    # Skip to next order
-                    break
-                    
+
     async def _can_execute_order(self, order: Order) -> bool:
         """Check if order can be executed"""
         try:
+            # Risk and position limits are independent checks; run them together
+            risk_check, position_check = await asyncio.gather(
+                self.risk_manager.check_order_risk(order),
+                self.position_tracker.check_position_limits(order)
+            )
+
             # Check risk limits
-            risk_check = await self.risk_manager.check_order_risk(order)
             if not risk_check["allowed"]:
                 logger.warning(f"Order {order.order_id} rejected by risk check: {risk_check['reason']}")
+                self._mark_rejected(order)
                 return False
-                
+
             # Check position limits
-            position_check = await self.position_tracker.check_position_limits(order)
             if not position_check["allowed"]:
                 logger.warning(f"Order {order.order_id} rejected by position check: {position_check['reason']}")
+                self._mark_rejected(order)
                 return False
-                
+
             return True
-            
+
         except Exception as e:
             logger.error(f"Error checking order execution: {str(e)}")
+            self._mark_rejected(order)
             return False
-            
+
+    @staticmethod
+    def _mark_rejected(order: Order):
+        order.status = OrderStatus.REJECTED
+        order.updated_at = datetime.now()
+
     async def _execute_order(self, order: Order):
         """Execute order"""
         try:
             # Execute order through order manager
             result = await self.order_manager.execute_order(order)
-            
+
             if result["status"] == "FILLED":
                 logger.info(f"Order {order.order_id} executed successfully")
             else:
                 logger.warning(f"Order {order.order_id} execution failed: {result.get('reason')}")
-                
+
         except Exception as e:
             logger.error(f"Error executing order {order.order_id}: {str(e)}")
-            
+
     async def get_queue_status(self) -> Dict:
         """Get current queue status"""
-        async with self.queue_lock:
-            return {
-                "priority_queue_size": len(self.priority_orders),
-                "pending_queue_size": len(self.pending_orders),
-                "timestamp": datetime.utcnow().isoformat()
-            }
-            
+        stats = self.scheduler.get_stats()
+        depth = stats['depth']
+        return {
+            "priority_queue_size": depth['exit'] + depth['stop'] + depth['hedge'],
+            "pending_queue_size": depth['entry'],
+            "queue_by_class": depth,
+            "in_flight": stats['in_flight'],
+            "class_stats": stats['classes'],
+            "timestamp": datetime.utcnow().isoformat()
+        }
+
     async def clear_queue(self):
         """Clear all orders from queue"""
-        async with self.queue_lock:
-            self.priority_orders.clear()
-            self.pending_orders.clear()
-            
-        logger.info("Order queue cleared") 
\ No newline at end of file
+        self.scheduler.clear()
+
+        logger.info("Order queue cleared")
@@ -2,14 +2,25 @@
 """
 Trading Data Persistence System
 Prevents data loss during redeployments by persisting trading data to Redis and Database.
+
+The SQLite store is opened once in WAL mode. All writes go through a single writer thread
+that group-commits whatever is queued in one transaction, so ``save_trade`` /
+``save_trading_session`` return without waiting on disk. Reads use per-thread connections
+that WAL never blocks behind the writer. Backups are page-level copies made with the
+SQLite online backup API instead of JSON dumps of every table.
 """
+import atexit
 import json
+import queue
 import redis
 import asyncio
 import logging
+import threading
+import time
+from concurrent.futures import Future
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional
-from dataclasses import dataclass, asdict
+from typing import Dict, List, Any, Optional, Callable, Iterable, Tuple
+from dataclasses import dataclass, asdict, fields
 import sqlite3
 import os
 
@@ -40,150 +51,331 @@ class TradingSession:
     is_active: bool
     strategies_performance: Dict[str, Any]
 
+SCHEMA = (
+    '''
+    CREATE TABLE IF NOT EXISTS trades (
+        trade_id TEXT PRIMARY KEY,
+        symbol TEXT NOT NULL,
+        action TEXT NOT NULL,
+        quantity INTEGER NOT NULL,
+        price REAL NOT NULL,
+        timestamp TEXT NOT NULL,
+        pnl REAL NOT NULL,
+        status TEXT NOT NULL,
+        strategy TEXT NOT NULL
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS trading_sessions (
+        session_id TEXT PRIMARY KEY,
+        start_time TEXT NOT NULL,
+        end_time TEXT,
+        total_trades INTEGER NOT NULL,
+        daily_pnl REAL NOT NULL,
+        success_rate REAL NOT NULL,
+        is_active BOOLEAN NOT NULL,
+        strategies_performance TEXT
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS performance_metrics (
+        date TEXT PRIMARY KEY,
+        total_pnl REAL NOT NULL,
+        trade_count INTEGER NOT NULL,
+        win_rate REAL NOT NULL,
+        max_drawdown REAL NOT NULL,
+        sharpe_ratio REAL NOT NULL,
+        created_at TEXT NOT NULL
+    )
+    ''',
+    # Session range scans and "latest active session" lookups
+    'CREATE INDEX IF NOT EXISTS idx_trades_timestamp ON trades(timestamp)',
+    'CREATE INDEX IF NOT EXISTS idx_sessions_active_start ON trading_sessions(is_active, start_time)'
+)
+
+# Statement text is fixed so sqlite3's per-connection statement cache reuses the prepared form
+INSERT_TRADE = '''
+    INSERT OR REPLACE INTO trades
+    (trade_id, symbol, action, quantity, price, timestamp, pnl, status, strategy)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+INSERT_SESSION = '''
+    INSERT OR REPLACE INTO trading_sessions
+    (session_id, start_time, end_time, total_trades, daily_pnl,
+     success_rate, is_active, strategies_performance)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+'''
+SELECT_SESSION_START = 'SELECT start_time FROM trading_sessions WHERE session_id = ?'
+SELECT_TRADES_SINCE = 'SELECT * FROM trades WHERE timestamp >= ? ORDER BY timestamp DESC'
+SELECT_ACTIVE_SESSION = 'SELECT * FROM trading_sessions WHERE is_active = 1 ORDER BY start_time DESC LIMIT 1'
+
+def connect_sqlite(db_path: str, timeout: float = 30.0) -> sqlite3.Connection:
+    """WAL-mode connection in autocommit mode (transactions are explicit)"""
+    conn = sqlite3.connect(db_path, timeout=timeout, isolation_level=None,
+                           check_same_thread=False, cached_statements=256)
+    conn.execute('PRAGMA journal_mode=WAL')
+    # WAL + NORMAL: commits are atomic and survive a process crash without an fsync per commit
+    conn.execute('PRAGMA synchronous=NORMAL')
+    return conn
+
+class SQLiteWriter:
+    """Single writer thread with group commit over one WAL connection"""
+
+    _STOP = object()
+
+    def __init__(self, db_path: str, max_batch: int = 500):
+        self.db_path = db_path
+        self.max_batch = max_batch
+        self._queue: "queue.Queue" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._atexit_registered = False
+        # Queued plus dequeued-but-uncommitted operations
+        self._unfinished = 0
+        self._unfinished_lock = threading.Lock()
+        self.stats = {
+            'submitted': 0,
+            'commits': 0,
+            'statements': 0,
+            'failed': 0,
+            'max_batch_seen': 0,
+            'last_commit_ms': None
+        }
+
+    def start(self):
+        with self._start_lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, name='sqlite-writer', daemon=True)
+            self._thread.start()
+            if not self._atexit_registered:
+                atexit.register(self.close)
+                self._atexit_registered = True
+
+    def submit(self, sql: str, params: Iterable = (), many: bool = False) -> Future:
+        """Queue one statement (``many``: a sequence of parameter rows); resolves once committed"""
+        return self._enqueue((sql, params, many))
+
+    def call(self, fn: Callable[[sqlite3.Connection], Any]) -> Future:
+        """Run ``fn(conn)`` on the writer thread inside the next group transaction"""
+        return self._enqueue((fn, None, False))
+
+    def _enqueue(self, op: Tuple) -> Future:
+        if self._thread is None or not self._thread.is_alive():
+            self.start()
+        future: Future = Future()
+        with self._unfinished_lock:
+            self._unfinished += 1
+            self.stats['submitted'] += 1
+        self._queue.put((op, future))
+        return future
+
+    def pending(self) -> int:
+        """Operations not yet committed, including the batch being written"""
+        return self._unfinished
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until everything queued so far is committed"""
+        try:
+            self.call(lambda conn: None).result(timeout=timeout)
+            return True
+        except Exception:
+            return False
+
+    def close(self, timeout: float = 10.0):
+        """Commit what is queued and stop the thread"""
+        if self._thread is None or not self._thread.is_alive():
+            return
+        self._queue.put((self._STOP, None))
+        self._thread.join(timeout)
+        self._thread = None
+
+    def _run(self):
+        conn = connect_sqlite(self.db_path)
+        try:
+            while True:
+                batch = [self._queue.get()]
+                # Group commit: everything that queued up while the last commit ran
+                while len(batch) < self.max_batch:
+                    try:
+                        batch.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+                stop = any(op is self._STOP for op, _ in batch)
+                batch = [(op, future) for op, future in batch if op is not self._STOP]
+                if batch:
+                    try:
+                        self._commit(conn, batch)
+                    finally:
+                        with self._unfinished_lock:
+                            self._unfinished -= len(batch)
+                if stop:
+                    break
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _execute(conn: sqlite3.Connection, op: Tuple) -> Any:
+        target, params, many = op
+        if callable(target):
+            return target(conn)
+        if many:
+            return conn.executemany(target, params).rowcount
+        return conn.execute(target, params).rowcount
+
+    def _commit(self, conn: sqlite3.Connection, batch: List[Tuple]):
+        started = time.perf_counter()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            results = [self._execute(conn, op) for op, _ in batch]
+            conn.execute('COMMIT')
+        except Exception as e:
+            conn.rollback()
+            if len(batch) > 1:
+                # Isolate the bad statement so the rest of the group still commits
+                for item in batch:
+                    self._commit(conn, [item])
+                return
+            self.stats['failed'] += 1
+            batch[0][1].set_exception(e)
+            logger.error(f"❌ SQLite write failed: {e}")
+            return
+        self.stats['commits'] += 1
+        self.stats['statements'] += len(batch)
+        self.stats['max_batch_seen'] = max(self.stats['max_batch_seen'], len(batch))
+        self.stats['last_commit_ms'] = round((time.perf_counter() - started) * 1000, 3)
+        for (_, future), result in zip(batch, results):
+            future.set_result(result)
+
 class TradingDataPersistence:
     """Comprehensive data persistence for trading system"""
-    
+
     def __init__(self, redis_url: str = None, db_path: str = "trading_data.db"):
         self.redis_client = None
         self.db_path = db_path
         self.current_session = None
         self.trades_cache = []
-        
+        self.last_backup = None
+        self.writer = SQLiteWriter(db_path)
+        self._readers = threading.local()
+
         # Initialize Redis if available
         try:
             if redis_url:
                 self.redis_client = redis.from_url(redis_url)
             else:
                 self.redis_client = redis.Redis(host='localhost', port=6379, db=0, decode_responses=True)
-            
+
             # Test Redis connection
             self.redis_client.ping()
             logger.info("✅ Redis connection established")
         except Exception as e:
             logger.warning(f"⚠️ Redis not available: {e}")
             self.redis_client = None
-        
+
         # Initialize SQLite database
         self.init_database()
-    
+
     def init_database(self):
         """Initialize SQLite database for persistent storage"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                
-                # Create trades table
-                cursor.execute('''
-                    CREATE TABLE IF NOT EXISTS trades (
-                        trade_id TEXT PRIMARY KEY,
-                        symbol TEXT NOT NULL,
-                        action TEXT NOT NULL,
-                        quantity INTEGER NOT NULL,
-                        price REAL NOT NULL,
-                        timestamp TEXT NOT NULL,
-                        pnl REAL NOT NULL,
-                        status TEXT NOT NULL,
-                        strategy TEXT NOT NULL
-                    )
-                ''')
-                
-                # Create sessions table
-                cursor.execute('''
-                    CREATE TABLE IF NOT EXISTS trading_sessions (
-                        session_id TEXT PRIMARY KEY,
-                        start_time TEXT NOT NULL,
-                        end_time TEXT,
-                        total_trades INTEGER NOT NULL,
-                        daily_pnl REAL NOT NULL,
-                        success_rate REAL NOT NULL,
-                        is_active BOOLEAN NOT NULL,
-                        strategies_performance TEXT
-                    )
-                ''')
-                
-                # Create performance metrics table
-                cursor.execute('''
-                    CREATE TABLE IF NOT EXISTS performance_metrics (
-                        date TEXT PRIMARY KEY,
-                        total_pnl REAL NOT NULL,
-                        trade_count INTEGER NOT NULL,
-                        win_rate REAL NOT NULL,
-                        max_drawdown REAL NOT NULL,
-                        sharpe_ratio REAL NOT NULL,
-                        created_at TEXT NOT NULL
-                    )
-                ''')
-                
-                conn.commit()
-                logger.info("✅ Database initialized successfully")
-                
+            def create_schema(conn):
+                for statement in SCHEMA:
+                    conn.execute(statement)
+
+            self.writer.call(create_schema).result()
+            logger.info("✅ Database initialized successfully")
+
         except Exception as e:
             logger.error(f"❌ Database initialization failed: {e}")
-    
-    def save_trade(self, trade: TradeRecord):
-        """Save individual trade to both Redis and Database"""
+
+    def _reader(self) -> sqlite3.Connection:
+        """Per-thread read connection, reused across calls"""
+        conn = getattr(self._readers, 'conn', None)
+        if conn is None:
+            conn = connect_sqlite(self.db_path)
+            conn.execute('PRAGMA query_only=1')
+            self._readers.conn = conn
+        return conn
+
+    def _read(self, sql: str, params: Iterable = ()) -> Tuple[List[str], List[tuple]]:
+        # Reads observe queued writes (read-your-writes); the wait is skipped when idle
+        if self.writer.pending():
+            self.writer.flush(timeout=5.0)
+        cursor = self._reader().execute(sql, tuple(params))
+        columns = [description[0] for description in cursor.description]
+        return columns, cursor.fetchall()
+
+    @staticmethod
+    def _trade_row(trade: TradeRecord) -> tuple:
+        return (trade.trade_id, trade.symbol, trade.action, trade.quantity,
+                trade.price, trade.timestamp, trade.pnl, trade.status, trade.strategy)
+
+    @staticmethod
+    def _session_row(session: TradingSession) -> tuple:
+        performance = session.strategies_performance
+        return (session.session_id, session.start_time, session.end_time,
+                session.total_trades, session.daily_pnl, session.success_rate,
+                session.is_active, performance if isinstance(performance, str) else json.dumps(performance))
+
+    def save_trade(self, trade: TradeRecord) -> Optional[Future]:
+        """Save individual trade to both Redis and Database
+
+        The database write is queued on the writer thread; the returned future resolves
+        once it is committed.
+        """
         try:
-            # Save to Redis cache
+            # Save to Redis cache (one round trip)
             if self.redis_client:
                 trade_key = f"trade:{trade.trade_id}"
-                self.redis_client.hset(trade_key, mapping=asdict(trade))
-                self.redis_client.expire(trade_key, 86400 * 7)  # 7 days expiry
-                
+                pipe = self.redis_client.pipeline(transaction=False)
+                pipe.hset(trade_key, mapping=asdict(trade))
+                pipe.expire(trade_key, 86400 * 7)  # 7 days expiry
+
                 # Add to trades list
-                self.redis_client.lpush("trades_list", trade.trade_id)
+                pipe.lpush("trades_list", trade.trade_id)
+                pipe.execute()
                 logger.info(f"✅ Trade {trade.trade_id} saved to Redis")
-            
+
             # Save to SQLite database
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute('''
-                    INSERT OR REPLACE INTO trades 
-                    (trade_id, symbol, action, quantity, price, timestamp, pnl, status, strategy)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    trade.trade_id, trade.symbol, trade.action, trade.quantity,
-                    trade.price, trade.timestamp, trade.pnl, trade.status, trade.strategy
-                ))
-                conn.commit()
-                logger.info(f"✅ Trade {trade.trade_id} saved to database")
-                
+            future = self.writer.submit(INSERT_TRADE, self._trade_row(trade))
+            logger.debug(f"Trade {trade.trade_id} queued for database")
+            return future
+
         except Exception as e:
             logger.error(f"❌ Failed to save trade {trade.trade_id}: {e}")
-    
-    def save_trading_session(self, session: TradingSession):
+            return None
+
+    def save_trades(self, trades: List[TradeRecord]) -> Optional[Future]:
+        """Save a burst of trades to the database as one prepared ``executemany``"""
+        if not trades:
+            return None
+        return self.writer.submit(INSERT_TRADE, [self._trade_row(trade) for trade in trades], many=True)
+
+    def save_trading_session(self, session: TradingSession) -> Optional[Future]:
         """Save trading session data"""
         try:
             self.current_session = session
-            
+
             # Save to Redis
             if self.redis_client:
                 session_key = f"session:{session.session_id}"
                 session_data = asdict(session)
                 session_data['strategies_performance'] = json.dumps(session_data['strategies_performance'])
-                
-                self.redis_client.hset(session_key, mapping=session_data)
-                self.redis_client.set("current_session", session.session_id)
+
+                pipe = self.redis_client.pipeline(transaction=False)
+                pipe.hset(session_key, mapping=session_data)
+                pipe.set("current_session", session.session_id)
+                pipe.execute()
                 logger.info(f"✅ Session {session.session_id} saved to Redis")
-            
+
             # Save to Database
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute('''
-                    INSERT OR REPLACE INTO trading_sessions
-                    (session_id, start_time, end_time, total_trades, daily_pnl, 
-                     success_rate, is_active, strategies_performance)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    session.session_id, session.start_time, session.end_time,
-                    session.total_trades, session.daily_pnl, session.success_rate,
-                    session.is_active, json.dumps(session.strategies_performance)
-                ))
-                conn.commit()
-                logger.info(f"✅ Session {session.session_id} saved to database")
-                
+            return self.writer.submit(INSERT_SESSION, self._session_row(session))
+
         except Exception as e:
             logger.error(f"❌ Failed to save session: {e}")
-    
+            return None
+
     def get_current_session(self) -> Optional[TradingSession]:
         """Retrieve current trading session data"""
         try:
@@ -198,132 +390,111 @@ class TradingDataPersistence:
                             session_data.get('strategies_performance', '{}')
                         )
                         return TradingSession(**session_data)
-            
+
             # Fallback to database
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute('''
-                    SELECT * FROM trading_sessions 
-                    WHERE is_active = 1 
-                    ORDER BY start_time DESC 
-                    LIMIT 1
-                ''')
-                
-                row = cursor.fetchone()
-                if row:
-                    columns = [description[0] for description in cursor.description]
-                    session_data = dict(zip(columns, row))
-                    session_data['strategies_performance'] = json.loads(
-                        session_data['strategies_performance']
-                    )
-                    return TradingSession(**session_data)
-                    
+            columns, rows = self._read(SELECT_ACTIVE_SESSION)
+            if rows:
+                session_data = dict(zip(columns, rows[0]))
+                session_data['strategies_performance'] = json.loads(
+                    session_data['strategies_performance'] or '{}'
+                )
+                session_data['is_active'] = bool(session_data['is_active'])
+                return TradingSession(**session_data)
+
         except Exception as e:
             logger.error(f"❌ Failed to get current session: {e}")
-        
+
         return None
-    
+
     def get_trades_for_session(self, session_id: str) -> List[TradeRecord]:
         """Get all trades for a specific session"""
         trades = []
-        
+
         try:
-            # Try database first (most reliable)
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute('''
-                    SELECT * FROM trades 
-                    WHERE timestamp >= (
-                        SELECT start_time FROM trading_sessions 
-                        WHERE session_id = ?
-                    )
-                    ORDER BY timestamp DESC
-                ''', (session_id,))
-                
-                rows = cursor.fetchall()
-                columns = [description[0] for description in cursor.description]
-                
-                for row in rows:
-                    trade_data = dict(zip(columns, row))
-                    trades.append(TradeRecord(**trade_data))
-                    
-                logger.info(f"✅ Retrieved {len(trades)} trades from database")
-                
+            # Try database first (most reliable); both lookups are index range scans
+            _, session_rows = self._read(SELECT_SESSION_START, (session_id,))
+            if not session_rows:
+                return trades
+            columns, rows = self._read(SELECT_TRADES_SINCE, (session_rows[0][0],))
+
+            for row in rows:
+                trade_data = dict(zip(columns, row))
+                trades.append(TradeRecord(**trade_data))
+
+            logger.info(f"✅ Retrieved {len(trades)} trades from database")
+
         except Exception as e:
             logger.error(f"❌ Failed to get trades for session: {e}")
-        
+
         return trades
-    
-    def create_emergency_backup(self) -> str:
-        """Create complete backup of all trading data"""
+
+    def create_emergency_backup(self, backup_dir: str = "data/trading_backups",
+                                pages_per_step: int = 256, step_sleep: float = 0.005) -> Optional[str]:
+        """Create a consistent page-level copy of the trading database
+
+        Uses the SQLite online backup API on a read connection, copying ``pages_per_step``
+        pages at a time and sleeping ``step_sleep`` seconds between steps, so the source is
+        only locked for one step and the writer thread keeps committing in between. A
+        commit that lands mid-copy makes SQLite restart the copy from the new snapshot, so
+        the result is always one consistent state.
+        """
         try:
-            backup_data = {
-                'timestamp': datetime.now().isoformat(),
-                'backup_type': 'emergency_full_backup',
-                'current_session': None,
-                'all_trades': [],
-                'all_sessions': [],
-                'performance_metrics': []
-            }
-            
-            # Get current session
-            current_session = self.get_current_session()
-            if current_session:
-                backup_data['current_session'] = asdict(current_session)
-            
-            # Get all trades
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                
-                # All trades
-                cursor.execute('SELECT * FROM trades ORDER BY timestamp DESC')
-                rows = cursor.fetchall()
-                columns = [description[0] for description in cursor.description]
-                backup_data['all_trades'] = [dict(zip(columns, row)) for row in rows]
-                
-                # All sessions
-                cursor.execute('SELECT * FROM trading_sessions ORDER BY start_time DESC')
-                rows = cursor.fetchall()
-                columns = [description[0] for description in cursor.description]
-                backup_data['all_sessions'] = [dict(zip(columns, row)) for row in rows]
-            
-            # Save backup file
-            backup_filename = f"complete_trading_backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-            
-            with open(backup_filename, 'w') as f:
-                json.dump(backup_data, f, indent=2, default=str)
-            
+            self.writer.flush(timeout=5.0)
+            os.makedirs(backup_dir, exist_ok=True)
+            backup_filename = os.path.join(
+                backup_dir, f"complete_trading_backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.db"
+            )
+
+            steps = 0
+
+            def progress(status, remaining, total):
+                nonlocal steps
+                steps += 1
+
+            source = connect_sqlite(self.db_path)
+            target = sqlite3.connect(backup_filename)
+            try:
+                source.backup(target, pages=max(1, pages_per_step), progress=progress, sleep=step_sleep)
+            finally:
+                target.close()
+                source.close()
+
+            logger.debug(f"Backup copied in {steps} steps of {pages_per_step} pages")
+            self.last_backup = backup_filename
             logger.info(f"✅ Complete backup created: {backup_filename}")
             return backup_filename
-            
+
         except Exception as e:
             logger.error(f"❌ Emergency backup failed: {e}")
             return None
-    
+
     def restore_from_backup(self, backup_file: str):
-        """Restore trading data from backup file"""
+        """Restore trading data from a database backup (or a legacy JSON backup)"""
         try:
-            with open(backup_file, 'r') as f:
-                backup_data = json.load(f)
-            
-            # Restore trades
-            for trade_data in backup_data.get('all_trades', []):
-                trade = TradeRecord(**trade_data)
-                self.save_trade(trade)
-            
-            # Restore sessions
-            for session_data in backup_data.get('all_sessions', []):
-                session_data['strategies_performance'] = json.loads(
-                    session_data.get('strategies_performance', '{}')
-                )
-                session = TradingSession(**session_data)
-                self.save_trading_session(session)
-            
+            if backup_file.endswith('.json'):
+                with open(backup_file, 'r') as f:
+                    backup_data = json.load(f)
+                trade_rows = backup_data.get('all_trades', [])
+                session_rows = backup_data.get('all_sessions', [])
+            else:
+                with sqlite3.connect(f"file:{backup_file}?mode=ro", uri=True) as source:
+                    source.row_factory = sqlite3.Row
+                    trade_rows = [dict(row) for row in source.execute('SELECT * FROM trades')]
+                    session_rows = [dict(row) for row in source.execute('SELECT * FROM trading_sessions')]
+
+            # Restore trades and sessions in one group transaction
+            trade_names = [field.name for field in fields(TradeRecord)]
+            session_names = [field.name for field in fields(TradingSession)]
+            self.writer.submit(INSERT_TRADE, [tuple(row[name] for name in trade_names) for row in trade_rows],
+                               many=True)
+            self.writer.submit(INSERT_SESSION, [tuple(row[name] for name in session_names) for row in session_rows],
+                               many=True).result()
+
             logger.info(f"✅ Successfully restored from backup: {backup_file}")
-            
+
         except Exception as e:
             logger.error(f"❌ Failed to restore from backup: {e}")
-    
+
     def get_recovery_status(self) -> Dict[str, Any]:
         """Get comprehensive recovery status"""
         status = {
@@ -332,9 +503,10 @@ class TradingDataPersistence:
             'current_session': None,
             'total_trades': 0,
             'total_sessions': 0,
-            'last_backup': None
+            'last_backup': self.last_backup,
+            'writer': dict(self.writer.stats, pending=self.writer.pending())
         }
-        
+
         try:
             # Test Redis
             if self.redis_client:
@@ -342,30 +514,30 @@ class TradingDataPersistence:
                 status['redis_status'] = 'connected'
             else:
                 status['redis_status'] = 'unavailable'
-            
+
             # Check database
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                
-                cursor.execute('SELECT COUNT(*) FROM trades')
-                status['total_trades'] = cursor.fetchone()[0]
-                
-                cursor.execute('SELECT COUNT(*) FROM trading_sessions')
-                status['total_sessions'] = cursor.fetchone()[0]
-                
-                cursor.execute('SELECT * FROM trading_sessions WHERE is_active = 1 LIMIT 1')
-                active_session = cursor.fetchone()
-                if active_session:
-                    columns = [description[0] for description in cursor.description]
-                    status['current_session'] = dict(zip(columns, active_session))
-            
+            status['total_trades'] = self._read('SELECT COUNT(*) FROM trades')[1][0][0]
+            status['total_sessions'] = self._read('SELECT COUNT(*) FROM trading_sessions')[1][0][0]
+
+            columns, rows = self._read(SELECT_ACTIVE_SESSION)
+            if rows:
+                status['current_session'] = dict(zip(columns, rows[0]))
+
             status['database_status'] = 'healthy'
-            
+
         except Exception as e:
             status['database_status'] = f'error: {e}'
-        
+
         return status
 
+    def close(self):
+        """Commit queued writes and stop the writer thread"""
+        self.writer.close()
+        conn = getattr(self._readers, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._readers.conn = None
+
 # Global persistence instance
 trading_persistence = TradingDataPersistence()
 
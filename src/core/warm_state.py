@@ -0,0 +1,181 @@
+"""
+Warm State
+==========
+Local checkpoints of learned in-memory state, so restarts skip the historical warmup.
+
+- Components register as providers with ``export_warm_state()`` (JSON-able dict) and
+  ``restore_warm_state(state, age_seconds)``
+- One JSON file per provider (``<name>.json``), written atomically (temp file + rename)
+  every ``interval`` seconds and once more at shutdown
+- ``restore`` loads a checkpoint in milliseconds and reports its age; providers use the age
+  to skip their historical fetch entirely when fresh or to fetch only the missing tail
+- Checkpoints older than ``max_age`` or written by another format version are ignored
+"""
+
+import asyncio
+import json
+import logging
+import os
+import tempfile
+import time
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 1
+
+# Restored state this recent needs no historical top-up at all
+FRESH_SECONDS = 10 * 60
+
+
+def to_jsonable(value: Any) -> Any:
+    """Recursively convert numpy arrays/scalars and datetimes for ``json.dump``"""
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, dict):
+        return {str(k): to_jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple, set)):
+        return [to_jsonable(v) for v in value]
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return value
+
+
+class WarmStateStore:
+    """Periodic, atomic on-disk checkpoints of registered providers"""
+
+    def __init__(self, directory: str, interval: float = 300.0, max_age: float = 3 * 86400):
+        self.directory = directory
+        self.interval = interval
+        self.max_age = max_age
+        self._providers: Dict[str, Any] = {}
+        self._saved_at: Dict[str, float] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def path_for(self, name: str) -> str:
+        return os.path.join(self.directory, f"{name.replace(':', '_').replace('/', '_')}.json")
+
+    def register(self, name: str, provider: Any):
+        """Checkpoint ``provider`` under ``name`` from now on"""
+        self._providers[name] = provider
+
+    def save(self, name: str, state: Dict[str, Any], now: Optional[float] = None) -> str:
+        now = now if now is not None else time.time()
+        os.makedirs(self.directory, exist_ok=True)
+        payload = {'version': FORMAT_VERSION, 'name': name, 'saved_at': now, 'state': to_jsonable(state)}
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(payload, f, separators=(',', ':'))
+            os.replace(tmp, self.path_for(name))
+        except Exception:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+        self._saved_at[name] = now
+        return self.path_for(name)
+
+    def load(self, name: str, now: Optional[float] = None) -> Optional[Tuple[Dict[str, Any], float]]:
+        """``(state, age_seconds)`` of a usable checkpoint, else None"""
+        path = self.path_for(name)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path) as f:
+                payload = json.load(f)
+        except Exception as e:
+            logger.warning(f"⚠️ Unreadable warm state {path}: {e}")
+            return None
+        if payload.get('version') != FORMAT_VERSION:
+            return None
+        age = (now if now is not None else time.time()) - float(payload.get('saved_at', 0))
+        if age > self.max_age or age < 0:
+            logger.info(f"📦 Warm state '{name}' is {age / 3600:.1f}h old - ignoring")
+            return None
+        return payload.get('state') or {}, age
+
+    def restore(self, name: str, provider: Any = None) -> Optional[float]:
+        """Load ``name`` into its provider; returns the checkpoint age or None"""
+        provider = provider or self._providers.get(name)
+        loaded = self.load(name)
+        if provider is None or loaded is None:
+            return None
+        state, age = loaded
+        started = time.perf_counter()
+        try:
+            provider.restore_warm_state(state, age)
+        except Exception as e:
+            logger.warning(f"⚠️ Warm state restore failed for '{name}': {e}")
+            return None
+        logger.info(f"📦 Warm state '{name}' restored in {(time.perf_counter() - started) * 1000:.1f}ms "
+                    f"({age / 60:.0f} min old)")
+        return age
+
+    def collect(self, name: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+        """Export providers into detached JSON-able copies (call on the owning thread)"""
+        states = {}
+        for key in ([name] if name else list(self._providers)):
+            provider = self._providers.get(key)
+            if provider is None:
+                continue
+            try:
+                state = provider.export_warm_state()
+                if state:
+                    states[key] = to_jsonable(state)
+            except Exception as e:
+                logger.warning(f"⚠️ Warm state export failed for '{key}': {e}")
+        return states
+
+    def write(self, states: Dict[str, Dict[str, Any]]) -> int:
+        written = 0
+        for key, state in states.items():
+            try:
+                self.save(key, state)
+                written += 1
+            except Exception as e:
+                logger.warning(f"⚠️ Warm state checkpoint failed for '{key}': {e}")
+        return written
+
+    def checkpoint(self, name: Optional[str] = None) -> int:
+        """Save one provider (or all); returns the number written"""
+        return self.write(self.collect(name))
+
+    async def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._checkpoint_loop())
+
+    async def stop(self):
+        """Stop the periodic loop and write a final checkpoint"""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        await asyncio.to_thread(self.write, self.collect())
+
+    async def _checkpoint_loop(self):
+        while True:
+            try:
+                await asyncio.sleep(self.interval)
+                # Export on the loop (consistent copies), write to disk off it
+                await asyncio.to_thread(self.write, self.collect())
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Warm state checkpoint loop error: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'directory': self.directory,
+            'providers': sorted(self._providers),
+            'saved_at': dict(self._saved_at)
+        }
+
+
+# Global warm state store instance
+warm_state = WarmStateStore(
+    os.getenv('WARM_STATE_DIR', 'data/warm_state'),
+    interval=float(os.getenv('WARM_STATE_INTERVAL', '300'))
+)
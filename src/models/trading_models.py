@@ -9,7 +9,7 @@ import uuid
 
 from sqlalchemy import (
     Column, Integer, String, Float, DateTime, Boolean, 
-    Text, JSON, ForeignKey, Index, DECIMAL, BigInteger
+    Text, JSON, ForeignKey, Index, DECIMAL, BigInteger, Date
 )
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -268,6 +268,58 @@ class UserMetric(Base):
     # Relationships
     user = relationship("src.models.trading_models.User", back_populates="metrics")
 
+class UserPnlDaily(Base):
+    """Per user/day P&L rollup (maintained by trigger on trades - migration 018)"""
+    __tablename__ = "user_pnl_daily"
+    __table_args__ = {'extend_existing': True}
+    
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    trade_date = Column(Date, primary_key=True)
+    trade_count = Column(Integer, default=0)
+    winning_trades = Column(Integer, default=0)
+    losing_trades = Column(Integer, default=0)
+    pnl_count = Column(Integer, default=0)  # Trades with a non-null P&L
+    total_pnl = Column(DECIMAL(15,2), default=0)
+    gross_profit = Column(DECIMAL(15,2), default=0)
+    gross_loss = Column(DECIMAL(15,2), default=0)
+    max_win = Column(DECIMAL(12,2), default=0)
+    max_loss = Column(DECIMAL(12,2), default=0)
+    pnl_sq_sum = Column(Float, default=0)  # For Sharpe without per-trade rows
+    loss_sq_sum = Column(Float, default=0)  # For Sortino downside deviation
+    notional = Column(DECIMAL(18,2), default=0)
+    notional_count = Column(Integer, default=0)
+    first_trade_at = Column(DateTime(timezone=True))
+    last_trade_at = Column(DateTime(timezone=True))
+    updated_at = Column(DateTime(timezone=True), server_default=func.now())
+
+class UserSymbolPnlDaily(Base):
+    """Per user/symbol/day P&L rollup"""
+    __tablename__ = "user_symbol_pnl_daily"
+    __table_args__ = {'extend_existing': True}
+    
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    trade_date = Column(Date, primary_key=True)
+    symbol = Column(String(20), primary_key=True)
+    trade_count = Column(Integer, default=0)
+    winning_trades = Column(Integer, default=0)
+    losing_trades = Column(Integer, default=0)
+    total_pnl = Column(DECIMAL(15,2), default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now())
+
+class UserStrategyPnlDaily(Base):
+    """Per user/strategy/day P&L rollup (strategy is '' when the trade had none)"""
+    __tablename__ = "user_strategy_pnl_daily"
+    __table_args__ = {'extend_existing': True}
+    
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    trade_date = Column(Date, primary_key=True)
+    strategy = Column(String(50), primary_key=True)
+    trade_count = Column(Integer, default=0)
+    winning_trades = Column(Integer, default=0)
+    losing_trades = Column(Integer, default=0)
+    total_pnl = Column(DECIMAL(15,2), default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now())
+
 class RiskMetric(Base):
     """Risk metrics"""
     __tablename__ = "risk_metrics"
@@ -0,0 +1,323 @@
+"""
+Hot-path metrics for the trading system.
+
+Prometheus instrumentation cheap enough for per-tick use:
+- Counters and histograms accumulate into thread-local cells; the hot path never takes a
+  lock (each cell is only written by its own thread)
+- Labelled children are bound once (``labels()`` is cached) and held by the caller, so an
+  observation is a list index, a ``bisect`` and two adds
+- Cells are cumulative; ``flush()`` sums them into a snapshot, at most every
+  ``flush_interval`` seconds when scraped, and the registry serves that snapshot as a
+  Prometheus collector on the default ``REGISTRY`` (``/metrics``)
+- Gauges are callbacks evaluated at flush time (queue depths and the like)
+"""
+
+import functools
+import os
+import re
+import threading
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from prometheus_client import REGISTRY
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily, HistogramMetricFamily
+
+# Seconds; tuned for sub-millisecond tick handling up to multi-second broker calls
+LATENCY_BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+                   0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+SYMBOL_CLASSES = ('index', 'option', 'future', 'equity')
+
+_OPTION_RE = re.compile(r'\d+(CE|PE)$')
+
+
+class _Metric(ABC):
+    """Labelled metric whose children accumulate in per-thread cells"""
+
+    kind = ''
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str]):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._label_values: List[Tuple[str, ...]] = []
+        self._local = threading.local()
+        self._shards: List[list] = []
+        self._lock = threading.Lock()
+
+    def labels(self, *values) -> object:
+        """Bound child for a label combination (bind once, keep the reference)"""
+        key = tuple(str(v) for v in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}, got {key}")
+            with self._lock:
+                child = self._children.get(key)
+                if child is None:
+                    child = self._make_child(len(self._label_values))
+                    self._label_values.append(key)
+                    self._children[key] = child
+        return child
+
+    def _cells(self, index: int) -> list:
+        """This thread's cell list, grown to cover child ``index``"""
+        cells = getattr(self._local, 'cells', None)
+        if cells is None:
+            cells = self._local.cells = []
+            with self._lock:
+                self._shards.append(cells)
+        while len(cells) <= index:
+            cells.append(self._new_cell())
+        return cells
+
+    def totals(self) -> List:
+        """Sum of every thread's cells per child"""
+        totals = [self._new_cell() for _ in self._label_values]
+        with self._lock:
+            shards = list(self._shards)
+        for cells in shards:
+            for index, cell in enumerate(list(cells)):
+                totals[index] = self._merge(totals[index], cell)
+        return totals
+
+    @abstractmethod
+    def _make_child(self, index: int):
+        """Bound child object observing into cell ``index``"""
+
+    @abstractmethod
+    def _new_cell(self):
+        """Empty accumulator for one child in one thread"""
+
+    @abstractmethod
+    def _merge(self, total, cell):
+        """``total`` with ``cell`` added in"""
+
+
+class _CounterChild:
+    __slots__ = ('_metric', '_index')
+
+    def __init__(self, metric: 'HotCounter', index: int):
+        self._metric = metric
+        self._index = index
+
+    def inc(self, amount: float = 1.0):
+        try:
+            self._metric._local.cells[self._index] += amount
+        except (AttributeError, IndexError):
+            self._metric._cells(self._index)[self._index] += amount
+
+
+class HotCounter(_Metric):
+    kind = 'counter'
+
+    def _make_child(self, index: int):
+        return _CounterChild(self, index)
+
+    def _new_cell(self):
+        return 0.0
+
+    def _merge(self, total, cell):
+        return total + cell
+
+    def family(self, totals):
+        family = CounterMetricFamily(self.name, self.documentation, labels=self.labelnames)
+        for labels, value in zip(self._label_values, totals):
+            family.add_metric(labels, value)
+        return family
+
+
+class _HistogramChild:
+    __slots__ = ('_metric', '_index', '_bounds')
+
+    def __init__(self, metric: 'HotHistogram', index: int):
+        self._metric = metric
+        self._index = index
+        self._bounds = metric.buckets
+
+    def observe(self, value: float):
+        try:
+            cell = self._metric._local.cells[self._index]
+        except (AttributeError, IndexError):
+            cell = self._metric._cells(self._index)[self._index]
+        # Last bucket is +Inf, last slot is the running sum
+        cell[bisect_left(self._bounds, value)] += 1
+        cell[-1] += value
+
+    def time(self):
+        return _Timer(self)
+
+
+class _Timer:
+    __slots__ = ('_child', '_start')
+
+    def __init__(self, child: _HistogramChild):
+        self._child = child
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self._child.observe(time.perf_counter() - self._start)
+
+
+class HotHistogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str],
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(float(b) for b in buckets))
+
+    def _make_child(self, index: int):
+        return _HistogramChild(self, index)
+
+    def _new_cell(self):
+        return [0] * (len(self.buckets) + 1) + [0.0]
+
+    def _merge(self, total, cell):
+        return [a + b for a, b in zip(total, cell)]
+
+    def family(self, totals):
+        family = HistogramMetricFamily(self.name, self.documentation, labels=self.labelnames)
+        for labels, cell in zip(self._label_values, totals):
+            cumulative, buckets = 0, []
+            for bound, count in zip(self.buckets + (float('inf'),), cell[:-1]):
+                cumulative += count
+                buckets.append(('+Inf' if bound == float('inf') else repr(bound), cumulative))
+            family.add_metric(labels, buckets, cell[-1])
+        return family
+
+
+class HotMetricsRegistry:
+    """Owns hot-path metrics and serves their flushed snapshot to Prometheus"""
+
+    def __init__(self, flush_interval: float = 5.0):
+        self.flush_interval = flush_interval
+        self._metrics: Dict[str, _Metric] = {}
+        self._gauges: Dict[str, Tuple[str, Callable[[], float]]] = {}
+        self._snapshot: List = []
+        self._flushed_at = 0.0
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> HotCounter:
+        return self._register(HotCounter(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = LATENCY_BUCKETS) -> HotHistogram:
+        return self._register(HotHistogram(name, documentation, labelnames, buckets))
+
+    def gauge(self, name: str, documentation: str, callback: Callable[[], float]):
+        """Gauge read at flush time; registering a name again replaces its callback"""
+        self._gauges[name] = (documentation, callback)
+
+    def flush(self) -> List:
+        """Fold every thread's cells into the snapshot served to scrapes"""
+        families = []
+        for metric in list(self._metrics.values()):
+            families.append(metric.family(metric.totals()))
+        for name, (documentation, callback) in list(self._gauges.items()):
+            try:
+                value = float(callback())
+            except Exception:
+                continue
+            family = GaugeMetricFamily(name, documentation)
+            family.add_metric([], value)
+            families.append(family)
+        self._snapshot = families
+        self._flushed_at = time.monotonic()
+        return families
+
+    def collect(self) -> Iterable:
+        if time.monotonic() - self._flushed_at >= self.flush_interval:
+            self.flush()
+        return iter(self._snapshot)
+
+    def describe(self) -> Iterable:
+        # Families are created lazily; nothing to pre-declare
+        return iter(())
+
+
+@functools.lru_cache(maxsize=16384)
+def symbol_class(symbol: str) -> str:
+    """index / option / future / equity, cached per symbol"""
+    upper = (symbol or '').upper()
+    if _OPTION_RE.search(upper):
+        return 'option'
+    if upper.endswith('FUT'):
+        return 'future'
+    if upper.endswith('-I') or upper in ('NIFTY', 'BANKNIFTY', 'FINNIFTY', 'MIDCPNIFTY', 'SENSEX', 'BANKEX'):
+        return 'index'
+    return 'equity'
+
+
+def timed_async(histogram: HotHistogram, *labels: str,
+                outcome: Optional[Callable[[object], str]] = None):
+    """Decorator observing an async call's latency, labelled with ``outcome`` (ok/error)"""
+    children = {}
+
+    def child(result_label: str):
+        bound = children.get(result_label)
+        if bound is None:
+            bound = children[result_label] = histogram.labels(*labels, result_label)
+        return bound
+
+    def decorate(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                result = await func(*args, **kwargs)
+            except BaseException:
+                child('error').observe(time.perf_counter() - start)
+                raise
+            child(outcome(result) if outcome else 'ok').observe(time.perf_counter() - start)
+            return result
+        return wrapper
+    return decorate
+
+
+# Global hot-path metrics registry instance
+hot_metrics = HotMetricsRegistry(flush_interval=float(os.getenv('METRICS_FLUSH_INTERVAL', '5')))
+try:
+    REGISTRY.register(hot_metrics)
+except ValueError:
+    pass
+
+ticks_total = hot_metrics.counter(
+    'trading_system_ticks', 'Ticks processed by the market data workers', ['symbol_class'])
+dropped_ticks_total = hot_metrics.counter(
+    'trading_system_dropped_ticks', 'Ticks dropped before processing', ['reason'])
+tick_processing_seconds = hot_metrics.histogram(
+    'trading_system_tick_processing_seconds', 'Per-tick processing time in the feed workers',
+    ['symbol_class'])
+cycle_stage_seconds = hot_metrics.histogram(
+    'trading_system_cycle_stage_seconds', 'Trading cycle stage latency', ['stage'])
+strategy_seconds = hot_metrics.histogram(
+    'trading_system_strategy_seconds', 'Per-strategy signal generation latency', ['strategy'])
+order_path_seconds = hot_metrics.histogram(
+    'trading_system_order_path_seconds', 'Order placement latency per layer', ['layer', 'outcome'])
+broker_call_seconds = hot_metrics.histogram(
+    'trading_system_broker_call_seconds', 'Broker REST call latency', ['call', 'outcome'])
+order_dispatch_wait_seconds = hot_metrics.histogram(
+    'trading_system_order_dispatch_wait_seconds', 'Queueing delay before a broker call gets rate-limit capacity',
+    ['kind', 'priority'])
+execution_queue_seconds = hot_metrics.histogram(
+    'trading_system_execution_queue_seconds', 'Time orders wait in the execution queue before starting',
+    ['priority_class'])
+
+# Pre-bound children for the per-tick path
+TICKS_BY_CLASS = {cls: ticks_total.labels(cls) for cls in SYMBOL_CLASSES}
+TICK_LATENCY_BY_CLASS = {cls: tick_processing_seconds.labels(cls) for cls in SYMBOL_CLASSES}
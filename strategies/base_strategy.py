@@ -32,6 +32,8 @@ warnings.filterwarnings('ignore')
 
 # Import our professional mathematical foundation
 from src.core.enhanced_strategy.mathematical_foundation import ProfessionalMathFoundation
+from src.core.market_depth_engine import market_depth_engine
+from src.core.signal_pipeline import cycle_memo
 
 logger = logging.getLogger(__name__)
 
@@ -507,6 +509,12 @@ class BaseStrategy:
             return {'opens': [], 'closes': [], 'highs': [], 'lows': [], 'volumes': [], 'source': 'missing'}
 
     def analyze_multi_timeframe(self, symbol: str, action: str = None) -> Dict:
+        """Multi-timeframe analysis, memoized per (strategy, action) for the current cycle"""
+        return cycle_memo.get_or_compute(
+            symbol, f'mtf:{self.name}:{action}', lambda: self._analyze_multi_timeframe(symbol, action)
+        )
+    
+    def _analyze_multi_timeframe(self, symbol: str, action: str = None) -> Dict:
         """
         🎯 MULTI-TIMEFRAME ANALYSIS for Higher Accuracy Signals
         
@@ -870,6 +878,29 @@ class BaseStrategy:
             # SAFE fallback - BLOCK trading if error in time check (safer)
             return False
     
+    def get_data_quality_score(self, symbol: str) -> Optional[float]:
+        """📶 Live feed quality score in [0, 1] (0 when stale, None when never seen)"""
+        try:
+            from monitoring.data_quality_monitor import data_quality_monitor
+            return data_quality_monitor.get_score(symbol)
+        except Exception:
+            return None
+    
+    def _has_acceptable_data_quality(self, symbol: str) -> bool:
+        """📶 Block signals on a degraded or stale feed (symbols the monitor never saw pass)"""
+        score = self.get_data_quality_score(symbol)
+        if score is None:
+            return True
+        try:
+            from monitoring.data_quality_monitor import data_quality_monitor
+            threshold = data_quality_monitor.quality_thresholds['min_acceptable_score']
+        except Exception:
+            return True
+        if score < threshold:
+            logger.warning(f"📶 DATA QUALITY BLOCK: {symbol} feed score {score:.2f} < {threshold:.2f} - signal skipped")
+            return False
+        return True
+    
     def _get_position_close_urgency(self) -> str:
         """⏰ GET POSITION CLOSE URGENCY - Determine urgency level for position closure"""
         try:
@@ -3419,7 +3450,13 @@ class BaseStrategy:
         Get IV Rank for symbol (0-100 scale)
         IV Rank > 50 = expensive options (high IV relative to historical)
         IV Rank < 50 = cheap options (low IV relative to historical)
+        
+        Memoized per trading cycle - the option chain is fetched once per symbol.
         """
+        return await cycle_memo.aget_or_compute(symbol, 'iv_rank', lambda: self._fetch_iv_rank(symbol))
+    
+    async def _fetch_iv_rank(self, symbol: str) -> Optional[float]:
+        """Fetch IV Rank from the Zerodha option chain (uncached)"""
         try:
             # Try to get IV from Zerodha option chain
             from src.core.orchestrator import get_orchestrator_instance
@@ -3446,7 +3483,11 @@ class BaseStrategy:
             return None
     
     async def _get_days_to_expiry(self, symbol: str) -> Optional[int]:
-        """Get days to expiry for nearest options contract"""
+        """Get days to expiry for nearest options contract (memoized per trading cycle)"""
+        return await cycle_memo.aget_or_compute(symbol, 'days_to_expiry', lambda: self._fetch_days_to_expiry(symbol))
+    
+    async def _fetch_days_to_expiry(self, symbol: str) -> Optional[int]:
+        """Compute days to expiry from the symbol or the broker's next expiry (uncached)"""
         try:
             from datetime import datetime, timedelta
             import re
@@ -5737,6 +5778,14 @@ class BaseStrategy:
             if total_qty > 0:
                 order_imbalance = (total_bid_qty - total_ask_qty) / total_qty  # -1 to +1
             
+            # 🎯 Prefer tick-resolution microstructure from the depth engine when fresh
+            # (smoothed 5-level imbalance instead of a single per-cycle snapshot)
+            depth_metrics = market_depth_engine.get_metrics(symbol)
+            if depth_metrics and depth_metrics['age_seconds'] > 30:
+                depth_metrics = None
+            if depth_metrics:
+                order_imbalance = depth_metrics['imbalance_l5_ewma']
+            
             # 3. Liquidity Score (based on depth and spread)
             liquidity_score = 5  # Default neutral
             
@@ -5797,6 +5846,19 @@ class BaseStrategy:
                 'total_ask_qty': total_ask_qty
             }
             
+            if depth_metrics:
+                result.update({
+                    'microprice': depth_metrics['microprice'],
+                    'microprice_offset_bps': round(depth_metrics['microprice_offset_bps'], 2),
+                    'order_flow_imbalance': depth_metrics['ofi_ewma'],
+                    'trade_sign_ewma': round(depth_metrics['trade_sign_ewma'], 3),
+                    'signed_volume_ratio': round(depth_metrics['signed_volume_ratio'], 3),
+                    'bid_depletion_rate': depth_metrics['bid_depletion_rate'],
+                    'ask_depletion_rate': depth_metrics['ask_depletion_rate'],
+                    'spread_mean_bps': round(depth_metrics['spread_mean_bps'], 2),
+                    'spread_std_bps': round(depth_metrics['spread_std_bps'], 2)
+                })
+            
             if liquidity_score <= 4 or buy_wall or sell_wall:
                 logger.info(f"📊 {symbol} DEPTH: Spread={bid_ask_spread:.2f}%, Imbalance={order_imbalance:+.2f}, Liquidity={liquidity_score}/10, Rec={recommendation}")
             
@@ -7052,6 +7114,10 @@ class BaseStrategy:
                               metadata: Dict, market_bias=None, market_data: Dict = None) -> Optional[Dict]:
         """Create standardized signal format - SUPPORTS EQUITY, FUTURES & OPTIONS"""
         try:
+            # 📶 FEED QUALITY GATE: never trade off spiky, gappy or stale ticks
+            if not self._has_acceptable_data_quality(symbol):
+                return None
+            
             # 🔧 TIME RESTRICTIONS MOVED TO RISK MANAGER
             # Strategies should always generate signals for analysis
             # Risk Manager will reject orders based on time restrictions
@@ -7292,12 +7358,14 @@ class BaseStrategy:
                 # Count current open positions
                 current_position_count = len(self.active_positions)
                 
-                # Also check Zerodha positions
+                # Also check Zerodha positions (one broker lookup per cycle across all signals)
                 try:
                     from src.core.orchestrator import get_orchestrator_instance
                     orchestrator = get_orchestrator_instance()
                     if orchestrator and hasattr(orchestrator, 'zerodha_client') and orchestrator.zerodha_client:
-                        zerodha_positions = await orchestrator.zerodha_client.get_positions()
+                        zerodha_positions = await cycle_memo.aget_or_compute(
+                            '__broker__', 'positions', orchestrator.zerodha_client.get_positions
+                        )
                         if zerodha_positions:
                             real_positions = [p for p in zerodha_positions if p.get('quantity', 0) != 0]
                             current_position_count = max(current_position_count, len(real_positions))
@@ -7560,26 +7628,7 @@ class BaseStrategy:
                 logger.info(f"   💡 Falling back to equity signal instead")
                 return self._create_equity_signal(symbol, action, entry_price, stop_loss, target, confidence, metadata)
             
-            # 🚨 FIX #2: IV FILTER - Don't buy expensive options (high IV = expensive = likely to lose)
-            try:
-                iv_rank = await self._get_iv_rank(symbol)
-                if iv_rank and iv_rank > 50:
-                    logger.warning(f"📈 HIGH IV REJECTED: {symbol} IV Rank {iv_rank:.0f}% > 50% - Options too expensive")
-                    logger.info(f"   💡 Falling back to equity signal (cheaper, no theta decay)")
-                    return self._create_equity_signal(symbol, action, entry_price, stop_loss, target, confidence, metadata)
-            except Exception as iv_err:
-                logger.debug(f"IV check skipped for {symbol}: {iv_err}")
-            
-            # 🚨 FIX #3: EXPIRY CHECK - Avoid options with < 3 days to expiry (fast decay)
-            try:
-                days_to_expiry = await self._get_days_to_expiry(symbol)
-                if days_to_expiry is not None and days_to_expiry < 3:
-                    logger.warning(f"⏳ SHORT EXPIRY REJECTED: {symbol} only {days_to_expiry} days to expiry")
-                    logger.info(f"   💡 Falling back to equity signal (avoiding theta cliff)")
-                    return self._create_equity_signal(symbol, action, entry_price, stop_loss, target, confidence, metadata)
-            except Exception as exp_err:
-                logger.debug(f"Expiry check skipped for {symbol}: {exp_err}")
-            
+            # Local (cheap) checks run before broker-backed IV/expiry lookups
             # 🚨 FIX #4: MOMENTUM CONFIRMATION - Only enter options on strong moves
             # Options need quick moves to overcome theta decay. Weak momentum = likely loss
             momentum_check = await self._check_momentum_for_options(symbol, action, entry_price, metadata)
@@ -7602,6 +7651,26 @@ class BaseStrategy:
             else:
                 logger.info(f"✅ TREND CONFIRMED: {symbol} - {trend_check.get('details', '')}")
             
+            # 🚨 FIX #2: IV FILTER - Don't buy expensive options (high IV = expensive = likely to lose)
+            try:
+                iv_rank = await self._get_iv_rank(symbol)
+                if iv_rank and iv_rank > 50:
+                    logger.warning(f"📈 HIGH IV REJECTED: {symbol} IV Rank {iv_rank:.0f}% > 50% - Options too expensive")
+                    logger.info(f"   💡 Falling back to equity signal (cheaper, no theta decay)")
+                    return self._create_equity_signal(symbol, action, entry_price, stop_loss, target, confidence, metadata)
+            except Exception as iv_err:
+                logger.debug(f"IV check skipped for {symbol}: {iv_err}")
+            
+            # 🚨 FIX #3: EXPIRY CHECK - Avoid options with < 3 days to expiry (fast decay)
+            try:
+                days_to_expiry = await self._get_days_to_expiry(symbol)
+                if days_to_expiry is not None and days_to_expiry < 3:
+                    logger.warning(f"⏳ SHORT EXPIRY REJECTED: {symbol} only {days_to_expiry} days to expiry")
+                    logger.info(f"   💡 Falling back to equity signal (avoiding theta cliff)")
+                    return self._create_equity_signal(symbol, action, entry_price, stop_loss, target, confidence, metadata)
+            except Exception as exp_err:
+                logger.debug(f"Expiry check skipped for {symbol}: {exp_err}")
+            
             # 🎯 CRITICAL FIX: Convert to options symbol and force BUY action
             options_symbol, option_type = await self._convert_to_options_symbol(symbol, entry_price, action)
             
@@ -7773,6 +7842,18 @@ class BaseStrategy:
                 logger.error(f"   This signal will NOT be sent to trade engine")
                 return None
             
+            # Exchange freeze quantity from today's contract specs: larger orders are rejected outright
+            from src.core.contract_specs import contract_specs
+            zerodha_underlying = self._map_truedata_to_zerodha_symbol(symbol)
+            freeze_quantity = contract_specs.get_freeze_quantity(zerodha_underlying)
+            if freeze_quantity and quantity > freeze_quantity:
+                lot_size = contract_specs.get_lot_size(zerodha_underlying) or 1
+                capped = (freeze_quantity // lot_size) * lot_size
+                logger.warning(f"⚠️ FREEZE LIMIT: {options_symbol} quantity {quantity} capped to {capped} (freeze {freeze_quantity})")
+                quantity = capped
+                if quantity <= 0:
+                    return None
+            
             # 🔥 OPTIONS ARE ALWAYS INTRADAY: Must be squared off same day
             is_intraday = True
             trading_mode = 'INTRADAY'
@@ -7787,9 +7868,9 @@ class BaseStrategy:
                 'option_type': option_type,  # CE or PE
                 'action': final_action.upper(),  # Always BUY for options (no selling due to margin)
                 'quantity': quantity,  # 🎯 CAPITAL-AWARE: Limit lots based on capital (validated above)
-                'entry_price': self._round_to_tick_size(options_entry_price),  # 🎯 FIXED: Use tick size rounding
-                'stop_loss': self._round_to_tick_size(options_stop_loss),      # 🎯 FIXED: Tick size rounding
-                'target': self._round_to_tick_size(options_target),            # 🎯 FIXED: Tick size rounding
+                'entry_price': self._round_to_tick_size(options_entry_price, symbol),  # 🎯 FIXED: Use tick size rounding
+                'stop_loss': self._round_to_tick_size(options_stop_loss, symbol),      # 🎯 FIXED: Tick size rounding
+                'target': self._round_to_tick_size(options_target, symbol),            # 🎯 FIXED: Tick size rounding
                 'strategy': self.name,  # Use 'strategy' for compatibility
                 'strategy_name': self.name,  # Also include strategy_name for new components
                 'confidence': round(confidence, 2),
@@ -9096,6 +9177,14 @@ class BaseStrategy:
             if zerodha_symbol != underlying_symbol:
                 logger.info(f"🔄 SYMBOL MAPPING: {underlying_symbol} → {zerodha_symbol}")
             
+            # Today's contract specs answer without a broker round-trip
+            from src.core.contract_specs import contract_specs
+            listed = contract_specs.has_symbol(options_symbol, zerodha_symbol)
+            if listed is not None:
+                if not listed:
+                    logger.warning(f"❌ OPTIONS NOT FOUND: {options_symbol} not listed in today's contract specs")
+                return listed
+            
             # Get orchestrator instance to access Zerodha client
             from src.core.orchestrator import get_orchestrator_instance
             orchestrator = get_orchestrator_instance()
@@ -9367,6 +9456,13 @@ class BaseStrategy:
         Args:
             preference: "nearest_weekly", "nearest_monthly", "next_weekly", "max_time_decay"
         """
+        # Expiry selection only changes with the trading day - reuse today's answer
+        from src.core.contract_specs import contract_specs
+        memo_key = ('optimal_expiry', self._map_truedata_to_zerodha_symbol(underlying_symbol), preference)
+        memoized = contract_specs.recall(memo_key)
+        if memoized:
+            return memoized
+        
         try:
             # Map TrueData symbol to Zerodha symbol before fetching expiries
             zerodha_symbol = self._map_truedata_to_zerodha_symbol(underlying_symbol)
@@ -9467,7 +9563,7 @@ class BaseStrategy:
             logger.info(f"🎯 OPTIMAL EXPIRY: {zerodha_expiry} (from {nearest['formatted']})")
             logger.info(f"   Date: {exp_date}, Days ahead: {(exp_date - today).days}")
             
-            return zerodha_expiry
+            return contract_specs.remember(memo_key, zerodha_expiry)
 
         except Exception as format_error:
             logger.error(f"❌ EXPIRY FORMATTING ERROR for {underlying_symbol}: {format_error}")
@@ -9486,6 +9582,12 @@ class BaseStrategy:
             if zerodha_symbol != underlying_symbol:
                 logger.info(f"🔄 SYMBOL MAPPING: {underlying_symbol} → {zerodha_symbol}")
             
+            # Today's contract specs, built once pre-market
+            from src.core.contract_specs import contract_specs
+            cached_expiries = contract_specs.get_expiries(zerodha_symbol)
+            if cached_expiries:
+                return cached_expiries
+            
             # Get orchestrator instance to access Zerodha client
             from src.core.orchestrator import get_orchestrator_instance
             orchestrator = get_orchestrator_instance()
@@ -9937,14 +10039,18 @@ class BaseStrategy:
             logger.error(f"Full traceback: {traceback.format_exc()}")
             return 0.0
     
-    def _round_to_tick_size(self, price: float) -> float:
-        """Round options price to proper tick size (₹0.05 for options)"""
+    def _round_to_tick_size(self, price: float, underlying_symbol: str = None) -> float:
+        """Round options price to the listed tick size (contract specs, else ₹0.05)"""
+        tick = 0.05
+        if underlying_symbol:
+            from src.core.contract_specs import contract_specs
+            tick = contract_specs.get_tick_size(self._map_truedata_to_zerodha_symbol(underlying_symbol)) or tick
         try:
             from src.utils.helpers import round_price_to_tick
-            return round_price_to_tick(price, 0.05)  # Options tick size is ₹0.05
+            return round_price_to_tick(price, tick)
         except ImportError:
             # Fallback if import fails
-            return round(price / 0.05) * 0.05
+            return round(price / tick) * tick
 
     
     def _calculate_options_levels(self, options_entry_price: float, original_stop_loss: float, 
@@ -10368,14 +10474,7 @@ class BaseStrategy:
             # 🔥 CRITICAL FIX: Hardcoded index lot sizes (these are well-known and rarely change)
             # Zerodha API sometimes returns stale data, so override for indices
             # 🔧 UPDATED Dec 2024
-            INDEX_LOT_SIZES = {
-                'NIFTY': 65,      # Corrected Dec 2024 - user confirmed
-                'BANKNIFTY': 35,  # Corrected Dec 2024 - user confirmed
-                'FINNIFTY': 40,   # Changed from 25 to 40 (Nov 2024)
-                'MIDCPNIFTY': 50, # Standard lot size
-                'SENSEX': 10,     # Lot size = 10
-                'BANKEX': 15,     # Lot size = 15
-            }
+            from src.core.contract_specs import INDEX_LOT_SIZES, contract_specs
             
             # Log symbol mapping for debugging
             clean_underlying = self._map_truedata_to_zerodha_symbol(underlying_symbol)
@@ -10388,6 +10487,12 @@ class BaseStrategy:
             if clean_underlying != underlying_symbol:
                 logger.info(f"🔄 SYMBOL MAPPING: {underlying_symbol} → {clean_underlying}")
             
+            # Today's contract specs avoid a full NFO instrument download per signal
+            lot_size = contract_specs.get_lot_size(clean_underlying)
+            if lot_size:
+                logger.debug(f"✅ CONTRACT SPEC LOT SIZE: {clean_underlying} = {lot_size}")
+                return lot_size
+            
             # Get orchestrator instance to access Zerodha client
             from src.core.orchestrator import get_orchestrator_instance
             orchestrator = get_orchestrator_instance()
@@ -10804,7 +10909,13 @@ class BaseStrategy:
             logger.info(f"   Current Price: ₹{current_price:.2f}, ATM: {atm_strike}, OTM Target: {otm_strike}")
             logger.info(f"   Strike Interval: {strike_interval}, OTM Offset: {otm_offset}")
 
-            # Get orchestrator to access Zerodha client
+            # Today's listed strike grid from contract specs - no broker round-trip
+            listed_strike = self._get_closest_listed_strike(underlying_symbol, otm_strike, expiry)
+            if listed_strike:
+                logger.info(f"✅ Using OTM strike: {listed_strike} (target was {otm_strike}, contract specs)")
+                return listed_strike
+
+            # Get orchestrator to access Zerodha client (fallback when specs are not ready)
             from src.core.orchestrator import get_orchestrator_instance
             orchestrator = get_orchestrator_instance()
 
@@ -10855,10 +10966,29 @@ class BaseStrategy:
             logger.warning(f"⚠️ Fallback to ATM strike: {atm_strike}")
             return atm_strike
     
+    def _get_closest_listed_strike(self, underlying_symbol: str, target_strike: float, expiry: str) -> Optional[int]:
+        """Closest listed strike for a YYMMM expiry from today's contract specs (None if not cached)"""
+        from src.core.contract_specs import contract_specs
+        zerodha_symbol = self._map_truedata_to_zerodha_symbol(underlying_symbol)
+        expiry_date = contract_specs.resolve_expiry(zerodha_symbol, expiry)
+        if expiry_date is None:
+            return None
+        strikes = [strike for strike in contract_specs.get_strikes(zerodha_symbol, expiry_date)
+                   if float(strike).is_integer()]
+        if not strikes:
+            return None
+        return int(min(strikes, key=lambda strike: abs(strike - target_strike)))
+    
     def _get_strike_interval(self, symbol: str, price: float) -> int:
         """Get the strike interval for a symbol"""
         symbol_upper = symbol.upper()
         
+        # Listed strike grid from today's contract specs
+        from src.core.contract_specs import contract_specs
+        interval = contract_specs.get_strike_interval(self._map_truedata_to_zerodha_symbol(symbol_upper))
+        if interval:
+            return interval
+        
         # Index options - fixed intervals
         if symbol_upper == 'NIFTY':
             return 50
@@ -10881,251 +11011,6 @@ class BaseStrategy:
             else:
                 return 5
     
-    def _get_strikes_volume_data(self, underlying_symbol: str, strikes: List[int], expiry: str, action: str) -> Dict:
-        """Get volume data for strikes from market data sources"""
-        try:
-            # Try to get volume data from TrueData cache
-            from data.truedata_client import live_market_data
-            
-            volume_data = {}
-            option_type = 'CE' if action.upper() == 'BUY' else 'PE'
-            
-            for strike in strikes:
-                # Build options symbol using proper format mapping
-                from config.options_symbol_mapping import get_truedata_options_format
-                options_symbol = get_truedata_options_format(underlying_symbol, expiry, strike, option_type)
-                
-                if live_market_data and options_symbol in live_market_data:
-                    market_data = live_market_data[options_symbol]
-                    volume = market_data.get('volume', 0)
-                    premium = market_data.get('ltp', market_data.get('price', 0))
-                    
-                    volume_data[strike] = {
-                        'volume': volume,
-                        'premium': premium,
-                        'symbol': options_symbol
-                    }
-                    
-            if volume_data:
-                logger.info(f"✅ Retrieved volume data for {len(volume_data)} strikes from TrueData")
-                return volume_data
-            else:
-                logger.debug(f"Volume data not needed - using ATM strike for {underlying_symbol}")
-                return {}
-                
-        except Exception as e:
-            logger.error(f"Error getting volume data: {e}")
-            return {}
-    
-    
-    def _get_capital_constrained_quantity(self, options_symbol: str, underlying_symbol: str, entry_price: float) -> int:
-        """🎯 SMART QUANTITY: F&O uses lots, Equity uses shares based on capital"""
-        try:
-            # Check if this is F&O (options) or equity
-            is_options = (options_symbol != underlying_symbol or 
-                         'CE' in options_symbol or 'PE' in options_symbol)
-            
-            # Get real-time available capital
-            available_capital = self._get_available_capital()
-            
-            if is_options:
-                # 🎯 F&O: Use lot-based calculation
-                # 🚨 CRITICAL FIX: Map TrueData symbol to Zerodha symbol (NIFTY-I → NIFTY)
-                zerodha_underlying = self._map_truedata_to_zerodha_symbol(underlying_symbol)
-                logger.info(f"🔄 SYMBOL MAPPING: {underlying_symbol} → {zerodha_underlying}")
-                
-                base_lot_size = self._get_dynamic_lot_size(options_symbol, zerodha_underlying)
-                if base_lot_size is None:
-                    logger.warning(f"⚠️ NO LOT SIZE for {zerodha_underlying} - FALLING BACK to EQUITY trading")
-                    # 🎯 AUTOMATIC FALLBACK: Calculate equity quantity instead of rejecting
-                    is_options = False  # Switch to equity mode
-                
-            if is_options:
-                # 🚨 CRITICAL SAFETY: Check for zero/invalid entry price BEFORE margin calculation
-                if entry_price <= 0:
-                    logger.error(f"❌ INVALID ENTRY PRICE: {entry_price} for {options_symbol}")
-                    logger.error(f"   Cannot calculate margin/quantity with zero/negative entry price")
-                    logger.error(f"   This indicates a price data issue - signal should be rejected")
-                    return 0
-                
-                # 🚨 CRITICAL FIX: Get REAL margin requirement from Zerodha API
-                margin_required = 0.0
-                
-                try:
-                    from src.core.orchestrator import get_orchestrator_instance
-                    orchestrator = get_orchestrator_instance()
-                    
-                    if orchestrator and hasattr(orchestrator, 'zerodha_client') and orchestrator.zerodha_client:
-                        # Get actual margin requirement from Zerodha
-                        if hasattr(orchestrator.zerodha_client, 'get_required_margin_for_order'):
-                            # Use the actual F&O symbol for margin calculation
-                            actual_symbol = options_symbol if options_symbol else underlying_symbol
-                            margin_required = orchestrator.zerodha_client.get_required_margin_for_order(
-                                symbol=actual_symbol,
-                                quantity=base_lot_size,
-                                order_type='BUY',
-                                product='MIS'  # Intraday
-                            )
-                            logger.info(f"📊 Dynamic margin from Zerodha: ₹{margin_required:,.2f} for {actual_symbol}")
-                except Exception as e:
-                    logger.debug(f"Could not get dynamic margin: {e}")
-                
-                # Fallback if dynamic margin not available
-                if margin_required <= 0:
-                    if 'CE' in options_symbol or 'PE' in options_symbol:
-                        # Options: Premium estimate (no caps - based on actual lot size)
-                        margin_required = base_lot_size * 50  # Remove capital percentage cap
-                        logger.info(f"📊 Options margin estimate: ₹{margin_required:,.2f}")
-                    else:
-                        # Futures: 10-15% of contract value
-                        contract_value = base_lot_size * entry_price
-                        margin_required = contract_value * 0.10  # 10% margin estimate
-                        logger.info(f"📊 Futures margin estimate: ₹{margin_required:,.2f}")
-                
-                # 🎯 MARGIN-BASED ALLOCATION: 80% margin limit per trade (allow high-value positions)
-                max_margin_per_trade_pct = 0.80  # 80% of available capital per trade  
-                max_margin_allowed = available_capital * max_margin_per_trade_pct
-
-                # CRITICAL: Options should ALWAYS be 1 lot (as per user requirement)
-                lots_needed_for_min = 1  # Always 1 lot for options/F&O
-                logger.info(f"🎯 OPTIONS LOT SIZE: Fixed to 1 lot for {zerodha_underlying}")
-
-                total_margin = margin_required * lots_needed_for_min if margin_required > 0 else margin_required
-
-                # Check if we can afford it within margin limits
-                if total_margin <= max_margin_allowed and total_margin <= available_capital:
-                    total_qty = base_lot_size * lots_needed_for_min
-                    logger.info(
-                        f"✅ F&O ORDER: {zerodha_underlying} = {lots_needed_for_min} lot(s) × {base_lot_size} = {total_qty} qty"
-                    )
-                    logger.info(
-                        f"   💰 Margin: ₹{total_margin:,.0f} (per lot ₹{margin_required:,.0f}) / Available: ₹{available_capital:,.0f}"
-                    )
-                    return total_qty
-
-                # If even 1 lot is too expensive, reject early
-                logger.warning(
-                    f"❌ F&O REJECTED: {zerodha_underlying} exceeds capital limits "
-                    f"(needed ₹{total_margin:,.0f}, available ₹{available_capital:,.0f})"
-                )
-                return 0
-            else:
-                # 🎯 EQUITY: Use share-based calculation with minimum trade value
-                # CRITICAL FIX: Reduce minimum trade value to work with available capital
-                min_trade_value = 20000.0  # Reduced from ₹25,000 to ₹20,000 for capital efficiency
-                
-                # Check if we can afford minimum trade value
-                if available_capital < min_trade_value:
-                    logger.warning(
-                        f"❌ EQUITY REJECTED: {underlying_symbol} insufficient capital for min trade value "
-                        f"(need ₹{min_trade_value:,.0f}, available ₹{available_capital:,.0f})"
-                    )
-                    return 0
-                
-                # 🚨 CRITICAL SAFETY: Check for zero/invalid entry price
-                if entry_price <= 0:
-                    logger.error(f"❌ INVALID ENTRY PRICE: {entry_price} for {underlying_symbol}")
-                    logger.error(f"   Cannot calculate quantity with zero/negative entry price")
-                    logger.error(f"   This indicates a price data issue - signal should be rejected")
-                    return 0
-                
-                # 🎯 CRITICAL: Calculate shares needed for MINIMUM ₹25,000 trade value
-                min_shares_required = int(min_trade_value / entry_price)
-                cost_for_min_shares = min_shares_required * entry_price
-                
-                # 🚨 MARGIN-BASED POSITION SIZING: Use 25% of available margin
-                estimated_margin_factor = 0.25  # Conservative estimate for MIS margin requirement
-                max_margin_per_trade_pct = 0.25  # 25% of available margin per trade
-                max_margin_allowed = available_capital * max_margin_per_trade_pct
-                
-                # Calculate maximum trade value we can afford with 25% margin allocation
-                max_affordable_trade_value = max_margin_allowed / estimated_margin_factor
-                max_affordable_shares = int(max_affordable_trade_value / entry_price)
-                max_affordable_cost = max_affordable_shares * entry_price
-                
-                # Use the higher of: minimum trade value OR maximum affordable within margin limits
-                if max_affordable_cost >= min_trade_value:
-                    # We can afford more than minimum - use maximum affordable
-                    final_quantity = max_affordable_shares
-                    cost = max_affordable_cost
-                    estimated_margin = cost * estimated_margin_factor
-                    
-                    logger.debug(f"✅ MARGIN-OPTIMIZED: {underlying_symbol} = {final_quantity} shares")
-                    logger.debug(f"   💰 Trade Value: ₹{cost:,.0f}")
-                    logger.debug(f"   💳 Est. Margin: ₹{estimated_margin:,.0f} ({estimated_margin/available_capital:.1%} of capital)")
-                    logger.debug(f"   📊 Leverage: ~{cost/estimated_margin:.1f}x")
-                else:
-                    # Can only afford minimum - check if it fits in margin allocation
-                    min_estimated_margin = cost_for_min_shares * estimated_margin_factor
-                    
-                    if min_estimated_margin <= max_margin_allowed:
-                        final_quantity = min_shares_required
-                        cost = cost_for_min_shares
-                        logger.debug(f"✅ MINIMUM VIABLE: {underlying_symbol} = {final_quantity} shares")
-                        logger.debug(f"   💰 Trade Value: ₹{cost:,.0f}")
-                        logger.debug(f"   💳 Est. Margin: ₹{cost * estimated_margin_factor:,.0f}")
-                    else:
-                        logger.warning(
-                            f"❌ EQUITY REJECTED: {underlying_symbol} min trade ₹{min_trade_value:,.0f} "
-                            f"needs ₹{min_estimated_margin:,.0f} margin, exceeds 25% limit ₹{max_margin_allowed:,.0f}"
-                        )
-                        return 0
-
-                logger.debug(f"✅ EQUITY ORDER: {underlying_symbol} = {final_quantity} shares")
-                logger.debug(f"   💰 Cost: ₹{cost:,.0f} / Available: ₹{available_capital:,.0f} ({cost/available_capital:.1%})")
-                
-                # CRITICAL DEBUG: Log final quantity calculation
-                if final_quantity == 0:
-                    logger.error(f"🚨 CRITICAL: Quantity calculation returned 0 for {underlying_symbol}")
-                    logger.error(f"   This should NOT happen for equity signals with valid entry price ₹{entry_price}")
-                
-                return final_quantity
-            
-        except Exception as e:
-            logger.error(f"Error calculating quantity: {e}")
-            # Fallback based on signal type
-            if 'CE' in options_symbol or 'PE' in options_symbol:
-                return 75  # F&O fallback
-            else:
-                return 10  # Equity fallback
-    
-    def _get_strikes_volume_data(self, underlying_symbol: str, strikes: List[int], expiry: str, action: str) -> Dict:
-        """Get volume data for strikes from market data sources"""
-        try:
-            # Try to get volume data from TrueData cache
-            from data.truedata_client import live_market_data
-            
-            volume_data = {}
-            option_type = 'CE' if action.upper() == 'BUY' else 'PE'
-            
-            for strike in strikes:
-                # Build options symbol using proper format mapping
-                from config.options_symbol_mapping import get_truedata_options_format
-                options_symbol = get_truedata_options_format(underlying_symbol, expiry, strike, option_type)
-                
-                if live_market_data and options_symbol in live_market_data:
-                    market_data = live_market_data[options_symbol]
-                    volume = market_data.get('volume', 0)
-                    premium = market_data.get('ltp', market_data.get('price', 0))
-                    
-                    volume_data[strike] = {
-                        'volume': volume,
-                        'premium': premium,
-                        'symbol': options_symbol
-                    }
-                    
-            if volume_data:
-                logger.info(f"✅ Retrieved volume data for {len(volume_data)} strikes from TrueData")
-                return volume_data
-            else:
-                logger.debug(f"Volume data not needed - using ATM strike for {underlying_symbol}")
-                return {}
-                
-        except Exception as e:
-            logger.error(f"Error getting volume data: {e}")
-            return {}
-    
-    
     def _get_capital_constrained_quantity(self, options_symbol: str, underlying_symbol: str, entry_price: float) -> int:
         """🎯 SMART QUANTITY: F&O uses lots, Equity uses shares based on capital"""
         try:
@@ -22,8 +22,6 @@ import numpy as np
 import pandas as pd
 import scipy.stats as stats
 from scipy.signal import savgol_filter
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.preprocessing import StandardScaler
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any, Tuple
 from dataclasses import dataclass
@@ -388,12 +386,12 @@ class EnhancedMomentumSurfer(BaseStrategy):
             'regime_adaptation_pnl': 0.0
         }
         
-        # MACHINE LEARNING COMPONENTS
-        self.ml_model = RandomForestClassifier(n_estimators=100, random_state=42)
-        self.feature_scaler = StandardScaler()
-        self.ml_trained = False
-        self.ml_features_history = []
-        self.ml_labels_history = []
+        # MACHINE LEARNING COMPONENTS (fitted off-loop by the shared training service)
+        from src.core.ml_training_service import ml_training_service
+        self.ml_service = ml_training_service
+        self.ml_model_key = f"ml:{self.strategy_name}"
+        self.ml_service.register(self.ml_model_key, capacity=1000, min_samples=50, retrain_every=20,
+                                 model_params={'n_estimators': 100, 'random_state': 42})
         
         # Market condition strategies
         self.strategies_by_condition = {
@@ -856,16 +854,16 @@ class EnhancedMomentumSurfer(BaseStrategy):
                 data_str = redis_client.get(ml_data_key)
                 if data_str:
                     data = json.loads(data_str)
-                    self.ml_features_history = [np.array(f) for f in data.get('features', [])]
-                    self.ml_labels_history = data.get('labels', [])
+                    loaded = self.ml_service.load_samples(
+                        self.ml_model_key, data.get('features', []), data.get('labels', []))
                     
-                    if len(self.ml_features_history) >= 50:
-                        logger.info(f"📊 ML DATA LOADED: {len(self.ml_features_history)} training samples from Redis")
+                    if loaded >= 50:
+                        logger.info(f"📊 ML DATA LOADED: {loaded} training samples from Redis")
                         
-                        # Train model immediately
+                        # Train model immediately (in the background pool)
                         await self._update_ml_model()
                     else:
-                        logger.info(f"📊 ML DATA: {len(self.ml_features_history)} samples (need 50+ for training)")
+                        logger.info(f"📊 ML DATA: {loaded} samples (need 50+ for training)")
                 else:
                     logger.info("📊 No persisted ML training data found - starting fresh")
                     
@@ -880,7 +878,8 @@ class EnhancedMomentumSurfer(BaseStrategy):
         try:
             import json
             
-            if len(self.ml_features_history) < 10:
+            features, labels = self.ml_service.samples(self.ml_model_key)
+            if len(features) < 10:
                 return  # Not enough data to persist
             
             # Get Redis client
@@ -895,8 +894,8 @@ class EnhancedMomentumSurfer(BaseStrategy):
                 return
             
             # Keep last 500 training samples
-            features_to_save = [f.tolist() for f in self.ml_features_history[-500:]]
-            labels_to_save = self.ml_labels_history[-500:]
+            features_to_save = features[-500:].tolist()
+            labels_to_save = labels[-500:].tolist()
             
             ml_data_key = f"ml_training_data:{self.strategy_name}"
             data = {
@@ -2593,17 +2592,10 @@ class EnhancedMomentumSurfer(BaseStrategy):
         Store data for ML model training with persistence
         """
         try:
-            if len(features) > 0:
-                self.ml_features_history.append(features)
-                self.ml_labels_history.append(label)
-                
-                # Keep only recent data
-                if len(self.ml_features_history) > 1000:
-                    self.ml_features_history.pop(0)
-                    self.ml_labels_history.pop(0)
-                
+            # Bounded ring buffer; a retrain is scheduled by the service every 20 samples
+            if len(features) > 0 and self.ml_service.add_sample(self.ml_model_key, features, label):
                 # Persist to Redis every 50 samples
-                if len(self.ml_features_history) % 50 == 0:
+                if self.ml_service.samples_seen(self.ml_model_key) % 50 == 0:
                     asyncio.create_task(self._persist_ml_training_data())
                     
         except Exception as e:
@@ -2612,35 +2604,10 @@ class EnhancedMomentumSurfer(BaseStrategy):
     async def _update_ml_model(self):
         """
         🔥 FIX FOR LIMITATION: ML Signal Validation  
-        Update ML model with new training data
+        Request a retrain; the fit runs in the training service's worker pool
         """
         try:
-            if len(self.ml_features_history) < 50:  # Need minimum data
-                return
-            
-            # Prepare training data
-            X = np.array(self.ml_features_history)
-            y = np.array(self.ml_labels_history)
-            
-            # Check if we have both classes
-            if len(np.unique(y)) < 2:
-                logger.debug("ML training skipped - need both positive and negative samples")
-                return
-            
-            # Scale features
-            X_scaled = self.feature_scaler.fit_transform(X)
-            
-            # Train model
-            self.ml_model.fit(X_scaled, y)
-            self.ml_trained = True
-            
-            # Calculate model performance
-            train_score = self.ml_model.score(X_scaled, y)
-            
-            logger.info(f"🤖 ML MODEL UPDATED: {len(X)} samples, accuracy={train_score:.3f}")
-            
-            # Persist training data
-            await self._persist_ml_training_data()
+            self.ml_service.request_training(self.ml_model_key)
             
         except Exception as e:
             logger.error(f"ML model update failed: {e}")
@@ -2648,27 +2615,26 @@ class EnhancedMomentumSurfer(BaseStrategy):
     def _get_ml_confidence_boost(self, features: np.ndarray) -> float:
         """Get ML-based confidence boost for signal"""
         try:
-            if not self.ml_trained or len(features) == 0:
+            # Latest published model; never a half-trained one
+            snapshot = self.ml_service.snapshot(self.ml_model_key)
+            if snapshot is None or len(features) == 0:
                 return 0.0
             
             # 🔥 FIX: Check if ML model has sufficient training data
-            if len(self.ml_labels_history) < 50:
-                logger.debug(f"ML model has insufficient training data ({len(self.ml_labels_history)} samples) - skipping penalty")
+            if snapshot.samples < 50:
+                logger.debug(f"ML model has insufficient training data ({snapshot.samples} samples) - skipping penalty")
                 return 0.0
             
-            # Scale features
-            features_scaled = self.feature_scaler.transform(features.reshape(1, -1))
-            
             # Get prediction probability
-            prediction_proba = self.ml_model.predict_proba(features_scaled)[0]
+            probability = snapshot.predict_proba(features)
             
             # 🔥 FIX: If model always predicts same class (not learning), don't apply penalty
-            if prediction_proba[1] < 0.05 or prediction_proba[1] > 0.95:
-                logger.debug(f"ML model prediction too extreme ({prediction_proba[1]:.3f}) - likely undertrained, skipping")
+            if probability < 0.05 or probability > 0.95:
+                logger.debug(f"ML model prediction too extreme ({probability:.3f}) - likely undertrained, skipping")
                 return 0.0
             
             # Convert to confidence boost (-0.3 to +0.3) - reduced impact
-            confidence_boost = (prediction_proba[1] - 0.5) * 0.6
+            confidence_boost = (probability - 0.5) * 0.6
             
             return confidence_boost
             
@@ -2700,13 +2666,10 @@ class EnhancedMomentumSurfer(BaseStrategy):
                     return  # Not enough data
             
             label = 1 if was_profitable else 0
+            # Retraining is scheduled by the training service once 20 new samples arrive
             self._store_ml_training_data(features, label)
             
             logger.debug(f"📊 ML training data recorded: {symbol} {'PROFIT' if was_profitable else 'LOSS'}")
-            
-            # Train model if we have enough new data
-            if len(self.ml_features_history) >= 50 and len(self.ml_features_history) % 20 == 0:
-                asyncio.create_task(self._update_ml_model())
                 
         except Exception as e:
             logger.error(f"Trade outcome recording failed: {e}")
@@ -20,12 +20,12 @@ import numpy as np
 import pandas as pd
 import scipy.stats as stats
 from scipy.optimize import minimize
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.preprocessing import StandardScaler
 from typing import Dict, List, Optional, Tuple, Union, Any
 from datetime import datetime, timedelta
 from dataclasses import dataclass, field
 from strategies.base_strategy import BaseStrategy
+from src.core.market_depth_engine import market_depth_engine
+from src.core.ml_inference import FeatureCache, InferenceBatch
 import pytz
 import warnings
 warnings.filterwarnings('ignore')
@@ -327,18 +327,21 @@ class OptimizedVolumeScalper(BaseStrategy):
         # MACHINE LEARNING COMPONENTS
         # 🔧 FIX: Use class_weight='balanced' to handle severe class imbalance
         # Without this, with 2% positive samples, model just predicts negative always
-        self.ml_model = RandomForestClassifier(
-            n_estimators=100, 
-            random_state=42,
-            class_weight='balanced',  # 🔧 CRITICAL: Give equal importance to minority class
-            min_samples_leaf=5,  # Prevent overfitting on small minority class
-            max_depth=10  # Limit depth to prevent memorizing minority samples
-        )
-        self.feature_scaler = StandardScaler()
-        self.ml_trained = False
-        self.ml_balanced_accuracy = 0.0  # 🔧 Track balanced accuracy to know if model is learning
-        self.ml_features_history = []
-        self.ml_labels_history = []
+        # Fitted off-loop by the shared training service (stratified 80/20 holdout at 100+ samples)
+        from src.core.ml_training_service import ml_training_service
+        self.ml_service = ml_training_service
+        self.ml_model_key = f"ml:{self.name}"
+        self.ml_service.register(
+            self.ml_model_key, capacity=1000, min_samples=50, retrain_every=20, holdout=True,
+            model_params={
+                'n_estimators': 100,
+                'random_state': 42,
+                'class_weight': 'balanced',  # 🔧 CRITICAL: Give equal importance to minority class
+                'min_samples_leaf': 5,  # Prevent overfitting on small minority class
+                'max_depth': 10  # Limit depth to prevent memorizing minority samples
+            })
+        # Symbol-level feature blocks, computed once per symbol per 1-minute bar
+        self.ml_feature_cache = FeatureCache(bar_seconds=60)
         
         # PROFESSIONAL PERFORMANCE TRACKING
         self.strategy_returns = []
@@ -1101,6 +1104,7 @@ class OptimizedVolumeScalper(BaseStrategy):
     async def _generate_microstructure_signals(self, data: Dict) -> List[Dict]:
         """Generate signals based on market microstructure analysis"""
         signals = []
+        candidates = []
         
         for symbol, symbol_data in data.items():
             if not symbol_data or symbol == 'timestamp':
@@ -1139,9 +1143,13 @@ class OptimizedVolumeScalper(BaseStrategy):
             if arbitrage_signal:
                 microstructure_signals.append(arbitrage_signal)
             
-            # PROFESSIONAL ML ENHANCEMENT
-            enhanced_signals = await self._enhance_signals_with_ml(microstructure_signals, symbol, symbol_data)
-            
+            if microstructure_signals:
+                candidates.append((symbol, symbol_data, microstructure_signals))
+        
+        # PROFESSIONAL ML ENHANCEMENT (every candidate of the cycle scored in one batch)
+        enhanced_by_symbol = await self._enhance_candidates_with_ml(candidates)
+        
+        for (symbol, symbol_data, _), enhanced_signals in zip(candidates, enhanced_by_symbol):
             # 🎯 Convert enhanced microstructure signals to trading signals
             # Note: Mean reversion and liquidity gap are now regime-aware (disabled in trending markets)
             # This prevents contradictory signals from mixing trend-following with counter-trend strategies
@@ -1160,8 +1168,15 @@ class OptimizedVolumeScalper(BaseStrategy):
         recent_flows = self.order_flow_history[symbol][-20:]  # Increased sample size
         
         # PROFESSIONAL ORDER FLOW METRICS
-        buy_flow = sum(f['intensity'] for f in recent_flows if f['direction'] > 0)
-        sell_flow = sum(f['intensity'] for f in recent_flows if f['direction'] < 0)
+        # 🎯 Real signed volume (Lee-Ready on full-mode depth) when the depth engine has it,
+        # otherwise fall back to the candle-based proxy
+        depth_metrics = market_depth_engine.get_metrics(symbol)
+        if depth_metrics and depth_metrics['trade_count'] >= 10 and depth_metrics['age_seconds'] <= 30:
+            buy_flow = depth_metrics['buy_volume_ewma']
+            sell_flow = depth_metrics['sell_volume_ewma']
+        else:
+            buy_flow = sum(f['intensity'] for f in recent_flows if f['direction'] > 0)
+            sell_flow = sum(f['intensity'] for f in recent_flows if f['direction'] < 0)
         total_flow = buy_flow + sell_flow
         
         if total_flow == 0:
@@ -2471,46 +2486,65 @@ class OptimizedVolumeScalper(BaseStrategy):
     async def _enhance_signals_with_ml(self, signals: List[MarketMicrostructureSignal], 
                                      symbol: str, symbol_data: Dict) -> List[MarketMicrostructureSignal]:
         """PROFESSIONAL ML SIGNAL ENHANCEMENT with feature engineering"""
+        if not signals:
+            return signals
+        return (await self._enhance_candidates_with_ml([(symbol, symbol_data, signals)]))[0]
+    
+    async def _enhance_candidates_with_ml(
+            self, candidates: List[Tuple[str, Dict, List[MarketMicrostructureSignal]]]
+    ) -> List[List[MarketMicrostructureSignal]]:
+        """ML enhancement for a whole cycle: extract features for every candidate signal,
+        score them with one vectorized model call, then apply the per-signal boosts"""
         try:
-            if not signals:
-                return signals
+            batch = InferenceBatch(self.ml_service)
+            extracted = []
             
-            enhanced_signals = []
-            
-            for signal in signals:
+            for symbol, symbol_data, signals in candidates:
                 # FEATURE ENGINEERING
-                features = self._extract_ml_features(symbol, symbol_data, signal)
-                
-                if len(features) > 0:
-                    # ML PREDICTION (if model is trained)
-                    ml_confidence_boost = await self._get_ml_confidence_boost(features)
-                    
-                    # ENHANCE SIGNAL WITH ML
-                    enhanced_signal = self._apply_ml_enhancement(signal, ml_confidence_boost, features)
-                    enhanced_signals.append(enhanced_signal)
-                    
-                    # STORE FOR TRAINING
-                    self._store_ml_training_data(features, signal)
-                else:
-                    enhanced_signals.append(signal)
-            
-            # TRAIN ML MODEL IF ENOUGH DATA
-            await self._update_ml_model()
+                rows = [self._extract_ml_features(symbol, symbol_data, signal) for signal in signals]
+                for signal, features in zip(signals, rows):
+                    batch.add(self.ml_model_key, id(signal), features)
+                extracted.append(rows)
+            
+            # ML PREDICTION (if model is trained)
+            probabilities = batch.score() if len(batch) else {}
+            
+            enhanced = []
+            for (symbol, symbol_data, signals), rows in zip(candidates, extracted):
+                enhanced_signals = []
+                for signal, features in zip(signals, rows):
+                    if len(features) > 0:
+                        ml_confidence_boost = await self._get_ml_confidence_boost(
+                            features, probabilities.get(id(signal)))
+                        
+                        # ENHANCE SIGNAL WITH ML
+                        enhanced_signals.append(self._apply_ml_enhancement(signal, ml_confidence_boost, features))
+                        
+                        # STORE FOR TRAINING
+                        self._store_ml_training_data(features, signal)
+                    else:
+                        enhanced_signals.append(signal)
+                enhanced.append(enhanced_signals)
             
-            return enhanced_signals
+            return enhanced
             
         except Exception as e:
             logger.error(f"ML signal enhancement failed: {e}")
-            return signals
+            return [signals for _, _, signals in candidates]
     
     def _extract_ml_features(self, symbol: str, symbol_data: Dict, 
                            signal: MarketMicrostructureSignal) -> np.ndarray:
-        """PROFESSIONAL FEATURE ENGINEERING for ML enhancement"""
+        """PROFESSIONAL FEATURE ENGINEERING for ML enhancement
+        
+        Signal features are computed per call; the bar-stable indicator blocks come from the
+        per-bar feature cache, so every signal (and re-evaluation) of a symbol within a bar
+        shares them.
+        """
         try:
-            features = []
+            market_features, technical_features = self._extract_symbol_ml_features(symbol, symbol_data)
             
             # MARKET MICROSTRUCTURE FEATURES
-            features.extend([
+            signal_features = [
                 signal.strength,
                 signal.confidence,
                 signal.risk_adjusted_return,
@@ -2518,181 +2552,202 @@ class OptimizedVolumeScalper(BaseStrategy):
                 signal.sharpe_ratio,
                 signal.var_95,
                 signal.kelly_fraction
-            ])
-            
-            # VOLATILITY REGIME FEATURES
-            if symbol in self.volatility_history and self.volatility_history[symbol]:
-                vol_data = self.volatility_history[symbol][-1]
-                features.extend([
-                    vol_data.get('current_vol', 0.02),
-                    vol_data.get('clustering_strength', 0.0),
-                    vol_data.get('vol_percentile', 50.0),
-                    1.0 if vol_data.get('vol_regime') == 'HIGH_VOLATILITY' else 0.0,
-                    1.0 if vol_data.get('vol_regime') == 'LOW_VOLATILITY' else 0.0
-                ])
-            else:
-                features.extend([0.02, 0.0, 50.0, 0.0, 0.0])
-            
-            # PRICE ACTION FEATURES
-            if symbol in self.price_history and len(self.price_history[symbol]) >= 10:
-                prices = self.price_history[symbol][-10:]
-                returns = np.diff(prices) / prices[:-1]
-                
-                features.extend([
-                    np.mean(returns),  # Average return
-                    np.std(returns),   # Return volatility
-                    np.max(returns),   # Max return
-                    np.min(returns),   # Min return
-                    len([r for r in returns if r > 0]) / len(returns),  # Win rate
-                    np.mean([r for r in returns if r > 0]) if any(r > 0 for r in returns) else 0,  # Avg win
-                    np.mean([r for r in returns if r < 0]) if any(r < 0 for r in returns) else 0   # Avg loss
-                ])
-            else:
-                features.extend([0.0, 0.02, 0.0, 0.0, 0.5, 0.0, 0.0])
-            
-            # VOLUME FEATURES
-            if symbol in self.volume_history and len(self.volume_history[symbol]) >= 5:
-                volumes = self.volume_history[symbol][-5:]
-                current_volume = symbol_data.get('volume', 0)
-                avg_volume = np.mean(volumes)
-                
-                features.extend([
-                    current_volume / avg_volume if avg_volume > 0 else 1.0,  # Volume ratio
-                    np.std(volumes) / avg_volume if avg_volume > 0 else 0.0,  # Volume volatility
-                    current_volume  # Absolute volume
-                ])
-            else:
-                features.extend([1.0, 0.0, symbol_data.get('volume', 0)])
-            
-            # TIME-BASED FEATURES
-            import pytz
-            ist = pytz.timezone('Asia/Kolkata')
-            current_time = datetime.now(ist)
-            
-            features.extend([
-                current_time.hour / 24.0,  # Hour of day (normalized)
-                current_time.minute / 60.0,  # Minute of hour (normalized)
-                1.0 if 9 <= current_time.hour <= 10 else 0.0,  # Opening hour
-                1.0 if 14 <= current_time.hour <= 15 else 0.0,  # Closing hour
-                1.0 if current_time.weekday() == 0 else 0.0,  # Monday
-                1.0 if current_time.weekday() == 4 else 0.0   # Friday
-            ])
+            ]
             
             # SIGNAL TYPE FEATURES (one-hot encoding)
-            features.extend([
+            edge_features = [
                 1.0 if signal.edge_source == "PROFESSIONAL_ORDER_FLOW" else 0.0,
                 1.0 if signal.edge_source == "STATISTICAL_ARBITRAGE" else 0.0,
                 1.0 if signal.edge_source == "VOLATILITY_CLUSTERING" else 0.0,
                 1.0 if signal.edge_source == "MEAN_REVERSION" else 0.0,
                 1.0 if signal.edge_source == "LIQUIDITY_GAP" else 0.0
-            ])
+            ]
             
-            # 🔥 FIX: TECHNICAL INDICATOR FEATURES (previously missing from ML!)
-            # These indicators were calculated but not passed to ML for weighting
-            if symbol in self.price_history and len(self.price_history[symbol]) >= 14:
-                prices = self.price_history[symbol]
-                prices_arr = np.array(prices)
-                
-                # RSI (normalized 0-1)
-                rsi = self._calculate_rsi(prices, 14)
-                rsi_normalized = rsi / 100.0
-                
-                # Momentum indicators
-                from strategies.momentum_surfer import ProfessionalMomentumModels
-                momentum_score = ProfessionalMomentumModels.momentum_score(prices_arr, min(20, len(prices)))
-                trend_strength = ProfessionalMomentumModels.trend_strength(prices_arr)
-                mean_reversion_prob = ProfessionalMomentumModels.mean_reversion_probability(prices_arr)
-                hp_trend, hp_cycle, hp_trend_direction = ProfessionalMomentumModels.hp_trend_filter(prices_arr)
-                
-                # MACD state (encoded)
-                macd_state_val = 0.0
-                if len(prices) >= 26:
-                    macd_data = self.calculate_macd_signal(prices)
-                    macd_crossover = macd_data.get('crossover')
-                    if macd_crossover == 'bullish':
-                        macd_state_val = 1.0
-                    elif macd_crossover == 'bearish':
-                        macd_state_val = -1.0
-                
-                # Buying/Selling pressure
-                ltp = symbol_data.get('ltp', symbol_data.get('close', 0))
-                high = symbol_data.get('high', ltp)
-                low = symbol_data.get('low', ltp)
-                close = symbol_data.get('close', ltp)
-                if high > low:
-                    buying_pressure = (close - low) / (high - low)
-                    selling_pressure = (high - close) / (high - low)
-                else:
-                    buying_pressure = 0.5
-                    selling_pressure = 0.5
-                
-                features.extend([
-                    rsi_normalized,           # 0-1: RSI normalized
-                    (rsi - 50) / 50,          # -1 to 1: RSI deviation from neutral
-                    momentum_score / 10.0,    # Normalized momentum score
-                    trend_strength,           # Raw trend strength
-                    mean_reversion_prob,      # 0-1: Mean reversion probability
-                    hp_trend_direction * 100, # HP trend direction (scaled)
-                    macd_state_val,           # -1, 0, 1: MACD state
-                    buying_pressure,          # 0-1: Buying pressure
-                    selling_pressure,         # 0-1: Selling pressure
-                    buying_pressure - selling_pressure  # -1 to 1: Net pressure
-                ])
-            else:
-                # Default values if insufficient data
-                features.extend([0.5, 0.0, 0.0, 0.0, 0.5, 0.0, 0.0, 0.5, 0.5, 0.0])
-            
-            return np.array(features)
+            return np.concatenate((signal_features, market_features, edge_features, technical_features))
             
         except Exception as e:
             logger.error(f"Feature extraction failed for {symbol}: {e}")
             return np.array([])
     
-    async def _get_ml_confidence_boost(self, features: np.ndarray) -> float:
-        """Get ML-based confidence boost for signal
+    def _extract_bar_ml_features(self, symbol: str) -> Tuple[List[float], Optional[List[float]]]:
+        """Indicator features that only change once per bar (volatility regime, RSI, HP, MACD)
+        
+        Returns the volatility-regime block and the indicator block (None without enough history).
+        """
+        # VOLATILITY REGIME FEATURES
+        if symbol in self.volatility_history and self.volatility_history[symbol]:
+            vol_data = self.volatility_history[symbol][-1]
+            vol_features = [
+                vol_data.get('current_vol', 0.02),
+                vol_data.get('clustering_strength', 0.0),
+                vol_data.get('vol_percentile', 50.0),
+                1.0 if vol_data.get('vol_regime') == 'HIGH_VOLATILITY' else 0.0,
+                1.0 if vol_data.get('vol_regime') == 'LOW_VOLATILITY' else 0.0
+            ]
+        else:
+            vol_features = [0.02, 0.0, 50.0, 0.0, 0.0]
+        
+        # 🔥 FIX: TECHNICAL INDICATOR FEATURES (previously missing from ML!)
+        # These indicators were calculated but not passed to ML for weighting
+        if symbol not in self.price_history or len(self.price_history[symbol]) < 14:
+            return vol_features, None
+        prices = self.price_history[symbol]
+        prices_arr = np.array(prices)
+        
+        # RSI (normalized 0-1)
+        rsi = self._calculate_rsi(prices, 14)
+        
+        # Momentum indicators
+        from strategies.momentum_surfer import ProfessionalMomentumModels
+        momentum_score = ProfessionalMomentumModels.momentum_score(prices_arr, min(20, len(prices)))
+        trend_strength = ProfessionalMomentumModels.trend_strength(prices_arr)
+        mean_reversion_prob = ProfessionalMomentumModels.mean_reversion_probability(prices_arr)
+        hp_trend, hp_cycle, hp_trend_direction = ProfessionalMomentumModels.hp_trend_filter(prices_arr)
+        
+        # MACD state (encoded)
+        macd_state_val = 0.0
+        if len(prices) >= 26:
+            macd_data = self.calculate_macd_signal(prices)
+            macd_crossover = macd_data.get('crossover')
+            if macd_crossover == 'bullish':
+                macd_state_val = 1.0
+            elif macd_crossover == 'bearish':
+                macd_state_val = -1.0
+        
+        return vol_features, [
+            rsi / 100.0,              # 0-1: RSI normalized
+            (rsi - 50) / 50,          # -1 to 1: RSI deviation from neutral
+            momentum_score / 10.0,    # Normalized momentum score
+            trend_strength,           # Raw trend strength
+            mean_reversion_prob,      # 0-1: Mean reversion probability
+            hp_trend_direction * 100, # HP trend direction (scaled)
+            macd_state_val            # -1, 0, 1: MACD state
+        ]
+    
+    def _extract_symbol_ml_features(self, symbol: str, symbol_data: Dict) -> Tuple[np.ndarray, np.ndarray]:
+        """Symbol-level ML features: market context and technical indicators
+        
+        Bar-stable indicators are cached per bar; tick-level values (price action, volume,
+        buying/selling pressure, time of day) are computed from the live tick on every call.
+        """
+        vol_features, indicator_features = self.ml_feature_cache.get(
+            symbol, datetime.now().timestamp(), lambda: self._extract_bar_ml_features(symbol))
+        features = list(vol_features)
+        
+        # PRICE ACTION FEATURES
+        if symbol in self.price_history and len(self.price_history[symbol]) >= 10:
+            prices = self.price_history[symbol][-10:]
+            returns = np.diff(prices) / prices[:-1]
+        
+            features.extend([
+                np.mean(returns),  # Average return
+                np.std(returns),   # Return volatility
+                np.max(returns),   # Max return
+                np.min(returns),   # Min return
+                len([r for r in returns if r > 0]) / len(returns),  # Win rate
+                np.mean([r for r in returns if r > 0]) if any(r > 0 for r in returns) else 0,  # Avg win
+                np.mean([r for r in returns if r < 0]) if any(r < 0 for r in returns) else 0   # Avg loss
+            ])
+        else:
+            features.extend([0.0, 0.02, 0.0, 0.0, 0.5, 0.0, 0.0])
+        
+        # VOLUME FEATURES
+        if symbol in self.volume_history and len(self.volume_history[symbol]) >= 5:
+            volumes = self.volume_history[symbol][-5:]
+            current_volume = symbol_data.get('volume', 0)
+            avg_volume = np.mean(volumes)
+        
+            features.extend([
+                current_volume / avg_volume if avg_volume > 0 else 1.0,  # Volume ratio
+                np.std(volumes) / avg_volume if avg_volume > 0 else 0.0,  # Volume volatility
+                current_volume  # Absolute volume
+            ])
+        else:
+            features.extend([1.0, 0.0, symbol_data.get('volume', 0)])
+        
+        # TIME-BASED FEATURES
+        import pytz
+        ist = pytz.timezone('Asia/Kolkata')
+        current_time = datetime.now(ist)
+        
+        features.extend([
+            current_time.hour / 24.0,  # Hour of day (normalized)
+            current_time.minute / 60.0,  # Minute of hour (normalized)
+            1.0 if 9 <= current_time.hour <= 10 else 0.0,  # Opening hour
+            1.0 if 14 <= current_time.hour <= 15 else 0.0,  # Closing hour
+            1.0 if current_time.weekday() == 0 else 0.0,  # Monday
+            1.0 if current_time.weekday() == 4 else 0.0   # Friday
+        ])
+        market_features = np.array(features)
+        
+        if indicator_features is None:
+            # Default values if insufficient data
+            return market_features, np.array([0.5, 0.0, 0.0, 0.0, 0.5, 0.0, 0.0, 0.5, 0.5, 0.0])
+        
+        # Buying/Selling pressure from the live tick
+        ltp = symbol_data.get('ltp', symbol_data.get('close', 0))
+        high = symbol_data.get('high', ltp)
+        low = symbol_data.get('low', ltp)
+        close = symbol_data.get('close', ltp)
+        if high > low:
+            buying_pressure = (close - low) / (high - low)
+            selling_pressure = (high - close) / (high - low)
+        else:
+            buying_pressure = 0.5
+            selling_pressure = 0.5
+        
+        return market_features, np.array(indicator_features + [
+            buying_pressure,          # 0-1: Buying pressure
+            selling_pressure,         # 0-1: Selling pressure
+            buying_pressure - selling_pressure  # -1 to 1: Net pressure
+        ])
+    
+    async def _get_ml_confidence_boost(self, features: np.ndarray,
+                                       probability: Optional[float] = None) -> float:
+        """Get ML-based confidence boost for signal (``probability`` from a batched scoring pass)
         
         🔧 FIX: Only trust ML model when it's actually learning (balanced_acc > 0.55)
         With severe class imbalance (2% positive), an untrained model just predicts negative always.
         """
         try:
-            if not self.ml_trained or len(features) == 0:
+            # Latest published model; never a half-trained one
+            snapshot = self.ml_service.snapshot(self.ml_model_key)
+            if snapshot is None or len(features) == 0:
                 return 0.0
             
             # 🔥 FIX: Check if ML model has sufficient training data
             # If model has < 50 samples, it's unreliable - return 0.0
-            if len(self.ml_labels_history) < 50:
-                logger.debug(f"ML model has insufficient training data ({len(self.ml_labels_history)} samples) - skipping")
+            if snapshot.samples < 50:
+                logger.debug(f"ML model has insufficient training data ({snapshot.samples} samples) - skipping")
                 return 0.0
             
             # 🔧 FIX: Check if model is actually learning (balanced accuracy > 0.55)
             # balanced_acc of 0.5 = random guessing, we need at least 0.55 to trust it
-            if hasattr(self, 'ml_balanced_accuracy') and self.ml_balanced_accuracy <= 0.55:
+            balanced_accuracy = snapshot.balanced_accuracy or 0.0
+            if balanced_accuracy <= 0.55:
                 # Model is not learning - don't use its predictions
-                logger.debug(f"ML model balanced_acc={self.ml_balanced_accuracy:.3f} ≤ 0.55 - not learned yet, skipping")
+                logger.debug(f"ML model balanced_acc={balanced_accuracy:.3f} ≤ 0.55 - not learned yet, skipping")
                 return 0.0
             
-            # Scale features
-            features_scaled = self.feature_scaler.transform(features.reshape(1, -1))
-            
             # Get prediction probability
-            prediction_proba = self.ml_model.predict_proba(features_scaled)[0]
+            if probability is None:
+                probability = snapshot.predict_proba(features)
             
             # 🔥 FIX: If model always predicts same class (not learning), don't apply penalty
             # A well-trained model should have varied predictions, not always 0.0 or 1.0
-            if prediction_proba[1] < 0.05 or prediction_proba[1] > 0.95:
+            if probability < 0.05 or probability > 0.95:
                 # Model is too confident in one direction = likely undertrained
-                logger.debug(f"ML model prediction too extreme ({prediction_proba[1]:.3f}) - likely undertrained, skipping")
+                logger.debug(f"ML model prediction too extreme ({probability:.3f}) - likely undertrained, skipping")
                 return 0.0
             
             # Convert to confidence boost (-0.3 to +0.3) - reduced from -0.5 to +0.5
             # ML should provide hints, not dominate the decision
-            confidence_boost = (prediction_proba[1] - 0.5) * 0.6  # Scale down the impact
+            confidence_boost = (probability - 0.5) * 0.6  # Scale down the impact
             
             # 🔧 FIX: Scale boost by model reliability (balanced accuracy)
             # Model with 0.55 acc gets 10% of boost, model with 0.75 acc gets full boost
-            if hasattr(self, 'ml_balanced_accuracy') and self.ml_balanced_accuracy > 0.55:
-                reliability_factor = min((self.ml_balanced_accuracy - 0.55) / 0.20, 1.0)  # 0.55->0%, 0.75->100%
-                confidence_boost *= reliability_factor
+            reliability_factor = min((balanced_accuracy - 0.55) / 0.20, 1.0)  # 0.55->0%, 0.75->100%
+            confidence_boost *= reliability_factor
             
             return confidence_boost
             
@@ -2737,8 +2792,6 @@ class OptimizedVolumeScalper(BaseStrategy):
         """Store data for ML model training"""
         try:
             if len(features) > 0:
-                self.ml_features_history.append(features)
-                
                 # 🔧 FIX (v3): ULTRA-STRICT criteria to avoid circular reasoning
                 # Previous v1: confidence > 8.0 → 89% positive (way too lenient)
                 # Previous v2: confidence >= 9.0, sharpe >= 3.0 → still 89% positive!
@@ -2762,103 +2815,12 @@ class OptimizedVolumeScalper(BaseStrategy):
                     metadata.get('volume_surge', 1.0) >= 1.5           # 50%+ above average volume
                 )
                 label = 1 if is_exceptional else 0
-                self.ml_labels_history.append(label)
-                
-                # Keep only recent data
-                if len(self.ml_features_history) > 1000:
-                    self.ml_features_history.pop(0)
-                    self.ml_labels_history.pop(0)
+                # Bounded ring buffer; the service schedules a background retrain every 20 samples
+                self.ml_service.add_sample(self.ml_model_key, features, label)
                     
         except Exception as e:
             logger.error(f"ML training data storage failed: {e}")
     
-    async def _update_ml_model(self):
-        """Update ML model with new training data
-        
-        🔧 FIX: Use train/test split for proper accuracy measurement
-        Previously reported 100% accuracy because it tested on training data!
-        """
-        try:
-            if len(self.ml_features_history) < 50:  # Need minimum data
-                return
-            
-            # Prepare training data
-            X = np.array(self.ml_features_history)
-            y = np.array(self.ml_labels_history)
-            
-            # Check if we have both classes
-            if len(np.unique(y)) < 2:
-                return
-            
-            # 🔧 FIX: Use train/test split for honest accuracy measurement
-            # Previously: trained and tested on same data → 100% accuracy (false!)
-            # Now: 80% train, 20% test → realistic accuracy
-            from sklearn.model_selection import train_test_split
-            
-            # 🔧 FIX: Handle class imbalance properly - use stratified split and report balanced metrics
-            # Only split if we have enough data
-            if len(X) >= 100:
-                # Use stratified split to ensure both classes in test set
-                try:
-                    X_train, X_test, y_train, y_test = train_test_split(
-                        X, y, test_size=0.2, random_state=42, stratify=y
-                    )
-                except ValueError:
-                    # If stratification fails (e.g., one class too small), use regular split
-                    X_train, X_test, y_train, y_test = train_test_split(
-                        X, y, test_size=0.2, random_state=42
-                    )
-            else:
-                # Not enough data for split - use all for training, report as "training accuracy"
-                X_train, X_test, y_train, y_test = X, X, y, y
-            
-            # Scale features (fit on train, transform both)
-            X_train_scaled = self.feature_scaler.fit_transform(X_train)
-            X_test_scaled = self.feature_scaler.transform(X_test)
-            
-            # Train model on training set only
-            self.ml_model.fit(X_train_scaled, y_train)
-            self.ml_trained = True
-
-            # 🔧 FIX: Calculate accuracy on TEST set with class imbalance awareness
-            test_score = self.ml_model.score(X_test_scaled, y_test)
-            
-            # Calculate class distribution for context
-            positive_ratio = np.mean(y) * 100
-            test_positive_ratio = np.mean(y_test) * 100 if len(y_test) > 0 else 0
-            
-            # 🔧 FIX: If accuracy is 100% with severe class imbalance, it's likely just predicting majority class
-            # Report this as a warning
-            if test_score >= 0.99 and test_positive_ratio < 5:
-                logger.warning(f"⚠️ ML MODEL: 100% accuracy with {test_positive_ratio:.1f}% positive samples - likely predicting majority class only")
-                logger.warning(f"   Model may not be learning meaningful patterns - consider class balancing")
-            
-            # Calculate balanced accuracy if we have both classes
-            if len(np.unique(y_test)) >= 2:
-                from sklearn.metrics import balanced_accuracy_score, confusion_matrix
-                y_pred = self.ml_model.predict(X_test_scaled)
-                balanced_acc = balanced_accuracy_score(y_test, y_pred)
-                cm = confusion_matrix(y_test, y_pred)
-                
-                # 🔧 FIX: Store balanced accuracy to check if model is actually learning
-                self.ml_balanced_accuracy = balanced_acc
-                
-                # 🔧 FIX: Warn if model is not learning (balanced_acc <= 0.55 is near random)
-                if balanced_acc <= 0.55:
-                    logger.warning(f"⚠️ ML MODEL: balanced_acc={balanced_acc:.3f} ≤ 0.55 - model is near RANDOM, predictions unreliable")
-                    logger.warning(f"   Model will be DISABLED until it learns better patterns")
-                elif balanced_acc >= 0.65:
-                    logger.info(f"✅ ML MODEL LEARNING: balanced_acc={balanced_acc:.3f} - model is making meaningful predictions")
-                
-                logger.info(f"🤖 ML MODEL UPDATED: {len(X)} samples, test_accuracy={test_score:.3f}, balanced_acc={balanced_acc:.3f} (pos={positive_ratio:.0f}%, test_pos={test_positive_ratio:.0f}%)")
-                logger.debug(f"   Confusion matrix: {cm.tolist()}")
-            else:
-                self.ml_balanced_accuracy = 0.0  # Can't calculate, treat as unreliable
-                logger.info(f"🤖 ML MODEL UPDATED: {len(X)} samples, test_accuracy={test_score:.3f} (pos={positive_ratio:.0f}%, test_pos={test_positive_ratio:.0f}%)")
-            
-        except Exception as e:
-            logger.error(f"ML model update failed: {e}")
-    
     def _calculate_vwap_execution_price(self, symbol: str, symbol_data: Dict, 
                                       quantity: int, direction: str) -> Tuple[float, Dict]:
         """PROFESSIONAL VWAP EXECUTION OPTIMIZATION"""
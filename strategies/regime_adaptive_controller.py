@@ -22,7 +22,7 @@ import pandas as pd
 import numpy as np
 import scipy.stats as stats
 from scipy.optimize import minimize
-from scipy.linalg import inv
+from scipy.linalg import cho_factor, cho_solve, solve_triangular
 from sklearn.mixture import GaussianMixture
 from sklearn.preprocessing import StandardScaler
 from typing import Dict, List, Optional, Any, Tuple
@@ -59,6 +59,15 @@ class ProfessionalRegimeMetrics:
     regime: MarketRegime
     timestamp: datetime
 
+def _timestamp_epoch(value) -> float:
+    """Epoch seconds of a candle/feature timestamp (datetime or ISO string); 0.0 if unknown"""
+    try:
+        if isinstance(value, str):
+            value = datetime.fromisoformat(value)
+        return value.timestamp()
+    except (AttributeError, TypeError, ValueError):
+        return 0.0
+
 class HiddenMarkovModel:
     """
     FULL IMPLEMENTATION: Professional Hidden Markov Model for regime detection
@@ -68,6 +77,11 @@ class HiddenMarkovModel:
     - Backward Algorithm: Smoothing for state estimation
     - Viterbi Algorithm: Most likely state sequence
     - Baum-Welch Algorithm: EM parameter estimation
+    - Online filter: O(N²) per-bar posterior update for live data
+    
+    🚀 VECTORIZED: Cholesky factors of the emission covariances are computed once per
+    parameter update, the emission matrix for a whole sequence is built in one shot,
+    and every recursion step is a matrix operation in log-space (no per-state loops).
     """
     
     def __init__(self, n_states: int = 4, n_features: int = 3):
@@ -83,6 +97,14 @@ class HiddenMarkovModel:
         # For numerical stability
         self.min_prob = 1e-10
         
+        # True once baum_welch has fitted the parameters
+        self.is_fitted = False
+        
+        # Online filter posterior P(state_t | obs_1..t)
+        self.filter_probabilities: Optional[np.ndarray] = None
+        
+        self._refresh_emission_cache()
+        
     def _init_transition_matrix(self) -> np.ndarray:
         """Initialize transition matrix with high self-transition probability (regime persistence)"""
         # 70% probability to stay in same state, 10% to transition to each other state
@@ -90,23 +112,74 @@ class HiddenMarkovModel:
         np.fill_diagonal(A, 0.7)
         return A
     
-    def _gaussian_pdf(self, x: np.ndarray, mean: np.ndarray, cov: np.ndarray) -> float:
-        """Multivariate Gaussian probability density function"""
-        try:
-            n = len(x)
-            det = np.linalg.det(cov)
-            if det <= 0:
-                det = self.min_prob
-            inv_cov = np.linalg.inv(cov + np.eye(n) * self.min_prob)
-            diff = x - mean
-            exponent = -0.5 * diff @ inv_cov @ diff
-            return max((1 / np.sqrt((2 * np.pi) ** n * det)) * np.exp(exponent), self.min_prob)
-        except:
-            return self.min_prob
+    def _refresh_emission_cache(self):
+        """Precompute Cholesky factors, log-normalizers and log-transitions after a parameter update"""
+        d = self.n_features
+        eye = np.eye(d)
+        chol = np.empty((self.n_states, d, d))
+        for j in range(self.n_states):
+            cov = self.emission_covariances[j] + eye * self.min_prob
+            jitter = 1e-6
+            while True:
+                try:
+                    chol[j] = np.linalg.cholesky(cov)
+                    break
+                except np.linalg.LinAlgError:
+                    # Not positive definite - regularize until it is
+                    cov = cov + eye * jitter
+                    jitter *= 10
+        
+        self._chol = chol
+        log_det = 2 * np.sum(np.log(np.diagonal(chol, axis1=1, axis2=2)), axis=1)
+        self._log_norm = -0.5 * (d * np.log(2 * np.pi) + log_det)
+        self._log_transition = np.log(self.transition_matrix + self.min_prob)
+    
+    def _log_emission_matrix(self, observations: np.ndarray) -> np.ndarray:
+        """log P(observation_t | state_j) for every t and j (T x N matrix)"""
+        obs = np.atleast_2d(np.asarray(observations, dtype=float))
+        log_b = np.empty((obs.shape[0], self.n_states))
+        for j in range(self.n_states):
+            # Mahalanobis distance via a triangular solve on the cached factor
+            z = solve_triangular(self._chol[j], (obs - self.emission_means[j]).T, lower=True)
+            log_b[:, j] = self._log_norm[j] - 0.5 * np.sum(z * z, axis=0)
+        return log_b
     
     def _emission_probability(self, observation: np.ndarray, state: int) -> float:
         """Calculate emission probability P(observation | state)"""
-        return self._gaussian_pdf(observation, self.emission_means[state], self.emission_covariances[state])
+        return max(float(np.exp(self._log_emission_matrix(observation)[0, state])), self.min_prob)
+    
+    @staticmethod
+    def _shifted_emissions(log_b: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Exponentiate log-emissions after removing each row's max (returns B, row_max)"""
+        row_max = log_b.max(axis=1)
+        return np.exp(log_b - row_max[:, None]), row_max
+    
+    def _forward_pass(self, b: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Scaled forward recursion on shifted emissions; returns alpha and per-step normalizers"""
+        T = b.shape[0]
+        A = self.transition_matrix
+        alpha = np.empty((T, self.n_states))
+        scale = np.empty(T)
+        
+        a = self.initial_probabilities * b[0]
+        scale[0] = a.sum() + self.min_prob
+        alpha[0] = a / scale[0]
+        for t in range(1, T):
+            a = (alpha[t-1] @ A) * b[t]
+            scale[t] = a.sum() + self.min_prob
+            alpha[t] = a / scale[t]
+        return alpha, scale
+    
+    def _backward_pass(self, b: np.ndarray, scale: Optional[np.ndarray] = None) -> np.ndarray:
+        """Backward recursion on shifted emissions, each step normalized by ``scale`` or its own sum"""
+        T = b.shape[0]
+        A = self.transition_matrix
+        beta = np.empty((T, self.n_states))
+        beta[T-1] = 1.0
+        for t in range(T-2, -1, -1):
+            v = A @ (b[t+1] * beta[t+1])
+            beta[t] = v / ((scale[t+1] if scale is not None else v.sum()) + self.min_prob)
+        return beta
     
     def forward(self, observations: np.ndarray) -> Tuple[np.ndarray, float]:
         """
@@ -116,31 +189,9 @@ class HiddenMarkovModel:
             alpha: Forward probabilities (T x N matrix)
             log_likelihood: Log probability of observation sequence
         """
-        T = len(observations)
-        N = self.n_states
-        alpha = np.zeros((T, N))
-        scaling_factors = np.zeros(T)
-        
-        # Initialization (t=0)
-        for i in range(N):
-            alpha[0, i] = self.initial_probabilities[i] * self._emission_probability(observations[0], i)
-        
-        # Scaling to prevent underflow
-        scaling_factors[0] = np.sum(alpha[0]) + self.min_prob
-        alpha[0] /= scaling_factors[0]
-        
-        # Induction (t=1 to T-1)
-        for t in range(1, T):
-            for j in range(N):
-                alpha[t, j] = sum(alpha[t-1, i] * self.transition_matrix[i, j] for i in range(N))
-                alpha[t, j] *= self._emission_probability(observations[t], j)
-            
-            scaling_factors[t] = np.sum(alpha[t]) + self.min_prob
-            alpha[t] /= scaling_factors[t]
-        
-        # Log likelihood
-        log_likelihood = np.sum(np.log(scaling_factors + self.min_prob))
-        
+        b, row_max = self._shifted_emissions(self._log_emission_matrix(observations))
+        alpha, scale = self._forward_pass(b)
+        log_likelihood = float(np.sum(np.log(scale)) + np.sum(row_max))
         return alpha, log_likelihood
     
     def backward(self, observations: np.ndarray, scaling_factors: np.ndarray = None) -> np.ndarray:
@@ -148,32 +199,10 @@ class HiddenMarkovModel:
         BACKWARD ALGORITHM: Calculate backward probabilities for smoothing
         
         Returns:
-            beta: Backward probabilities (T x N matrix)
+            beta: Backward probabilities (T x N matrix), rescaled per step
         """
-        T = len(observations)
-        N = self.n_states
-        beta = np.zeros((T, N))
-        
-        # Initialization (t=T-1)
-        beta[T-1] = 1.0
-        
-        # Get scaling factors from forward pass if not provided
-        if scaling_factors is None:
-            _, _ = self.forward(observations)
-            scaling_factors = np.ones(T)
-        
-        # Induction (t=T-2 to 0)
-        for t in range(T-2, -1, -1):
-            for i in range(N):
-                beta[t, i] = sum(
-                    self.transition_matrix[i, j] * 
-                    self._emission_probability(observations[t+1], j) * 
-                    beta[t+1, j]
-                    for j in range(N)
-                )
-            beta[t] /= (scaling_factors[t+1] + self.min_prob)
-        
-        return beta
+        b, _ = self._shifted_emissions(self._log_emission_matrix(observations))
+        return self._backward_pass(b, scaling_factors)
     
     def viterbi(self, observations: np.ndarray) -> Tuple[np.ndarray, float]:
         """
@@ -183,33 +212,23 @@ class HiddenMarkovModel:
             path: Most likely state sequence
             log_prob: Log probability of the path
         """
-        T = len(observations)
-        N = self.n_states
+        log_b = self._log_emission_matrix(observations)
+        log_A = self._log_transition
+        T = log_b.shape[0]
         
-        # Viterbi probabilities and backpointers
-        delta = np.zeros((T, N))
-        psi = np.zeros((T, N), dtype=int)
+        psi = np.zeros((T, self.n_states), dtype=int)
+        delta = np.log(self.initial_probabilities + self.min_prob) + log_b[0]
         
-        # Initialization
-        for i in range(N):
-            delta[0, i] = np.log(self.initial_probabilities[i] + self.min_prob) + \
-                          np.log(self._emission_probability(observations[0], i) + self.min_prob)
-            psi[0, i] = 0
-        
-        # Recursion
+        # Recursion: scores[i, j] = delta[i] + log A[i, j]
         for t in range(1, T):
-            for j in range(N):
-                trans_probs = delta[t-1] + np.log(self.transition_matrix[:, j] + self.min_prob)
-                psi[t, j] = np.argmax(trans_probs)
-                delta[t, j] = trans_probs[psi[t, j]] + \
-                              np.log(self._emission_probability(observations[t], j) + self.min_prob)
+            scores = delta[:, None] + log_A
+            psi[t] = np.argmax(scores, axis=0)
+            delta = scores[psi[t], np.arange(self.n_states)] + log_b[t]
         
-        # Termination
+        # Termination and backtracking
         path = np.zeros(T, dtype=int)
-        path[T-1] = np.argmax(delta[T-1])
-        log_prob = delta[T-1, path[T-1]]
-        
-        # Backtracking
+        path[T-1] = np.argmax(delta)
+        log_prob = float(delta[path[T-1]])
         for t in range(T-2, -1, -1):
             path[t] = psi[t+1, path[t+1]]
         
@@ -223,70 +242,41 @@ class HiddenMarkovModel:
         Returns:
             final_log_likelihood: Log likelihood after training
         """
-        T = len(observations)
-        N = self.n_states
+        observations = np.asarray(observations, dtype=float)
         prev_log_likelihood = float('-inf')
+        log_likelihood = prev_log_likelihood
         
         for iteration in range(n_iterations):
-            # E-STEP: Calculate forward and backward probabilities
-            alpha, log_likelihood = self.forward(observations)
+            # E-STEP: one emission matrix per iteration, forward/backward as matrix ops
+            b, row_max = self._shifted_emissions(self._log_emission_matrix(observations))
+            alpha, scale = self._forward_pass(b)
+            beta = self._backward_pass(b, scale)
+            log_likelihood = float(np.sum(np.log(scale)) + np.sum(row_max))
             
-            # Calculate scaling factors for backward pass
-            scaling_factors = np.zeros(T)
-            for t in range(T):
-                scaling_factors[t] = np.sum(alpha[t]) + self.min_prob
-                
-            beta = self.backward(observations, scaling_factors)
-            
-            # Calculate gamma (state occupation probability)
-            gamma = np.zeros((T, N))
-            for t in range(T):
-                denom = np.sum(alpha[t] * beta[t]) + self.min_prob
-                gamma[t] = (alpha[t] * beta[t]) / denom
-            
-            # Calculate xi (transition probability)
-            xi = np.zeros((T-1, N, N))
-            for t in range(T-1):
-                denom = 0
-                for i in range(N):
-                    for j in range(N):
-                        denom += alpha[t, i] * self.transition_matrix[i, j] * \
-                                 self._emission_probability(observations[t+1], j) * beta[t+1, j]
-                denom = max(denom, self.min_prob)
-                
-                for i in range(N):
-                    for j in range(N):
-                        xi[t, i, j] = (alpha[t, i] * self.transition_matrix[i, j] * 
-                                       self._emission_probability(observations[t+1], j) * 
-                                       beta[t+1, j]) / denom
+            # gamma: state occupation probability (T x N)
+            gamma = alpha * beta
+            gamma /= gamma.sum(axis=1, keepdims=True) + self.min_prob
+            
+            # xi: transition probability ((T-1) x N x N), normalized per step
+            xi = alpha[:-1, :, None] * self.transition_matrix[None] * (b[1:] * beta[1:])[:, None, :]
+            xi /= xi.sum(axis=(1, 2), keepdims=True) + self.min_prob
             
             # M-STEP: Update parameters
-            # Update initial probabilities
             self.initial_probabilities = gamma[0] / (np.sum(gamma[0]) + self.min_prob)
             
-            # Update transition matrix
-            for i in range(N):
-                denom = np.sum(gamma[:-1, i]) + self.min_prob
-                for j in range(N):
-                    self.transition_matrix[i, j] = np.sum(xi[:, i, j]) / denom
-            
-            # Normalize transition matrix rows
+            self.transition_matrix = xi.sum(axis=0) / (gamma[:-1].sum(axis=0)[:, None] + self.min_prob)
             row_sums = self.transition_matrix.sum(axis=1, keepdims=True)
             self.transition_matrix = self.transition_matrix / (row_sums + self.min_prob)
             
-            # Update emission means
-            for j in range(N):
-                denom = np.sum(gamma[:, j]) + self.min_prob
-                self.emission_means[j] = np.sum(gamma[:, j:j+1] * observations, axis=0) / denom
+            weights = gamma.sum(axis=0) + self.min_prob
+            self.emission_means = (gamma.T @ observations) / weights[:, None]
             
-            # Update emission covariances
-            for j in range(N):
-                denom = np.sum(gamma[:, j]) + self.min_prob
-                diff = observations - self.emission_means[j]
-                weighted_cov = np.zeros((self.n_features, self.n_features))
-                for t in range(T):
-                    weighted_cov += gamma[t, j] * np.outer(diff[t], diff[t])
-                self.emission_covariances[j] = weighted_cov / denom + np.eye(self.n_features) * 0.01
+            diff = observations[:, None, :] - self.emission_means[None]
+            self.emission_covariances = (
+                np.einsum('tn,tni,tnj->nij', gamma, diff, diff) / weights[:, None, None]
+                + np.eye(self.n_features) * 0.01
+            )
+            self._refresh_emission_cache()
             
             # Check convergence
             if abs(log_likelihood - prev_log_likelihood) < convergence_threshold:
@@ -294,6 +284,7 @@ class HiddenMarkovModel:
                 break
             prev_log_likelihood = log_likelihood
         
+        self.is_fitted = True
         return log_likelihood
     
     def predict_state(self, observation: np.ndarray) -> Tuple[int, np.ndarray]:
@@ -304,12 +295,55 @@ class HiddenMarkovModel:
             predicted_state: Most likely current state
             state_probabilities: Probability distribution over states
         """
-        probs = np.array([
-            self.initial_probabilities[i] * self._emission_probability(observation, i)
-            for i in range(self.n_states)
-        ])
+        b, _ = self._shifted_emissions(self._log_emission_matrix(observation))
+        probs = self.initial_probabilities * b[0]
         probs = probs / (np.sum(probs) + self.min_prob)
-        return np.argmax(probs), probs
+        return int(np.argmax(probs)), probs
+    
+    def get_params(self) -> Dict[str, Any]:
+        """Fitted parameters and filter posterior (for warm-state checkpoints)"""
+        return {
+            'transition_matrix': self.transition_matrix,
+            'emission_means': self.emission_means,
+            'emission_covariances': self.emission_covariances,
+            'initial_probabilities': self.initial_probabilities,
+            'filter_probabilities': self.filter_probabilities,
+            'is_fitted': self.is_fitted
+        }
+    
+    def set_params(self, params: Dict[str, Any]):
+        """Restore parameters written by ``get_params``"""
+        self.transition_matrix = np.asarray(params['transition_matrix'], dtype=float)
+        self.emission_means = np.asarray(params['emission_means'], dtype=float)
+        self.emission_covariances = np.asarray(params['emission_covariances'], dtype=float)
+        self.initial_probabilities = np.asarray(params['initial_probabilities'], dtype=float)
+        filtered = params.get('filter_probabilities')
+        self.filter_probabilities = None if filtered is None else np.asarray(filtered, dtype=float)
+        self.is_fitted = bool(params.get('is_fitted', False))
+        self._refresh_emission_cache()
+    
+    def seed_filter(self, observations: np.ndarray) -> Tuple[int, np.ndarray]:
+        """Initialize the online filter with the forward posterior at the end of a sequence"""
+        alpha, _ = self.forward(observations)
+        self.filter_probabilities = alpha[-1].copy()
+        return int(np.argmax(self.filter_probabilities)), self.filter_probabilities
+    
+    def filter_step(self, observation: np.ndarray) -> Tuple[int, np.ndarray]:
+        """
+        ONLINE FILTER: Update P(state | observations so far) with one new bar in O(N²)
+        
+        Returns:
+            state: Most likely current state
+            state_probabilities: Filtered probability distribution over states
+        """
+        prior = (self.filter_probabilities @ self.transition_matrix
+                 if self.filter_probabilities is not None else self.initial_probabilities)
+        b, _ = self._shifted_emissions(self._log_emission_matrix(observation))
+        posterior = prior * b[0]
+        total = posterior.sum()
+        # An impossible observation keeps the prior rather than collapsing to zeros
+        self.filter_probabilities = posterior / total if total > self.min_prob else prior
+        return int(np.argmax(self.filter_probabilities)), self.filter_probabilities
     
     def get_regime_from_state(self, state: int) -> MarketRegime:
         """Map HMM state to MarketRegime enum"""
@@ -336,9 +370,11 @@ class KalmanFilter:
     observation_noise: np.ndarray = field(default_factory=lambda: np.eye(3) * 0.1)
     
     def predict(self, transition_matrix: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
-        """Predict next state"""
+        """Predict next state (the prediction becomes the prior for the next update)"""
         predicted_state = transition_matrix @ self.state_vector
         predicted_covariance = transition_matrix @ self.covariance_matrix @ transition_matrix.T + self.process_noise
+        self.state_vector = predicted_state
+        self.covariance_matrix = predicted_covariance
         return predicted_state, predicted_covariance
     
     def update(self, observation: np.ndarray, observation_matrix: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
@@ -347,7 +383,9 @@ class KalmanFilter:
         innovation_covariance = observation_matrix @ self.covariance_matrix @ observation_matrix.T + self.observation_noise
         
         try:
-            kalman_gain = self.covariance_matrix @ observation_matrix.T @ inv(innovation_covariance)
+            # Gain via Cholesky solve of the (symmetric positive definite) innovation covariance
+            factor = cho_factor(innovation_covariance)
+            kalman_gain = cho_solve(factor, observation_matrix @ self.covariance_matrix.T).T
             updated_state = self.state_vector + kalman_gain @ innovation
             updated_covariance = (np.eye(self.state_dim) - kalman_gain @ observation_matrix) @ self.covariance_matrix
             
@@ -356,7 +394,7 @@ class KalmanFilter:
             
             return updated_state, updated_covariance
         except np.linalg.LinAlgError:
-            # Fallback if matrix inversion fails
+            # Fallback if the factorization fails
             return self.state_vector, self.covariance_matrix
 
 @dataclass
@@ -540,6 +578,10 @@ class RegimeAdaptiveController:
         self.math_models = ProfessionalMathModels()
         self.hmm_model = HiddenMarkovModel(n_states=len(MarketRegime))
         self.kalman_filter = KalmanFilter()
+        # Latest online-filtered HMM posterior (refreshed on every bar once fitted)
+        self.hmm_state_probabilities: Optional[np.ndarray] = None
+        # Epoch of the newest observation restored from a warm-state checkpoint
+        self._checkpoint_last_timestamp: Optional[float] = None
         
         # CONFIGURABLE PROFESSIONAL DATA MANAGEMENT
         self.regime_history = []
@@ -845,6 +887,15 @@ class RegimeAdaptiveController:
         try:
             logger.info("🔄 HMM WARMUP: Pre-loading historical data for regime detection...")
             
+            # 📦 Restore the last checkpoint first; a fresh fitted one needs no candles at all
+            from src.core.warm_state import FRESH_SECONDS, warm_state
+            warm_state.register(self.strategy_name, self)
+            checkpoint_age = warm_state.restore(self.strategy_name)
+            if checkpoint_age is not None and checkpoint_age <= FRESH_SECONDS and self.hmm_model.is_fitted:
+                logger.info(f"✅ HMM WARMUP: Restored fitted model ({len(self.feature_history)} observations, "
+                            f"regime {self.current_regime.value}) - no historical fetch needed")
+                return
+            
             # 🔥 FIX: Use get_orchestrator_instance() which is more reliable than self.orchestrator
             zerodha_client = None
             try:
@@ -864,10 +915,15 @@ class RegimeAdaptiveController:
                 return
             
             # Fetch 3 days of 5-minute NIFTY data
-            from datetime import datetime, timedelta
             to_date = datetime.now()
             from_date = to_date - timedelta(days=3)
             
+            # Top-up after a restore: only candles since the checkpoint (plus 20 bars of feature lookback)
+            last_seen = None
+            if checkpoint_age is not None and self._checkpoint_last_timestamp is not None:
+                last_seen = self._checkpoint_last_timestamp
+                from_date = max(from_date, to_date - timedelta(seconds=checkpoint_age, minutes=5 * 21))
+            
             try:
                 historical_data = await zerodha_client.get_historical_data(
                     symbol='NIFTY 50',
@@ -877,7 +933,11 @@ class RegimeAdaptiveController:
                     exchange='NSE'
                 )
                 
-                if not historical_data or len(historical_data) < 50:
+                if last_seen is not None and not historical_data:
+                    logger.info("📦 HMM WARMUP: No new candles since checkpoint - keeping restored model")
+                    return
+                
+                if last_seen is None and (not historical_data or len(historical_data) < 50):
                     logger.warning(f"⚠️ HMM WARMUP: Insufficient historical data ({len(historical_data) if historical_data else 0} candles)")
                     return
                 
@@ -888,6 +948,10 @@ class RegimeAdaptiveController:
                     if i < 20:  # Need some history to calculate features
                         continue
                     
+                    # Already in the restored feature history
+                    if last_seen is not None and _timestamp_epoch(candle.get('timestamp') or candle.get('date')) <= last_seen:
+                        continue
+                    
                     # 🚨 CRITICAL: Yield to event loop every 20 candles to not block health checks
                     if i % 20 == 0:
                         await asyncio.sleep(0)
@@ -971,14 +1035,19 @@ class RegimeAdaptiveController:
                     
                     feature_matrix = np.array([f['features'][:3] for f in self.feature_history])
                     
-                    # Run CPU-intensive training in thread pool to not block event loop
+                    # Run training in thread pool to not block event loop (vectorized - milliseconds)
+                    train_start = time.perf_counter()
                     await asyncio.to_thread(self.hmm_model.baum_welch, feature_matrix, 10)
-                    logger.info(f"✅ HMM WARMUP COMPLETE: Trained on {len(self.feature_history)} observations")
+                    logger.info(f"✅ HMM WARMUP COMPLETE: Trained on {len(self.feature_history)} observations "
+                                f"in {(time.perf_counter() - train_start) * 1000:.1f}ms")
                     
                     # 🔥 FIX: Run Viterbi in thread pool too (was blocking before!)
                     state_path, _ = await asyncio.to_thread(self.hmm_model.viterbi, feature_matrix)
                     initial_regime = self.hmm_model.get_regime_from_state(state_path[-1])
                     self.current_regime = initial_regime
+                    
+                    # Seed the online filter so live bars continue from the warmup posterior
+                    _, self.hmm_state_probabilities = self.hmm_model.seed_filter(feature_matrix)
                     logger.info(f"🎯 HMM Initial Regime: {initial_regime.value}")
                 else:
                     logger.warning(f"⚠️ HMM WARMUP: Only {len(self.feature_history)} observations (need 50+)")
@@ -989,6 +1058,51 @@ class RegimeAdaptiveController:
         except Exception as e:
             logger.error(f"❌ HMM WARMUP failed: {e}")
 
+    def export_warm_state(self) -> Dict[str, Any]:
+        """Checkpointable state: fitted HMM, Kalman filter, feature history and current regime"""
+        return {
+            'hmm': self.hmm_model.get_params(),
+            'hmm_state_probabilities': self.hmm_state_probabilities,
+            'kalman': {
+                'state_vector': self.kalman_filter.state_vector,
+                'covariance_matrix': self.kalman_filter.covariance_matrix
+            },
+            'feature_history': [
+                {'timestamp': f['timestamp'], 'features': f['features'], 'raw_data': f['raw_data']}
+                for f in self.feature_history
+            ],
+            'current_regime': self.current_regime.value
+        }
+    
+    def restore_warm_state(self, state: Dict[str, Any], age_seconds: float):
+        """Load a checkpoint written by ``export_warm_state``"""
+        self.hmm_model.set_params(state['hmm'])
+        probabilities = state.get('hmm_state_probabilities')
+        self.hmm_state_probabilities = None if probabilities is None else np.asarray(probabilities, dtype=float)
+        kalman = state.get('kalman') or {}
+        if kalman:
+            self.kalman_filter.state_vector = np.asarray(kalman['state_vector'], dtype=float)
+            self.kalman_filter.covariance_matrix = np.asarray(kalman['covariance_matrix'], dtype=float)
+        
+        restored = []
+        for entry in state.get('feature_history', []):
+            timestamp = entry.get('timestamp')
+            if isinstance(timestamp, str):
+                try:
+                    timestamp = datetime.fromisoformat(timestamp)
+                except ValueError:
+                    pass
+            restored.append({'timestamp': timestamp, 'features': np.asarray(entry['features'], dtype=float),
+                             'raw_data': entry.get('raw_data', {})})
+        # Live bars that arrived before the restore stay after the restored history
+        self.feature_history = (restored + self.feature_history)[-self.max_history:]
+        self._checkpoint_last_timestamp = _timestamp_epoch(restored[-1]['timestamp']) if restored else None
+        
+        try:
+            self.current_regime = MarketRegime(state.get('current_regime'))
+        except ValueError:
+            pass
+    
     # BACKTESTING METHODS
     async def run_backtest(self, historical_data: Dict[str, List], start_date: str = None, end_date: str = None) -> Dict:
         """
@@ -1380,6 +1494,10 @@ class RegimeAdaptiveController:
                     self.feature_history.pop(0)
                 
                 # Scale features for ML models
+                # O(N²) online HMM update - regime probabilities refresh on every bar
+                if self.hmm_model.is_fitted:
+                    _, self.hmm_state_probabilities = self.hmm_model.filter_step(feature_vector[:3])
+                
                 if len(self.feature_history) >= 10 and not self.features_scaled:
                     self._scale_features()
                     
@@ -1565,7 +1683,8 @@ class RegimeAdaptiveController:
         """
         LITE REGIME DETECTION - Uses only fast methods (GARCH + Rule-based)
         
-        🚀 PERFORMANCE: GMM/HMM/MTF skipped for speed - they were blocking trading loop
+        🚀 PERFORMANCE: GMM/MTF skipped for speed - they were blocking trading loop
+        HMM is read from the online filter posterior (updated per bar in O(N²))
         GARCH is still used (same as base_strategy ATR calculations)
         """
         try:
@@ -1586,12 +1705,18 @@ class RegimeAdaptiveController:
             latest_features = self.feature_history[-1]['raw_data']
             rule_based_regime = self._classify_regime_by_rules(latest_features)
             
-            # 🚀 LITE MODE: Skip GMM/HMM/MTF - use simplified ensemble
-            # GMM and HMM are academically interesting but add 10+ seconds blocking
+            # 🚀 LITE MODE: Skip GMM/MTF - use simplified ensemble
             gmm_confidence = 0.5  # Default
             regime_id = 0
-            hmm_regime = rule_based_regime  # Use rule-based as HMM proxy
-            hmm_confidence = 0.6
+            
+            # HMM: filtered posterior once warmup has fitted the model, else rule-based proxy
+            if self.hmm_model.is_fitted and self.hmm_state_probabilities is not None:
+                hmm_state = int(np.argmax(self.hmm_state_probabilities))
+                hmm_regime = self.hmm_model.get_regime_from_state(hmm_state)
+                hmm_confidence = float(self.hmm_state_probabilities[hmm_state])
+            else:
+                hmm_regime = rule_based_regime  # Use rule-based as HMM proxy
+                hmm_confidence = 0.6
             
             # MTF analysis - skip API calls, use cached data if available
             mtf_analysis = {'aligned': False, 'confidence_boost': 0.0}
@@ -0,0 +1,153 @@
+"""
+Unit tests for AdvancedRateLimiter
+Tests in-process GCRA buckets per scope and reconciliation through the shared store
+"""
+
+import asyncio
+import os
+import sys
+import unittest
+from types import SimpleNamespace
+
+# Add repo root to path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from middleware.security_middleware import AdvancedRateLimiter, GCRABucketStore, SecurityConfig
+
+
+def run(coro):
+    return asyncio.new_event_loop().run_until_complete(coro)
+
+
+def make_request(path, ip='10.0.0.1'):
+    return SimpleNamespace(url=SimpleNamespace(path=path), headers={}, client=SimpleNamespace(host=ip))
+
+
+class FakeSharedRedis:
+    """Evaluates the reconciliation script's semantics against a dict"""
+
+    def __init__(self):
+        self.values = {}
+        self.calls = 0
+
+    def register_script(self, script):
+        async def reconcile(keys, args):
+            self.calls += 1
+            now, increments = float(args[0]), args[1:]
+            result = []
+            for key, increment in zip(keys, increments):
+                tat = max(self.values.get(key, now), now) + float(increment)
+                self.values[key] = tat
+                result.append(str(tat))
+            return result
+        return reconcile
+
+
+class TestGCRABucketStore(unittest.TestCase):
+    """Test suite for the in-process token buckets"""
+
+    def test_burst_then_steady_rate(self):
+        buckets = GCRABucketStore()
+        now = 1000.0
+        # 5 per minute with a burst of 5: one token every 12 seconds
+        self.assertEqual([buckets.consume('k', 12.0, 5, now) for _ in range(5)], [None] * 5)
+        self.assertAlmostEqual(buckets.consume('k', 12.0, 5, now), 12.0)
+        self.assertAlmostEqual(buckets.consume('k', 12.0, 5, now + 11.0), 1.0)
+        self.assertIsNone(buckets.consume('k', 12.0, 5, now + 12.0))
+        self.assertIsNotNone(buckets.consume('k', 12.0, 5, now + 12.0))
+
+        self.assertEqual(buckets.take_unsynced(), {'k': 72.0})
+        self.assertEqual(buckets.take_unsynced(), {})
+        # Refilled buckets carry no state
+        self.assertEqual(buckets.prune(now + 1000), 1)
+        self.assertEqual(len(buckets), 0)
+
+    def test_unique_key_flood_evicts_least_recently_used(self):
+        buckets = GCRABucketStore(max_keys=100)
+        now = 1000.0
+        self.assertIsNone(buckets.consume('hot', 12.0, 1, now))
+        for i in range(1000):
+            buckets.consume(f'ip-{i}', 12.0, 5, now)
+            if i % 50 == 0:
+                # Recently used keys survive the flood
+                buckets.consume('hot', 12.0, 1, now)
+        self.assertEqual(len(buckets), 100)
+        self.assertEqual(buckets.evictions, 901)
+        self.assertIsNotNone(buckets.consume('hot', 12.0, 1, now))
+
+
+class TestAdvancedRateLimiter(unittest.TestCase):
+    """Test suite for scoped local limits and shared reconciliation"""
+
+    def test_scopes_are_evaluated_locally(self):
+        limiter = AdvancedRateLimiter(None, SecurityConfig())
+
+        async def scenario():
+            login = [await limiter.check_rate_limit(make_request('/api/v1/auth/login')) for _ in range(8)]
+            other_ip = await limiter.check_rate_limit(make_request('/api/v1/auth/login', ip='10.0.0.2'))
+            orders_a = [(await limiter.check_rate_limit(make_request('/api/v1/orders'), 'alice'))[0]
+                        for _ in range(151)]
+            orders_b = await limiter.check_rate_limit(make_request('/api/v1/orders'), 'bob')
+            return login, other_ip, orders_a, orders_b
+
+        login, other_ip, orders_a, orders_b = run(scenario())
+        # Login: 5 per 300s per IP, burst 7
+        self.assertEqual([allowed for allowed, _ in login], [True] * 7 + [False])
+        self.assertEqual(login[-1][1], 60)
+        self.assertEqual(other_ip, (True, None))
+        # Orders: 100 per minute per user, burst 150
+        self.assertEqual(orders_a.count(True), 150)
+        self.assertFalse(orders_a[-1])
+        self.assertEqual(orders_b, (True, None))
+
+    def test_workers_share_limits_through_reconciliation(self):
+        shared = FakeSharedRedis()
+        config = SecurityConfig(endpoint_rate_limits={'/api/v1/reports': 4})
+        config.burst_multiplier = 1.0
+        worker_a = AdvancedRateLimiter(shared, config)
+        worker_b = AdvancedRateLimiter(shared, config)
+
+        async def scenario():
+            request = make_request('/api/v1/reports')
+            for _ in range(3):
+                self.assertTrue((await worker_a.check_rate_limit(request))[0])
+            await worker_a.reconcile()
+            self.assertTrue((await worker_b.check_rate_limit(request))[0])
+            # Worker B learns about A's three requests: the shared bucket of 4 is now empty
+            await worker_b.reconcile()
+            allowed = (await worker_b.check_rate_limit(request))[0]
+            await worker_a.close()
+            await worker_b.close()
+            return allowed
+
+        self.assertFalse(run(scenario()))
+        self.assertEqual(shared.calls, 2)
+        self.assertEqual(worker_b.sync_stats['keys_synced'], 1)
+
+    def test_failed_reconciliation_keeps_consumption(self):
+        shared = FakeSharedRedis()
+        limiter = AdvancedRateLimiter(shared, SecurityConfig())
+
+        async def failing(keys, args):
+            raise ConnectionError("redis down")
+
+        async def scenario():
+            for _ in range(3):
+                await limiter.check_rate_limit(make_request('/api/v1/orders'), 'alice')
+            limiter._reconcile_script = failing
+            with self.assertRaises(ConnectionError):
+                await limiter.reconcile(now=0.0)
+            limiter._reconcile_script = None
+            synced = await limiter.reconcile(now=0.0)
+            await limiter.close()
+            return synced
+
+        self.assertEqual(run(scenario()), 1)
+        key, tat = next(iter(shared.values.items()))
+        self.assertTrue(key.startswith('rate_limit:gcra:user:alice:'))
+        # All three requests (0.6s of emission each) reached the shared bucket
+        self.assertAlmostEqual(tat, 1.8)
+
+
+if __name__ == '__main__':
+    unittest.main()
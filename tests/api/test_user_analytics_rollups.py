@@ -0,0 +1,271 @@
+"""
+Unit tests for rollup-backed user analytics
+Builds the rollup tables in SQLite and checks the metrics derived from them, and runs the
+migration 018 trigger and backfill SQL against an embedded PostgreSQL
+"""
+
+import asyncio
+import tempfile
+import threading
+import unittest
+import sys
+import os
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+# Add repo root to path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from src.config.database import Base
+from src.models.trading_models import (
+    User, TradingPosition, Order, UserPnlDaily, UserSymbolPnlDaily, UserStrategyPnlDaily
+)
+from src.api.user_analytics_service import UserAnalyticsService
+
+try:
+    import pgserver
+    import psycopg2
+except ImportError:
+    pgserver = None
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(__file__), '..', '..', 'database', 'migrations')
+
+# (days ago, symbol, strategy, pnl, quantity, price)
+TRADES = [
+    (0, 'RELIANCE', 'momentum', 500.0, 10, 2500.0),
+    (0, 'TCS', 'momentum', -200.0, 5, 3500.0),
+    (1, 'RELIANCE', 'scalper', -300.0, 10, 2480.0),
+    (3, 'INFY', 'scalper', 800.0, 20, 1500.0),
+    (3, 'RELIANCE', None, 0.0, 5, 2460.0),
+]
+
+
+def rollup_rows(user_id, trades):
+    """Aggregate raw trades the same way the migration 018 trigger does"""
+    today = datetime.utcnow().date()
+    daily, by_symbol, by_strategy = {}, {}, {}
+    for days_ago, symbol, strategy, pnl, qty, price in trades:
+        day = today - timedelta(days=days_ago)
+        d = daily.setdefault(day, dict(
+            user_id=user_id, trade_date=day, trade_count=0, winning_trades=0, losing_trades=0,
+            pnl_count=0, total_pnl=0, gross_profit=0, gross_loss=0, max_win=0, max_loss=0,
+            pnl_sq_sum=0, loss_sq_sum=0, notional=0, notional_count=0,
+            first_trade_at=datetime.utcnow() - timedelta(days=days_ago), last_trade_at=datetime.utcnow()))
+        d['trade_count'] += 1
+        d['pnl_count'] += 1
+        d['total_pnl'] += pnl
+        d['pnl_sq_sum'] += pnl * pnl
+        d['notional'] += qty * price
+        d['notional_count'] += 1
+        if pnl > 0:
+            d['winning_trades'] += 1
+            d['gross_profit'] += pnl
+            d['max_win'] = max(d['max_win'], pnl)
+        elif pnl < 0:
+            d['losing_trades'] += 1
+            d['gross_loss'] += pnl
+            d['loss_sq_sum'] += pnl * pnl
+            d['max_loss'] = min(d['max_loss'], pnl)
+        for store, key, value in ((by_symbol, 'symbol', symbol), (by_strategy, 'strategy', strategy or '')):
+            row = store.setdefault((day, value), {
+                'user_id': user_id, 'trade_date': day, 'trade_count': 0, 'winning_trades': 0,
+                'losing_trades': 0, 'total_pnl': 0, key: value})
+            row['trade_count'] += 1
+            row['total_pnl'] += pnl
+            row['winning_trades'] += 1 if pnl > 0 else 0
+            row['losing_trades'] += 1 if pnl < 0 else 0
+    return list(daily.values()), list(by_symbol.values()), list(by_strategy.values())
+
+
+class TestUserAnalyticsRollups(unittest.TestCase):
+    """Test suite for rollup-backed UserAnalyticsService"""
+
+    def setUp(self):
+        engine = create_engine('sqlite://')
+        Base.metadata.create_all(engine, tables=[
+            User.__table__, TradingPosition.__table__, Order.__table__,
+            UserPnlDaily.__table__, UserSymbolPnlDaily.__table__, UserStrategyPnlDaily.__table__
+        ])
+        self.service = UserAnalyticsService.__new__(UserAnalyticsService)
+        self.service.SessionLocal = sessionmaker(bind=engine)
+        self.service.redis_client = None
+
+        daily, by_symbol, by_strategy = rollup_rows(1, TRADES)
+        with engine.begin() as conn:
+            conn.execute(User.__table__.insert(), [
+                dict(id=1, username='trader', email='t@example.com', password_hash='x',
+                     initial_capital=100000, current_balance=100800, is_active=True),
+                dict(id=2, username='idle', email='i@example.com', password_hash='x',
+                     initial_capital=50000, current_balance=50000, is_active=True),
+            ])
+            conn.execute(UserPnlDaily.__table__.insert(), daily)
+            conn.execute(UserSymbolPnlDaily.__table__.insert(), by_symbol)
+            conn.execute(UserStrategyPnlDaily.__table__.insert(), by_strategy)
+
+    def run_async(self, coro):
+        return asyncio.new_event_loop().run_until_complete(coro)
+
+    def test_performance_metrics_match_trade_level_values(self):
+        metrics = self.run_async(self.service.get_user_performance_metrics(1, days=30))
+        pnl = np.array([t[3] for t in TRADES])
+        losses = pnl[pnl < 0]
+
+        self.assertEqual(metrics.total_trades, 5)
+        self.assertEqual(metrics.winning_trades, 2)
+        self.assertEqual(metrics.losing_trades, 2)
+        self.assertAlmostEqual(metrics.total_pnl, 800.0)
+        self.assertAlmostEqual(metrics.daily_pnl, 300.0)
+        self.assertAlmostEqual(metrics.avg_win_amount, 650.0)
+        self.assertAlmostEqual(metrics.avg_loss_amount, -250.0)
+        self.assertAlmostEqual(metrics.profit_factor, 1300.0 / 500.0)
+        self.assertAlmostEqual(metrics.max_profit, 800.0)
+        self.assertAlmostEqual(metrics.max_loss, -300.0)
+        self.assertAlmostEqual(metrics.sharpe_ratio, pnl.mean() / pnl.std(), places=9)
+        self.assertAlmostEqual(metrics.sortino_ratio, pnl.mean() / losses.std(), places=9)
+        self.assertAlmostEqual(metrics.avg_position_size, np.mean([t[4] * t[5] for t in TRADES]))
+        self.assertEqual(metrics.most_traded_symbol, 'RELIANCE')
+        self.assertEqual(metrics.most_profitable_strategy, 'scalper')
+        # Daily curve 800 (day -3), -300 (day -1), +300 (today) -> 300 drawdown
+        self.assertAlmostEqual(metrics.max_drawdown, 300.0)
+
+    def test_report_sections(self):
+        db = self.service.SessionLocal()
+        try:
+            chart = self.run_async(self.service._generate_daily_pnl_chart(1, 7, db))
+            self.assertEqual(len(chart), 8)
+            self.assertAlmostEqual(chart[-1]['cumulative_pnl'], 800.0)
+
+            symbols = self.run_async(self.service._generate_symbol_performance(1, 30, db))
+            self.assertEqual(symbols[0]['symbol'], 'INFY')
+            self.assertEqual({s['symbol'] for s in symbols}, {'RELIANCE', 'TCS', 'INFY'})
+
+            strategies = self.run_async(self.service._generate_strategy_performance(1, 30, db))
+            self.assertEqual([s['strategy'] for s in strategies], ['scalper', 'momentum'])
+
+            months = self.run_async(self.service._generate_monthly_summary(1, 30, db))
+            self.assertEqual(sum(m['trades'] for m in months), 5)
+            self.assertEqual(months[0]['month'], datetime.utcnow().strftime('%Y-%m'))
+        finally:
+            db.close()
+
+    def test_leaderboard_includes_users_without_trades(self):
+        db = self.service.SessionLocal()
+        try:
+            rows = {r['user_id']: r for r in self.service.get_leaderboard_metrics(db, 30)}
+        finally:
+            db.close()
+        self.assertAlmostEqual(rows[1]['total_pnl'], 800.0)
+        self.assertEqual(rows[2]['total_trades'], 0)
+
+
+
+@unittest.skipIf(pgserver is None, "pgserver (embedded PostgreSQL) not installed")
+class TestPnlRollupMigration(unittest.TestCase):
+    """Test suite for the migration 018 trigger and backfill on PostgreSQL"""
+
+    DAILY_COLUMNS = ('trade_count', 'winning_trades', 'losing_trades', 'pnl_count', 'total_pnl',
+                     'gross_profit', 'gross_loss', 'max_win', 'max_loss', 'pnl_sq_sum', 'loss_sq_sum',
+                     'notional', 'notional_count')
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = pgserver.get_server(tempfile.mkdtemp(), cleanup_mode='stop')
+        cls.uri = cls.server.get_uri()
+
+    def setUp(self):
+        self.conn = self.connect()
+        # 000 drops and recreates the base tables; 008 adds trades.pnl
+        self.migrate('000_reset_database.sql', '008_add_pnl_columns_to_trades.sql')
+        self.execute("INSERT INTO users (id, username, email, password_hash) VALUES (1, 'trader', 't@example.com', 'x')")
+
+    def tearDown(self):
+        self.conn.close()
+
+    def connect(self):
+        conn = psycopg2.connect(self.uri)
+        conn.autocommit = True
+        return conn
+
+    def migrate(self, *names):
+        for name in names:
+            with open(os.path.join(MIGRATIONS_DIR, name)) as f:
+                self.execute(f.read())
+
+    def execute(self, sql, params=None, conn=None):
+        with (conn or self.conn).cursor() as cursor:
+            cursor.execute(sql, params)
+            return cursor.fetchall() if cursor.description else None
+
+    def insert_trade(self, days_ago, symbol, strategy, pnl, quantity, price, conn=None):
+        created_at = datetime.now(timezone.utc) - timedelta(days=days_ago)
+        self.execute(
+            "INSERT INTO trades (user_id, symbol, trade_type, quantity, price, strategy, pnl, created_at) "
+            "VALUES (1, %s, 'BUY', %s, %s, %s, %s, %s)",
+            (symbol, quantity, price, strategy, pnl, created_at), conn)
+
+    def daily_rows(self):
+        rows = self.execute(f"SELECT trade_date, {', '.join(self.DAILY_COLUMNS)} FROM user_pnl_daily ORDER BY trade_date")
+        return {row[0]: [float(value) for value in row[1:]] for row in rows}
+
+    def expected_daily(self):
+        daily, _, _ = rollup_rows(1, TRADES)
+        return {row['trade_date']: [float(row[column]) for column in self.DAILY_COLUMNS]
+                for row in sorted(daily, key=lambda r: r['trade_date'])}
+
+    def test_backfill_and_trigger_maintain_rollups(self):
+        # Two trades exist before the migration (backfill), the rest arrive through the trigger
+        for trade in TRADES[:2]:
+            self.insert_trade(*trade)
+        self.migrate('018_add_pnl_rollup_tables.sql')
+        for trade in TRADES[2:]:
+            self.insert_trade(*trade)
+
+        self.assertEqual(self.daily_rows(), self.expected_daily())
+        strategies = dict(self.execute("SELECT strategy, SUM(total_pnl) FROM user_strategy_pnl_daily GROUP BY strategy"))
+        self.assertEqual({k: float(v) for k, v in strategies.items()}, {'momentum': 300.0, 'scalper': 500.0, '': 0.0})
+
+        # Moving a trade to another symbol and deleting the last trade of a day
+        self.execute("UPDATE trades SET symbol = 'HDFC' WHERE symbol = 'TCS'")
+        self.execute("DELETE FROM trades WHERE created_at < NOW() - INTERVAL '2 days'")
+        symbols = self.execute("SELECT symbol, trade_count FROM user_symbol_pnl_daily ORDER BY symbol")
+        self.assertEqual(symbols, [('HDFC', 1), ('RELIANCE', 1), ('RELIANCE', 1)])
+        self.assertEqual(len(self.daily_rows()), 2)
+        self.assertEqual(self.execute("SELECT COUNT(*) FROM user_strategy_pnl_daily WHERE strategy = ''"), [(0,)])
+
+    def test_concurrent_trades_for_same_user_day_both_commit(self):
+        self.migrate('018_add_pnl_rollup_tables.sql')
+        first = self.connect()
+        first.autocommit = False
+        errors = []
+
+        def second_writer():
+            conn = self.connect()
+            try:
+                self.insert_trade(0, 'TCS', 'momentum', -200.0, 5, 3500.0, conn)
+            except Exception as e:
+                errors.append(e)
+            finally:
+                conn.close()
+
+        try:
+            # First trade's transaction holds the (user, day) rollup until it commits
+            self.insert_trade(0, 'TCS', 'momentum', 500.0, 10, 2500.0, first)
+            writer = threading.Thread(target=second_writer)
+            writer.start()
+            writer.join(0.5)
+            self.assertTrue(writer.is_alive())
+            first.commit()
+            writer.join(10)
+        finally:
+            first.close()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(self.execute("SELECT trade_count, total_pnl FROM user_pnl_daily"), [(2, 300)])
+        self.assertEqual(self.execute("SELECT trade_count FROM user_symbol_pnl_daily"), [(2,)])
+
+
+if __name__ == '__main__':
+    unittest.main()
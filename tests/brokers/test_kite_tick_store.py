@@ -0,0 +1,83 @@
+"""
+Unit tests for the Kite tick store
+Validates in-place writes, TTL filtering and TrueData-compatible snapshots
+"""
+
+import unittest
+import sys
+import os
+import time
+
+# Add repo root to path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from brokers.kite_tick_store import KiteTickStore, DEPTH_LEVELS
+
+
+def make_tick(token, ltp, bid=None, ask=None):
+    tick = {
+        'instrument_token': token,
+        'last_price': ltp,
+        'volume_traded': 1000,
+        'change': 5.0,
+        'ohlc': {'open': ltp - 2, 'high': ltp + 3, 'low': ltp - 4, 'close': 100.0},
+    }
+    if bid is not None:
+        tick['depth'] = {
+            'buy': [{'price': bid - i * 0.05, 'quantity': 10 * (i + 1), 'orders': 1} for i in range(DEPTH_LEVELS)],
+            'sell': [{'price': ask + i * 0.05, 'quantity': 20 * (i + 1), 'orders': 2} for i in range(DEPTH_LEVELS)],
+        }
+    return tick
+
+
+class TestKiteTickStore(unittest.TestCase):
+    """Test suite for KiteTickStore"""
+
+    def setUp(self):
+        self.store = KiteTickStore(capacity=2, ttl_seconds=5)
+        self.tokens = {1: 'RELIANCE', 2: 'TCS', 3: 'INFY'}
+
+    def test_snapshot_matches_truedata_schema(self):
+        self.store.write_ticks([make_tick(1, 105.0, bid=104.95, ask=105.05)], self.tokens)
+        record = self.store.snapshot()['RELIANCE']
+        self.assertEqual(record['ltp'], 105.0)
+        self.assertEqual(record['previous_close'], 100.0)
+        self.assertEqual(record['close'], 100.0)
+        self.assertEqual(record['volume'], 1000)
+        self.assertAlmostEqual(record['change_percent'], 5.0)
+        self.assertAlmostEqual(record['bid'], 104.95)
+        self.assertAlmostEqual(record['ask'], 105.05)
+        self.assertEqual(len(record['depth']['buy']), DEPTH_LEVELS)
+        self.assertIn('timestamp', record)
+
+    def test_overwrites_in_place_and_grows(self):
+        for ltp in (101.0, 102.0):
+            self.store.write_ticks([make_tick(1, ltp), make_tick(2, ltp), make_tick(3, ltp)], self.tokens)
+        self.assertEqual(len(self.store), 3)
+        snapshot = self.store.snapshot()
+        self.assertEqual(snapshot['INFY']['ltp'], 102.0)
+        self.assertEqual(snapshot['RELIANCE']['depth'], {})
+
+    def test_symbol_filter_and_ttl(self):
+        self.store.write_ticks([make_tick(1, 101.0), make_tick(2, 202.0)], self.tokens)
+        self.assertEqual(list(self.store.snapshot(['TCS']).keys()), ['TCS'])
+        time.sleep(0.01)
+        self.assertEqual(self.store.snapshot(max_age_seconds=0.001), {})
+
+    def test_depth_arrays_are_fixed_size(self):
+        self.store.write_ticks([make_tick(1, 105.0, bid=104.95, ask=105.05)], self.tokens)
+        depth = self.store.get_depth_arrays('RELIANCE')
+        self.assertEqual(depth['bid_px'].shape, (DEPTH_LEVELS,))
+        self.assertEqual(int(depth['ask_qty'][0]), 20)
+        self.assertIsNone(self.store.get_depth_arrays('TCS'))
+
+    def test_tick_without_depth_clears_previous_book(self):
+        self.store.write_ticks([make_tick(1, 105.0, bid=104.95, ask=105.05)], self.tokens)
+        self.store.write_ticks([make_tick(1, 106.0)], self.tokens)
+        self.assertIsNone(self.store.get_depth_arrays('RELIANCE'))
+        record = self.store.snapshot()['RELIANCE']
+        self.assertEqual((record['ltp'], record['bid'], record['ask'], record['depth']), (106.0, 0, 0, {}))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,146 @@
+"""
+Unit tests for BreadthEngine
+Tests that incremental counters match a full rescan and that only changed symbols are updated
+"""
+
+import asyncio
+import random
+import unittest
+import sys
+import os
+
+# Add repo root to path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from src.core.breadth_engine import BreadthEngine
+
+SECTORS = {'BANKING': ['HDFCBANK', 'SBIN', 'AXISBANK'], 'IT': ['INFY', 'TCS']}
+
+
+def full_scan(market_data):
+    """Reference full-scan breadth, as MarketInternalsAnalyzer computed it before"""
+    adv = dec = unch = above = total = highs = lows = 0
+    up_vol = down_vol = 0.0
+    for symbol, data in market_data.items():
+        if symbol.endswith('-I'):
+            continue
+        total += 1
+        change = data.get('change_percent', 0)
+        if change > 0.1:
+            adv += 1
+        elif change < -0.1:
+            dec += 1
+        else:
+            unch += 1
+        ltp = data.get('ltp', 0)
+        if ltp > data.get('vwap', ltp):
+            above += 1
+        if data.get('year_high', 0) > 0 and ltp >= data['year_high'] * 0.98:
+            highs += 1
+        elif data.get('year_low', 0) > 0 and ltp <= data['year_low'] * 1.02:
+            lows += 1
+        if change > 0:
+            up_vol += data.get('volume', 0)
+        else:
+            down_vol += data.get('volume', 0)
+    sectors = {}
+    for sector, symbols in SECTORS.items():
+        changes = [market_data[s]['change_percent'] for s in symbols if s in market_data]
+        if changes:
+            sectors[sector] = sum(changes) / len(changes)
+    return {'advancing': adv, 'declining': dec, 'unchanged': unch,
+            'above_vwap': (above / total * 100) if total else 50,
+            'highs_lows': highs - lows, 'up_volume': up_vol, 'down_volume': down_vol,
+            'sectors': sectors}
+
+
+def quote(rng):
+    ltp = round(rng.uniform(90, 110), 2)
+    return {'ltp': ltp, 'change_percent': round(rng.uniform(-2, 2), 2),
+            'vwap': round(rng.uniform(90, 110), 2), 'volume': rng.randint(0, 10000),
+            'high': ltp + 1, 'low': ltp - 1, 'year_high': 110, 'year_low': 90}
+
+
+class TestBreadthEngine(unittest.TestCase):
+    """Test suite for BreadthEngine"""
+
+    def setUp(self):
+        self.engine = BreadthEngine(history=5)
+        self.engine.add_sector_map('test', SECTORS)
+
+    def assert_matches(self, market_data):
+        expected = full_scan(market_data)
+        breadth = self.engine.breadth()
+        for key in ('advancing', 'declining', 'unchanged', 'highs_lows'):
+            self.assertEqual(breadth[key], expected[key], key)
+        self.assertAlmostEqual(breadth['above_vwap'], expected['above_vwap'])
+        self.assertAlmostEqual(self.engine.up_volume, expected['up_volume'])
+        self.assertAlmostEqual(self.engine.down_volume, expected['down_volume'])
+        sectors = {k: v['change'] for k, v in self.engine.sector_averages('test').items()}
+        self.assertEqual(set(sectors), set(expected['sectors']))
+        for sector, change in expected['sectors'].items():
+            self.assertAlmostEqual(sectors[sector], change)
+
+    def test_incremental_counters_match_full_scan(self):
+        rng = random.Random(7)
+        universe = [s for symbols in SECTORS.values() for s in symbols] + [f"SYM{i}" for i in range(40)]
+        market_data = {symbol: quote(rng) for symbol in universe}
+        market_data['NIFTY-I'] = quote(rng)
+        self.engine.ingest(market_data)
+        self.assert_matches(market_data)
+
+        for _ in range(30):
+            market_data = dict(market_data)
+            for symbol in rng.sample(universe, 5):
+                market_data[symbol] = quote(rng)
+            # Symbols drop out of (and come back into) the shared cache
+            removed = rng.choice(universe)
+            market_data.pop(removed, None)
+            changed = self.engine.ingest(market_data)
+            # 5 ticks, 1 removal and last round's removed symbol coming back
+            self.assertLessEqual(changed, 7)
+            self.assert_matches(market_data)
+            market_data[removed] = quote(rng)
+
+    def test_unchanged_snapshot_does_no_work(self):
+        market_data = {'INFY': {'ltp': 100, 'change_percent': 0.5, 'volume': 10}}
+        self.assertEqual(self.engine.ingest(market_data), 1)
+        updates = self.engine.updates
+        self.assertEqual(self.engine.ingest({'INFY': dict(market_data['INFY'])}), 0)
+        self.assertEqual(self.engine.updates, updates)
+
+    def test_ad_line_is_running_sum_of_bounded_history(self):
+        diffs = []
+        for i in range(8):
+            # i advancers, no decliners
+            self.engine.ingest({f"S{j}": {'ltp': 100, 'change_percent': 1.0} for j in range(i)})
+            point = self.engine.snapshot(rotation_group='test')
+            diffs.append(i)
+            self.assertEqual(point['ad_line'], sum(diffs[-5:]))
+        series = self.engine.get_series()
+        self.assertEqual(len(series['ad_line']), 5)
+        self.assertEqual(len(series['sector_rotation']), 8)
+
+    def test_market_internals_uses_engine(self):
+        from src.core.market_internals import MarketInternalsAnalyzer
+        analyzer = MarketInternalsAnalyzer()
+        market_data = {
+            'HDFCBANK': {'ltp': 100, 'change_percent': 1.5, 'volume': 100, 'high': 101, 'low': 98},
+            'SBIN': {'ltp': 100, 'change_percent': 0.5, 'volume': 100, 'high': 101, 'low': 99},
+            'INFY': {'ltp': 100, 'change_percent': -1.0, 'volume': 50, 'high': 101, 'low': 99},
+            'NIFTY-I': {'ltp': 22000, 'open': 21900, 'change_percent': 0.4},
+        }
+        analyzer.breadth_engine.ingest(market_data)
+        breadth = analyzer._calculate_breadth(market_data)
+        self.assertEqual((breadth['advancing'], breadth['declining']), (2, 1))
+        self.assertEqual(breadth['ad_line'], 1)
+        rotation = analyzer._analyze_sector_rotation(market_data)
+        self.assertEqual(rotation['leaders'][0], 'BANKING')
+        self.assertAlmostEqual(rotation['rotation_score'], 2.0)
+        internals = asyncio.new_event_loop().run_until_complete(analyzer.analyze_market_internals(market_data))
+        self.assertAlmostEqual(internals.advance_decline_ratio, 2.0)
+        self.assertAlmostEqual(internals.up_volume_ratio, 80.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
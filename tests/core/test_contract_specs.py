@@ -0,0 +1,156 @@
+"""
+Unit tests for ContractSpecCache
+Tests building specs from an instrument dump, per-day persistence and the BaseStrategy lookups
+"""
+
+import asyncio
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+
+# Add repo root to path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from src.core import contract_specs as contract_specs_module
+from src.core.contract_specs import IST, ContractSpecCache, trading_day
+
+
+def run(coro):
+    return asyncio.new_event_loop().run_until_complete(coro)
+
+
+def option(name, expiry, strike, kind='CE', lot=75, tick=0.05, symbol=None):
+    return {
+        'tradingsymbol': symbol or f"{name}{expiry.strftime('%y%b').upper()}{strike}{kind}",
+        'name': name,
+        'instrument_type': kind,
+        'segment': 'NFO-OPT',
+        'expiry': expiry,
+        'strike': float(strike),
+        'lot_size': lot,
+        'tick_size': tick
+    }
+
+
+class FakeBroker:
+    def __init__(self, instruments):
+        self.instruments = instruments
+        self.calls = 0
+
+    async def get_instruments(self, exchange='NFO'):
+        self.calls += 1
+        return self.instruments if exchange == 'NFO' else []
+
+
+class TestContractSpecCache(unittest.TestCase):
+    """Test suite for the per-day contract spec cache"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.cache = ContractSpecCache(self.directory)
+        today = datetime.now(IST).date()
+        self.near = today + timedelta(days=3)
+        self.far = today + timedelta(days=10)
+        self.instruments = [
+            {'tradingsymbol': 'NIFTY25DECFUT', 'name': 'NIFTY', 'instrument_type': 'FUT',
+             'expiry': self.near, 'strike': 0.0, 'lot_size': 75, 'tick_size': 0.1}
+        ]
+        for strike in (23800, 23900, 23950, 24000, 24050, 24100, 24200):
+            for kind in ('CE', 'PE'):
+                self.instruments.append(option('NIFTY', self.near, strike, kind))
+        self.instruments.append(option('NIFTY', self.far, 24000))
+        for strike in (51000, 51100, 51200):
+            self.instruments.append(option('BANKNIFTY', self.far, strike, lot=35))
+        self.instruments.append(option('SBIN', self.far, 800, lot=750))
+        self.instruments.append(option('SBIN', self.far, 810, lot=750))
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_build_indexes_by_underlying_name(self):
+        self.assertEqual(self.cache.build_from_instruments(self.instruments), 3)
+        self.assertTrue(self.cache.is_ready())
+
+        expiries = self.cache.get_expiries('NIFTY')
+        self.assertEqual([e['date'] for e in expiries], [self.near, self.far])
+        self.assertEqual(expiries[0]['formatted'], self.near.strftime('%y%b').upper())
+        # BANKNIFTY contracts never leak into NIFTY the way a substring scan does
+        self.assertEqual([e['date'] for e in self.cache.get_expiries('BANKNIFTY')], [self.far])
+
+        self.assertEqual(self.cache.get_strikes('NIFTY')[:3], [23800, 23900, 23950])
+        self.assertEqual(self.cache.get_strikes('NIFTY', self.far), [24000])
+        self.assertEqual(self.cache.get_strike_interval('NIFTY'), 50)
+        self.assertEqual(self.cache.get_strike_interval('SBIN'), 10)
+        self.assertEqual(self.cache.get_lot_size('BANKNIFTY'), 35)
+        self.assertEqual(self.cache.get_tick_size('NIFTY'), 0.05)
+        self.assertEqual(self.cache.get_freeze_quantity('NIFTY'), 1800)
+        self.assertIsNone(self.cache.get_freeze_quantity('SBIN'))
+
+        listed = self.instruments[1]['tradingsymbol']
+        self.assertTrue(self.cache.has_symbol(listed, 'NIFTY'))
+        self.assertFalse(self.cache.has_symbol(listed.replace('23800', '23825'), 'NIFTY'))
+        self.assertIsNone(self.cache.has_symbol('TCS25DEC4000CE', 'TCS'))
+
+    def test_persisted_snapshot_loads_without_broker(self):
+        broker = FakeBroker(self.instruments)
+        self.assertTrue(run(self.cache.ensure(broker)))
+        self.assertEqual(broker.calls, 2)  # NFO and BFO
+        self.assertEqual(self.cache.get_stats()['source'], 'broker')
+        self.assertTrue(os.path.exists(self.cache.path_for(trading_day())))
+
+        restarted = ContractSpecCache(self.directory)
+        self.assertTrue(run(restarted.ensure(FakeBroker([]))))
+        self.assertEqual(restarted.get_stats()['source'], 'disk')
+        self.assertEqual(restarted.get_expiries('NIFTY'), self.cache.get_expiries('NIFTY'))
+        self.assertEqual(restarted.get_lot_size('SBIN'), 750)
+
+    def test_stale_day_and_memo(self):
+        self.cache.build_from_instruments(self.instruments)
+        self.assertEqual(self.cache.remember(('optimal_expiry', 'NIFTY'), '25DEC'), '25DEC')
+        self.assertEqual(self.cache.recall(('optimal_expiry', 'NIFTY')), '25DEC')
+
+        # Yesterday's snapshot is never served
+        self.cache.build_from_instruments(self.instruments, session='20000101')
+        self.assertFalse(self.cache.is_ready())
+        self.assertEqual(self.cache.get_expiries('NIFTY'), [])
+        self.assertIsNone(self.cache.get_lot_size('NIFTY'))
+        self.assertIsNone(self.cache.recall(('optimal_expiry', 'NIFTY')))
+        self.assertFalse(run(self.cache.ensure(None)))
+
+    def test_strategy_lookups_use_cache(self):
+        from strategies.base_strategy import BaseStrategy
+
+        cache = ContractSpecCache(self.directory)
+        cache.build_from_instruments(self.instruments)
+        original = contract_specs_module.contract_specs
+        contract_specs_module.contract_specs = cache
+        try:
+            strategy = BaseStrategy.__new__(BaseStrategy)
+            expiries = run(strategy._get_available_expiries_from_zerodha('NIFTY-I'))
+            self.assertEqual([e['date'] for e in expiries], [self.near, self.far])
+            self.assertEqual(strategy._fetch_zerodha_lot_size('SBIN'), 750)
+            self.assertEqual(strategy._fetch_zerodha_lot_size('NIFTY'), 65)  # index override wins
+            self.assertEqual(strategy._get_strike_interval('SBIN', 805.0), 10)
+            self.assertFalse(strategy._validate_options_symbol_exists('SBIN25DEC820CE', 'SBIN'))
+
+            expiry = run(strategy._get_optimal_expiry_for_strategy('NIFTY'))
+            self.assertEqual(expiry, self.far.strftime('%y%b').upper())
+            self.assertEqual(cache.recall(('optimal_expiry', 'NIFTY', 'nearest_weekly')), expiry)
+
+            # Strike selection reads the listed grid of the code's monthly (last) expiry
+            self.assertEqual(strategy._get_closest_listed_strike('NIFTY', 23930, expiry), 24000)
+            self.assertIsNone(strategy._get_closest_listed_strike('NIFTY', 23930, '99JAN'))
+            # 1 strike OTM of 23900 is 23950, which is not listed for that expiry
+            self.assertEqual(run(strategy._get_volume_based_strike('NIFTY', 23880.0, expiry, 'BUY')), 24000)
+            self.assertEqual(strategy._round_to_tick_size(101.23, 'NIFTY'), 101.25)
+            self.assertEqual(cache.get_tick_size_for_symbol(f'BANKNIFTY{expiry}51000CE'), 0.05)
+            self.assertIsNone(cache.get_tick_size_for_symbol('NIFTY99JAN1CE'))
+        finally:
+            contract_specs_module.contract_specs = original
+
+
+if __name__ == '__main__':
+    unittest.main()
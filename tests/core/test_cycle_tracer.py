@@ -0,0 +1,110 @@
+"""
+Unit tests for CycleTracer
+Tests nested spans, stage percentiles, the flight recorder and tick-to-order latency
+"""
+
+import asyncio
+import unittest
+import sys
+import os
+
+# Add repo root to path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from src.core.cycle_tracer import CycleTracer, LatencyHistogram
+
+
+class TestLatencyHistogram(unittest.TestCase):
+    """Test suite for LatencyHistogram"""
+
+    def test_percentiles_within_bucket_resolution(self):
+        histogram = LatencyHistogram()
+        for ms in range(1, 1001):
+            histogram.record(float(ms))
+        self.assertEqual(histogram.count, 1000)
+        for q, expected in ((50, 500), (95, 950), (99, 990)):
+            self.assertAlmostEqual(histogram.percentile(q), expected, delta=expected * 0.1)
+        self.assertEqual(histogram.percentile(100), 1000.0)
+
+    def test_empty_histogram(self):
+        self.assertEqual(LatencyHistogram().to_dict()['p99_ms'], 0.0)
+
+
+class TestCycleTracer(unittest.TestCase):
+    """Test suite for CycleTracer"""
+
+    def setUp(self):
+        self.tracer = CycleTracer(capacity=3, slow_cycle_ms=20.0)
+
+    def test_async_spans_nest_across_tasks(self):
+        tracer = self.tracer
+
+        async def strategy():
+            async with tracer.span('strategy.demo'):
+                with tracer.span('signal.ltp_validation', symbol='NIFTY'):
+                    await asyncio.sleep(0)
+
+        async def cycle():
+            tracer.begin_cycle()
+            with tracer.span('market_data_fetch'):
+                await asyncio.sleep(0)
+            # wait_for runs the coroutine in a child task - spans still attach to this cycle
+            await asyncio.wait_for(strategy(), timeout=1.0)
+            return tracer.end_cycle(symbols=2)
+
+        trace = asyncio.new_event_loop().run_until_complete(cycle()).to_dict()
+        self.assertEqual([c['name'] for c in trace['children']], ['market_data_fetch', 'strategy.demo'])
+        nested = trace['children'][1]['children'][0]
+        self.assertEqual(nested['name'], 'signal.ltp_validation')
+        self.assertEqual(nested['attrs'], {'symbol': 'NIFTY'})
+        self.assertEqual(trace['attrs'], {'symbols': 2})
+
+        report = self.tracer.get_latency_report()
+        self.assertEqual(report['cycles'], 1)
+        for stage in ('cycle', 'market_data_fetch', 'strategy.demo', 'signal.ltp_validation'):
+            self.assertEqual(report['stages'][stage]['count'], 1)
+
+    def test_flight_recorder_is_bounded_and_keeps_slow_cycles(self):
+        import time
+        self.tracer.begin_cycle()
+        with self.tracer.span('strategy.slow'):
+            time.sleep(0.03)
+        self.tracer.end_cycle()
+        for _ in range(5):
+            self.tracer.begin_cycle()
+            self.tracer.end_cycle()
+
+        self.assertEqual(len(self.tracer.recent), 3)
+        slow = self.tracer.get_slow_cycles()
+        self.assertEqual(len(slow), 1)
+        self.assertEqual(slow[0]['cycle_id'], 1)
+        self.assertEqual(slow[0]['children'][0]['name'], 'strategy.slow')
+        self.assertEqual(len(self.tracer.get_slow_cycles(threshold_ms=0)), 4)
+
+    def test_tick_to_order_latency(self):
+        self.assertIsNone(self.tracer.mark_order({'symbol': 'X'}))
+        self.tracer.begin_cycle()
+        self.tracer.mark_tick()
+        latency = self.tracer.mark_order({'symbol': 'NIFTY24DEC24000CE', 'strategy': 'demo'})
+        cycle = self.tracer.end_cycle()
+        self.assertGreaterEqual(latency, 0.0)
+        self.assertEqual(cycle.orders[0]['symbol'], 'NIFTY24DEC24000CE')
+        self.assertEqual(self.tracer.get_latency_report()['tick_to_order']['count'], 1)
+
+    def test_discarded_and_disabled_cycles_are_not_recorded(self):
+        self.tracer.begin_cycle()
+        with self.tracer.span('market_data_fetch'):
+            pass
+        self.tracer.discard_cycle()
+        self.assertEqual(len(self.tracer.recent), 0)
+        self.assertNotIn('cycle', self.tracer.histograms)
+
+        disabled = CycleTracer(enabled=False)
+        self.assertIsNone(disabled.begin_cycle())
+        with disabled.span('anything'):
+            pass
+        self.assertEqual(disabled.histograms, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,128 @@
+"""
+Unit tests for DashboardReadModel
+Tests shared source reads, ETag handling and snapshot diffs
+"""
+
+import asyncio
+import unittest
+import sys
+import os
+from datetime import datetime
+
+# Add repo root to path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from src.core.dashboard_read_model import DashboardReadModel, merge_patch_diff
+
+
+class FakeRequest:
+    def __init__(self, headers=None):
+        self.headers = headers or {}
+
+
+class TestDashboardReadModel(unittest.TestCase):
+    """Test suite for DashboardReadModel"""
+
+    def setUp(self):
+        self.broker_calls = 0
+        self.pnl = 100.0
+        self.model = DashboardReadModel(refresh_interval=60.0, event_debounce=0.0)
+
+        async def fetch_orders():
+            self.broker_calls += 1
+            await asyncio.sleep(0)
+            return [{'status': 'COMPLETE', 'pnl': self.pnl}]
+
+        async def summary(sources):
+            orders = await sources._get('orders', fetch_orders)
+            return {'success': True, 'trades': len(orders), 'pnl': orders[0]['pnl'],
+                    'timestamp': datetime.utcnow().isoformat()}
+
+        async def trades(sources):
+            orders = await sources._get('orders', fetch_orders)
+            return {'success': True, 'data': orders}
+
+        self.model.register_section('summary', summary)
+        self.model.register_section('trades', trades)
+
+    def run_async(self, coro):
+        async def run():
+            try:
+                return await coro
+            finally:
+                await self.model.stop()
+        return asyncio.new_event_loop().run_until_complete(run())
+
+    def test_sections_share_one_broker_read_per_refresh(self):
+        async def scenario():
+            await self.model.refresh()
+            await asyncio.gather(*(self.model.get('summary') for _ in range(20)))
+            await asyncio.gather(*(self.model.get('trades') for _ in range(20)))
+        self.run_async(scenario())
+        self.assertEqual(self.broker_calls, 1)
+
+    def test_etag_not_modified(self):
+        async def scenario():
+            first = await self.model.respond(FakeRequest(), 'summary')
+            etag = first.headers['etag']
+            cached = await self.model.respond(FakeRequest({'if-none-match': etag}), 'summary')
+            # Only the timestamp changes - the ETag must not
+            await self.model.refresh()
+            unchanged = await self.model.respond(FakeRequest({'if-none-match': etag}), 'summary')
+            self.pnl = 250.0
+            await self.model.refresh()
+            changed = await self.model.respond(FakeRequest({'if-none-match': etag}), 'summary')
+            return first, cached, unchanged, changed
+        first, cached, unchanged, changed = self.run_async(scenario())
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(cached.status_code, 304)
+        self.assertEqual(unchanged.status_code, 304)
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed.headers['etag'], first.headers['etag'])
+
+    def test_listener_receives_merge_patch_of_changes(self):
+        messages = []
+
+        async def listener(message):
+            messages.append(message)
+
+        self.model.add_listener(listener)
+
+        async def scenario():
+            await self.model.refresh()
+            await self.model.refresh()
+            self.pnl = -50.0
+            await self.model.refresh(['summary'])
+        self.run_async(scenario())
+
+        self.assertEqual(len(messages), 2)
+        self.assertEqual(set(messages[0]['sections']), {'summary', 'trades'})
+        self.assertEqual(messages[1]['sections']['summary']['patch'], {'pnl': -50.0})
+        self.assertEqual(messages[1]['version'], self.model.version)
+
+    def test_notify_triggers_debounced_refresh(self):
+        async def scenario():
+            await self.model.get('summary')
+            builds = self.model._sections['summary'].builds
+            self.pnl = 300.0
+            for _ in range(5):
+                self.model.notify('pnl_tick', ['summary'])
+            for _ in range(20):
+                await asyncio.sleep(0.01)
+                if self.model._sections['summary'].builds > builds:
+                    break
+            return builds, await self.model.get_payload('summary')
+        builds, payload = self.run_async(scenario())
+        self.assertEqual(self.model._sections['summary'].builds, builds + 1)
+        self.assertEqual(payload['pnl'], 300.0)
+        self.assertEqual(self.model.stats.events['pnl_tick'], 5)
+
+    def test_merge_patch_diff(self):
+        old = {'a': 1, 'b': {'c': 2, 'd': 3}, 'e': [1, 2]}
+        new = {'a': 1, 'b': {'c': 2, 'd': 4}, 'e': [1, 2, 3], 'f': True}
+        self.assertEqual(merge_patch_diff(old, new), {'b': {'d': 4}, 'e': [1, 2, 3], 'f': True})
+        self.assertEqual(merge_patch_diff(new, {'a': 1}), {'b': None, 'e': None, 'f': None})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+"""
+Unit tests for ExecutionAnalytics
+Tests signal timelines, fill aliasing, slippage sign and bounded storage
+"""
+
+import unittest
+import sys
+import os
+
+# Add repo root to path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from src.core.execution_analytics import ExecutionAnalytics
+
+
+class TestExecutionAnalytics(unittest.TestCase):
+    """Test suite for ExecutionAnalytics"""
+
+    def setUp(self):
+        self.ltp = {'NIFTY24DEC24000CE': 100.0, 'RELIANCE': 2500.0}
+        self.analytics = ExecutionAnalytics(max_open=3, max_completed=10,
+                                            ltp_lookup=lambda symbol: self.ltp.get(symbol))
+
+    def signal(self, signal_id='s1', symbol='NIFTY24DEC24000CE', action='BUY',
+               entry_price=100.0, strategy='options_scalper'):
+        return {'signal_id': signal_id, 'symbol': symbol, 'action': action,
+                'entry_price': entry_price, 'strategy': strategy}
+
+    def run_through(self, signal, order_id):
+        for stage in ('generated', 'deduped', 'risk_approved', 'order_sent'):
+            self.analytics.stamp(signal, stage)
+        self.analytics.link_order(signal, order_id)
+
+    def test_fill_by_order_id_closes_timeline(self):
+        signal = self.signal()
+        self.run_through(signal, 'ORD1')
+        self.ltp['NIFTY24DEC24000CE'] = 101.0
+        timeline = self.analytics.record_fill('ORD1', 101.0)
+
+        self.assertEqual(timeline.outcome, 'FILLED')
+        data = timeline.to_dict()
+        self.assertEqual(list(data['stages']), ['generated', 'deduped', 'risk_approved',
+                                                'order_sent', 'broker_ack', 'filled'])
+        self.assertEqual(data['stages']['order_sent']['ltp'], 100.0)
+        self.assertEqual(data['stages']['filled']['ltp'], 101.0)
+
+        report = self.analytics.get_report('strategy')
+        group = report['groups']['options_scalper']
+        self.assertEqual(group['fills'], 1)
+        self.assertAlmostEqual(group['slippage_vs_entry']['mean_bps'], 100.0)
+        self.assertEqual(group['latency']['decision_ms']['count'], 1)
+        self.assertEqual(report['open_timelines'], 0)
+        # A duplicate postback is ignored
+        self.assertIsNone(self.analytics.record_fill('ORD1', 101.0))
+
+    def test_sell_slippage_sign_and_recorded_signal_alias(self):
+        signal = self.signal('s2', symbol='RELIANCE', action='SELL', entry_price=2500.0)
+        signal['recorded_signal_id'] = 'REC_2'
+        self.run_through(signal, 'ORD2')
+        self.analytics.record_fill('REC_2', 2495.0)
+        group = self.analytics.get_report('symbol')['groups']['RELIANCE']
+        # Selling below the signal price is adverse
+        self.assertAlmostEqual(group['slippage_vs_entry']['mean_bps'], 20.0)
+        self.assertEqual(len(self.analytics.get_report('time_of_day')['groups']), 1)
+
+    def test_discarded_signals_do_not_enter_distributions(self):
+        signal = self.signal('s3')
+        self.analytics.stamp(signal, 'generated')
+        self.analytics.discard(signal, 'FILTERED')
+        report = self.analytics.get_report()
+        self.assertEqual(report['overall']['fills'], 0)
+        self.assertEqual(self.analytics.get_timelines(outcome='FILTERED')[0]['signal_id'], 's3')
+
+    def test_open_timelines_are_bounded(self):
+        for i in range(5):
+            self.run_through(self.signal(f"s{i}"), f"ORD{i}")
+        report = self.analytics.get_report()
+        self.assertEqual(report['open_timelines'], 3)
+        self.assertEqual(report['dropped_timelines'], 2)
+        # Evicted order ids no longer resolve
+        self.assertIsNone(self.analytics.record_fill('ORD0', 100.0))
+        self.assertIsNotNone(self.analytics.record_fill('ORD4', 100.0))
+
+    def test_invalid_group_by(self):
+        with self.assertRaises(ValueError):
+            self.analytics.get_report('weekday')
+
+
+if __name__ == '__main__':
+    unittest.main()
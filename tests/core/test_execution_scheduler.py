@@ -0,0 +1,150 @@
+"""
+Unit tests for ExecutionScheduler
+Tests class/deadline ordering, expiry of stale entries and per-user / per-session concurrency
+"""
+
+import asyncio
+import os
+import sys
+import time
+import unittest
+from types import SimpleNamespace
+
+# Add repo root to path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from src.core.execution_scheduler import ExecutionScheduler, PriorityClass
+
+
+def run(coro):
+    return asyncio.new_event_loop().run_until_complete(coro)
+
+
+def make_order(order_id, user_id='U1'):
+    return SimpleNamespace(order_id=order_id, user_id=user_id)
+
+
+class Broker:
+    """Records execution order and concurrency"""
+
+    def __init__(self, delay=0.01):
+        self.delay = delay
+        self.executed = []
+        self.running = 0
+        self.max_running = 0
+
+    async def execute(self, order):
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        await asyncio.sleep(self.delay)
+        self.executed.append(order.order_id)
+        self.running -= 1
+
+
+class TestExecutionScheduler(unittest.TestCase):
+    """Test suite for the priority execution scheduler"""
+
+    def test_classes_then_deadlines_and_stale_entries_dropped(self):
+        broker = Broker()
+        scheduler = ExecutionScheduler(broker.execute, max_in_flight_per_session=1)
+        now = time.monotonic()
+        scheduler.submit(make_order('entry-late'), PriorityClass.ENTRY, deadline=now + 60)
+        scheduler.submit(make_order('entry-soon'), PriorityClass.ENTRY, deadline=now + 5)
+        scheduler.submit(make_order('entry-stale'), PriorityClass.ENTRY, deadline=now - 1)
+        scheduler.submit(make_order('hedge'), PriorityClass.HEDGE)
+        scheduler.submit(make_order('stop'), PriorityClass.STOP)
+        scheduler.submit(make_order('exit'), PriorityClass.EXIT)
+
+        async def scenario():
+            scheduler.start()
+            await asyncio.sleep(0.2)
+            await scheduler.drain()
+            await scheduler.stop()
+
+        run(scenario())
+        self.assertEqual(broker.executed, ['exit', 'stop', 'hedge', 'entry-soon', 'entry-late'])
+        self.assertEqual(broker.max_running, 1)
+        stats = scheduler.get_stats()
+        self.assertEqual(stats['classes']['entry']['expired'], 1)
+        self.assertEqual(stats['classes']['exit']['started'], 1)
+        # Everything behind the exit waited for it
+        self.assertGreater(stats['classes']['entry']['max_latency_ms'], stats['classes']['exit']['max_latency_ms'])
+        self.assertEqual(sum(stats['depth'].values()), 0)
+
+    def test_per_user_caps_and_rejections_do_not_block(self):
+        broker = Broker(delay=0.05)
+
+        async def can_execute(order):
+            return order.order_id != 'b-rejected'
+
+        scheduler = ExecutionScheduler(broker.execute, can_execute=can_execute,
+                                       max_in_flight_per_user=1, max_in_flight_per_session=4)
+        for i in range(3):
+            scheduler.submit(make_order(f'a-{i}', 'A'), PriorityClass.ENTRY)
+        scheduler.submit(make_order('b-rejected', 'B'), PriorityClass.ENTRY)
+        scheduler.submit(make_order('b-exit', 'B'), PriorityClass.EXIT)
+        scheduler.submit(make_order('c-0', 'C'), PriorityClass.ENTRY)
+
+        async def scenario():
+            # One dispatch pass: user A is capped at one order, B and C are not held behind it
+            started = scheduler.dispatch()
+            snapshot = scheduler.get_stats()
+            await asyncio.sleep(0)
+            scheduler.start()
+            await asyncio.sleep(0.4)
+            await scheduler.drain()
+            await scheduler.stop()
+            return started, snapshot
+
+        started, snapshot = run(scenario())
+        self.assertEqual(started, 3)
+        self.assertEqual(snapshot['in_flight'], 3)
+        self.assertEqual(snapshot['depth']['entry'], 3)
+        self.assertEqual(sorted(broker.executed), ['a-0', 'a-1', 'a-2', 'b-exit', 'c-0'])
+        self.assertLess(broker.executed.index('b-exit'), broker.executed.index('a-1'))
+        self.assertEqual(scheduler.get_stats()['classes']['entry']['rejected'], 1)
+
+    def test_risk_check_and_execution_are_atomic_per_user(self):
+        # 100 of headroom per user; each order uses 60, so only one of a user's two may pass
+        exposure = {'A': 0, 'B': 0}
+        broker = Broker(delay=0.03)
+
+        async def can_execute(order):
+            await asyncio.sleep(0.01)
+            return exposure[order.user_id] + 60 <= 100
+
+        async def execute(order):
+            await broker.execute(order)
+            exposure[order.user_id] += 60
+
+        scheduler = ExecutionScheduler(execute, can_execute=can_execute,
+                                       max_in_flight_per_user=2, max_in_flight_per_session=4)
+        for user in ('A', 'B'):
+            for i in range(2):
+                scheduler.submit(make_order(f'{user}-{i}', user), PriorityClass.ENTRY)
+
+        async def scenario():
+            scheduler.dispatch()
+            await scheduler.drain()
+
+        run(scenario())
+        self.assertEqual(exposure, {'A': 60, 'B': 60})
+        self.assertEqual(sorted(broker.executed), ['A-0', 'B-0'])
+        # Users are still executed concurrently with each other
+        self.assertEqual(broker.max_running, 2)
+        self.assertEqual(scheduler.get_stats()['classes']['entry']['rejected'], 2)
+
+    def test_full_queue_evicts_entries_for_protective_orders(self):
+        scheduler = ExecutionScheduler(Broker().execute, max_queue_size=2)
+        self.assertTrue(scheduler.submit(make_order('entry-1'), PriorityClass.ENTRY))
+        self.assertTrue(scheduler.submit(make_order('entry-2'), PriorityClass.ENTRY))
+        self.assertFalse(scheduler.submit(make_order('entry-3'), PriorityClass.ENTRY))
+        self.assertTrue(scheduler.submit(make_order('exit'), PriorityClass.EXIT))
+        self.assertEqual(scheduler.depth(), {'exit': 1, 'stop': 0, 'hedge': 0, 'entry': 1})
+        self.assertTrue(scheduler.cancel('entry-1') or scheduler.cancel('entry-2'))
+        self.assertEqual(scheduler.depth()['entry'], 0)
+        self.assertEqual(scheduler.get_stats()['classes']['entry']['dropped'], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
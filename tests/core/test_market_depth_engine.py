@@ -0,0 +1,64 @@
+"""
+Unit tests for the market depth microstructure engine
+Validates imbalance, microprice, OFI, depletion and Lee-Ready trade signing
+"""
+
+import unittest
+import sys
+import os
+
+# Add repo root to path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from src.core.market_depth_engine import MarketDepthEngine
+
+SEC = 1_000_000_000
+
+
+class TestMarketDepthEngine(unittest.TestCase):
+    """Test suite for MarketDepthEngine"""
+
+    def setUp(self):
+        self.engine = MarketDepthEngine(halflife_ticks=1)
+
+    def feed(self, ts, ltp, volume, bid, bid_qty, ask, ask_qty):
+        self.engine.on_depth('TEST', ts * SEC, ltp, volume,
+                             [bid, bid - 0.05], [bid_qty, 100], [ask, ask + 0.05], [ask_qty, 100])
+
+    def test_imbalance_and_microprice(self):
+        self.feed(1, 100.0, 0, 99.95, 300, 100.05, 100)
+        m = self.engine.get_metrics('TEST')
+        self.assertAlmostEqual(m['imbalance_l1'], 0.5)
+        # Heavier bid queue pulls the microprice toward the ask
+        self.assertGreater(m['microprice'], m['mid'])
+        self.assertAlmostEqual(m['spread_bps'], 10.0, places=3)
+
+    def test_lee_ready_trade_sign(self):
+        self.feed(1, 100.0, 1000, 99.95, 100, 100.05, 100)
+        self.feed(2, 100.05, 1500, 99.95, 100, 100.05, 100)   # above mid -> buy
+        self.feed(3, 99.95, 1700, 99.95, 100, 100.05, 100)    # below mid -> sell
+        m = self.engine.get_metrics('TEST')
+        self.assertEqual(m['buy_volume'], 500)
+        self.assertEqual(m['sell_volume'], 200)
+        self.assertEqual(m['trade_count'], 2)
+
+    def test_queue_depletion_and_ofi(self):
+        self.feed(1, 100.0, 0, 99.95, 500, 100.05, 500)
+        self.feed(2, 100.0, 0, 99.95, 500, 100.05, 200)       # ask queue consumed
+        m = self.engine.get_metrics('TEST')
+        self.assertGreater(m['ask_depletion_rate'], 0)
+        self.assertEqual(m['bid_depletion_rate'], 0)
+        self.assertGreater(m['ofi_cumulative'], 0)
+
+    def test_depth_book_and_reset(self):
+        self.engine.on_depth_book('BOOK', {
+            'buy': [{'price': 10.0, 'quantity': 50}],
+            'sell': [{'price': 10.1, 'quantity': 50}]
+        }, 10.05, 0)
+        self.assertTrue(self.engine.has_depth('BOOK'))
+        self.engine.reset('BOOK')
+        self.assertIsNone(self.engine.get_metrics('BOOK'))
+
+
+if __name__ == '__main__':
+    unittest.main()
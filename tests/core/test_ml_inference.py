@@ -0,0 +1,97 @@
+"""
+Unit tests for batched ML inference
+Tests the per-bar feature cache and one-call-per-model scoring of a cycle's candidates
+"""
+
+import asyncio
+import os
+import sys
+import unittest
+
+import numpy as np
+
+# Add repo root to path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from src.core.ml_inference import FeatureCache, InferenceBatch
+from src.core.ml_training_service import MLTrainingService
+
+
+def run(coro):
+    return asyncio.new_event_loop().run_until_complete(coro)
+
+
+class TestFeatureCache(unittest.TestCase):
+    """Test suite for the per-symbol, per-bar feature cache"""
+
+    def test_builds_once_per_symbol_and_bar(self):
+        cache = FeatureCache(bar_seconds=60)
+        built = []
+
+        def builder(symbol):
+            return lambda: built.append(symbol) or (symbol, len(built))
+
+        first = cache.get('NIFTY', 600.0, builder('NIFTY'))
+        self.assertIs(cache.get('NIFTY', 659.9, builder('NIFTY')), first)
+        cache.get('BANKNIFTY', 610.0, builder('BANKNIFTY'))
+        self.assertEqual(built, ['NIFTY', 'BANKNIFTY'])
+
+        # Next bar rebuilds
+        self.assertIsNot(cache.get('NIFTY', 660.0, builder('NIFTY')), first)
+        self.assertEqual(built, ['NIFTY', 'BANKNIFTY', 'NIFTY'])
+        stats = cache.get_stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['symbols']), (1, 3, 1))
+
+
+class CountingModel:
+    """Wraps a fitted model and counts predict_proba calls"""
+
+    def __init__(self, model):
+        self.model = model
+        self.classes_ = model.classes_
+        self.calls = 0
+
+    def predict_proba(self, X):
+        self.calls += 1
+        return self.model.predict_proba(X)
+
+
+class TestInferenceBatch(unittest.TestCase):
+    """Test suite for cycle-level batched scoring"""
+
+    def setUp(self):
+        self.service = MLTrainingService(executor='thread')
+        self.service.register('ml:batch', min_samples=50,
+                              model_params={'n_estimators': 10, 'random_state': 42})
+        rng = np.random.default_rng(3)
+        X = rng.normal(size=(80, 4))
+        self.service.load_samples('ml:batch', X, (X[:, 0] > 0).astype(int))
+        self.snapshot = run(self.service.train('ml:batch'))
+
+    def tearDown(self):
+        self.service.shutdown()
+
+    def test_scores_all_candidates_in_one_call(self):
+        rows = {f'signal-{i}': np.array([i - 5.0, 0.0, 0.0, 0.0]) for i in range(10)}
+        expected = {ref: self.snapshot.predict_proba(row) for ref, row in rows.items()}
+
+        counting = CountingModel(self.snapshot.model)
+        object.__setattr__(self.snapshot, 'model', counting)
+        batch = InferenceBatch(self.service)
+        for ref, row in rows.items():
+            self.assertTrue(batch.add('ml:batch', ref, row))
+        self.assertFalse(batch.add('ml:batch', 'empty', np.array([])))
+        batch.add('ml:untrained', 'other', np.ones(4))
+        batch.add('ml:batch', 'wrong-width', np.ones(3))
+
+        scored = batch.score()
+        self.assertEqual(counting.calls, 1)
+        self.assertEqual(set(scored), set(rows))
+        for ref, probability in expected.items():
+            self.assertAlmostEqual(scored[ref], probability)
+        self.assertGreater(scored['signal-9'], scored['signal-0'])
+        self.assertEqual(len(batch), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
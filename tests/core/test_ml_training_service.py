@@ -0,0 +1,125 @@
+"""
+Unit tests for MLTrainingService
+Tests the feature ring buffer, off-loop fits with versioned snapshots and the process pool path
+"""
+
+import asyncio
+import os
+import sys
+import unittest
+
+import numpy as np
+
+# Add repo root to path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from src.core.ml_training_service import FeatureBuffer, MLTrainingService
+
+
+def run(coro):
+    return asyncio.new_event_loop().run_until_complete(coro)
+
+
+def samples(n, seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n, 5))
+    y = (X[:, 0] + 0.1 * rng.normal(size=n) > 0).astype(int)
+    return X, y
+
+
+class TestFeatureBuffer(unittest.TestCase):
+    """Test suite for the bounded feature/label ring buffer"""
+
+    def test_wraps_in_chronological_order(self):
+        buffer = FeatureBuffer(capacity=4)
+        for i in range(6):
+            self.assertTrue(buffer.append([i, i * 10], i % 2))
+        X, y = buffer.arrays()
+        self.assertEqual(len(buffer), 4)
+        self.assertEqual(buffer.total, 6)
+        self.assertEqual(X[:, 0].tolist(), [2, 3, 4, 5])
+        self.assertEqual(y.tolist(), [0, 1, 0, 1])
+
+        # Wrong width or non-finite rows are rejected, not stored
+        self.assertFalse(buffer.append([1, 2, 3], 1))
+        self.assertFalse(buffer.append([float('nan'), 1], 1))
+        self.assertEqual(buffer.total, 6)
+
+
+class TestMLTrainingService(unittest.TestCase):
+    """Test suite for off-loop training and snapshot publication"""
+
+    def setUp(self):
+        self.service = MLTrainingService(executor='thread')
+        self.service.register('ml:test', capacity=200, min_samples=50, retrain_every=20,
+                              model_params={'n_estimators': 10, 'random_state': 42})
+
+    def tearDown(self):
+        self.service.shutdown()
+
+    def test_snapshots_are_versioned_and_swapped(self):
+        X, y = samples(120)
+
+        async def scenario():
+            for features, label in zip(X[:49], y[:49]):
+                self.service.add_sample('ml:test', features, label)
+            self.assertIsNone(self.service.request_training('ml:test'))  # below min_samples
+
+            self.service.add_sample('ml:test', X[49], y[49])
+            first_task = self.service.request_training('ml:test')
+            self.assertIsNotNone(first_task)
+            # A fit already in flight is reused rather than duplicated
+            self.assertIs(self.service.request_training('ml:test'), first_task)
+            first = await first_task
+            self.assertEqual(first.version, 1)
+            self.assertEqual(first.samples, 50)
+
+            for features, label in zip(X[50:], y[50:]):
+                self.service.add_sample('ml:test', features, label)
+            # 20 new samples scheduled a background retrain on their own
+            background = await self.service.request_training('ml:test')
+            self.assertEqual(background.version, 2)
+            second = await self.service.train('ml:test')
+            return first, second
+
+        first, second = run(scenario())
+        self.assertEqual(second.version, 3)
+        self.assertEqual(second.samples, 120)
+        self.assertIs(self.service.snapshot('ml:test'), second)
+        # The older snapshot is untouched and still usable
+        self.assertGreater(first.predict_proba(X[0]), -1)
+        self.assertGreater(second.predict_proba([3, 0, 0, 0, 0]), 0.5)
+        self.assertLess(second.predict_proba([-3, 0, 0, 0, 0]), 0.5)
+        with self.assertRaises(Exception):
+            second.version = 5
+
+    def test_single_class_and_reload(self):
+        X, _ = samples(60)
+        self.assertEqual(self.service.load_samples('ml:test', X.tolist(), [0] * 60), 60)
+        self.assertIsNone(run(self.service.train('ml:test')))
+
+        features, labels = self.service.samples('ml:test')
+        self.assertEqual(features.shape, (60, 5))
+        self.assertEqual(self.service.samples_seen('ml:test'), 60)
+        stats = self.service.get_stats()['models']['ml:test']
+        self.assertEqual(stats['fits'], 0)
+        self.assertIsNone(stats['snapshot'])
+
+    def test_process_pool_fit_with_holdout(self):
+        service = MLTrainingService(executor='process')
+        service.register('ml:holdout', min_samples=50, holdout=True,
+                         model_params={'n_estimators': 10, 'random_state': 42,
+                                       'class_weight': 'balanced'})
+        X, y = samples(150, seed=1)
+        service.load_samples('ml:holdout', X, y)
+        try:
+            snapshot = run(service.train('ml:holdout'))
+        finally:
+            service.shutdown()
+        self.assertIsNotNone(snapshot)
+        self.assertEqual(snapshot.samples, 150)
+        self.assertGreater(snapshot.balanced_accuracy, 0.7)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+"""
+Unit tests for OrderDispatchScheduler
+Tests per-API-key token pacing, exit-first ordering and entry wait limits
+"""
+
+import asyncio
+import os
+import sys
+import time
+import unittest
+
+# Add repo root to path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from src.core.order_dispatch_scheduler import (
+    DispatchPriority, OrderDispatchScheduler, OrderDispatchTimeout, api_kind, modification_priority,
+    order_priority
+)
+
+
+def run(coro):
+    return asyncio.new_event_loop().run_until_complete(coro)
+
+
+# 4 orders per 0.2s (20/s) keeps the tests fast
+FAST_LIMITS = {'orders': ((4, 0.2),), 'quotes': ((1, 0.1),), 'other': ((10, 1.0),)}
+
+
+class TestOrderDispatchScheduler(unittest.TestCase):
+    """Test suite for broker-aware dispatch pacing"""
+
+    def test_burst_is_smoothed_with_exits_first(self):
+        scheduler = OrderDispatchScheduler(FAST_LIMITS, headroom=1.0)
+        granted = []
+
+        async def call(name, priority):
+            await scheduler.acquire('KEY1', 'orders', priority)
+            granted.append((name, time.monotonic()))
+
+        async def scenario():
+            started = time.monotonic()
+            entries = [asyncio.create_task(call(f'entry-{i}', DispatchPriority.ENTRY)) for i in range(8)]
+            await asyncio.sleep(0)
+            # Arrive after the entries but jump the queue
+            protective = [asyncio.create_task(call('stop', DispatchPriority.STOP_LOSS)),
+                          asyncio.create_task(call('exit', DispatchPriority.EXIT))]
+            await asyncio.gather(*entries, *protective)
+            return started
+
+        started = run(scenario())
+        names = [name for name, _ in granted]
+        # First four fit the bucket; then exit, stop-loss, and the remaining entries in order
+        self.assertEqual(names, ['entry-0', 'entry-1', 'entry-2', 'entry-3', 'exit', 'stop',
+                                 'entry-4', 'entry-5', 'entry-6', 'entry-7'])
+        # 10 calls at 20/s with a burst of 4: about 0.3s, never more than the ceiling allows
+        elapsed = granted[-1][1] - started
+        self.assertGreater(elapsed, 0.25)
+        self.assertLess(elapsed, 1.0)
+        stats = scheduler.get_stats()['KEY1:orders']
+        self.assertEqual((stats['granted'], stats['queued'], stats['waiting']), (10, 6, 0))
+
+    def test_entries_time_out_and_lanes_are_per_key(self):
+        scheduler = OrderDispatchScheduler({'orders': ((1, 1.0),), 'other': ((10, 1.0),)},
+                                           headroom=1.0, entry_max_wait=0.05)
+
+        async def scenario():
+            self.assertEqual(await scheduler.acquire('KEY1', 'orders', DispatchPriority.EXIT), 0.0)
+            with self.assertRaises(OrderDispatchTimeout):
+                await scheduler.acquire('KEY1', 'orders')
+            # Another API key has its own ceiling
+            self.assertEqual(await scheduler.acquire('KEY2', 'orders'), 0.0)
+            # Exits wait for capacity instead of failing
+            return await scheduler.acquire('KEY1', 'orders', DispatchPriority.EXIT)
+
+        waited = run(scenario())
+        self.assertGreater(waited, 0.8)
+        self.assertEqual(scheduler.queue_depth(), 0)
+
+    def test_priority_and_kind_helpers(self):
+        self.assertEqual(order_priority({'tag': 'SQUARE_OFF'}), DispatchPriority.EXIT)
+        self.assertEqual(order_priority({'metadata': {'is_exit': True}}), DispatchPriority.EXIT)
+        self.assertEqual(order_priority({'symbol': 'SBIN'}), DispatchPriority.ENTRY)
+        self.assertEqual(modification_priority({'trigger_price': 790.0}), DispatchPriority.STOP_LOSS)
+        self.assertEqual(modification_priority({'price': 801.0}), DispatchPriority.MODIFY)
+        self.assertEqual([api_kind(name) for name in ('modify_order', 'ltp', 'historical_data', 'margins')],
+                         ['orders', 'quotes', 'historical', 'other'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+"""
+Unit tests for the rolling risk analytics engine
+Validates bounded windows, EWMA correlation and incremental VaR against numpy
+"""
+
+import unittest
+import sys
+import os
+import math
+
+import numpy as np
+
+# Add repo root to path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from src.core.risk_analytics_engine import RollingReturnWindow, RollingCovarianceEngine
+
+
+def price_paths(n_bars=400, seed=3):
+    """Three symbols: B tracks A closely, C is independent"""
+    rng = np.random.default_rng(seed)
+    a = rng.normal(0, 0.002, n_bars)
+    b = a + rng.normal(0, 0.0005, n_bars)
+    c = rng.normal(0, 0.002, n_bars)
+    returns = np.column_stack([a, b, c])
+    return 100 * np.cumprod(1 + returns, axis=0)
+
+
+class TestRollingReturnWindow(unittest.TestCase):
+    """Test suite for RollingReturnWindow"""
+
+    def test_window_is_bounded_and_matches_numpy(self):
+        window = RollingReturnWindow(window=100)
+        data = np.random.default_rng(1).normal(0, 0.01, 1000)
+        for value in data:
+            window.add(value)
+        self.assertEqual(len(window), 100)
+
+        tail = data[-100:]
+        var, cvar = window.historical_var_cvar(0.95)
+        expected = np.sort(tail)[:5]
+        self.assertAlmostEqual(var, abs(expected[-1]), places=12)
+        self.assertAlmostEqual(cvar, abs(expected.mean()), places=12)
+        self.assertAlmostEqual(window.std(), np.std(tail, ddof=1), places=10)
+
+    def test_parametric_var(self):
+        window = RollingReturnWindow(window=50)
+        for value in np.random.default_rng(2).normal(0, 0.01, 50):
+            window.add(value)
+        var, cvar = window.parametric_var_cvar(0.95)
+        self.assertGreater(cvar, var)
+        self.assertAlmostEqual(var, 1.6449 * window.std() - window.mean(), places=4)
+
+
+class TestRollingCovarianceEngine(unittest.TestCase):
+    """Test suite for RollingCovarianceEngine"""
+
+    def setUp(self):
+        self.engine = RollingCovarianceEngine(max_symbols=8, window=100, halflife_bars=50, min_bars=20)
+        self.prices = price_paths()
+        for t, row in enumerate(self.prices):
+            self.engine.on_prices({'A': row[0], 'B': row[1], 'C': row[2]}, ts=t * 30.0)
+
+    def test_correlation(self):
+        self.assertGreater(self.engine.correlation('A', 'B'), 0.9)
+        self.assertLess(abs(self.engine.correlation('A', 'C')), 0.3)
+        self.assertEqual(self.engine.correlation('A', 'UNKNOWN'), 0.0)
+
+    def test_memory_is_bounded(self):
+        stats = self.engine.get_stats()
+        self.assertEqual(stats['bars'], len(self.prices) - 1)
+        self.engine.set_exposures({'A': 100000.0})
+        for i in range(20):
+            self.engine.on_prices({f'X{i}': 10.0})
+        stats = self.engine.get_stats()
+        self.assertEqual(stats['symbols'], 8)
+        # Least recently updated slots are reused; the held symbol keeps its history
+        self.assertEqual(stats['evicted_symbols'], 20 - 5)
+        self.assertEqual(stats['dropped_symbols'], 0)
+        self.assertFalse(self.engine.has_history('B'))
+        self.assertTrue(self.engine.has_history('A'))
+        self.assertEqual(self.engine.correlation('X19', 'A'), 0.0)
+
+        # Symbols are only dropped when every slot is held or priced in the same bar
+        self.engine.on_prices({f'Y{i}': 10.0 for i in range(9)})
+        self.assertEqual(self.engine.get_stats()['dropped_symbols'], 2)
+
+    def test_incremental_var_matches_full_recompute(self):
+        self.engine.set_exposures({'A': 100000.0})
+        incremental = self.engine.incremental_var('B', 50000.0)
+        self.engine.set_exposures({'A': 100000.0, 'B': 50000.0})
+        full, full_cvar = self.engine.portfolio_var()
+        self.assertAlmostEqual(incremental, full, places=6)
+        self.assertGreater(full_cvar, full)
+        self.assertIsNone(self.engine.incremental_var('UNKNOWN', 1000.0))
+
+        # Hedging with the correlated leg must reduce VaR
+        hedged = self.engine.incremental_var('B', -100000.0)
+        self.assertLess(hedged, full)
+
+    def test_historical_portfolio_var(self):
+        var, cvar = self.engine.historical_portfolio_var({'A': 100000.0})
+        returns = np.diff(self.prices[-101:, 0]) / self.prices[-101:-1, 0]
+        expected = abs(np.sort(returns * 100000.0)[:5][-1])
+        self.assertTrue(math.isclose(var, expected, rel_tol=1e-9))
+        self.assertGreaterEqual(cvar, var)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,147 @@
+"""
+Unit tests for RouterLoader and ImportProfiler
+Tests lazy mounting order, on-demand loading and import profiling
+"""
+
+import asyncio
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+import textwrap
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+# Add repo root to path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from src.core.router_loader import RouterLoader, LazyRouterMiddleware, ImportProfiler
+
+
+class TestRouterLoader(unittest.TestCase):
+    """Test suite for RouterLoader"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.package = f"lazy_pkg_{id(self)}"
+        pkg_dir = os.path.join(self.tmpdir, self.package)
+        os.makedirs(pkg_dir)
+        open(os.path.join(pkg_dir, '__init__.py'), 'w').close()
+        with open(os.path.join(pkg_dir, 'helper.py'), 'w') as f:
+            f.write("VALUE = 42\n")
+        with open(os.path.join(pkg_dir, 'items.py'), 'w') as f:
+            f.write(textwrap.dedent("""
+                from fastapi import APIRouter
+                from . import helper
+
+                router = APIRouter()
+
+                @router.get("/hello")
+                async def hello():
+                    return {"source": "router", "value": helper.VALUE}
+            """))
+        sys.path.insert(0, self.tmpdir)
+
+    def tearDown(self):
+        sys.path.remove(self.tmpdir)
+        for name in [m for m in sys.modules if m.startswith(self.package)]:
+            del sys.modules[name]
+        shutil.rmtree(self.tmpdir)
+
+    def build_app(self, lazy):
+        loader = RouterLoader({'items': (f"{self.package}.items", 'router')})
+        app = FastAPI()
+        if lazy:
+            app.add_middleware(LazyRouterMiddleware, loader=loader, exempt_prefixes=('/health',))
+
+        @app.get("/health")
+        async def health():
+            return {"status": "healthy"}
+
+        loader.mount(app, [('items', '/x', ('items',))], lazy=lazy)
+
+        # Catch-all registered after the mount point must not shadow the router
+        @app.api_route("/{path:path}", methods=["GET"])
+        async def catch_all(path: str):
+            return {"source": "catch_all"}
+
+        return app, loader
+
+    def test_lazy_mount_defers_import(self):
+        app, loader = self.build_app(lazy=True)
+        self.assertEqual(loader.pending, ['items'])
+        self.assertNotIn(f"{self.package}.items", sys.modules)
+
+        client = TestClient(app)
+        self.assertEqual(client.get("/health").json(), {"status": "healthy"})
+        self.assertEqual(loader.pending, ['items'])
+
+    def test_first_request_loads_router_in_manifest_position(self):
+        app, loader = self.build_app(lazy=True)
+        client = TestClient(app)
+        response = client.get("/x/hello").json()
+        self.assertEqual(response, {"source": "router", "value": 42})
+        self.assertEqual(loader.pending, [])
+        self.assertEqual(app.state.routers_loaded, 1)
+        # The placeholder is replaced in place, ahead of the catch-all route
+        names = [type(r).__name__ for r in app.router.routes]
+        self.assertNotIn('_PendingRouterRoute', names)
+        self.assertEqual(client.get("/other").json()['source'], 'catch_all')
+
+    def test_eager_mount_matches_lazy_routes(self):
+        app, loader = self.build_app(lazy=False)
+        self.assertEqual(loader.pending, [])
+        client = TestClient(app)
+        self.assertEqual(client.get("/x/hello").json()['source'], 'router')
+
+    def test_warmup_imports_off_the_event_loop(self):
+        with open(os.path.join(self.tmpdir, self.package, 'slow.py'), 'w') as f:
+            f.write("import time\nfrom fastapi import APIRouter\ntime.sleep(0.3)\nrouter = APIRouter()\n")
+        loader = RouterLoader({'slow': (f"{self.package}.slow", 'router')})
+        app = FastAPI()
+        loader.mount(app, [('slow', '/slow', ('slow',))], lazy=True)
+
+        async def scenario():
+            ticks = 0
+            warmup = asyncio.create_task(loader.warmup())
+            while not warmup.done():
+                ticks += 1
+                await asyncio.sleep(0.01)
+            return ticks
+
+        ticks = asyncio.new_event_loop().run_until_complete(scenario())
+        # The loop kept running while the module slept in its import
+        self.assertGreater(ticks, 10)
+        self.assertEqual(loader.pending, [])
+        self.assertEqual(app.state.routers_loaded, 1)
+
+    def test_import_profiler_records_nested_modules(self):
+        loader = RouterLoader({'items': (f"{self.package}.items", 'router')})
+        loader.import_router('items')
+        modules = loader.profiler.modules
+        items = modules[f"{self.package}.items"]
+        helper = modules[f"{self.package}.helper"]
+        self.assertEqual(helper['parent'], f"{self.package}.items")
+        self.assertGreaterEqual(items['cumulative_ms'], helper['cumulative_ms'])
+        self.assertGreaterEqual(items['cumulative_ms'], items['self_ms'])
+
+        report = loader.get_report(top=5)
+        self.assertEqual(report['routers_loaded'], 1)
+        self.assertIn('items', report['router_load_ms'])
+        self.assertLessEqual(len(report['imports']['slowest']), 5)
+
+    def test_profiler_restores_builtin_import(self):
+        import builtins
+        original = builtins.__import__
+        profiler = ImportProfiler()
+        with profiler:
+            with profiler:
+                self.assertIsNot(builtins.__import__, original)
+            self.assertIsNot(builtins.__import__, original)
+        self.assertIs(builtins.__import__, original)
+
+
+if __name__ == '__main__':
+    unittest.main()
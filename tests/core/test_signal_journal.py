@@ -0,0 +1,148 @@
+"""
+Unit tests for SignalJournal
+Tests batched write-behind flushes, backpressure, spill/replay and the bulk-insert sink
+"""
+
+import asyncio
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from datetime import datetime
+
+from sqlalchemy import create_engine, text
+
+# Add repo root to path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from src.core.signal_journal import DatabaseSink, SignalJournal
+from src.core.signal_recorder import SignalRecord, SignalStatus
+
+
+def run(coro):
+    return asyncio.new_event_loop().run_until_complete(coro)
+
+
+class FakeSink:
+    def __init__(self):
+        self.batches = []
+        self.failing = False
+
+    def available(self):
+        return True
+
+    def write_batch(self, rows):
+        if self.failing:
+            raise ConnectionError("database unavailable")
+        self.batches.append(list(rows))
+
+    def rows(self):
+        return [row for batch in self.batches for row in batch]
+
+
+def make_record(signal_id='sig-1'):
+    return SignalRecord(signal_id=signal_id, timestamp=datetime(2026, 1, 5, 9, 20), strategy='momentum',
+                        symbol='SBIN', action='BUY', entry_price=800.0, stop_loss=790.0, target=820.0,
+                        confidence=8.5, quantity=10, status=SignalStatus.GENERATED,
+                        risk_reward_ratio=2.0, risk_percent=1.25, reward_percent=2.5, metadata={'edge': 'breakout'}, valid_until=datetime(2026, 1, 5, 9, 25))
+
+
+class TestSignalJournal(unittest.TestCase):
+    """Test suite for the write-behind signal journal"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.sink = FakeSink()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def journal(self, **kwargs):
+        return SignalJournal(self.sink, spill_dir=self.directory, **kwargs)
+
+    def test_appends_are_flushed_in_batches(self):
+        journal = self.journal(batch_size=3, flush_interval=0.05)
+
+        async def scenario():
+            self.assertFalse(journal.append_event('sig-0', 'stage', 'GENERATED'))  # not started
+            await journal.start()
+            self.assertTrue(journal.append_signal(make_record()))
+            for stage in ('VALIDATED', 'QUEUED', 'EXECUTING', 'EXECUTED'):
+                self.assertTrue(journal.append_event('sig-1', 'stage', stage))
+            self.assertEqual(self.sink.batches, [])  # nothing written on the append path
+            await asyncio.sleep(0.2)
+            journal.append_event('sig-1', 'status', 'EXECUTED', payload={'pnl': 120.0})
+            await journal.stop()
+
+        run(scenario())
+        self.assertEqual([len(batch) for batch in self.sink.batches], [3, 2, 1])
+        signal = self.sink.rows()[0]
+        self.assertEqual((signal['kind'], signal['status'], signal['generated_at']),
+                         ('signal', 'GENERATED', '2026-01-05T09:20:00'))
+        self.assertEqual(self.sink.rows()[-1]['payload'], '{"pnl":120.0}')
+        self.assertEqual(journal.get_stats()['written'], 6)
+
+    def test_backpressure_spill_and_replay(self):
+        journal = self.journal(max_pending=3, batch_size=2, retry_seconds=60)
+        self.sink.failing = True
+
+        async def scenario():
+            await journal.start()
+            accepted = [journal.append_event(f'sig-{i}', 'stage', 'GENERATED') for i in range(5)]
+            # Memory stays bounded: the overflow goes to disk, not the queue
+            self.assertEqual(accepted, [True, True, True, False, False])
+            self.assertEqual(journal.get_stats()['pending'], 3)
+            # ...written by the drain task, not on the append path
+            self.assertEqual(journal.get_stats()['overflow'], 2)
+            self.assertFalse(journal.has_spill())
+            await asyncio.sleep(0.05)
+            self.assertEqual(journal.get_stats()['overflow'], 0)
+            self.assertTrue(journal.has_spill())
+            await journal.stop()
+
+        run(scenario())
+        stats = journal.get_stats()
+        self.assertEqual((stats['spilled'], stats['written'], stats['dropped']), (5, 0, 0))
+        self.assertTrue(stats['spill_pending'])
+
+        # Restart with a healthy database: the spill is replayed once and removed
+        self.sink.failing = False
+        restarted = self.journal(batch_size=2, flush_interval=0.05)
+
+        async def restart():
+            await restarted.start()
+            await asyncio.sleep(0.2)
+            await restarted.stop()
+
+        run(restart())
+        self.assertEqual(sorted(row['signal_id'] for row in self.sink.rows()), [f'sig-{i}' for i in range(5)])
+        self.assertFalse(restarted.has_spill())
+        self.assertEqual(restarted.get_stats()['replayed'], 5)
+
+    def test_database_sink_bulk_insert_is_idempotent(self):
+        engine = create_engine(f"sqlite:///{os.path.join(self.directory, 'signals.db')}")
+        with engine.begin() as conn:
+            conn.execute(text("CREATE TABLE signals (signal_id TEXT PRIMARY KEY, strategy TEXT, symbol TEXT, "
+                              "action TEXT, entry_price REAL, stop_loss REAL, target REAL, confidence REAL, "
+                              "quantity INTEGER, status TEXT, generated_at TEXT, valid_until TEXT, metadata TEXT)"))
+            conn.execute(text("CREATE TABLE signal_events (event_id TEXT UNIQUE, signal_id TEXT, kind TEXT, "
+                              "stage TEXT, previous_stage TEXT, event_time TEXT, payload TEXT)"))
+        sink = DatabaseSink(engine)
+        journal = SignalJournal(sink, spill_dir=self.directory)
+        journal.enabled = True
+        journal.append_signal(make_record())
+        journal.append_event('sig-1', 'stage', 'EXECUTED', 'VALIDATED')
+        rows = list(journal._pending)
+
+        sink.write_batch(rows)
+        sink.write_batch(rows)  # replayed batch: duplicates are skipped
+        with engine.connect() as conn:
+            self.assertEqual(conn.execute(text("SELECT COUNT(*), MAX(metadata) FROM signals")).one(),
+                             (1, '{"edge":"breakout"}'))
+            self.assertEqual(conn.execute(text("SELECT stage, previous_stage FROM signal_events")).all(),
+                             [('EXECUTED', 'VALIDATED')])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,115 @@
+"""
+Unit tests for the signal validation pipeline
+Validates stage ordering, short-circuiting, stats and per-cycle memoization
+"""
+
+import asyncio
+import unittest
+import sys
+import os
+
+# Add repo root to path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from src.core.signal_pipeline import SignalPipeline, CycleMemo
+
+
+class TestSignalPipeline(unittest.TestCase):
+    """Test suite for SignalPipeline"""
+
+    def setUp(self):
+        self.calls = []
+
+    def _expensive(self, signal, context):
+        self.calls.append(('expensive', signal['symbol']))
+        return None
+
+    def _cheap(self, signal, context):
+        self.calls.append(('cheap', signal['symbol']))
+        return 'LOW_CONFIDENCE' if signal['confidence'] < 8 else None
+
+    def test_cheap_filters_run_first_between_batch_barriers(self):
+        pipeline = (SignalPipeline('test')
+                    .add_stage('dedup', lambda signals, ctx: signals, batch=True)
+                    .add_stage('expensive', self._expensive, cost=10)
+                    .add_stage('cheap', self._cheap, cost=1)
+                    .add_stage('throttle', lambda signals, ctx: signals[:1], batch=True))
+        self.assertEqual([s.name for s in pipeline.plan], ['dedup', 'cheap', 'expensive', 'throttle'])
+
+        signals = [{'symbol': 'A', 'confidence': 9}, {'symbol': 'B', 'confidence': 5}, {'symbol': 'C', 'confidence': 9}]
+        result = asyncio.run(pipeline.run(signals))
+
+        self.assertEqual([s['symbol'] for s in result], ['A'])
+        # Rejected signal never reaches the expensive stage
+        self.assertNotIn(('expensive', 'B'), self.calls)
+        stats = pipeline.get_stats()['stages']
+        self.assertEqual(stats['cheap']['rejected'], 1)
+        self.assertEqual(stats['cheap']['top_reasons'], {'LOW_CONFIDENCE': 1})
+        self.assertEqual(stats['throttle']['rejected'], 1)
+
+    def test_failing_safety_gate_rejects_signals(self):
+        def broken(signals, context):
+            raise ConnectionError('redis down')
+        pipeline = (SignalPipeline('test')
+                    .add_stage('dedup', broken, batch=True)
+                    .add_stage('after', self._expensive))
+        result = asyncio.run(pipeline.run([{'symbol': 'A'}, {'symbol': 'B'}]))
+        self.assertEqual(result, [])
+        self.assertEqual(self.calls, [])
+        stats = pipeline.get_stats()['stages']['dedup']
+        self.assertEqual((stats['errors'], stats['rejected']), (1, 2))
+        self.assertEqual(stats['top_reasons'], {'stage_error': 2})
+
+    def test_failing_best_effort_stage_passes_signals_through(self):
+        def broken(signal, context):
+            raise RuntimeError('boom')
+        pipeline = SignalPipeline('test').add_stage('enhance', broken, on_error='pass')
+        result = asyncio.run(pipeline.run([{'symbol': 'A'}]))
+        self.assertEqual(len(result), 1)
+        self.assertEqual(pipeline.get_stats()['stages']['enhance']['errors'], 1)
+
+    def test_missing_inputs_follow_the_stage_policy(self):
+        pipeline = SignalPipeline('test').add_stage('enhance', lambda s, c: 'REJECT', inputs=('market_data',),
+                                                    on_error='pass')
+        self.assertEqual(len(asyncio.run(pipeline.run([{'symbol': 'A'}]))), 1)
+
+        pipeline = SignalPipeline('test').add_stage('gate', lambda s, c: None, inputs=('positions',))
+        self.assertEqual(asyncio.run(pipeline.run([{'symbol': 'A'}])), [])
+        self.assertEqual(pipeline.get_stats()['stages']['gate']['top_reasons'], {'missing_inputs': 1})
+
+        with self.assertRaises(ValueError):
+            SignalPipeline('test').add_stage('gate', lambda s, c: None, on_error='ignore')
+
+
+class TestCycleMemo(unittest.TestCase):
+    """Test suite for CycleMemo"""
+
+    def test_memoizes_within_cycle(self):
+        memo = CycleMemo()
+        counter = {'n': 0}
+
+        async def fetch():
+            counter['n'] += 1
+            await asyncio.sleep(0)
+            return 42
+
+        async def scenario():
+            values = await asyncio.gather(*(memo.aget_or_compute('NIFTY', 'iv_rank', fetch) for _ in range(5)))
+            self.assertEqual(values, [42] * 5)
+            self.assertEqual(counter['n'], 1)
+            memo.begin_cycle()
+            await memo.aget_or_compute('NIFTY', 'iv_rank', fetch)
+            self.assertEqual(counter['n'], 2)
+
+        asyncio.run(scenario())
+        self.assertEqual(memo.get_or_compute('X', 'k', lambda: 1), 1)
+        self.assertEqual(memo.get_or_compute('X', 'k', lambda: 2), 1)
+
+    def test_rollover_when_cycle_not_advanced(self):
+        memo = CycleMemo(max_cycle_seconds=0)
+        memo.get_or_compute('X', 'k', lambda: 1)
+        self.assertEqual(memo.get_or_compute('X', 'k', lambda: 2), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,206 @@
+"""
+Unit tests for SimulatedBroker execution models
+Tests depth-walking price-time matching, latency, freeze/tick-size rejections, rate limits and the paper broker
+"""
+
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+
+# Add repo root to path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from src.core import contract_specs as contract_specs_module
+from src.core.contract_specs import IST, ContractSpecCache
+from src.core.paper_trader import PaperTradingBroker
+from src.core.replay_harness import ReplayClock
+from src.core.simulated_broker import LatencyModel, SimulatedBroker, SimulationConfig
+
+
+def run(coro):
+    return asyncio.new_event_loop().run_until_complete(coro)
+
+
+def book(bid_levels, ask_levels, ltp=100.0):
+    return {
+        'ltp': ltp,
+        'bid': bid_levels[0][0],
+        'ask': ask_levels[0][0],
+        'depth': {
+            'buy': [{'price': p, 'quantity': q, 'orders': 1} for p, q in bid_levels],
+            'sell': [{'price': p, 'quantity': q, 'orders': 1} for p, q in ask_levels]
+        }
+    }
+
+
+class TestSimulatedBrokerModels(unittest.TestCase):
+    """Test suite for the SimulatedBroker fill, latency and rejection models"""
+
+    def setUp(self):
+        self.clock = ReplayClock(1764563400.0)  # 2025-12-01 10:00 IST
+        self.broker = SimulatedBroker(clock=self.clock)
+
+    def place(self, **params):
+        params.setdefault('transaction_type', 'BUY')
+        return run(self.broker.place_order(params))
+
+    def last(self, order_id):
+        return run(self.broker.get_order_status(order_id))[-1]
+
+    def test_market_order_walks_depth_and_rests_remainder(self):
+        self.broker.update_quotes({'SBIN': book([(99.95, 100)], [(100.05, 40), (100.10, 30), (100.20, 20)])})
+        order_id = self.place(symbol='SBIN', quantity=100)
+        order = self.last(order_id)
+        self.assertEqual(order['status'], 'OPEN')
+        self.assertEqual(order['filled_quantity'], 100 - 10)
+        self.assertAlmostEqual(order['average_price'], (100.05 * 40 + 100.10 * 30 + 100.20 * 20) / 90)
+        self.assertEqual(self.broker.get_stats()['partial_fills'], 3)
+
+        # Liquidity already taken is not available again until a fresh quote arrives
+        self.assertEqual(self.broker.update_quotes({'SBIN': self.broker._quotes['SBIN']}), 0)
+        self.broker.update_quotes({'SBIN': book([(100.0, 100)], [(100.25, 500)])})
+        order = self.last(order_id)
+        self.assertEqual(order['status'], 'COMPLETE')
+        self.assertEqual(order['filled_quantity'], 100)
+
+    def test_price_time_priority_between_resting_orders(self):
+        self.broker.update_quotes({'SBIN': book([(99.0, 100)], [(101.0, 100)])})
+        first = self.place(symbol='SBIN', quantity=30, order_type='LIMIT', price=100.0)
+        second = self.place(symbol='SBIN', quantity=30, order_type='LIMIT', price=100.0)
+        better = self.place(symbol='SBIN', quantity=30, order_type='LIMIT', price=100.05)
+
+        # 50 offered at 100.00: best price first, then time priority
+        self.broker.update_quotes({'SBIN': book([(99.0, 100)], [(100.0, 50)])})
+        self.assertEqual(self.last(better)['filled_quantity'], 30)
+        self.assertEqual(self.last(first)['filled_quantity'], 20)
+        self.assertEqual(self.last(second)['filled_quantity'], 0)
+
+        # A price modification loses time priority
+        run(self.broker.modify_order(first, {'price': 100.0, 'quantity': 40}))
+        self.broker.update_quotes({'SBIN': book([(99.0, 100)], [(100.0, 35)])})
+        self.assertEqual(self.last(second)['filled_quantity'], 30)
+        self.assertEqual(self.last(first)['filled_quantity'], 25)
+
+    def test_ack_and_fill_latency(self):
+        self.broker.config = SimulationConfig(ack_latency=LatencyModel(50, distribution='fixed'),
+                                              fill_latency=LatencyModel(100, distribution='fixed'))
+        self.broker.update_quotes({'SBIN': book([(99.95, 100)], [(100.05, 100)])})
+        order_id = self.place(symbol='SBIN', quantity=10)
+        self.assertEqual(self.last(order_id)['status'], 'OPEN PENDING')
+
+        self.clock.advance(0.06)
+        order = self.last(order_id)
+        self.assertEqual((order['status'], order['filled_quantity']), ('OPEN', 0))
+        self.assertIsNotNone(order['exchange_order_id'])
+
+        self.clock.advance(0.1)
+        self.broker.update_quotes({'SBIN': book([(99.95, 100)], [(100.10, 100)])})
+        order = self.last(order_id)
+        self.assertEqual(order['status'], 'COMPLETE')
+        self.assertAlmostEqual(order['average_price'], 100.10)
+
+    def test_freeze_quantity_and_tick_size_rejections(self):
+        self.broker.update_quotes({'NIFTY25DEC24000CE': {'ltp': 120.0, 'bid': 119.95, 'ask': 120.05},
+                                   'NIFTYNXT50-I': {'ltp': 68000.0, 'bid': 67999.0, 'ask': 68001.0},
+                                   'SBIN': {'ltp': 800.0, 'bid': 799.95, 'ask': 800.05}})
+        self.assertIsNone(self.place(symbol='NIFTY25DEC24000CE', quantity=1875))
+        self.assertIn('freeze quantity of 1800', self.broker.last_error)
+        self.assertIsNotNone(self.place(symbol='NIFTY25DEC24000CE', quantity=1800))
+        self.assertIsNone(self.place(symbol='NIFTYNXT50-I', quantity=625))
+        self.assertIn('freeze quantity of 600', self.broker.last_error)
+
+        # Aligned the way ZerodhaIntegration does: BUY limits round down to the tick
+        order_id = self.place(symbol='SBIN', quantity=5, order_type='LIMIT', price=790.03)
+        self.assertAlmostEqual(self.last(order_id)['price'], 790.0)
+        self.broker.config.align_to_tick = False
+        self.assertIsNone(self.place(symbol='SBIN', quantity=5, order_type='LIMIT', price=790.03))
+        self.assertIn('Tick size for this script is 0.05', self.broker.last_error)
+        self.assertEqual(self.broker.get_stats()['rejections'], {'freeze_quantity': 2, 'tick_size': 1})
+
+    def test_kite_rate_limits(self):
+        self.broker.update_quotes({'SBIN': {'ltp': 800.0, 'bid': 799.95, 'ask': 800.05}})
+        placed = [self.place(symbol='SBIN', quantity=1) for _ in range(10)]
+        self.assertTrue(all(placed))
+        self.assertIsNone(self.place(symbol='SBIN', quantity=1))
+        self.assertEqual(self.broker.last_error, 'Too many requests')
+        self.assertEqual(self.broker.get_stats()['rate_limited'], 1)
+        # Rate-limited requests never reach the order book
+        self.assertEqual(len(self.broker.get_orders_sync()), 10)
+
+        self.clock.advance(1.0)
+        self.assertIsNotNone(self.place(symbol='SBIN', quantity=1))
+
+    def test_latency_model_distributions(self):
+        rng = random.Random(1)
+        self.assertEqual(LatencyModel().sample(rng), 0.0)
+        self.assertEqual(LatencyModel(25, distribution='fixed').sample(rng), 0.025)
+        model = LatencyModel.parse('20:8:lognormal')
+        self.assertEqual((model.mean_ms, model.jitter_ms, model.distribution), (20.0, 8.0, 'lognormal'))
+        samples = [model.sample(rng) for _ in range(5000)]
+        self.assertTrue(all(s >= 0 for s in samples))
+        self.assertAlmostEqual(sum(samples) / len(samples), 0.020, delta=0.001)
+
+
+class TestPaperTradingBroker(unittest.TestCase):
+    """Test suite for PaperTradingBroker on a live quote dict"""
+
+    def test_quotes_pulled_from_live_feed(self):
+        live = {'INFY': {'ltp': 1500.0, 'bid': 1499.9, 'ask': 1500.1}}
+        broker = PaperTradingBroker(initial_cash=500000.0, market_data=live, config=SimulationConfig())
+        filled = run(broker.place_order({'symbol': 'INFY', 'transaction_type': 'BUY', 'quantity': 10}))
+        resting = run(broker.place_order({'symbol': 'INFY', 'transaction_type': 'BUY', 'quantity': 10,
+                                          'order_type': 'LIMIT', 'price': 1495.0}))
+        self.assertEqual(run(broker.get_order_status(filled))[-1]['average_price'], 1500.1)
+        self.assertEqual(broker.poll_once(), 0)
+
+        # The feed replaces the quote dict on every tick
+        live['INFY'] = {'ltp': 1494.5, 'bid': 1494.4, 'ask': 1494.6}
+        self.assertEqual(broker.poll_once(), 1)
+        self.assertEqual(run(broker.get_order_status(resting))[-1]['status'], 'COMPLETE')
+        self.assertEqual(broker.get_positions_sync()['net'][0]['quantity'], 20)
+
+    def test_options_lookups_match_zerodha_surface(self):
+        expiry = datetime.now(IST).date() + timedelta(days=7)
+        code = expiry.strftime('%y%b').upper()
+        live = {f'NIFTY{code}{strike}CE': {'ltp': ltp, 'volume': 1200}
+                for strike, ltp in ((24000, 110.0), (24050, 85.5), (24100, 0.0))}
+        broker = PaperTradingBroker(initial_cash=500000.0, market_data=live, config=SimulationConfig())
+        for name in ('validate_options_symbol', 'get_available_expiries_for_symbol', 'find_closest_available_strike',
+                     'get_available_strikes_for_symbol', 'get_nearby_atm_options_ltp', 'get_options_volume',
+                     'calculate_atr_from_zerodha'):
+            self.assertTrue(asyncio.iscoroutinefunction(getattr(broker, name)), name)
+
+        cache = ContractSpecCache(tempfile.mkdtemp())
+        original = contract_specs_module.contract_specs
+        contract_specs_module.contract_specs = cache
+        try:
+            # Without today's specs: strikes and validity come from the quoted contracts
+            self.assertEqual(run(broker.get_available_strikes_for_symbol('NIFTY', code)), [24000, 24050, 24100])
+            self.assertEqual(run(broker.find_closest_available_strike('NIFTY', 24060, code)), 24050)
+            self.assertTrue(run(broker.validate_options_symbol(f'NIFTY{code}24000CE')))
+            self.assertEqual(run(broker.get_available_expiries_for_symbol('NIFTY')), [])
+
+            cache.build_from_instruments([
+                {'tradingsymbol': f'NIFTY{code}{strike}CE', 'name': 'NIFTY', 'instrument_type': 'CE',
+                 'expiry': expiry, 'strike': float(strike), 'lot_size': 75, 'tick_size': 0.05}
+                for strike in (23950, 24000, 24050, 24100)
+            ])
+            self.assertEqual(run(broker.get_available_strikes_for_symbol('NIFTY', code)), [23950, 24000, 24050, 24100])
+            self.assertEqual([e['date'] for e in run(broker.get_available_expiries_for_symbol('NIFTY'))], [expiry])
+            self.assertFalse(run(broker.validate_options_symbol(f'NIFTY{code}24025CE')))
+            self.assertEqual(run(broker.get_nearby_atm_options_ltp('NIFTY', 24050, code, band=1)),
+                             {f'NIFTY{code}24000CE': 110.0, f'NIFTY{code}24050CE': 85.5})
+        finally:
+            contract_specs_module.contract_specs = original
+
+        self.assertEqual(run(broker.get_options_volume(f'NIFTY{code}24050CE')), 1200)
+        self.assertIsNone(run(broker.get_options_volume(f'NIFTY{code}99999CE')))
+        self.assertEqual(run(broker.calculate_atr_from_zerodha('NIFTY')), 0.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
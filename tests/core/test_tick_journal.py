@@ -0,0 +1,132 @@
+"""
+Unit tests for TickJournal
+Tests the record layout round trip, daily rotation with compression, restart recovery and replay
+"""
+
+import asyncio
+import os
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+from datetime import datetime
+
+# Add repo root to path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from src.core.tick_journal import (IST, RECORD_SIZE, TickJournal, TickJournalReader,
+                                   compress_segment, list_segments)
+
+
+def ist_ns(day, hour, minute, second=0):
+    return int(IST.localize(datetime(2025, 12, day, hour, minute, second)).timestamp() * 1e9)
+
+
+class TestTickJournal(unittest.TestCase):
+    """Test suite for TickJournal and TickJournalReader"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.journal = TickJournal(self.directory, compress=False)
+
+    def tearDown(self):
+        self.journal.close()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_round_trip_in_truedata_schema(self):
+        data = {'ltp': 24010.5, 'close': 23900.0, 'high': 24050.0, 'low': 23880.0, 'open': 23910.0,
+                'volume': 125000, 'change_percent': 0.46, 'bid': 24010.0, 'ask': 24011.0, 'oi': 900}
+        self.assertTrue(self.journal.record('NIFTY-I', data))
+        self.journal.append('NIFTY25DEC24000CE', 120.5, volume=300, source='zerodha')
+        self.journal.append('NIFTY-I', 24012.0, previous_close=23900.0)
+
+        path = self.journal.get_stats()['current_segment']
+        reader = TickJournalReader(path)
+        ticks = list(reader)
+        self.assertEqual([t.symbol for t in ticks], ['NIFTY-I', 'NIFTY25DEC24000CE', 'NIFTY-I'])
+        self.assertEqual(reader.symbols, ['NIFTY-I', 'NIFTY25DEC24000CE'])
+        # 3 ticks + 2 symbol definitions
+        self.assertEqual(reader.count, 5)
+
+        market_data = ticks[0].to_market_data()
+        for key in ('ltp', 'high', 'low', 'open', 'volume', 'change_percent', 'bid', 'ask', 'oi'):
+            self.assertEqual(market_data[key], data[key], key)
+        self.assertEqual(market_data['previous_close'], 23900.0)
+        self.assertTrue(market_data['ohlc_available'])
+        self.assertEqual(ticks[1].to_market_data()['source'], 'journal_zerodha')
+
+    def test_daily_rotation_and_compressed_reads(self):
+        self.journal.append('SBIN', 800.0, ts_ns=ist_ns(1, 15, 29))
+        self.journal.append('SBIN', 801.0, ts_ns=ist_ns(1, 15, 30))
+        # Next IST day opens a new segment
+        self.journal.append('SBIN', 805.0, ts_ns=ist_ns(2, 9, 15))
+        self.assertEqual(self.journal.rotations, 1)
+
+        segments = list_segments(self.directory)
+        self.assertEqual(sorted(segments), ['20251201', '20251202'])
+        # Closed segments are trimmed to their records
+        self.assertEqual(os.path.getsize(segments['20251201']), 64 + 3 * RECORD_SIZE)
+
+        compressed = compress_segment(segments['20251201'])
+        self.assertTrue(compressed.endswith('.tj.gz'))
+        reader = TickJournalReader.for_session(self.directory, '20251201')
+        self.assertEqual([t.ltp for t in reader], [800.0, 801.0])
+        # The new day re-interns its symbols
+        self.assertEqual([t.symbol for t in TickJournalReader.for_session(self.directory, '20251202')], ['SBIN'])
+
+    def test_restart_resumes_segment(self):
+        now = time.time_ns()
+        self.journal.append('INFY', 1500.0, ts_ns=now)
+        self.journal.close()
+
+        journal = TickJournal(self.directory, compress=False)
+        journal.append('INFY', 1501.0, ts_ns=now + 1)
+        journal.append('TCS', 3500.0, ts_ns=now + 2)
+        journal.close()
+
+        ticks = list(TickJournalReader(list_segments(self.directory).popitem()[1]))
+        self.assertEqual([(t.symbol, t.ltp) for t in ticks], [('INFY', 1500.0), ('INFY', 1501.0), ('TCS', 3500.0)])
+
+    def test_kite_ticks(self):
+        ticks = [{'instrument_token': 256265, 'last_price': 102.0, 'volume_traded': 50, 'oi': 7,
+                  'ohlc': {'open': 99.0, 'high': 103.0, 'low': 98.0, 'close': 100.0},
+                  'depth': {'buy': [{'price': 101.5}], 'sell': [{'price': 102.5}]}},
+                 {'last_price': 1.0}]
+        self.assertEqual(self.journal.record_kite_ticks(ticks, {256265: 'BANKNIFTY'}), 1)
+        tick = next(iter(TickJournalReader(self.journal.get_stats()['current_segment'])))
+        self.assertEqual((tick.symbol, tick.bid, tick.ask, tick.volume), ('BANKNIFTY', 101.5, 102.5, 50))
+        self.assertAlmostEqual(tick.change_percent, 2.0)
+
+    def test_replay_speed_and_snapshots(self):
+        start = ist_ns(3, 10, 0)
+        for i in range(5):
+            # One tick every 100ms of session time
+            self.journal.append('RELIANCE' if i % 2 else 'HDFCBANK', 100.0 + i, ts_ns=start + i * 100_000_000)
+        path = self.journal.get_stats()['current_segment']
+
+        target = {}
+        seen = []
+        began = time.monotonic()
+        replayed = asyncio.new_event_loop().run_until_complete(
+            TickJournalReader(path).replay(speed=4.0, target=target, on_tick=lambda s, d: seen.append(s)))
+        elapsed = time.monotonic() - began
+        self.assertEqual(replayed, 5)
+        # 400ms of session at 4x is ~100ms
+        self.assertGreaterEqual(elapsed, 0.09)
+        self.assertLess(elapsed, 0.4)
+        self.assertEqual(target['HDFCBANK']['ltp'], 104.0)
+        self.assertEqual(len(seen), 5)
+
+        snapshots = list(TickJournalReader(path).snapshots(interval_seconds=0.2))
+        self.assertEqual([sorted(s) for _, s in snapshots][0], ['HDFCBANK', 'RELIANCE'])
+        self.assertEqual(snapshots[-1][1]['HDFCBANK']['ltp'], 104.0)
+
+    def test_disabled_journal_writes_nothing(self):
+        journal = TickJournal(os.path.join(self.directory, 'off'), enabled=False)
+        self.assertFalse(journal.append('SBIN', 800.0))
+        self.assertFalse(os.path.exists(os.path.join(self.directory, 'off')))
+
+
+if __name__ == '__main__':
+    unittest.main()
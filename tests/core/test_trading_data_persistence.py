@@ -0,0 +1,119 @@
+"""
+Unit tests for TradingDataPersistence
+Tests the WAL single-writer store: group commits, indexed session reads and online backups
+"""
+
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import threading
+import unittest
+
+# Add repo root to path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from src.core.trading_data_persistence import TradeRecord, TradingDataPersistence, TradingSession
+
+
+def make_trade(i, timestamp='2026-01-05T09:30:00'):
+    return TradeRecord(trade_id=f'T{i:04d}', symbol='NIFTY', action='BUY', quantity=50, price=19500.0 + i,
+                       timestamp=timestamp, pnl=float(i), status='completed', strategy='momentum')
+
+
+def make_session(session_id='S1', start_time='2026-01-05T09:15:00'):
+    return TradingSession(session_id=session_id, start_time=start_time, end_time=None, total_trades=0,
+                          daily_pnl=0.0, success_rate=0.0, is_active=True,
+                          strategies_performance={'momentum': {'trades': 0}})
+
+
+class TestTradingDataPersistence(unittest.TestCase):
+    """Test suite for the SQLite persistence layer"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.store = TradingDataPersistence(redis_url='redis://127.0.0.1:1/0',
+                                            db_path=os.path.join(self.directory, 'trading.db'))
+
+    def tearDown(self):
+        self.store.close()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_bursty_fills_are_group_committed(self):
+        self.store.save_trading_session(make_session())
+        self.store.save_trade(make_trade(0, timestamp='2026-01-05T09:00:00'))  # before the session
+
+        def fill_burst(offset):
+            for i in range(offset, offset + 100):
+                self.store.save_trade(make_trade(i))
+
+        threads = [threading.Thread(target=fill_burst, args=(offset,)) for offset in (1, 101, 201, 301)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        trades = self.store.get_trades_for_session('S1')
+        self.assertEqual(len(trades), 400)
+        stats = self.store.writer.stats
+        self.assertEqual(stats['failed'], 0)
+        self.assertLess(stats['commits'], stats['statements'])
+
+        session = self.store.get_current_session()
+        self.assertEqual(session.strategies_performance, {'momentum': {'trades': 0}})
+        self.assertTrue(session.is_active)
+
+        with sqlite3.connect(self.store.db_path) as conn:
+            self.assertEqual(conn.execute('PRAGMA journal_mode').fetchone()[0], 'wal')
+            plan = ' '.join(row[-1] for row in conn.execute(
+                'EXPLAIN QUERY PLAN SELECT * FROM trades WHERE timestamp >= ? ORDER BY timestamp DESC', ('x',)))
+            self.assertIn('idx_trades_timestamp', plan)
+
+    def test_failed_statement_does_not_fail_its_group(self):
+        bad = make_trade(1)
+        bad.symbol = None  # NOT NULL violation
+        futures = [self.store.save_trade(make_trade(0)), self.store.save_trade(bad),
+                   self.store.save_trade(make_trade(2))]
+        self.assertEqual(futures[0].result(timeout=5), 1)
+        self.assertIsInstance(futures[1].exception(timeout=5), sqlite3.IntegrityError)
+        self.assertEqual(futures[2].result(timeout=5), 1)
+        self.assertEqual(self.store.get_recovery_status()['total_trades'], 2)
+
+    def test_online_backup_and_restore(self):
+        self.store.save_trading_session(make_session())
+        self.store.save_trades([make_trade(i) for i in range(50)]).result(timeout=5)
+
+        # One page per step: the copy interleaves with writes instead of holding the source
+        backup = self.store.create_emergency_backup(os.path.join(self.directory, 'backups'),
+                                                    pages_per_step=1, step_sleep=0)
+        self.assertTrue(backup.endswith('.db'))
+        self.assertEqual(self.store.get_recovery_status()['last_backup'], backup)
+
+        restored = TradingDataPersistence(redis_url='redis://127.0.0.1:1/0',
+                                          db_path=os.path.join(self.directory, 'restored.db'))
+        try:
+            restored.restore_from_backup(backup)
+            status = restored.get_recovery_status()
+            self.assertEqual((status['total_trades'], status['total_sessions']), (50, 1))
+            self.assertEqual(restored.get_current_session().strategies_performance, {'momentum': {'trades': 0}})
+        finally:
+            restored.close()
+
+    def test_stepped_backup_lets_the_writer_commit(self):
+        self.store.save_trades([make_trade(i) for i in range(2000)]).result(timeout=10)
+        result = {}
+        backup_thread = threading.Thread(target=lambda: result.update(backup=self.store.create_emergency_backup(
+            os.path.join(self.directory, 'backups'), pages_per_step=1, step_sleep=0.01)))
+        backup_thread.start()
+        # The writer is never locked out for the whole copy
+        self.store.save_trade(make_trade(5000)).result(timeout=2)
+        self.assertTrue(backup_thread.is_alive())
+        backup_thread.join(timeout=30)
+        with sqlite3.connect(result['backup']) as copy:
+            count = copy.execute('SELECT COUNT(*) FROM trades').fetchone()[0]
+        self.assertIn(count, (2000, 2001))
+
+
+if __name__ == '__main__':
+    unittest.main()
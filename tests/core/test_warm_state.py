@@ -0,0 +1,123 @@
+"""
+Unit tests for WarmStateStore
+Tests checkpoint persistence, the SignalEnhancer top-up warmup and the regime model restore
+"""
+
+import asyncio
+import os
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+from datetime import datetime, timedelta
+
+import numpy as np
+
+# Add repo root to path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from src.core import warm_state as warm_state_module
+from src.core.signal_enhancement import SignalEnhancer
+from src.core.warm_state import WarmStateStore
+
+
+def run(coro):
+    return asyncio.new_event_loop().run_until_complete(coro)
+
+
+class FakeHistoryClient:
+    def __init__(self, candles=30):
+        self.candles = candles
+        self.calls = []
+
+    async def get_historical_data(self, symbol, interval, from_date, to_date, exchange='NSE'):
+        self.calls.append((symbol, from_date))
+        return [{'close': 100.0 + i, 'volume': 1000 + i, 'timestamp': to_date - timedelta(minutes=5 * (self.candles - i))}
+                for i in range(self.candles)]
+
+
+class TestWarmStateStore(unittest.TestCase):
+    """Test suite for warm-state checkpoints"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.store = WarmStateStore(self.directory, max_age=3600)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_save_and_load_with_age_limit(self):
+        now = time.time()
+        self.store.save('regime:test', {'matrix': np.eye(2), 'when': datetime(2026, 1, 5, 9, 15)}, now=now - 120)
+        state, age = self.store.load('regime:test', now=now)
+        self.assertEqual(state['matrix'], [[1.0, 0.0], [0.0, 1.0]])
+        self.assertEqual(state['when'], '2026-01-05T09:15:00')
+        self.assertAlmostEqual(age, 120, places=3)
+
+        self.assertIsNone(self.store.load('regime:test', now=now + 7200))
+        self.assertIsNone(self.store.load('missing'))
+        self.assertEqual([f for f in os.listdir(self.directory) if f.endswith('.tmp')], [])
+
+    def test_signal_enhancer_restores_and_tops_up(self):
+        enhancer = SignalEnhancer()
+        enhancer.zerodha_client = FakeHistoryClient()
+        self.assertEqual(run(enhancer.warmup_with_historical_data(['SBIN', 'TCS'], days=3)), 2)
+        enhancer.update_signal_outcome('s1', 'momentum', True, 250.0)
+        self.store.register('signal_enhancer', enhancer)
+        self.assertEqual(self.store.checkpoint(), 1)
+
+        # Fresh checkpoint: restored without a single historical call
+        restored = SignalEnhancer()
+        restored.zerodha_client = FakeHistoryClient()
+        self.assertIsNotNone(self.store.restore('signal_enhancer', restored))
+        self.assertEqual(run(restored.warmup_with_historical_data(['SBIN', 'TCS'], days=3)), 2)
+        self.assertEqual(restored.zerodha_client.calls, [])
+        self.assertEqual(restored.price_history['SBIN'], enhancer.price_history['SBIN'])
+        self.assertEqual(restored.strategy_performance['momentum']['wins'], 1)
+        self.assertIsInstance(restored.signal_history[0]['timestamp'], datetime)
+
+        # Older checkpoint: only the gap since it was written is fetched, history stays bounded
+        stale = SignalEnhancer()
+        stale.zerodha_client = FakeHistoryClient(candles=4)
+        state, _ = self.store.load('signal_enhancer')
+        stale.restore_warm_state(state, age_seconds=1800)
+        run(stale.warmup_with_historical_data(['SBIN'], days=3))
+        (symbol, from_date), = stale.zerodha_client.calls
+        self.assertLess(abs((datetime.now() - from_date).total_seconds() - 1800), 60)
+        self.assertEqual(stale.price_history['SBIN'][-1], 103.0)
+        self.assertLessEqual(len(stale.price_history['SBIN']), 50)
+
+    def test_regime_model_restores_fitted_hmm(self):
+        from strategies.regime_adaptive_controller import RegimeAdaptiveController
+
+        controller = RegimeAdaptiveController({})
+        rng = np.random.default_rng(7)
+        observations = np.abs(rng.normal(0.02, 0.01, size=(80, 3)))
+        controller.hmm_model.baum_welch(observations, 5)
+        _, controller.hmm_state_probabilities = controller.hmm_model.seed_filter(observations)
+        controller.feature_history = [{'timestamp': datetime(2026, 1, 5, 9, 15) + timedelta(minutes=5 * i),
+                                       'features': np.r_[row, [0.5, 0.0, 0.0, 0.0]], 'raw_data': {'volatility': row[0]}}
+                                      for i, row in enumerate(observations)]
+        self.store.save(controller.strategy_name, controller.export_warm_state())
+
+        restored = RegimeAdaptiveController({})
+        original_store = warm_state_module.warm_state
+        warm_state_module.warm_state = self.store
+        try:
+            # Fresh fitted checkpoint: warmup returns before looking for a broker client
+            run(restored._warmup_hmm_with_historical_data())
+        finally:
+            warm_state_module.warm_state = original_store
+
+        self.assertTrue(restored.hmm_model.is_fitted)
+        self.assertEqual(len(restored.feature_history), 80)
+        self.assertEqual(restored.feature_history[-1]['timestamp'], controller.feature_history[-1]['timestamp'])
+        np.testing.assert_allclose(restored.hmm_model.transition_matrix, controller.hmm_model.transition_matrix)
+        observation = observations[-1]
+        np.testing.assert_allclose(restored.hmm_model.filter_step(observation)[1],
+                                   controller.hmm_model.filter_step(observation)[1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,148 @@
+"""
+Unit tests for the streaming DataQualityMonitor
+Tests windowed statistics, spike/gap/staleness/volume detectors and the published score
+"""
+
+import asyncio
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+import unittest
+from datetime import datetime
+
+# Add repo root to path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+import monitoring.data_quality_monitor as data_quality_monitor_module
+from monitoring.data_quality_monitor import DataQualityMonitor
+
+
+def run(coro):
+    return asyncio.new_event_loop().run_until_complete(coro)
+
+
+class TestDataQualityMonitor(unittest.TestCase):
+    """Test suite for the per-symbol streaming quality engine"""
+
+    def setUp(self):
+        self.monitor = DataQualityMonitor({'data_quality': {'thresholds': {'window': 32}}})
+
+    def feed(self, symbol, prices, start=1000.0, step=1.0, volume=None):
+        for i, price in enumerate(prices):
+            self.monitor.record_tick(symbol, price, volume, timestamp=start + i * step)
+        return start + (len(prices) - 1) * step
+
+    def test_window_statistics_are_bounded_and_exact(self):
+        rng = random.Random(7)
+        prices = [100.0]
+        for _ in range(200):
+            prices.append(prices[-1] * (1 + rng.gauss(0, 0.001)))
+        self.feed('SBIN', prices)
+
+        state = self.monitor.metrics['SBIN']
+        self.assertEqual(len(state.returns), 32)
+        expected = [(b - a) / a for a, b in zip(prices, prices[1:])][-32:]
+        mean, std = state.mean_std()
+        self.assertAlmostEqual(mean, statistics.fmean(expected), places=12)
+        self.assertAlmostEqual(std, statistics.pstdev(expected), places=9)
+        self.assertEqual(self.monitor.get_score('SBIN', now=1200.0), 1.0)
+
+    def test_spike_gap_and_volume_detectors(self):
+        rng = random.Random(3)
+        last = self.feed('INFY', [1500 + rng.uniform(-0.5, 0.5) for _ in range(40)])
+        self.assertEqual(self.monitor.record_tick('INFY', 1530.0, timestamp=last + 1), ['price_spike'])
+        self.assertEqual(self.monitor.record_tick('INFY', 1700.0, timestamp=last + 2), ['price_spike'])
+        self.assertEqual(self.monitor.record_tick('INFY', 1700.1, timestamp=last + 400), ['data_gap'])
+        # A new session after a long silence is not a gap
+        self.assertEqual(self.monitor.record_tick('INFY', 1650.0, timestamp=last + 8 * 3600), [])
+
+        self.monitor.record_tick('TCS', 3500.0, volume=1000, timestamp=0.0)
+        self.assertEqual(self.monitor.record_tick('TCS', 3500.5, volume=900, timestamp=1.0), ['volume_regression'])
+        self.assertEqual(self.monitor.record_tick('TCS', 0, volume=900, timestamp=2.0), ['missing_data'])
+
+        quality = self.monitor.get_quality('INFY', now=last + 8 * 3600)
+        self.assertEqual((quality['spikes'], quality['gaps']), (2, 1))
+        self.assertLess(quality['score'], 1.0)
+
+    def test_score_recovers_and_goes_stale(self):
+        last = self.feed('NIFTY-I', [24000.0] * 10)
+        self.monitor.record_tick('NIFTY-I', 0, timestamp=last + 1)
+        degraded = self.monitor.get_score('NIFTY-I', now=last + 1)
+        self.assertLess(degraded, 1.0)
+        last = self.feed('NIFTY-I', [24000.0] * 100, start=last + 2)
+        self.assertGreater(self.monitor.get_score('NIFTY-I', now=last), degraded)
+        self.assertEqual(self.monitor.get_score('NIFTY-I', now=last + 31), 0.0)
+        self.assertIsNone(self.monitor.get_score('UNKNOWN'))
+
+    def test_concurrent_tick_workers_and_async_alerts(self):
+        def worker(symbols):
+            for i in range(500):
+                for symbol in symbols:
+                    self.monitor.record_tick(symbol, 100.0 + (i % 3) * 0.05, volume=i)
+
+        threads = [threading.Thread(target=worker, args=(['A', 'B', 'C'],)) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(sum(self.monitor.metrics[s].ticks for s in 'ABC'), 4 * 500 * 3)
+
+        alerts = []
+
+        async def collect(alert):
+            alerts.append(alert)
+
+        self.monitor.add_alert_callback(collect)
+        ok = run(self.monitor.check_data_quality('D', {'price': 50.0, 'volume': 10, 'timestamp': datetime.now()}))
+        self.assertTrue(ok)
+        self.assertFalse(run(self.monitor.check_data_quality('D', {'price': 0.0})))
+        self.assertIn('missing_data', [a['type'] for a in alerts])
+
+    def test_monitor_loop_delivers_tick_alerts(self):
+        alerts = []
+
+        async def collect(alert):
+            alerts.append(alert['type'])
+
+        self.monitor.add_alert_callback(collect)
+
+        async def scenario():
+            await self.monitor.start()
+            self.monitor.record_tick('E', 100.0, timestamp=1000.0)
+            self.monitor.record_tick('E', 100.0, timestamp=1400.0)
+            await asyncio.sleep(0.05)
+            delivered = list(alerts)
+            self.monitor.record_tick('E', 100.0, timestamp=1800.0)
+            await self.monitor.stop()
+            return delivered
+
+        delivered = run(scenario())
+        self.assertEqual(delivered, ['data_gap'])
+        # stop() flushes what the loop had not picked up yet
+        self.assertEqual(alerts, ['data_gap', 'data_gap'])
+        self.assertIsNone(self.monitor._monitoring_task)
+
+    def test_strategies_skip_signals_on_a_degraded_feed(self):
+        from strategies.base_strategy import BaseStrategy
+
+        strategy = BaseStrategy({})
+        now = time.time()
+        self.monitor.record_tick('FRESH', 100.0, timestamp=now)
+        self.monitor.record_tick('STALE', 100.0, timestamp=now - 120)
+        original = data_quality_monitor_module.data_quality_monitor
+        data_quality_monitor_module.data_quality_monitor = self.monitor
+        try:
+            self.assertTrue(strategy._has_acceptable_data_quality('FRESH'))
+            self.assertTrue(strategy._has_acceptable_data_quality('NEVER_SEEN'))
+            self.assertFalse(strategy._has_acceptable_data_quality('STALE'))
+            signal = run(strategy.create_standard_signal('STALE', 'BUY', 100.0, 99.0, 102.0, 9.0, {}))
+            self.assertIsNone(signal)
+        finally:
+            data_quality_monitor_module.data_quality_monitor = original
+
+
+if __name__ == '__main__':
+    unittest.main()
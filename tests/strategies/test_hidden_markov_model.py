@@ -0,0 +1,108 @@
+"""
+Unit tests for the vectorized HMM regime engine
+Checks the log-space recursions against a direct reference computation
+"""
+
+import unittest
+import sys
+import os
+import time
+
+import numpy as np
+
+# Add repo root to path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from strategies.regime_adaptive_controller import HiddenMarkovModel, KalmanFilter
+
+
+def reference_log_likelihood(hmm, obs):
+    """Unscaled forward pass with explicit inverses/determinants (small T only)"""
+    def pdf(x, mean, cov):
+        d = len(x)
+        diff = x - mean
+        return np.exp(-0.5 * diff @ np.linalg.inv(cov) @ diff) / np.sqrt((2 * np.pi) ** d * np.linalg.det(cov))
+
+    n = hmm.n_states
+    alpha = np.array([hmm.initial_probabilities[i] * pdf(obs[0], hmm.emission_means[i], hmm.emission_covariances[i])
+                      for i in range(n)])
+    for t in range(1, len(obs)):
+        alpha = np.array([
+            (alpha @ hmm.transition_matrix[:, j]) * pdf(obs[t], hmm.emission_means[j], hmm.emission_covariances[j])
+            for j in range(n)
+        ])
+    return np.log(alpha.sum())
+
+
+def regime_series(n=600, seed=7):
+    """Two well-separated regimes that switch every 100 bars"""
+    rng = np.random.default_rng(seed)
+    means = np.array([[0.0, 0.0, 0.0], [3.0, -3.0, 3.0]])
+    states = (np.arange(n) // 100) % 2
+    return means[states] + rng.normal(scale=0.5, size=(n, 3)), states
+
+
+class TestHiddenMarkovModel(unittest.TestCase):
+    """Test suite for HiddenMarkovModel"""
+
+    def setUp(self):
+        np.random.seed(0)
+        self.hmm = HiddenMarkovModel(n_states=3, n_features=3)
+
+    def test_forward_matches_reference(self):
+        obs = np.random.randn(20, 3)
+        _, log_likelihood = self.hmm.forward(obs)
+        self.assertAlmostEqual(log_likelihood, reference_log_likelihood(self.hmm, obs), places=6)
+
+    def test_forward_is_stable_for_outliers(self):
+        obs = np.random.randn(50, 3)
+        obs[25] = 1e3
+        alpha, log_likelihood = self.hmm.forward(obs)
+        self.assertTrue(np.isfinite(log_likelihood))
+        np.testing.assert_allclose(alpha.sum(axis=1), 1.0, atol=1e-6)
+
+    def test_baum_welch_separates_regimes_quickly(self):
+        obs, states = regime_series()
+        hmm = HiddenMarkovModel(n_states=2, n_features=3)
+        hmm.emission_means = np.array([[0.5, 0.0, 0.5], [2.5, -2.5, 2.5]])
+        hmm._refresh_emission_cache()
+
+        start = time.perf_counter()
+        ll_first = hmm.baum_welch(obs, n_iterations=1)
+        ll_final = hmm.baum_welch(obs, n_iterations=10)
+        elapsed = time.perf_counter() - start
+
+        self.assertTrue(hmm.is_fitted)
+        self.assertGreaterEqual(ll_final, ll_first - 1e-6)
+        self.assertLess(elapsed, 1.0)
+        path, _ = hmm.viterbi(obs)
+        self.assertGreater(np.mean(path == states), 0.98)
+        np.testing.assert_allclose(hmm.transition_matrix.sum(axis=1), 1.0, atol=1e-6)
+
+    def test_online_filter_matches_forward(self):
+        obs, _ = regime_series(n=200)
+        hmm = HiddenMarkovModel(n_states=2, n_features=3)
+        hmm.baum_welch(obs, n_iterations=5)
+
+        alpha, _ = hmm.forward(obs)
+        hmm.seed_filter(obs[:150])
+        for row in obs[150:]:
+            state, probs = hmm.filter_step(row)
+        np.testing.assert_allclose(probs, alpha[-1], atol=1e-6)
+        self.assertEqual(state, int(np.argmax(alpha[-1])))
+
+
+class TestKalmanFilter(unittest.TestCase):
+    """Test suite for KalmanFilter"""
+
+    def test_converges_to_constant_observation(self):
+        kf = KalmanFilter()
+        target = np.array([0.2, -0.1, 1.5])
+        for _ in range(200):
+            kf.predict(np.eye(3))
+            state, _ = kf.update(target, np.eye(3))
+        np.testing.assert_allclose(state, target, atol=1e-3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,49 @@
+"""
+Unit tests for the volume scalper's ML feature extraction
+Checks that bar-stable indicators are cached while tick-level features stay live
+"""
+
+import unittest
+import sys
+import os
+
+import numpy as np
+
+# Add repo root to path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from strategies.optimized_volume_scalper import OptimizedVolumeScalper
+
+
+class TestScalperMLFeatures(unittest.TestCase):
+    """Test suite for per-bar feature caching"""
+
+    def setUp(self):
+        self.scalper = OptimizedVolumeScalper({})
+        self.scalper.price_history['SBIN'] = list(800 + np.cumsum(np.random.default_rng(1).normal(size=40)))
+        self.scalper.volume_history['SBIN'] = [1000, 1100, 900, 1000, 1000]
+
+    def test_tick_features_are_live_within_a_bar(self):
+        built = []
+        build = self.scalper._extract_bar_ml_features
+        self.scalper._extract_bar_ml_features = lambda symbol: built.append(symbol) or build(symbol)
+
+        quiet = {'volume': 1000, 'ltp': 801.0, 'high': 802.0, 'low': 800.0, 'close': 801.0}
+        spike = {'volume': 3000, 'ltp': 801.9, 'high': 802.0, 'low': 800.0, 'close': 801.9}
+        market1, technical1 = self.scalper._extract_symbol_ml_features('SBIN', quiet)
+        market2, technical2 = self.scalper._extract_symbol_ml_features('SBIN', spike)
+
+        # Indicators are built once per bar...
+        self.assertEqual(built, ['SBIN'])
+        self.assertEqual((len(market1), len(technical1)), (21, 10))
+        np.testing.assert_array_equal(market1[:5], market2[:5])
+        np.testing.assert_array_equal(technical1[:7], technical2[:7])
+        # ...while volume ratio, absolute volume and buying/selling pressure follow the tick
+        self.assertEqual((market1[12], market1[14]), (1.0, 1000))
+        self.assertEqual((market2[12], market2[14]), (3.0, 3000))
+        np.testing.assert_allclose(technical1[7:], [0.5, 0.5, 0.0])
+        np.testing.assert_allclose(technical2[7:], [0.95, 0.05, 0.9])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+"""
+Unit tests for hot-path metrics
+Tests thread-local accumulation, flushed Prometheus exposition and the timing helpers
+"""
+
+import asyncio
+import os
+import sys
+import threading
+import unittest
+
+# Add repo root to path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from prometheus_client import CollectorRegistry, generate_latest
+
+from src.utils.hot_metrics import HotMetricsRegistry, _Metric, symbol_class, timed_async
+
+
+def run(coro):
+    return asyncio.new_event_loop().run_until_complete(coro)
+
+
+class TestHotMetrics(unittest.TestCase):
+    """Test suite for the hot-path metrics registry"""
+
+    def setUp(self):
+        self.metrics = HotMetricsRegistry(flush_interval=0)
+        self.registry = CollectorRegistry()
+        self.registry.register(self.metrics)
+
+    def scrape(self):
+        return generate_latest(self.registry).decode()
+
+    def test_thread_local_cells_sum_on_flush(self):
+        ticks = self.metrics.counter('test_ticks', 'ticks', ['symbol_class'])
+        latency = self.metrics.histogram('test_latency_seconds', 'latency', ['symbol_class'],
+                                         buckets=(0.001, 0.01))
+        option_ticks, option_latency = ticks.labels('option'), latency.labels('option')
+        self.assertIs(ticks.labels('option'), option_ticks)
+
+        def worker():
+            for i in range(1000):
+                option_ticks.inc()
+                option_latency.observe(0.0005 if i % 2 else 0.005)
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        latency.labels('index').observe(1.0)
+
+        text = self.scrape()
+        self.assertIn('test_ticks_total{symbol_class="option"} 4000.0', text)
+        self.assertIn('test_latency_seconds_bucket{le="0.001",symbol_class="option"} 2000.0', text)
+        self.assertIn('test_latency_seconds_bucket{le="0.01",symbol_class="option"} 4000.0', text)
+        self.assertIn('test_latency_seconds_bucket{le="+Inf",symbol_class="index"} 1.0', text)
+        self.assertIn('test_latency_seconds_count{symbol_class="option"} 4000.0', text)
+        self.assertEqual(len(ticks._shards), 4)
+
+    def test_snapshot_served_between_flushes_and_gauges(self):
+        self.metrics.flush_interval = 3600
+        counter = self.metrics.counter('test_orders', 'orders').labels()
+        depth = {'value': 7}
+        self.metrics.gauge('test_queue_depth', 'depth', lambda: depth['value'])
+        self.metrics.flush()
+        counter.inc(3)
+        depth['value'] = 9
+        self.assertIn('test_orders_total 0.0', self.scrape())
+        self.assertIn('test_queue_depth 7.0', self.scrape())
+        self.metrics.flush()
+        self.assertIn('test_orders_total 3.0', self.scrape())
+        self.assertIn('test_queue_depth 9.0', self.scrape())
+
+    def test_timed_async_labels_outcome(self):
+        histogram = self.metrics.histogram('test_call_seconds', 'calls', ['layer', 'outcome'])
+
+        @timed_async(histogram, 'broker', outcome=lambda order_id: 'ok' if order_id else 'rejected')
+        async def place(order_id):
+            if order_id == 'boom':
+                raise RuntimeError(order_id)
+            return order_id
+
+        run(place('1'))
+        run(place(None))
+        with self.assertRaises(RuntimeError):
+            run(place('boom'))
+        text = self.scrape()
+        for outcome in ('ok', 'rejected', 'error'):
+            self.assertIn(f'test_call_seconds_count{{layer="broker",outcome="{outcome}"}} 1.0', text)
+        with self.assertRaises(ValueError):
+            histogram.labels('broker')
+
+    def test_symbol_class(self):
+        self.assertEqual(symbol_class('NIFTY-I'), 'index')
+        self.assertEqual(symbol_class('NIFTY25DEC24000CE'), 'option')
+        self.assertEqual(symbol_class('BANKNIFTY25DECFUT'), 'future')
+        self.assertEqual(symbol_class('SBIN'), 'equity')
+        hits = symbol_class.cache_info().hits
+        self.assertEqual(symbol_class('SBIN'), 'equity')
+        self.assertEqual(symbol_class.cache_info().hits, hits + 1)
+
+    def test_metric_base_is_abstract(self):
+        with self.assertRaises(TypeError):
+            _Metric('test_base', 'base', [])
+
+
+if __name__ == '__main__':
+    unittest.main()